@@ -8,6 +8,16 @@ from app.web.routes import register_routes
 import os
 from dotenv import load_dotenv
 
+def _is_reloader_parent(app):
+    """
+    Processus de surveillance du rechargeur Werkzeug (mode debug) : il ne sert
+    aucune requête, seul le processus enfant (WERKZEUG_RUN_MAIN=true) démarre
+    les threads d'arrière-plan
+    """
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        return False
+    return bool(app.debug)
+
 def create_app(config_name='development'):
     """Factory pour créer l'application Flask"""
     
@@ -30,4 +40,9 @@ def create_app(config_name='development'):
     # Enregistrer les routes
     register_routes(app)
     
+    # Démarrer le rafraîchissement en arrière-plan si activé
+    if app.config.get('REFRESH_SCHEDULER_ENABLED') and not _is_reloader_parent(app):
+        from app.services.refresh_scheduler import get_refresh_scheduler
+        get_refresh_scheduler(app).start()
+    
     return app 
\ No newline at end of file
@@ -35,12 +35,170 @@ class Config:
     MAX_RETRIES = 3
     DELAY_BETWEEN_REQUESTS = 1  # secondes
     
+    # Récupération HTTP partagée (sites web des leads)
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 20))
+    HTTP_PER_HOST_LIMIT = int(os.environ.get('HTTP_PER_HOST_LIMIT', 2))
+    HTTP_MAX_WORKERS = int(os.environ.get('HTTP_MAX_WORKERS', 10))
+    HTTP_DNS_CACHE_TTL = 300  # secondes
+    HTTP_DNS_CACHE_MAX_ENTRIES = 1000  # au-delà : entrées expirées puis les plus anciennes retirées
+    HTTP2_ENABLED = os.environ.get('HTTP2_ENABLED', 'true').lower() == 'true'
+    HTTP_HTML_CONTENT_TYPES = ['text/html', 'application/xhtml+xml']  # autres types rejetés dès les en-têtes
+    HTTP_MAX_BODY_BYTES = int(os.environ.get('HTTP_MAX_BODY_BYTES', 500000))  # au-delà : début et fin seulement
+    HTTP_BODY_HEAD_BYTES = 80000   # début conservé d'une page trop volumineuse
+    HTTP_BODY_TAIL_BYTES = 20000   # fin conservée (pied de page : contact, réseaux sociaux)
+    HTTP_MAX_DOWNLOAD_BYTES = int(os.environ.get('HTTP_MAX_DOWNLOAD_BYTES', 10 * 1024 * 1024))  # lecture interrompue au-delà
+    
+    # Cache disque du HTML des sites (revalidation ETag / Last-Modified)
+    HTML_CACHE_ENABLED = os.environ.get('HTML_CACHE_ENABLED', 'true').lower() == 'true'
+    HTML_CACHE_DIR = os.environ.get('HTML_CACHE_DIR', os.path.join('cache', 'html'))
+    HTML_CACHE_MAX_AGE_DAYS = int(os.environ.get('HTML_CACHE_MAX_AGE_DAYS', 90))
+    HTML_CACHE_MAX_SIZE_MB = int(os.environ.get('HTML_CACHE_MAX_SIZE_MB', 200))
+    
+    # Cache disque des réponses OpenAI (modèle + gabarit + entrée normalisée)
+    LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_DIR = os.environ.get('LLM_CACHE_DIR', os.path.join('cache', 'llm'))
+    LLM_CACHE_TTL_DAYS = int(os.environ.get('LLM_CACHE_TTL_DAYS', 30))
+    LLM_CACHE_MAX_SIZE_MB = int(os.environ.get('LLM_CACHE_MAX_SIZE_MB', 100))
+    
+    # Télémétrie des appels OpenAI (type, modèle, tokens, latence, cache, issue, coût ; par lead et par scraping)
+    LLM_TELEMETRY_ENABLED = os.environ.get('LLM_TELEMETRY_ENABLED', 'true').lower() == 'true'
+    LLM_TELEMETRY_FILE = os.environ.get('LLM_TELEMETRY_FILE', os.path.join('logs', 'llm_calls.jsonl'))
+    LLM_TELEMETRY_MAX_CALLS = 2000  # appels conservés en mémoire
+    # Rotation du fichier : llm_calls.jsonl.1 (le plus récent) ... .N, les plus anciens supprimés
+    LLM_TELEMETRY_MAX_SIZE_MB = int(os.environ.get('LLM_TELEMETRY_MAX_SIZE_MB', 20))
+    LLM_TELEMETRY_BACKUP_COUNT = int(os.environ.get('LLM_TELEMETRY_BACKUP_COUNT', 5))
+    
+    # Client HTTP OpenAI partagé (pool de connexions, reprises des 429 / 5xx, délais par modèle)
+    OPENAI_API_BASE = os.environ.get('OPENAI_API_BASE', 'https://api.openai.com/v1')  # serveur local : scripts/openai_batch_stub.py
+    OPENAI_POOL_SIZE = int(os.environ.get('OPENAI_POOL_SIZE', 10))  # connexions conservées
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 4))
+    OPENAI_BACKOFF_BASE = 1.0  # secondes, doublées à chaque reprise (valeur aléatoire jusqu'à ce plafond)
+    OPENAI_BACKOFF_MAX = 30
+    OPENAI_RETRY_AFTER_MAX = 60  # Retry-After plus long : abandon plutôt que de bloquer le lead
+    OPENAI_CONNECT_TIMEOUT = 10
+    OPENAI_DEFAULT_TIMEOUT = 60  # secondes de lecture, modèles absents de OPENAI_TIMEOUTS
+    OPENAI_TIMEOUTS = {'gpt-3.5-turbo': 45, 'gpt-4': 120, 'gpt-4o': 90}
+    
+    # Analyses différées par l'API Batch d'OpenAI (réanalyses de nuit, moitié prix)
+    BATCH_DIR = os.environ.get('BATCH_DIR', os.path.join('cache', 'batch'))  # fichiers JSONL et suivi des lots
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 5000))  # requêtes par lot (limite API : 50000)
+    BATCH_POLL_INTERVAL = int(os.environ.get('BATCH_POLL_INTERVAL', 60))  # secondes entre deux consultations
+    BATCH_COMPLETION_WINDOW = '24h'
+    
+    # Worker Scrapy persistant (sites web)
+    CRAWLER_CONCURRENT_REQUESTS = int(os.environ.get('CRAWLER_CONCURRENT_REQUESTS', 16))
+    CRAWLER_CONCURRENT_PER_DOMAIN = int(os.environ.get('CRAWLER_CONCURRENT_PER_DOMAIN', 2))
+    CRAWLER_TIMEOUT = 60  # secondes par lot
+    
+    # Exploration bornée des pages contact / mentions légales / à propos
+    SITE_CRAWL_ENABLED = os.environ.get('SITE_CRAWL_ENABLED', 'true').lower() == 'true'
+    SITE_CRAWL_MAX_PAGES = int(os.environ.get('SITE_CRAWL_MAX_PAGES', 4))  # pages en plus de l'accueil
+    SITE_CRAWL_MAX_DEPTH = int(os.environ.get('SITE_CRAWL_MAX_DEPTH', 1))  # 1 = liens de la page d'accueil
+    SITE_CRAWL_TIME_BUDGET = int(os.environ.get('SITE_CRAWL_TIME_BUDGET', 15))  # secondes par site
+    SITE_CRAWL_REQUIRED_FIELDS = ['emails', 'phones', 'social_media']  # arrêt dès qu'ils sont trouvés
+    
+    # Pages candidates issues de robots.txt / sitemap.xml (cache par domaine)
+    SITEMAP_ENABLED = os.environ.get('SITEMAP_ENABLED', 'true').lower() == 'true'
+    SITEMAP_TIMEOUT = 8  # secondes par document
+    SITEMAP_MAX_URLS = 5000  # URLs lues au plus par site
+    SITEMAP_MAX_FILES = 4  # sitemaps lus au plus par site (index compris)
+    SITEMAP_MAX_BYTES = 5 * 1024 * 1024  # par sitemap
+    SITEMAP_CACHE_TTL = 24 * 3600  # secondes
+    
+    # Rendu navigateur des sites JavaScript (coquilles vides servies à requests : Wix, Squarespace, React...)
+    JS_RENDER_ENABLED = os.environ.get('JS_RENDER_ENABLED', 'true').lower() == 'true'
+    JS_RENDER_MAX_PAGES = int(os.environ.get('JS_RENDER_MAX_PAGES', 2))  # pages rendues simultanément
+    JS_RENDER_TIMEOUT = int(os.environ.get('JS_RENDER_TIMEOUT', 15))  # secondes par page (chargement)
+    JS_RENDER_IDLE_TIMEOUT = 3  # attente supplémentaire de l'inactivité réseau (secondes)
+    JS_RENDER_START_TIMEOUT = 30  # lancement du navigateur (secondes)
+    JS_SHELL_MIN_TEXT_CHARS = 300  # en dessous : page candidate au rendu
+    JS_SHELL_MAX_TEXT_RATIO = 0.02  # texte visible / taille du HTML
+    
+    # Extraction déterministe avant l'IA : OpenAI n'est appelé que pour les champs cibles manquants
+    LLM_GATE_ENABLED = os.environ.get('LLM_GATE_ENABLED', 'true').lower() == 'true'
+    LLM_GATE_TARGET_FIELDS = os.environ.get('LLM_GATE_TARGET_FIELDS', 'emails,telephones,adresse,description,horaires,services').split(',')
+    
+    # Texte compact envoyé à l'IA (page HTML convertie), tailles en tokens (tiktoken si installé, sinon caractères / 4)
+    LLM_STANDARD_MAX_TOKENS = int(os.environ.get('LLM_STANDARD_MAX_TOKENS', 4000))  # un appel gpt-3.5-turbo ; au-delà, analyse complète
+    LLM_FULL_MAX_TOKENS = int(os.environ.get('LLM_FULL_MAX_TOKENS', 12000))  # un appel OPENAI_FULL_MODEL ; au-delà, par sections
+    LLM_CHUNK_TOKENS = int(os.environ.get('LLM_CHUNK_TOKENS', 3000))  # taille d'une section
+    # max_tokens des analyses de site (réservés dans la fenêtre du modèle) : réponse mesurée ~800 tokens
+    LLM_OUTPUT_TOKENS = int(os.environ.get('LLM_OUTPUT_TOKENS', 1200))
+    # Analyse complète : seulement si la fenêtre du modèle, réponse et consignes déduites,
+    # dépasse LLM_STANDARD_MAX_TOKENS (sinon les gros textes passent directement par sections)
+    OPENAI_FULL_MODEL = os.environ.get('OPENAI_FULL_MODEL', 'gpt-4o')
+    OPENAI_CONTEXT_TOKENS = {'gpt-3.5-turbo': 16385, 'gpt-4': 8192, 'gpt-4o': 128000}
+    
+    # Analyse par sections des très gros sites : sections envoyées en parallèle, arrêt dès que les champs cibles sont trouvés
+    CHUNK_ANALYSIS_WORKERS = int(os.environ.get('CHUNK_ANALYSIS_WORKERS', 3))  # sections simultanées par lead
+    CHUNK_ANALYSIS_GLOBAL_LIMIT = int(os.environ.get('CHUNK_ANALYSIS_GLOBAL_LIMIT', 6))  # sections simultanées pour tout le processus
+    CHUNK_ANALYSIS_TARGET_FIELDS = os.environ.get('CHUNK_ANALYSIS_TARGET_FIELDS', 'emails,telephones,adresse,description,facebook,instagram').split(',')
+    
+    # Analyse partagée des sites référencés par plusieurs leads (chaînes, Linktree, TheFork...)
+    WEBSITE_DEDUP_ENABLED = os.environ.get('WEBSITE_DEDUP_ENABLED', 'true').lower() == 'true'
+    WEBSITE_DEDUP_MAX_AGE_DAYS = int(os.environ.get('WEBSITE_DEDUP_MAX_AGE_DAYS', 30))  # réutilisation d'une analyse enregistrée
+    WEBSITE_DEDUP_WAIT_TIMEOUT = 300  # attente d'une analyse en cours du même site (secondes)
+    
     # Limites
     MAX_LEADS_PER_REQUEST = 50
-    MAX_SCRAPING_TIME = 300  # secondes
+    MAX_SCRAPING_TIME = int(os.environ.get('MAX_SCRAPING_TIME', 300))  # secondes
+    
+    # Dégradation à l'approche de MAX_SCRAPING_TIME : part du temps écoulée au-delà de
+    # laquelle chaque étape coûteuse est abandonnée pour les leads restants
+    SCRAPING_DEGRADATION_THRESHOLDS = {
+        'full_html': 0.5,     # analyse OPENAI_FULL_MODEL du HTML complet / par sections
+        'js_render': 0.55,    # rendu navigateur des sites JavaScript
+        'site_crawl': 0.6,    # exploration des pages contact / mentions légales
+        'vision': 0.7,        # analyse Vision des captures
+        'screenshots': 0.85,  # captures Playwright des réseaux sociaux
+        'website_ai': 0.95    # analyse IA du site (remplacée par l'analyse HTML manuelle)
+    }
+    
+    # Tarifs API (USD) utilisés pour les estimations de coût
+    PLACES_GEOCODING_COST = 0.005
+    PLACES_NEARBY_SEARCH_COST = 0.032
+    PLACES_DETAILS_COST = 0.017
+    OPENAI_PRICING = {  # USD pour 1000 tokens (entrée, sortie)
+        'gpt-3.5-turbo': (0.0005, 0.0015),
+        'gpt-4': (0.03, 0.06),
+        'gpt-4o': (0.005, 0.015)
+    }
     
     # Captures d'écran
     SCREENSHOTS_DIR = os.environ.get('SCREENSHOTS_DIR', 'screenshots')
+    
+    # Préparation des captures avant l'analyse Vision (recadrage, réduction, réencodage ; Pillow requis)
+    VISION_PREPROCESS_ENABLED = os.environ.get('VISION_PREPROCESS_ENABLED', 'true').lower() == 'true'
+    VISION_CROP_HEIGHT = {'facebook': 0.8, 'instagram': 0.65}  # part conservée du haut de la capture (en-tête du profil)
+    VISION_MAX_WIDTH = int(os.environ.get('VISION_MAX_WIDTH', 1024))  # 1024x768 : 4 tuiles de 512 px au plus
+    VISION_MAX_HEIGHT = int(os.environ.get('VISION_MAX_HEIGHT', 768))
+    VISION_IMAGE_FORMAT = os.environ.get('VISION_IMAGE_FORMAT', 'JPEG')  # JPEG ou WEBP
+    VISION_IMAGE_QUALITY = 80
+    VISION_DETAIL = os.environ.get('VISION_DETAIL', 'high')  # 'low' : 85 tokens, texte fin illisible
+    
+    # Captures inchangées : l'analyse Vision précédente est réutilisée (empreinte dHash de l'en-tête du profil)
+    VISION_CHANGE_DETECTION_ENABLED = os.environ.get('VISION_CHANGE_DETECTION_ENABLED', 'true').lower() == 'true'
+    VISION_HASH_SIZE = 16  # empreinte de 256 bits
+    VISION_HASH_THRESHOLD = int(os.environ.get('VISION_HASH_THRESHOLD', 8))  # bits différents tolérés
+    # Au-delà : nouvelle analyse. Plafonné sous REFRESH_MAX_AGE_DAYS['social'] : un rafraîchissement
+    # planifié des réseaux sociaux relance toujours Vision au lieu de reprendre des compteurs périmés
+    VISION_REUSE_MAX_AGE_DAYS = int(os.environ.get('VISION_REUSE_MAX_AGE_DAYS', 7))
+
+    # Compteurs des profils lus dans la page (balises meta, texte de l'en-tête) avant toute capture Vision
+    SOCIAL_DOM_FIRST_ENABLED = os.environ.get('SOCIAL_DOM_FIRST_ENABLED', 'true').lower() == 'true'
+    SOCIAL_DOM_REQUIRED_FIELDS = {'facebook': ['followers'], 'instagram': ['followers', 'following', 'posts']}
+    SOCIAL_PAGE_TIMEOUT = int(os.environ.get('SOCIAL_PAGE_TIMEOUT', 15000))  # ms, attente de l'en-tête du profil
+    SOCIAL_NETWORKIDLE_TIMEOUT = int(os.environ.get('SOCIAL_NETWORKIDLE_TIMEOUT', 5000))  # ms, avant une capture
+
+    # Rafraîchissement en arrière-plan des leads existants
+    REFRESH_SCHEDULER_ENABLED = os.environ.get('REFRESH_SCHEDULER_ENABLED', 'false').lower() == 'true'
+    REFRESH_DAILY_API_BUDGET = int(os.environ.get('REFRESH_DAILY_API_BUDGET', 200))  # appels Places + OpenAI par jour
+    REFRESH_DAILY_BROWSER_BUDGET = int(os.environ.get('REFRESH_DAILY_BROWSER_BUDGET', 50))  # captures Playwright par jour
+    REFRESH_MAX_AGE_DAYS = {
+        'google_maps': 30,  # note, nombre d'avis
+        'site_web': 60,     # contenu du site et analyse IA
+        'social': 14        # followers, likes, posts
+    }
 
 class DevelopmentConfig(Config):
     """Configuration pour le développement"""
@@ -2,9 +2,19 @@
 Modèles de données pour les leads/prospects
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.database.database import db
 
+# Étape coûteuse reportée -> collecte à relancer pour la compléter
+PENDING_ENRICHMENT_STAGES = {
+    'full_html': 'site_web',
+    'site_crawl': 'site_web',
+    'js_render': 'site_web',
+    'website_ai': 'site_web',
+    'screenshots': 'social',
+    'vision': 'social'
+}
+
 class Lead(db.Model):
     """Modèle pour les leads/prospects"""
     
@@ -31,6 +41,7 @@ class Lead(db.Model):
     note_google = db.Column(db.Float, nullable=True)
     nb_avis_google = db.Column(db.Integer, nullable=True)
     business_type = db.Column(db.String(100), nullable=True)  # Type réel retourné par Google Places
+    place_id = db.Column(db.String(255), nullable=True, index=True)  # Identifiant Google Places pour les rafraîchissements
     
     # Données de scraping site web
     has_video_on_site = db.Column(db.Boolean, default=False)
@@ -124,6 +135,7 @@ class Lead(db.Model):
     site_web_description = db.Column(db.Text, nullable=True)
     site_web_horaires = db.Column(db.Text, nullable=True)
     site_web_services = db.Column(db.Text, nullable=True)
+    site_web_statut = db.Column(db.String(50), nullable=True)  # ok, tronque (page trop volumineuse), non_html (PDF, image...)
     
     # Données Réseaux Sociaux (IA)
     facebook_description = db.Column(db.Text, nullable=True)
@@ -136,6 +148,13 @@ class Lead(db.Model):
     
     # Analyse IA complète (JSON) - Déjà défini plus haut
     
+    # Fraîcheur des données par étape (utilisé par le planificateur de rafraîchissement)
+    google_maps_refreshed_at = db.Column(db.DateTime, nullable=True)
+    site_web_refreshed_at = db.Column(db.DateTime, nullable=True)
+    social_refreshed_at = db.Column(db.DateTime, nullable=True)
+    enrichissement_en_attente = db.Column(db.JSON, nullable=True)  # Étapes coûteuses reportées (budget de temps dépassé)
+    vision_fingerprints = db.Column(db.JSON, nullable=True)  # Par plateforme : empreinte de la dernière capture analysée et son analyse Vision
+    
     def __repr__(self):
         return f'<Lead {self.nom}>'
     
@@ -156,6 +175,7 @@ class Lead(db.Model):
             'note_google': self.note_google,
             'nb_avis_google': self.nb_avis_google,
             'business_type': self.business_type,
+            'place_id': self.place_id,
             'has_video_on_site': self.has_video_on_site,
             'has_images_on_site': self.has_images_on_site,
             'videos_count': self.videos_count,
@@ -203,6 +223,7 @@ class Lead(db.Model):
             'site_web_description': self.site_web_description,
             'site_web_horaires': self.site_web_horaires,
             'site_web_services': self.site_web_services,
+            'site_web_statut': self.site_web_statut,
             
             # Données Réseaux Sociaux (IA)
             'facebook_stats': self.facebook_stats,
@@ -239,6 +260,10 @@ class Lead(db.Model):
             'date_contacted_by_instagram': self.date_contacted_by_instagram.isoformat() if self.date_contacted_by_instagram else None,
             'date_contacted_by_facebook': self.date_contacted_by_facebook.isoformat() if self.date_contacted_by_facebook else None,
             'date_contacted_by_contact_form': self.date_contacted_by_contact_form.isoformat() if self.date_contacted_by_contact_form else None,
+            'google_maps_refreshed_at': self.google_maps_refreshed_at.isoformat() if self.google_maps_refreshed_at else None,
+            'site_web_refreshed_at': self.site_web_refreshed_at.isoformat() if self.site_web_refreshed_at else None,
+            'social_refreshed_at': self.social_refreshed_at.isoformat() if self.social_refreshed_at else None,
+            'enrichissement_en_attente': self.enrichissement_en_attente or [],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -272,6 +297,57 @@ class Lead(db.Model):
         self.statut_scraping = statut
         self.updated_at = datetime.utcnow()
     
+    def mark_refreshed(self, stage):
+        """Marquer une étape de collecte (google_maps, site_web, social) comme rafraîchie"""
+        refresh_fields = {
+            'google_maps': 'google_maps_refreshed_at',
+            'site_web': 'site_web_refreshed_at',
+            'social': 'social_refreshed_at'
+        }
+        
+        if stage in refresh_fields:
+            setattr(self, refresh_fields[stage], datetime.utcnow())
+            self.updated_at = datetime.utcnow()
+            # Les étapes reportées de cette collecte sont faites
+            pending = [p for p in (self.enrichissement_en_attente or []) if PENDING_ENRICHMENT_STAGES.get(p) != stage]
+            self.enrichissement_en_attente = pending or None
+            return True
+        return False
+    
+    def add_pending_enrichment(self, pending_stage):
+        """Reporter une étape coûteuse (full_html, website_ai, screenshots, vision) à un enrichissement ultérieur"""
+        pending = list(self.enrichissement_en_attente or [])
+        if pending_stage not in pending:
+            pending.append(pending_stage)
+            # Réaffecter la liste pour que SQLAlchemy détecte la modification
+            self.enrichissement_en_attente = pending
+            self.updated_at = datetime.utcnow()
+    
+    def pending_refresh_stages(self):
+        """Étapes de collecte (site_web, social) à relancer pour compléter l'enrichissement"""
+        stages = []
+        for pending_stage in self.enrichissement_en_attente or []:
+            stage = PENDING_ENRICHMENT_STAGES.get(pending_stage)
+            if stage and stage not in stages:
+                stages.append(stage)
+        return stages
+    
+    def get_vision_fingerprint(self, platform):
+        """Empreinte (dHash) de la dernière capture analysée d'une plateforme, avec son analyse et sa date"""
+        return (self.vision_fingerprints or {}).get(platform)
+    
+    def set_vision_fingerprint(self, platform, image_hash, analysis):
+        """Conserver l'empreinte d'une capture analysée et son analyse Vision (réutilisée si la capture suivante est identique)"""
+        fingerprints = dict(self.vision_fingerprints or {})
+        fingerprints[platform] = {
+            'hash': image_hash,
+            'analysis': analysis,
+            'analyzed_at': datetime.utcnow().isoformat()
+        }
+        # Réaffecter le dictionnaire pour que SQLAlchemy détecte la modification
+        self.vision_fingerprints = fingerprints
+        self.updated_at = datetime.utcnow()
+    
     def set_ai_status(self, status):
         """Définir le statut d'analyse IA"""
         self.ai_extraction_status = status
@@ -346,4 +422,49 @@ class Lead(db.Model):
             setattr(self, info_fields[info_type], has_info)
             self.updated_at = datetime.utcnow()
             return True
-        return False 
\ No newline at end of file
+        return False 
+
+class WebsiteAnalysis(db.Model):
+    """Analyse d'un site web partagée par les leads qui le référencent (chaînes, Linktree, TheFork...)"""
+    
+    __tablename__ = 'website_analyses'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    cle = db.Column(db.String(500), nullable=False, unique=True, index=True)  # URL canonique (cf. website_dedup.website_key)
+    url = db.Column(db.String(500), nullable=False)
+    ai_analysis = db.Column(db.JSON, nullable=True)
+    site_signals = db.Column(db.JSON, nullable=True)
+    analysis_mode = db.Column(db.String(50), nullable=True)
+    html_size = db.Column(db.Integer, nullable=True)
+    site_web_statut = db.Column(db.String(50), nullable=True)  # ok, tronque, non_html
+    complete = db.Column(db.Boolean, default=True)  # aucune étape abandonnée faute de budget
+    source_lead_id = db.Column(db.Integer, nullable=True)  # lead dont le scraping a produit l'analyse
+    reutilisations = db.Column(db.Integer, default=0)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<WebsiteAnalysis {self.cle}>'
+    
+    def to_dict(self):
+        """Convertir l'analyse en dictionnaire"""
+        return {
+            'id': self.id,
+            'cle': self.cle,
+            'url': self.url,
+            'ai_analysis': self.ai_analysis,
+            'site_signals': self.site_signals,
+            'analysis_mode': self.analysis_mode,
+            'html_size': self.html_size,
+            'site_web_statut': self.site_web_statut,
+            'complete': self.complete,
+            'source_lead_id': self.source_lead_id,
+            'reutilisations': self.reutilisations or 0,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def is_fresh(self, max_age_days):
+        """Analyse assez récente pour être réutilisée"""
+        return bool(self.updated_at) and datetime.utcnow() - self.updated_at < timedelta(days=max_age_days)
@@ -4,19 +4,21 @@ Configuration des prompts pour l'IA
 
 # Prompt pour l'analyse des sites web
 WEBSITE_ANALYSIS_PROMPT = """
-Analyse ce code HTML et extrait TOUTES les informations importantes de l'entreprise.
+Analyse ce contenu de page web et extrait TOUTES les informations importantes de l'entreprise.
+Le contenu est le texte de la page mis en forme : métadonnées, données structurées (JSON-LD),
+liens de contact et réseaux sociaux, pied de page, puis contenu principal. Les liens sont au format [texte](url).
 
 INSTRUCTIONS DÉTAILLÉES :
 
-1. CONTACT - Cherche dans TOUT le HTML :
+1. CONTACT - Cherche dans TOUT le contenu :
    - Emails 
    - Téléphones 
    - Adresse 
 
 2. ENTREPRISE - Analyse complète :
-   - Nom : titre, h1, h2, meta title, logo alt
+   - Nom : titre, titres (#), données structurées
    - Type : description, mots-clés, contexte
-   - Description : meta description, textes, about
+   - Description : description, textes, à propos
    - Services : liste, menu, sections
 
 3. RÉSEAUX SOCIAUX - Cherche PARTOUT MAIS VALIDE :
@@ -41,11 +43,10 @@ INSTRUCTIONS DÉTAILLÉES :
    - Services : liste détaillée
 
 MÉTHODE :
-- Parcours TOUT le HTML ligne par ligne
-- Cherche dans les attributs href, src, alt, title
-- Cherche dans les textes visibles et cachés
+- Parcours TOUT le contenu ligne par ligne
+- Cherche dans les URLs des liens [texte](url), mailto: et tel:
 - Vérifie les liens externes
-- Analyse les métadonnées
+- Analyse les métadonnées et les données structurées
 
 IMPORTANT :
 - Sois exhaustif, ne rate rien
@@ -83,9 +84,46 @@ JSON REQUIS :
 }}
 
 URL : {url}
-HTML : {html_content}
+CONTENU :
+{page_content}
 """
 
+# Prompt pour compléter l'extraction déterministe (uniquement les champs manquants)
+WEBSITE_GAP_ANALYSIS_PROMPT = """
+Analyse ce contenu de page web (texte mis en forme, liens au format [texte](url))
+et extrait UNIQUEMENT les informations demandées ci-dessous.
+Les autres informations ont déjà été extraites, ne les cherche pas.
+
+INFORMATIONS À TROUVER :
+{instructions}
+
+IMPORTANT :
+- Si une information n'est pas trouvée, utiliser "" (ou [] pour une liste)
+- Retourner UNIQUEMENT un JSON valide
+
+JSON REQUIS :
+{schema}
+
+URL : {url}
+CONTENU :
+{page_content}
+"""
+
+# Consigne par champ cible du prompt ciblé
+WEBSITE_GAP_FIELD_INSTRUCTIONS = {
+    'emails': "Emails de contact (liens mailto, textes, pied de page)",
+    'telephones': "Téléphones (liens tel, textes, en-tête et pied de page)",
+    'adresse': "Adresse postale complète (rue, code postal, ville)",
+    'nom': "Nom de l'entreprise : titre, h1, meta title, logo alt",
+    'type': "Type d'activité : description, mots-clés, contexte",
+    'description': "Description de l'entreprise : meta description, textes, à propos",
+    'horaires': "Horaires d'ouverture : textes, sections horaires",
+    'tarifs': "Tarifs : prix, coûts",
+    'services': "Services proposés : liste, menu, sections",
+    'facebook': "URL de la page Facebook (pas de fichiers .css/.js/.png, ni plugins ou widgets)",
+    'instagram': "URL du profil Instagram (pas de fichiers .css/.js/.png, ni plugins ou widgets)",
+}
+
 # Prompt pour l'analyse des captures d'écran
 SCREENSHOT_ANALYSIS_PROMPT = """
 Analyse cette capture d'écran de {platform} et extrait TOUTES les informations visibles.
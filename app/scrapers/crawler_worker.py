@@ -0,0 +1,280 @@
+"""
+Worker Scrapy persistant pour le scraping des sites web
+
+Un seul réacteur Twisted tourne dans un thread dédié avec un spider longue durée :
+les lots d'URLs sont déposés dans une file, crawlés en parallèle (limite globale et
+par domaine) avec le même pool de connexions, et les résultats sont restitués au
+fur et à mesure. Plus de processus Python lancé par URL.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional
+
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+
+from app.config import Config
+from app.scrapers.scrapy_spider_improved import WebsiteSpider, logger
+
+CRAWLER_SETTINGS = {
+    'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'ROBOTSTXT_OBEY': False,
+    'DOWNLOAD_DELAY': Config.DELAY_BETWEEN_REQUESTS,  # par domaine
+    'DOWNLOAD_TIMEOUT': Config.REQUEST_TIMEOUT,
+    'RETRY_TIMES': Config.MAX_RETRIES,
+    'DOWNLOAD_MAXSIZE': Config.HTTP_MAX_DOWNLOAD_BYTES,
+    'CONCURRENT_REQUESTS': Config.CRAWLER_CONCURRENT_REQUESTS,
+    'CONCURRENT_REQUESTS_PER_DOMAIN': Config.CRAWLER_CONCURRENT_PER_DOMAIN,
+    'AUTOTHROTTLE_ENABLED': True,
+    'AUTOTHROTTLE_START_DELAY': 1,
+    'AUTOTHROTTLE_MAX_DELAY': 3,
+    'AUTOTHROTTLE_TARGET_CONCURRENCY': float(Config.CRAWLER_CONCURRENT_PER_DOMAIN),
+    'DNSCACHE_ENABLED': True,
+    'COOKIES_ENABLED': False,
+    'TELNETCONSOLE_ENABLED': False,
+    'LOG_LEVEL': 'ERROR',
+    # Le réacteur est installé par le worker, pas par Scrapy
+    'TWISTED_REACTOR': None,
+}
+
+_batch_ids = itertools.count(1)
+
+class CrawlBatch:
+    """Lot d'URLs soumis au worker, dont les résultats arrivent au fil de l'eau"""
+
+    def __init__(self, urls: List[str]):
+        self.id = next(_batch_ids)
+        self.urls = list(dict.fromkeys(url for url in urls if url))
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._pending = set(self.urls)
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if not self._pending:
+            self._done.set()
+
+    def deliver(self, url: str, data: Dict[str, Any]):
+        """Enregistrer le résultat d'une URL (appelé depuis le thread du réacteur)"""
+        with self._lock:
+            if url not in self._pending:
+                return
+            self._pending.discard(url)
+            self.results[url] = data
+            if not self._pending:
+                self._done.set()
+        self._queue.put(data)
+
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Restituer les résultats dans l'ordre où ils se terminent
+
+        Les URLs non terminées à l'échéance sont restituées en échec (timeout).
+        """
+        deadline = time.time() + timeout if timeout else None
+        delivered = 0
+        while delivered < len(self.urls):
+            remaining = deadline - time.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                data = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            delivered += 1
+            yield data
+
+        with self._lock:
+            expired = sorted(self._pending)
+        for url in expired:
+            logger.error(f"❌ [CRAWLER] Timeout pour {url}")
+            self.deliver(url, {'url': url, 'scraping_success': False, 'error': 'Timeout du crawler'})
+            yield self.results[url]
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Attendre la fin du lot et retourner les résultats par URL"""
+        for _ in self.stream(timeout):
+            pass
+        return dict(self.results)
+
+class PersistentWebsiteSpider(WebsiteSpider):
+    """Spider longue durée : reste ouvert et prend ses URLs dans la file du worker"""
+
+    name = 'website_spider_worker'
+
+    def __init__(self, worker=None, *args, **kwargs):
+        super(PersistentWebsiteSpider, self).__init__(*args, **kwargs)
+        self.worker = worker
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(PersistentWebsiteSpider, cls).from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+
+    def spider_idle(self, spider):
+        """Ne jamais fermer le spider : attendre les prochains lots"""
+        self.worker.schedule_pending()
+        raise DontCloseSpider
+
+class CrawlerWorker:
+    """Worker de crawl : un réacteur Twisted, un spider, une file de lots"""
+
+    def __init__(self):
+        self._requests: queue.Queue = queue.Queue()
+        self._batches: Dict[int, CrawlBatch] = {}
+        self._batches_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._reactor = None
+        self._runner = None
+        self._crawler = None
+        self._error: Optional[str] = None
+
+    # ----- Thread du réacteur -----
+
+    def _run_reactor(self):
+        """Démarrer le réacteur et le spider persistant (thread dédié)"""
+        try:
+            from twisted.internet import reactor
+            from scrapy.crawler import CrawlerRunner
+
+            self._reactor = reactor
+            self._runner = CrawlerRunner(CRAWLER_SETTINGS)
+            self._launch_crawl()
+
+            logger.info("🚀 [CRAWLER] Réacteur Twisted démarré")
+            reactor.run(installSignalHandlers=False)
+        except Exception as e:
+            self._error = str(e)
+            logger.error(f"❌ [CRAWLER] Erreur du réacteur: {str(e)}")
+        finally:
+            self._ready.set()
+
+    def _launch_crawl(self):
+        """Ouvrir le spider persistant (thread du réacteur, relancé après un échec d'ouverture)"""
+        self._crawler = self._runner.create_crawler(PersistentWebsiteSpider)
+
+        def started(spider=None):
+            self._ready.set()
+            self.schedule_pending()
+
+        def stopped(failure):
+            self._error = str(failure.value) if failure else None
+            logger.error(f"❌ [CRAWLER] Spider persistant arrêté: {self._error}")
+            self._ready.set()
+
+        self._crawler.signals.connect(started, signal=signals.spider_opened)
+        deferred = self._runner.crawl(self._crawler, worker=self, on_result=self._on_result)
+        deferred.addErrback(stopped)
+
+    def schedule_pending(self):
+        """Transmettre au moteur Scrapy les URLs en attente (thread du réacteur)"""
+        spider = self._crawler.spider if self._crawler else None
+        engine = self._crawler.engine if self._crawler else None
+        if spider is None or engine is None:
+            return
+        while True:
+            try:
+                url, batch_id = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            engine.crawl(spider.make_website_request(url, {'batch_id': batch_id}))
+
+    def _on_result(self, data: Dict[str, Any], meta: Dict[str, Any]):
+        """Résultat d'un site : le remettre au lot correspondant (thread du réacteur)"""
+        batch_id = meta.get('batch_id')
+        with self._batches_lock:
+            batch = self._batches.get(batch_id)
+        if batch is None:
+            return
+        batch.deliver(meta.get('url'), data)
+        if batch.is_done():
+            with self._batches_lock:
+                self._batches.pop(batch_id, None)
+
+    # ----- API -----
+
+    def start(self, timeout: float = 30) -> bool:
+        """
+        Démarrer le worker s'il ne tourne pas encore
+
+        Après un échec (spider non ouvert, réacteur arrêté), l'appel suivant
+        retente le démarrage au lieu de laisser le worker hors service.
+        """
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                if self._error and self._reactor is not None and self._runner is not None:
+                    # Réacteur toujours actif : seul le spider est à rouvrir
+                    logger.warning(f"🔁 [CRAWLER] Nouvelle ouverture du spider après l'échec: {self._error}")
+                    self._ready.clear()
+                    self._error = None
+                    self._reactor.callFromThread(self._launch_crawl)
+            else:
+                self._ready.clear()
+                self._error = None
+                self._thread = threading.Thread(target=self._run_reactor, name='crawler-worker', daemon=True)
+                self._thread.start()
+
+        if not self._ready.wait(timeout):
+            logger.error(f"❌ [CRAWLER] Démarrage non terminé après {timeout}s")
+            return False
+        if self._error:
+            logger.error(f"❌ [CRAWLER] Démarrage impossible: {self._error}")
+            return False
+        return True
+
+    def submit(self, urls: List[str]) -> CrawlBatch:
+        """Soumettre un lot d'URLs ; les résultats arrivent dans le lot retourné"""
+        started = self.start()
+        batch = CrawlBatch(urls)
+        if not batch.urls:
+            return batch
+        if not started:
+            for url in batch.urls:
+                batch.deliver(url, {'url': url, 'scraping_success': False, 'error': f"Crawler indisponible: {self._error}"})
+            return batch
+
+        with self._batches_lock:
+            self._batches[batch.id] = batch
+        for url in batch.urls:
+            self._requests.put((url, batch.id))
+
+        logger.info(f"📥 [CRAWLER] Lot {batch.id}: {len(batch.urls)} URL(s) soumises")
+        if self._reactor is not None:
+            self._reactor.callFromThread(self.schedule_pending)
+        return batch
+
+    def crawl(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Crawler une seule URL et attendre son résultat"""
+        results = self.submit([url]).wait(timeout or Config.CRAWLER_TIMEOUT)
+        return results.get(url, {'url': url, 'scraping_success': False, 'error': 'Aucun résultat'})
+
+    def status(self) -> Dict[str, Any]:
+        """État du worker"""
+        with self._batches_lock:
+            batches = len(self._batches)
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'pending_batches': batches,
+            'queued_urls': self._requests.qsize(),
+            'error': self._error
+        }
+
+# Instance partagée par le processus (un réacteur Twisted ne redémarre pas)
+_worker: Optional[CrawlerWorker] = None
+_worker_lock = threading.Lock()
+
+def get_crawler_worker() -> CrawlerWorker:
+    """Obtenir le worker de crawl partagé (créé à la première demande)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = CrawlerWorker()
+    return _worker
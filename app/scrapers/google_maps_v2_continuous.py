@@ -14,9 +14,36 @@ from googlemaps.geocoding import geocode
 
 from app.config import Config
 from app.utils.logger import get_logger
+from app.utils.pipeline_metrics import record_value
 
 logger = get_logger('google_maps_scraper_v2_continuous')
 
+# Types d'entreprises supportés par Google Places (liste constante, sans appel API)
+BUSINESS_TYPES = [
+    'accounting', 'airport', 'amusement_park', 'aquarium', 'art_gallery',
+    'atm', 'bakery', 'bank', 'bar', 'beauty_salon', 'bicycle_store',
+    'book_store', 'bowling_alley', 'bus_station', 'cafe', 'car_dealer',
+    'car_rental', 'car_repair', 'car_wash', 'casino', 'cemetery',
+    'church', 'city_hall', 'clothing_store', 'convenience_store',
+    'courthouse', 'dentist', 'department_store', 'doctor', 'drugstore',
+    'electrician', 'electronics_store', 'embassy', 'fire_station',
+    'florist', 'funeral_home', 'furniture_store', 'gas_station',
+    'gym', 'hair_care', 'hardware_store', 'hindu_temple', 'home_goods_store',
+    'hospital', 'insurance_agency', 'jewelry_store', 'laundry',
+    'lawyer', 'library', 'light_rail_station', 'liquor_store',
+    'local_government_office', 'locksmith', 'lodging', 'meal_delivery',
+    'meal_takeaway', 'mosque', 'movie_rental', 'movie_theater',
+    'moving_company', 'museum', 'night_club', 'painter', 'park',
+    'parking', 'pet_store', 'pharmacy', 'physiotherapist', 'plumber',
+    'police', 'post_office', 'primary_school', 'real_estate_agency',
+    'restaurant', 'roofing_contractor', 'rv_park', 'school',
+    'secondary_school', 'shoe_store', 'shopping_mall', 'spa',
+    'stadium', 'storage', 'store', 'subway_station', 'supermarket',
+    'synagogue', 'taxi_stand', 'tourist_attraction', 'train_station',
+    'transit_station', 'travel_agency', 'university', 'veterinary_care',
+    'zoo'
+]
+
 class GoogleMapsScraperV2Continuous:
     """Scraper avec recherche continue jusqu'à obtenir le nombre de bars uniques souhaité"""
     
@@ -137,6 +164,10 @@ class GoogleMapsScraperV2Continuous:
                 # Filtrer les doublons en base de données
                 unique_new_bars = self._check_database_duplicates(unique_new_bars)
                 
+                # Historique de couverture : part des candidats réellement nouveaux
+                if new_bars:
+                    record_value('places.unique_rate', len(unique_new_bars) / len(new_bars))
+                
                 logger.info(f"📈 [CONTINUOUS] Nouvelles entreprises trouvées: {len(new_bars)}")
                 logger.info(f"✅ [CONTINUOUS] Entreprises uniques ajoutées: {len(unique_new_bars)}")
                 logger.info(f"🛡️ [CONTINUOUS] Doublons évités: {len(new_bars) - len(unique_new_bars)}")
@@ -174,7 +205,8 @@ class GoogleMapsScraperV2Continuous:
             logger.error(f"❌ [CONTINUOUS] Erreur lors de la recherche continue: {str(e)}")
             return []
 
-    def _get_search_strategies(self, business_type: str, radius: int) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _get_search_strategies(business_type: str, radius: int) -> List[Dict[str, Any]]:
         """
         Générer des stratégies de recherche adaptées au type d'entreprise
         """
@@ -297,16 +329,23 @@ class GoogleMapsScraperV2Continuous:
                 response = places_nearby(self.client, **params)
                 
                 # Filtrer par qualité
-                for result in response.get('results', []):
+                results = response.get('results', [])
+                record_value('places.results_per_page', len(results))
+                passed = 0
+                for result in results:
                     rating = result.get('rating', 0)
                     user_ratings_total = result.get('user_ratings_total', 0)
                     
                     if rating >= min_rating and user_ratings_total >= min_reviews:
+                        passed += 1
                         # Enrichir avec les détails
                         enriched_bar = self._enrich_business_data(result)
                         if enriched_bar:
                             bars_found.append(enriched_bar)
                 
+                if results:
+                    record_value('places.filter_pass_rate', passed / len(results))
+                
                 # Vérifier s'il y a une page suivante
                 next_page_token = response.get('next_page_token')
                 if not next_page_token:
@@ -383,12 +422,12 @@ class GoogleMapsScraperV2Continuous:
             logger.error(f"❌ [CONTINUOUS] Erreur lors de l'enrichissement: {str(e)}")
             return self._format_basic_data(place_data)
     
-    def _get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+    def _get_place_details(self, place_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """Récupérer les détails complets d'un lieu"""
         try:
             details = place(self.client,
                 place_id,
-                fields=[
+                fields=fields or [
                     'formatted_phone_number',
                     'website',
                     'opening_hours',
@@ -516,30 +555,7 @@ class GoogleMapsScraperV2Continuous:
         Obtenir la liste des types d'entreprises supportés par Google Places
         Méthode de compatibilité pour l'interface web
         """
-        return [
-            'accounting', 'airport', 'amusement_park', 'aquarium', 'art_gallery',
-            'atm', 'bakery', 'bank', 'bar', 'beauty_salon', 'bicycle_store',
-            'book_store', 'bowling_alley', 'bus_station', 'cafe', 'car_dealer',
-            'car_rental', 'car_repair', 'car_wash', 'casino', 'cemetery',
-            'church', 'city_hall', 'clothing_store', 'convenience_store',
-            'courthouse', 'dentist', 'department_store', 'doctor', 'drugstore',
-            'electrician', 'electronics_store', 'embassy', 'fire_station',
-            'florist', 'funeral_home', 'furniture_store', 'gas_station',
-            'gym', 'hair_care', 'hardware_store', 'hindu_temple', 'home_goods_store',
-            'hospital', 'insurance_agency', 'jewelry_store', 'laundry',
-            'lawyer', 'library', 'light_rail_station', 'liquor_store',
-            'local_government_office', 'locksmith', 'lodging', 'meal_delivery',
-            'meal_takeaway', 'mosque', 'movie_rental', 'movie_theater',
-            'moving_company', 'museum', 'night_club', 'painter', 'park',
-            'parking', 'pet_store', 'pharmacy', 'physiotherapist', 'plumber',
-            'police', 'post_office', 'primary_school', 'real_estate_agency',
-            'restaurant', 'roofing_contractor', 'rv_park', 'school',
-            'secondary_school', 'shoe_store', 'shopping_mall', 'spa',
-            'stadium', 'storage', 'store', 'subway_station', 'supermarket',
-            'synagogue', 'taxi_stand', 'tourist_attraction', 'train_station',
-            'transit_station', 'travel_agency', 'university', 'veterinary_care',
-            'zoo'
-        ]
+        return list(BUSINESS_TYPES)
 
     def search_nearby(self, location: str, radius: int = 5000, business_type: Optional[str] = None, max_results: int = 20) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,260 @@
+"""
+Extraction en une seule passe des signaux d'une page HTML
+
+L'arbre lxml est parcouru une seule fois : chaque balise utile (a, meta, script,
+img, video, iframe, form, address, title, h1, p) alimente directement les signaux
+(réseaux sociaux, emails, téléphones, adresse, horaires, médias, formulaires,
+liens importants) et chaque bloc JSON-LD n'est parsé qu'une fois.
+"""
+
+import json
+import re
+from typing import Dict, Any, Callable, Iterator, List, Optional
+from urllib.parse import urljoin as _urljoin
+
+from lxml import etree
+
+from app.utils.logger import get_logger
+from app.utils.pattern_matcher import EMAIL_PATTERN, PHONE_PATTERN, platforms_in, scan
+
+logger = get_logger('html_signals')
+
+VIDEO_PLATFORMS = ['youtube', 'vimeo', 'dailymotion']
+IMPORTANT_LINK_KEYWORDS = ['contact', 'reservation', 'menu', 'carte', 'book', 'reserver', 'access', 'localisation', 'find-us']
+PRODUCT_KEYWORDS = ['produit', 'service', 'tarif', 'prix', 'commander', 'acheter', 'réservation', 'booking']
+HOURS_KEYWORDS = ['horaires', 'ouverture', 'opening']
+
+HOURS_PATTERNS = [re.compile(rf'{kw}[^\n\r:]*[:\-]([^\n\r<]+)', re.IGNORECASE) for kw in HOURS_KEYWORDS]
+
+NON_PAGE_SCHEMES = ('mailto:', 'tel:', 'javascript:', '#', 'data:')
+
+TEXT_SUMMARY_LENGTH = 500
+
+def _direct_texts(element) -> Iterator[str]:
+    """Nœuds texte directs d'un élément (équivalent de ::text)"""
+    if element.text is not None:
+        yield element.text
+    for child in element:
+        if child.tail is not None:
+            yield child.tail
+
+def _first_text(element) -> Optional[str]:
+    """Premier nœud texte direct d'un élément (équivalent de ::text.get())"""
+    return next(_direct_texts(element), None)
+
+def _add_social(social_media: Dict[str, List[str]], platform: str, url: str):
+    social_media.setdefault(platform, []).append(url)
+
+def _add_contacts(text: str, emails: Dict[str, None], phones: Dict[str, None]):
+    """Emails et téléphones d'un texte (une seule passe)"""
+    for match in scan(text, ('email', 'phone')):
+        (emails if match.kind == 'email' else phones)[match.value] = None
+
+def _social_from_json(data, social_media: Dict[str, List[str]]):
+    """Réseaux sociaux présents dans les valeurs d'un bloc JSON-LD (récursif)"""
+    if isinstance(data, dict):
+        for value in data.values():
+            if isinstance(value, str):
+                for platform in platforms_in(value):
+                    _add_social(social_media, platform, value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, str):
+                        for platform in platforms_in(item):
+                            _add_social(social_media, platform, item)
+            elif isinstance(value, dict):
+                _social_from_json(value, social_media)
+    elif isinstance(data, list):
+        for item in data:
+            _social_from_json(item, social_media)
+
+def _top_level_strings(data) -> Iterator[str]:
+    """Valeurs texte de premier niveau d'un bloc JSON-LD (emails, téléphones)"""
+    if isinstance(data, dict):
+        for value in data.values():
+            if isinstance(value, str):
+                yield value
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, str):
+                        yield item
+
+def parse_html(html: str):
+    """Construire l'arbre lxml d'une page (hors Scrapy)"""
+    from parsel import Selector
+    return Selector(text=html).root
+
+def extract_html_signals(html: str, url: str, root=None, urljoin: Optional[Callable[[str], str]] = None) -> Dict[str, Any]:
+    """
+    Extraire tous les signaux d'une page en un seul parcours de l'arbre
+
+    Args:
+        html: Texte de la page
+        url: URL de la page (résolution des liens relatifs)
+        root: Arbre lxml déjà construit (response.selector.root avec Scrapy)
+        urljoin: Résolution des liens (response.urljoin, qui respecte <base>)
+
+    Returns:
+        {'title', 'description', 'emails', 'phones', 'social_media', 'links', 'page_links', 'address',
+         'opening_hours', 'structured_data', 'has_video', 'has_images', 'images_count',
+         'videos_count', 'text_summary', 'products_services', 'contact_form'}
+        page_links contient les liens de navigation bruts [href, texte], non résolus,
+        qui servent à choisir les pages à explorer (site_crawler).
+    """
+    if root is None:
+        root = parse_html(html)
+    if urljoin is None:
+        urljoin = lambda href: _urljoin(url, href)
+
+    social_media: Dict[str, List[str]] = {}
+    emails: Dict[str, None] = {}
+    phones: Dict[str, None] = {}
+    links: Dict[str, None] = {}
+    page_links: Dict[str, str] = {}
+    structured_data: List[Any] = []
+    paragraphs: List[str] = []
+
+    title = None
+    h1 = None
+    meta_description = None
+    og_description = None
+    address = None
+    jsonld_address = None
+    opening_hours = ''
+    images_count = 0
+    videos_count = 0
+    forms_count = 0
+    contact_links = 0
+
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):  # commentaires, instructions
+            continue
+
+        if tag == 'a':
+            href = element.get('href')
+            if href is None:
+                continue
+            text = _first_text(element) or ''
+            href_lower = href.lower()
+            text_lower = text.lower()
+
+            platforms = platforms_in(f"{href} {text} {element.get('title', '')}")
+            if platforms:
+                full_url = urljoin(href)
+                for platform in platforms:
+                    _add_social(social_media, platform, full_url)
+
+            if href.startswith('mailto:'):
+                email = href.replace('mailto:', '').split('?')[0]
+                if EMAIL_PATTERN.match(email):
+                    emails[email] = None
+            elif href.startswith('tel:'):
+                phone = href.replace('tel:', '').strip()
+                if PHONE_PATTERN.match(phone):
+                    phones[phone] = None
+
+            if not href_lower.startswith(NON_PAGE_SCHEMES):
+                page_links.setdefault(href, text.strip())
+            if any(kw in href_lower or kw in text_lower for kw in IMPORTANT_LINK_KEYWORDS):
+                links[urljoin(href)] = None
+            if any(platform in href for platform in VIDEO_PLATFORMS):
+                videos_count += 1
+            if 'contact' in href or 'nous-contacter' in href:
+                contact_links += 1
+
+        elif tag == 'meta':
+            content = element.get('content', '')
+            for platform in platforms_in(f"{content} {element.get('property', '')} {element.get('name', '')}"):
+                _add_social(social_media, platform, content)
+            _add_contacts(content, emails, phones)
+
+            if element.get('content') is not None:
+                if meta_description is None and element.get('name') == 'description':
+                    meta_description = content
+                if og_description is None and element.get('property') == 'og:description':
+                    og_description = content
+
+        elif tag == 'script':
+            script_html = etree.tostring(element, method='html', encoding='unicode', with_tail=False)
+            for match in scan(script_html, ('social_path',)):
+                _add_social(social_media, match.label, urljoin(match.value))
+
+            if element.get('type') == 'application/ld+json' and element.text:
+                try:
+                    data = json.loads(element.text)
+                except Exception as e:
+                    logger.debug(f"⚠️ [SIGNALS] Erreur parsing JSON-LD: {str(e)}")
+                    continue
+                structured_data.append(data)
+                _social_from_json(data, social_media)
+                for value in _top_level_strings(data):
+                    _add_contacts(value, emails, phones)
+                if isinstance(data, dict):
+                    if 'address' in data:
+                        if isinstance(data['address'], dict):
+                            jsonld_address = ', '.join([str(v) for v in data['address'].values() if v])
+                        elif isinstance(data['address'], str):
+                            jsonld_address = data['address']
+                    if 'openingHours' in data:
+                        opening_hours = data['openingHours']
+
+        elif tag == 'img':
+            images_count += 1
+        elif tag == 'video':
+            videos_count += 1
+        elif tag == 'iframe':
+            src = element.get('src')
+            if src and any(platform in src.lower() for platform in VIDEO_PLATFORMS):
+                videos_count += 1
+        elif tag == 'form':
+            forms_count += 1
+        elif tag == 'p':
+            paragraphs.extend(_direct_texts(element))
+        elif tag == 'title':
+            title = title if title is not None else _first_text(element)
+        elif tag == 'h1':
+            h1 = h1 if h1 is not None else _first_text(element)
+        elif tag == 'address':
+            address = address if address is not None else _first_text(element)
+
+    # Une seule passe texte sur la page brute (URLs sociales, emails, téléphones)
+    for match in scan(html):
+        if match.kind == 'social':
+            _add_social(social_media, match.label, match.value)
+        elif match.kind == 'email':
+            emails[match.value] = None
+        else:
+            phones[match.value] = None
+
+    if not opening_hours:
+        for pattern in HOURS_PATTERNS:
+            found = pattern.findall(html)
+            if found:
+                opening_hours = found[0].strip()
+                break
+
+    html_lower = html.lower()
+    text_summary = ' '.join([p.strip() for p in paragraphs if p.strip()])
+    if len(text_summary) > TEXT_SUMMARY_LENGTH:
+        text_summary = text_summary[:TEXT_SUMMARY_LENGTH] + "..."
+
+    return {
+        'title': (title or h1 or '').strip(),
+        'description': (meta_description or og_description or '').strip(),
+        'emails': list(emails),
+        'phones': list(phones),
+        'social_media': {platform: list(dict.fromkeys(urls)) for platform, urls in social_media.items()},
+        'links': list(links),
+        'page_links': [[href, text] for href, text in page_links.items()],
+        'address': jsonld_address if jsonld_address is not None else (address.strip() if address else ''),
+        'opening_hours': opening_hours,
+        'structured_data': structured_data,
+        'has_video': videos_count > 0,
+        'has_images': images_count > 0,
+        'images_count': images_count,
+        'videos_count': videos_count,
+        'text_summary': text_summary,
+        'products_services': any(kw in html_lower for kw in PRODUCT_KEYWORDS),
+        'contact_form': forms_count > 0 or contact_links > 0
+    }
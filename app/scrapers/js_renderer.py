@@ -0,0 +1,237 @@
+"""
+Rendu navigateur sélectif des sites JavaScript
+
+Certains sites (Wix, Squarespace, applications React / Vue / Angular) renvoient
+une coquille presque vide à une requête HTTP simple. detect_js_shell repère ces
+pages d'après la part de texte visible dans le HTML et les marqueurs des
+frameworks ; seules celles-ci passent par le navigateur, les autres restent sur
+la récupération HTTP.
+
+Le navigateur Chromium (Playwright) est lancé une fois dans un thread dédié et
+partagé par le processus : chaque rendu ouvre un contexte isolé, le nombre de
+pages simultanées est borné (JS_RENDER_MAX_PAGES), les images, médias, polices,
+feuilles de style et traceurs sont bloqués et chaque rendu est limité dans le temps.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from app.config import Config
+from app.scrapers.html_signals import parse_html
+from app.utils.http_fetcher import DEFAULT_HEADERS
+from app.utils.logger import get_logger
+
+logger = get_logger('js_renderer')
+
+# Marqueurs de pages rendues côté client
+FRAMEWORK_MARKERS = {
+    'react': re.compile(r'<div id=["\']root["\']>\s*</div>|data-reactroot', re.IGNORECASE),
+    'next': re.compile(r'id=["\']__next["\']|__NEXT_DATA__'),
+    'vue': re.compile(r'<div id=["\']app["\']>\s*</div>|data-v-app|data-server-rendered', re.IGNORECASE),
+    'nuxt': re.compile(r'window\.__NUXT__|id=["\']__nuxt["\']'),
+    'angular': re.compile(r'ng-version=|<app-root', re.IGNORECASE),
+    'wix': re.compile(r'static\.parastorage\.com|wixstatic\.com', re.IGNORECASE),
+    'squarespace': re.compile(r'static1\.squarespace\.com|SQUARESPACE_CONTEXT', re.IGNORECASE),
+    'noscript': re.compile(r'<noscript[^>]*>[^<]*(?:enable javascript|activer javascript|activez javascript|javascript is required)',
+                           re.IGNORECASE),
+}
+
+NON_VISIBLE_TAGS = {'script', 'style', 'noscript', 'template', 'title', 'head', 'meta', 'link', 'svg'}
+
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet', 'texttrack', 'eventsource', 'websocket', 'manifest'}
+BLOCKED_HOSTS = ['google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'connect.facebook.net',
+                 'hotjar.com', 'clarity.ms', 'googlesyndication.com', 'tiktok.com/i18n/pixel']
+
+BROWSER_ARGS = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage', '--disable-gpu', '--no-first-run']
+RETRY_DELAY = 300  # secondes avant de relancer un navigateur qui n'a pas démarré
+
+def visible_text_length(html: str, root=None) -> int:
+    """Nombre de caractères de texte visible (hors scripts, styles, en-tête)"""
+    if root is None:
+        root = parse_html(html)
+    length = 0
+    for element in root.iter():
+        if isinstance(element.tag, str) and element.tag not in NON_VISIBLE_TAGS and element.text:
+            length += len(element.text.strip())
+        if element.tail:
+            length += len(element.tail.strip())
+    return length
+
+def detect_js_shell(html: str, root=None) -> Dict[str, Any]:
+    """
+    Détecter une page dont le contenu n'est produit que par JavaScript
+
+    Returns:
+        {'is_shell', 'text_chars', 'text_ratio', 'markers'}
+    """
+    text_chars = visible_text_length(html, root)
+    text_ratio = text_chars / len(html) if html else 0.0
+    markers = [name for name, pattern in FRAMEWORK_MARKERS.items() if pattern.search(html)]
+    is_shell = text_chars < Config.JS_SHELL_MIN_TEXT_CHARS and (bool(markers) or text_ratio < Config.JS_SHELL_MAX_TEXT_RATIO)
+    return {'is_shell': is_shell, 'text_chars': text_chars, 'text_ratio': round(text_ratio, 4), 'markers': markers}
+
+class JsRenderer:
+    """Navigateur headless partagé, dans son propre thread et sa boucle asyncio"""
+
+    def __init__(self, max_pages: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_pages = max_pages or Config.JS_RENDER_MAX_PAGES
+        self.timeout = timeout or Config.JS_RENDER_TIMEOUT
+
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playwright = None
+        self._browser = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._error: Optional[str] = None
+        self._failed_at = 0.0
+
+        self.stats = {'rendered': 0, 'failed': 0, 'blocked_requests': 0}
+
+    # ----- Cycle de vie -----
+
+    def start(self) -> bool:
+        """Lancer le navigateur s'il ne tourne pas encore (attend la fin d'un lancement en cours)"""
+        with self._start_lock:
+            if not (self._thread and self._thread.is_alive()):
+                if self._error and time.time() - self._failed_at < RETRY_DELAY:
+                    return False
+                self._ready.clear()
+                self._error = None
+                self._thread = threading.Thread(target=self._run_loop, name='js-renderer', daemon=True)
+                self._thread.start()
+
+        # Thread déjà vivant mais boucle et sémaphore pas encore prêts : attendre aussi
+        if not self._ready.wait(Config.JS_RENDER_START_TIMEOUT):
+            logger.error("❌ [RENDER] Navigateur indisponible: délai de lancement dépassé")
+            return False
+        if self._error:
+            logger.error(f"❌ [RENDER] Navigateur indisponible: {self._error}")
+            return False
+        return True
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._launch())
+        except Exception as e:
+            self._error = (str(e).splitlines() or ['Lancement impossible'])[0]  # Playwright ajoute un encadré d'aide
+            self._failed_at = time.time()
+            self._ready.set()
+            loop.close()
+            return
+
+        logger.info(f"✅ [RENDER] Navigateur lancé ({self.max_pages} page(s) simultanée(s))")
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+
+    async def _launch(self):
+        from playwright.async_api import async_playwright
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+
+    async def _shutdown(self):
+        try:
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ [RENDER] Fermeture du navigateur: {str(e)}")
+        self._browser = None
+        self._playwright = None
+
+    def close(self):
+        """Fermer le navigateur et arrêter le thread"""
+        if self._loop is not None and self._thread and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+
+    # ----- Rendu -----
+
+    def render(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Rendre une page dans le navigateur partagé
+
+        Returns:
+            {'url', 'success', 'html', 'final_url', 'blocked', 'elapsed', 'error'}
+        """
+        timeout = timeout or self.timeout
+        result = {'url': url, 'success': False, 'html': None, 'final_url': url, 'blocked': 0, 'elapsed': 0.0, 'error': None}
+        if not self.start():
+            self.stats['failed'] += 1
+            result['error'] = f"Navigateur indisponible: {self._error}"
+            return result
+
+        start = time.time()
+        future = asyncio.run_coroutine_threadsafe(self._render(url, timeout), self._loop)
+        try:
+            # Chargement + inactivité réseau + attente d'un emplacement libre
+            result.update(future.result(timeout * 2 + Config.JS_RENDER_IDLE_TIMEOUT))
+            result['success'] = True
+        except Exception as e:
+            future.cancel()
+            result['error'] = str(e) or 'Délai de rendu dépassé'
+        result['elapsed'] = time.time() - start
+
+        if result['success']:
+            self.stats['rendered'] += 1
+            self.stats['blocked_requests'] += result['blocked']
+            logger.info(f"✅ [RENDER] {url}: {len(result['html'])} caractères en {result['elapsed']:.1f}s "
+                        f"({result['blocked']} ressource(s) bloquée(s))")
+        else:
+            self.stats['failed'] += 1
+            logger.warning(f"⚠️ [RENDER] Échec {url}: {result['error']}")
+        return result
+
+    async def _render(self, url: str, timeout: float) -> Dict[str, Any]:
+        async with self._semaphore:
+            context = await self._browser.new_context(
+                user_agent=DEFAULT_HEADERS['User-Agent'],
+                locale='fr-FR',
+                service_workers='block'
+            )
+            blocked: List[str] = []
+
+            async def filter_request(route):
+                request = route.request
+                if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+                    blocked.append(request.url)
+                    await route.abort()
+                else:
+                    await route.continue_()
+
+            try:
+                await context.route('**/*', filter_request)
+                page = await context.new_page()
+                await page.goto(url, wait_until='domcontentloaded', timeout=timeout * 1000)
+                try:
+                    await page.wait_for_load_state('networkidle', timeout=Config.JS_RENDER_IDLE_TIMEOUT * 1000)
+                except Exception:
+                    pass  # réseau encore actif (analytics, chat) : contenu rendu jusqu'ici
+                return {'html': await page.content(), 'final_url': page.url, 'blocked': len(blocked)}
+            finally:
+                await context.close()
+
+# Instance partagée par le processus
+_renderer: Optional[JsRenderer] = None
+_renderer_lock = threading.Lock()
+
+def get_js_renderer() -> JsRenderer:
+    """Obtenir le navigateur de rendu partagé (lancé à la première demande)"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = JsRenderer()
+    return _renderer
@@ -0,0 +1,245 @@
+"""
+Conversion d'une page HTML en texte compact pour l'analyse IA
+
+Le HTML brut (scripts, styles, chemins SVG, pixels de suivi, attributs) coûte
+l'essentiel des tokens d'un prompt sans rien apprendre à l'IA. La page est
+convertie en texte structuré façon markdown : titres, listes, liens au format
+[texte](url), liens mailto: / tel:. Les données utiles souvent perdues par une
+troncature sont placées en tête : métadonnées, blocs JSON-LD, liens de contact
+et réseaux sociaux, pied de page. Le contenu principal vient ensuite, c'est lui
+qui est réduit quand le texte dépasse le budget de tokens.
+
+Le mode d'analyse (standard, complète, par sections) est choisi d'après le
+nombre de tokens du texte et la fenêtre de contexte des modèles.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from app.config import Config
+from app.scrapers.html_signals import parse_html
+from app.utils.pattern_matcher import classify_social_url, scan
+from app.utils.token_counter import count_tokens
+
+# Balises dont ni le texte ni les enfants ne sont utiles
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'embed',
+                'head', 'link', 'meta', 'img', 'picture', 'source', 'video', 'audio', 'map', 'select'}
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'header', 'footer', 'main', 'aside', 'nav', 'ul', 'ol', 'li',
+              'table', 'tr', 'address', 'form', 'dl', 'dt', 'dd', 'blockquote', 'figure', 'figcaption',
+              'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'hr'}
+HEADING_TAGS = {'h1': '#', 'h2': '##', 'h3': '###', 'h4': '####', 'h5': '####', 'h6': '####'}
+CELL_TAGS = {'td', 'th'}
+FOOTER_HINT = re.compile(r'footer|pied', re.IGNORECASE)
+ASSET_URL = re.compile(r'\.(?:js|css|png|jpe?g|gif|svg|webp|ico|woff2?|ttf)(?:[?#]|$)', re.IGNORECASE)
+
+META_NAMES = {'description': 'Description', 'og:title': 'Titre', 'og:description': 'Description',
+              'og:site_name': 'Site', 'keywords': 'Mots-clés'}
+MAX_JSONLD_CHARS = 4000     # par bloc JSON-LD (catalogues produits volumineux)
+MAX_CONTACT_LINKS = 30
+MAX_CHUNKS = 5              # sections analysées au plus (appels API)
+MIN_DEDUP_CHARS = 20        # longueur à partir de laquelle une ligne répétée est retirée
+PROMPT_RESERVE_TOKENS = 1000  # consignes du prompt et message système
+
+_SPACES = re.compile(r'[ \t\r\f\v ]+')
+
+def _clean(text: Optional[str]) -> str:
+    return _SPACES.sub(' ', text or '').strip()
+
+def _link_label(element) -> str:
+    """Texte d'un lien, ou à défaut aria-label / title / alt de son image (icônes)"""
+    text = _clean(' '.join(element.itertext()))
+    if text:
+        return text
+    for candidate in [element] + list(element.iter('img')):
+        for attribute in ('aria-label', 'title', 'alt'):
+            if candidate.get(attribute):
+                return _clean(candidate.get(attribute))
+    return ''
+
+class _Renderer:
+    """Parcours unique de l'arbre : contenu principal, pied de page et liens de contact"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.body: List[str] = []
+        self.footer: List[str] = []
+        self.contact_links: Dict[str, str] = {}
+
+    def link(self, element, out: List[str]):
+        href = (element.get('href') or '').strip()
+        label = _link_label(element)
+        lowered = href.lower()
+        if not href or lowered.startswith(('javascript:', '#', 'data:')):
+            out.append(f" {label} " if label else ' ')
+            return
+        if lowered.startswith(('mailto:', 'tel:')):
+            target = href.split('?', 1)[0]
+            self.contact_links.setdefault(target, label)
+            out.append(f" {label} ({target}) " if label and label not in target else f" {target} ")
+            return
+
+        target = urljoin(self.url, href) if self.url else href
+        platform = classify_social_url(target)
+        if platform:
+            self.contact_links.setdefault(target, label or platform)
+        if not label:
+            label = platform or 'lien'
+        out.append(f" [{label}]({target}) ")
+
+    def walk(self, element, out: List[str], in_footer: bool = False):
+        tag = element.tag.lower() if isinstance(element.tag, str) else None
+        if tag is None or tag in SKIPPED_TAGS:
+            return
+        if tag == 'a':
+            self.link(element, out)
+            return
+
+        # Pied de page rendu à part : placé en tête du texte, jamais tronqué en premier
+        if not in_footer and (tag == 'footer' or (tag in BLOCK_TAGS and FOOTER_HINT.search(
+                f"{element.get('class') or ''} {element.get('id') or ''}"))):
+            self.footer.append('\n')
+            self.walk(element, self.footer, in_footer=True)
+            self.footer.append('\n')
+            return
+
+        block = tag in BLOCK_TAGS
+        if block:
+            out.append('\n')
+        if tag in HEADING_TAGS:
+            out.append(HEADING_TAGS[tag] + ' ')
+        elif tag in ('li', 'dd'):
+            out.append('- ')
+        elif tag in CELL_TAGS:
+            out.append(' | ')
+        if element.text:
+            out.append(element.text)
+        for child in element:
+            self.walk(child, out, in_footer)
+            if child.tail:
+                out.append(child.tail)
+        if block:
+            out.append('\n')
+
+def _lines(parts: List[str], seen: Optional[set] = None) -> List[str]:
+    """Lignes non vides, sans les répétitions (menus doublés desktop / mobile, paragraphes repris)"""
+    seen = set() if seen is None else seen
+    lines = []
+    for line in ''.join(parts).split('\n'):
+        line = _clean(line)
+        if not line or line in ('-', '|'):
+            continue
+        # Les lignes courtes répétées sont des données (prix, horaires) : conservées
+        if len(line) >= MIN_DEDUP_CHARS:
+            if line in seen:
+                continue
+            seen.add(line)
+        lines.append(line)
+    return lines
+
+def _meta_lines(root) -> List[str]:
+    lines = []
+    title = root.find('.//title')
+    if title is not None and _clean(title.text):
+        lines.append(f"Titre: {_clean(title.text)}")
+    for meta in root.iter('meta'):
+        name = (meta.get('name') or meta.get('property') or '').lower()
+        content = _clean(meta.get('content'))
+        if name in META_NAMES and content:
+            line = f"{META_NAMES[name]}: {content}"
+            if line not in lines:
+                lines.append(line)
+    return lines
+
+def _script_data(root, contact_links: Dict[str, str]) -> List[str]:
+    """Blocs JSON-LD compactés ; les URLs de réseaux sociaux des scripts de configuration vont dans contact_links"""
+    blocks = []
+    for script in root.iter('script'):
+        if not script.text:
+            continue
+        if (script.get('type') or '').lower() != 'application/ld+json':
+            # Constructeurs de pages : liens sociaux dans un objet JavaScript (window.__THEME__...)
+            for match in scan(script.text, ('social',)):
+                platform = classify_social_url(match.value)
+                if platform and not ASSET_URL.search(match.value):
+                    contact_links.setdefault(match.value, platform)
+            continue
+        try:
+            block = json.dumps(json.loads(script.text), ensure_ascii=False, separators=(',', ':'))
+        except ValueError:
+            block = _clean(script.text)
+        blocks.append(block[:MAX_JSONLD_CHARS])
+    return blocks
+
+def html_to_text(html: str, url: str = '', root=None) -> str:
+    """
+    Texte compact d'une page : métadonnées, JSON-LD, liens de contact et réseaux
+    sociaux, pied de page, puis contenu principal (sections titrées)
+    """
+    if not html:
+        return ''
+    if root is None:
+        root = parse_html(html)
+
+    renderer = _Renderer(url)
+    body = root.find('.//body')
+    renderer.walk(body if body is not None else root, renderer.body)
+
+    sections = []
+    meta = _meta_lines(root)
+    if meta:
+        sections.append('\n'.join(meta))
+    jsonld = _script_data(root, renderer.contact_links)
+    if jsonld:
+        sections.append('## Données structurées (JSON-LD)\n' + '\n'.join(jsonld))
+    if renderer.contact_links:
+        links = list(renderer.contact_links.items())[:MAX_CONTACT_LINKS]
+        sections.append('## Contacts et réseaux sociaux\n' + '\n'.join(
+            f"- {label}: {target}" if label and label not in target else f"- {target}" for target, label in links))
+    seen: set = set()
+    footer = _lines(renderer.footer, seen)
+    if footer:
+        sections.append('## Pied de page\n' + '\n'.join(footer))
+    content = _lines(renderer.body, seen)
+    if content:
+        sections.append('## Contenu\n' + '\n'.join(content))
+    return '\n\n'.join(sections)
+
+def split_text_into_chunks(text: str, chunk_tokens: Optional[int] = None, max_chunks: Optional[int] = None) -> List[str]:
+    """Sections de chunk_tokens tokens au plus, coupées entre deux lignes (max_chunks premières)"""
+    chunk_tokens = chunk_tokens or Config.LLM_CHUNK_TOKENS
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in text.split('\n'):
+        tokens = count_tokens(line) + 1
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append('\n'.join(current))
+            current, current_tokens = [], 0
+            if max_chunks and len(chunks) >= max_chunks:
+                return chunks
+        current.append(line)
+        current_tokens += tokens
+    if current and (not max_chunks or len(chunks) < max_chunks):
+        chunks.append('\n'.join(current))
+    return chunks
+
+def full_text_budget() -> int:
+    """Tokens de texte acceptés par l'analyse complète (fenêtre du modèle, réponse et consignes déduites)"""
+    context = Config.OPENAI_CONTEXT_TOKENS.get(Config.OPENAI_FULL_MODEL, 8192)
+    return max(0, min(Config.LLM_FULL_MAX_TOKENS, context - Config.LLM_OUTPUT_TOKENS - PROMPT_RESERVE_TOKENS))
+
+def analysis_mode_for(text_tokens: int, allow_full_html: bool = True) -> str:
+    """
+    Mode d'analyse d'une page d'après les tokens de son texte
+
+    Returns:
+        'standard' (un appel, texte réduit à LLM_STANDARD_MAX_TOKENS si besoin),
+        'full_html' (un appel sur tout le texte) ou 'chunked' (sections parallèles)
+    """
+    if text_tokens <= Config.LLM_STANDARD_MAX_TOKENS or not allow_full_html:
+        return 'standard'
+    if text_tokens <= full_text_budget():
+        return 'full_html'
+    return 'chunked'
@@ -4,8 +4,6 @@ Alternative moderne et performante au scraper requests/BeautifulSoup
 """
 
 import scrapy
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
 from scrapy.http import Request
 from typing import Dict, Any, Optional, List
 import json
@@ -13,12 +11,21 @@ import re
 from urllib.parse import urljoin, urlparse
 from app.utils.logger import get_logger
 from app.config import Config
-import subprocess
+from app.utils.pipeline_metrics import record_value, measure_stage
+from app.utils.http_fetcher import get_http_fetcher
+from app.utils.html_cache import get_html_cache
+from app.scrapers.html_signals import extract_html_signals
+from app.scrapers.js_renderer import detect_js_shell, get_js_renderer, visible_text_length
+from app.scrapers.page_text import analysis_mode_for
+from app.scrapers.site_crawler import SiteCrawler, MERGED_FIELDS, missing_fields
+from app.services.extraction_gate import (
+    build_deterministic_analysis, gate_savings, merge_gap_analysis, missing_target_fields
+)
+from app.utils.pattern_matcher import find_all
+from app.utils.token_counter import count_tokens
 import sys
 import os
-import tempfile
 import logging
-import requests
 import time
 
 logger = get_logger('scrapy_spider_improved')
@@ -36,35 +43,69 @@ class WebsiteSpider(scrapy.Spider):
     
     name = 'website_spider'
     
-    def __init__(self, url=None, result_path=None, *args, **kwargs):
+    def __init__(self, url=None, result_path=None, urls=None, on_result=None, *args, **kwargs):
         super(WebsiteSpider, self).__init__(*args, **kwargs)
-        self.start_urls = [url] if url else []
+        self.start_urls = list(urls or []) + ([url] if url else [])
         self.extracted_data = {}
         self.result_path = result_path
+        # Callback appelé pour chaque site terminé (succès ou échec) : on_result(data, meta)
+        self.on_result = on_result
         
-    def start_requests(self):
+    async def start(self):
         """Démarre les requêtes de scraping"""
         for url in self.start_urls:
-            logger.info(f"🔍 Démarrage du scraping Scrapy pour: {url}")
-            yield Request(
-                url=url,
-                callback=self.parse,
-                meta={'url': url},
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Cache-Control': 'max-age=0',
-                }
-            )
+            yield self.make_website_request(url)
+    
+    def make_website_request(self, url: str, meta: Optional[Dict[str, Any]] = None) -> Request:
+        """Construire la requête de scraping d'un site"""
+        logger.info(f"🔍 Démarrage du scraping Scrapy pour: {url}")
+        request_meta = {'url': url}
+        request_meta.update(meta or {})
+        return Request(
+            url=url,
+            callback=self.parse,
+            errback=self.parse_error,
+            meta=request_meta,
+            dont_filter=True,
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+                'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Sec-Fetch-Dest': 'document',
+                'Sec-Fetch-Mode': 'navigate',
+                'Sec-Fetch-Site': 'none',
+                'Cache-Control': 'max-age=0',
+            }
+        )
+    
+    def _emit(self, website_data: Dict[str, Any], meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Transmettre le résultat d'un site au callback éventuel"""
+        if self.on_result:
+            try:
+                self.on_result(website_data, meta)
+            except Exception as e:
+                logger.error(f"❌ [PARSE] Erreur callback résultat: {str(e)}")
+        return website_data
+    
+    def parse_error(self, failure):
+        """Échec de téléchargement (DNS, timeout, connexion refusée...)"""
+        meta = failure.request.meta if hasattr(failure, 'request') else {}
+        url = meta.get('url')
+        logger.error(f"❌ [PARSE] Échec du téléchargement de {url}: {failure.getErrorMessage()}")
+        return self._emit({
+            'url': url,
+            'scraping_success': False,
+            'error': failure.getErrorMessage()
+        }, meta)
     
     def parse(self, response):
+        """Parse la page web et transmet le résultat"""
+        return self._emit(self._parse_website(response), response.meta)
+    
+    def _parse_website(self, response):
         """Parse la page web et extrait les données"""
         url = response.meta.get('url', response.url)
         logger.info(f"📄 Parsing de la page: {url}")
@@ -79,7 +120,7 @@ class WebsiteSpider(scrapy.Spider):
                     logger.info(f"📄 [PARSE] Contenu brut extrait: {len(raw_content)} caractères")
                     
                     # Créer un faux résultat avec les données extraites manuellement
-                    website_data = self._extract_from_raw_content(raw_content, url)
+                    website_data = self._extract_from_raw_content(raw_content, url, response.body)
                     return website_data
                     
                 except Exception as e:
@@ -90,39 +131,11 @@ class WebsiteSpider(scrapy.Spider):
                         'error': f"Contenu non-textuel: {str(e)}"
                     }
             
-            # Extraction normale si le contenu est du texte
-            # Extraction exhaustive des réseaux sociaux
-            social_media = self._extract_social_media_all(response)
-            # Extraction exhaustive des emails/téléphones
-            emails = self._extract_emails_all(response)
-            phones = self._extract_phones_all(response)
-            # Extraction des liens importants
-            links = self._extract_important_links(response)
-            # Extraction de l'adresse et horaires
-            address, opening_hours = self._extract_address_hours(response)
-            # Extraction des microdonnées/JSON-LD
-            structured_data = self._extract_structured_data(response)
-
-            website_data = {
-                'url': url,
-                'title': self._extract_title(response),
-                'description': self._extract_description(response),
-                'emails': emails,
-                'phones': phones,
-                'social_media': social_media,
-                'links': links,
-                'address': address,
-                'opening_hours': opening_hours,
-                'structured_data': structured_data,
-                'has_video': self._has_video(response),
-                'has_images': self._has_images(response),
-                'images_count': self._count_images(response),
-                'videos_count': self._count_videos(response),
-                'text_summary': self._extract_text_summary(response),
-                'products_services': self._has_products_services(response),
-                'contact_form': self._has_contact_form(response),
-                'scraping_success': True
-            }
+            # Extraction normale : un seul parcours de l'arbre pour tous les signaux
+            signals = extract_html_signals(response.text, url, root=response.selector.root, urljoin=response.urljoin)
+            website_data = {'url': url}
+            website_data.update(signals)
+            website_data['scraping_success'] = True
             
             # Logs des résultats
             logger.info(f"📊 Résultats scraping Scrapy {url}:")
@@ -161,453 +174,29 @@ class WebsiteSpider(scrapy.Spider):
                 'error': str(e)
             }
     
-    def _extract_title(self, response) -> str:
-        """Extraire le titre de la page"""
-        # Meta title
-        title = response.css('title::text').get()
-        if title:
-            title = title.strip()
-            logger.info(f"📝 Titre trouvé: {title[:50]}...")
-            return title
-        
-        # Fallback: H1
-        h1 = response.css('h1::text').get()
-        if h1:
-            h1 = h1.strip()
-            logger.info(f"📝 Titre H1 trouvé: {h1[:50]}...")
-            return h1
-        
-        logger.warning("⚠️ Aucun titre trouvé")
-        return ""
-    
-    def _extract_description(self, response) -> str:
-        """Extraire la description de la page"""
-        # Meta description
-        desc = response.css('meta[name="description"]::attr(content)').get()
-        if desc:
-            desc = desc.strip()
-            logger.info(f"📄 Description meta trouvée: {desc[:50]}...")
-            return desc
-        
-        # Open Graph description
-        og_desc = response.css('meta[property="og:description"]::attr(content)').get()
-        if og_desc:
-            og_desc = og_desc.strip()
-            logger.info(f"📄 Description OG trouvée: {og_desc[:50]}...")
-            return og_desc
-        
-        logger.warning("⚠️ Aucune description trouvée")
-        return ""
-    
-    def _extract_social_media_all(self, response) -> dict:
-        """Extraction exhaustive des liens réseaux sociaux (a, meta, scripts, JSON-LD)"""
-        social_media = {}
-        
-        logger.info(f"🔍 [SOCIAL] Début extraction réseaux sociaux pour {response.url}")
-        
-        # 1. Liens <a> - AMÉLIORÉ
-        for a in response.css('a[href]'):
-            href = a.attrib.get('href', '')
-            text = a.css('::text').get() or ''
-            title = a.attrib.get('title', '')
-            classes = ' '.join(a.attrib.get('class', []))
-            
-            # Chercher dans href, texte, title et classes
-            search_text = f"{href} {text} {title} {classes}".lower()
-            
-            for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-                if platform in search_text:
-                    full_url = response.urljoin(href)
-                    social_media.setdefault(platform, []).append(full_url)
-                    logger.info(f"📱 [SOCIAL] {platform} trouvé dans lien: {full_url}")
-        
-        # 2. Meta tags - AMÉLIORÉ
-        for meta in response.css('meta'):
-            content = meta.attrib.get('content', '')
-            property_attr = meta.attrib.get('property', '')
-            name_attr = meta.attrib.get('name', '')
-            
-            # Chercher dans content, property et name
-            search_text = f"{content} {property_attr} {name_attr}".lower()
-            
-            for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-                if platform in search_text:
-                    social_media.setdefault(platform, []).append(content)
-                    logger.info(f"📱 [SOCIAL] {platform} trouvé dans meta: {content}")
-        
-        # 3. Scripts - AMÉLIORÉ
-        for script in response.css('script'):
-            script_text = script.get()
-            if script_text:
-                # Chercher les URLs complètes
-                for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-                    # Pattern pour URLs complètes
-                    urls = re.findall(rf'https?://[^\s"\'>]*{platform}[^\s"\'>]*', script_text, re.IGNORECASE)
-                    for url in urls:
-                        social_media.setdefault(platform, []).append(url)
-                        logger.info(f"📱 [SOCIAL] {platform} trouvé dans script: {url}")
-                    
-                    # Pattern pour chemins relatifs
-                    paths = re.findall(rf'/{platform}[^\s"\'>]*', script_text, re.IGNORECASE)
-                    for path in paths:
-                        full_url = response.urljoin(path)
-                        social_media.setdefault(platform, []).append(full_url)
-                        logger.info(f"📱 [SOCIAL] {platform} trouvé dans script (path): {full_url}")
-        
-        # 4. JSON-LD - AMÉLIORÉ
-        for script in response.css('script[type="application/ld+json"]::text').getall():
-            try:
-                data = json.loads(script)
-                self._extract_social_from_json(data, social_media, response)
-            except Exception as e:
-                logger.debug(f"⚠️ [SOCIAL] Erreur parsing JSON-LD: {str(e)}")
-                continue
-        
-        # 5. Chercher dans les icônes et classes CSS
-        for element in response.css('*[class*="facebook"], *[class*="instagram"], *[class*="twitter"], *[class*="linkedin"], *[class*="youtube"], *[class*="social"]'):
-            classes = ' '.join(element.attrib.get('class', []))
-            parent = element.xpath('..')
-            
-            # Chercher le lien parent
-            if parent and parent.css('a[href]'):
-                href = parent.css('a::attr(href)').get()
-                if href:
-                    for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-                        if platform in classes.lower():
-                            full_url = response.urljoin(href)
-                            social_media.setdefault(platform, []).append(full_url)
-                            logger.info(f"📱 [SOCIAL] {platform} trouvé via icône: {full_url}")
-        
-        # 6. Chercher dans le texte brut
-        text_content = response.text
-        for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-            # URLs complètes
-            urls = re.findall(rf'https?://[^\s"\'>]*{platform}[^\s"\'>]*', text_content, re.IGNORECASE)
-            for url in urls:
-                social_media.setdefault(platform, []).append(url)
-                logger.info(f"📱 [SOCIAL] {platform} trouvé dans texte: {url}")
-        
-        # Dédupliquer les URLs
-        for platform in social_media:
-            social_media[platform] = list(set(social_media[platform]))
-        
-        logger.info(f"✅ [SOCIAL] Extraction terminée: {len(social_media)} plateformes trouvées")
-        for platform, urls in social_media.items():
-            logger.info(f"   📱 {platform}: {len(urls)} URLs")
-            for url in urls:
-                logger.info(f"      - {url}")
-        
-        return social_media
-    
-    def _extract_social_from_json(self, data, social_media, response):
-        """Extrait les réseaux sociaux depuis les données JSON"""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, str):
-                    for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-                        if platform in value.lower():
-                            social_media.setdefault(platform, []).append(value)
-                            logger.info(f"📱 [SOCIAL] {platform} trouvé dans JSON: {value}")
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, str):
-                            for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
-                                if platform in item.lower():
-                                    social_media.setdefault(platform, []).append(item)
-                                    logger.info(f"📱 [SOCIAL] {platform} trouvé dans JSON array: {item}")
-                elif isinstance(value, dict):
-                    self._extract_social_from_json(value, social_media, response)
-        elif isinstance(data, list):
-            for item in data:
-                self._extract_social_from_json(item, social_media, response)
-
-    def _extract_emails_all(self, response) -> list:
-        """Extraction exhaustive des emails (texte, href, meta, scripts, JSON-LD)"""
-        emails = set()
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        
-        logger.info(f"🔍 [EMAIL] Début extraction emails pour {response.url}")
-        
-        # Texte brut
-        text_emails = re.findall(email_pattern, response.text)
-        emails.update(text_emails)
-        logger.info(f"📧 [EMAIL] {len(text_emails)} emails trouvés dans le texte")
-        
-        # Href mailto
-        mailto_emails = []
-        for mailto in response.css('a[href^="mailto:"]::attr(href)').getall():
-            email = mailto.replace('mailto:', '').split('?')[0]
-            if re.match(email_pattern, email):
-                emails.add(email)
-                mailto_emails.append(email)
-        logger.info(f"📧 [EMAIL] {len(mailto_emails)} emails trouvés dans les liens mailto")
-        
-        # Meta
-        meta_emails = []
-        for meta in response.css('meta'):
-            content = meta.attrib.get('content', '')
-            found_emails = re.findall(email_pattern, content)
-            emails.update(found_emails)
-            meta_emails.extend(found_emails)
-        logger.info(f"📧 [EMAIL] {len(meta_emails)} emails trouvés dans les meta tags")
-        
-        # Scripts
-        script_emails = []
-        for script in response.css('script'):
-            script_text = script.get()
-            if script_text:
-                found_emails = re.findall(email_pattern, script_text)
-                emails.update(found_emails)
-                script_emails.extend(found_emails)
-        logger.info(f"📧 [EMAIL] {len(script_emails)} emails trouvés dans les scripts")
-        
-        # JSON-LD
-        jsonld_emails = []
-        for script in response.css('script[type="application/ld+json"]::text').getall():
-            try:
-                data = json.loads(script)
-                if isinstance(data, dict):
-                    for v in data.values():
-                        if isinstance(v, str):
-                            found_emails = re.findall(email_pattern, v)
-                            emails.update(found_emails)
-                            jsonld_emails.extend(found_emails)
-                        elif isinstance(v, list):
-                            for item in v:
-                                if isinstance(item, str):
-                                    found_emails = re.findall(email_pattern, item)
-                                    emails.update(found_emails)
-                                    jsonld_emails.extend(found_emails)
-            except Exception:
-                continue
-        logger.info(f"📧 [EMAIL] {len(jsonld_emails)} emails trouvés dans JSON-LD")
-        
-        final_emails = list(emails)
-        logger.info(f"✅ [EMAIL] Total emails uniques extraits: {len(final_emails)}")
-        for email in final_emails:
-            logger.debug(f"📧 [EMAIL] Email trouvé: {email}")
-        
-        return final_emails
-
-    def _extract_phones_all(self, response) -> list:
-        """Extraction exhaustive des téléphones (texte, href, meta, scripts, JSON-LD)"""
-        phones = set()
-        phone_pattern = r'(?:\+33|0033|33|0)[1-9](?:[ .-]?\d{2}){4}'
-        # Texte brut
-        phones.update(re.findall(phone_pattern, response.text))
-        # Href tel
-        for tel in response.css('a[href^="tel:"]::attr(href)').getall():
-            phone = tel.replace('tel:', '').strip()
-            if re.match(phone_pattern, phone):
-                phones.add(phone)
-        # Meta
-        for meta in response.css('meta'):
-            content = meta.attrib.get('content', '')
-            phones.update(re.findall(phone_pattern, content))
-        # Scripts
-        for script in response.css('script'):
-            script_text = script.get()
-            if script_text:
-                phones.update(re.findall(phone_pattern, script_text))
-        # JSON-LD
-        for script in response.css('script[type="application/ld+json"]::text').getall():
-            try:
-                data = json.loads(script)
-                if isinstance(data, dict):
-                    for v in data.values():
-                        if isinstance(v, str):
-                            phones.update(re.findall(phone_pattern, v))
-                        elif isinstance(v, list):
-                            for item in v:
-                                if isinstance(item, str):
-                                    phones.update(re.findall(phone_pattern, item))
-            except Exception:
-                continue
-        return list(phones)
-
-    def _extract_important_links(self, response) -> list:
-        """Extraction des liens de contact, réservation, menu, etc."""
-        keywords = ['contact', 'reservation', 'menu', 'carte', 'book', 'reserver', 'access', 'localisation', 'find-us']
-        links = set()
-        for a in response.css('a[href]'):
-            href = a.attrib.get('href', '')
-            text = a.css('::text').get() or ''
-            if any(kw in href.lower() or kw in text.lower() for kw in keywords):
-                links.add(response.urljoin(href))
-        return list(links)
-
-    def _extract_address_hours(self, response):
-        """Extraction de l'adresse et des horaires (balises, microdonnées, JSON-LD)"""
-        address = ''
-        opening_hours = ''
-        # Balises address
-        addr = response.css('address::text').get()
-        if addr:
-            address = addr.strip()
-        # Microdonnées/JSON-LD
-        for script in response.css('script[type="application/ld+json"]::text').getall():
-            try:
-                data = json.loads(script)
-                if isinstance(data, dict):
-                    if 'address' in data:
-                        if isinstance(data['address'], dict):
-                            address = ', '.join([str(v) for v in data['address'].values() if v])
-                        elif isinstance(data['address'], str):
-                            address = data['address']
-                    if 'openingHours' in data:
-                        opening_hours = data['openingHours']
-            except Exception:
-                continue
-        # Recherche dans le texte pour les horaires
-        if not opening_hours:
-            for kw in ['horaires', 'ouverture', 'opening']:
-                found = re.findall(rf'{kw}[^\n\r:]*[:\-]([^\n\r<]+)', response.text, re.IGNORECASE)
-                if found:
-                    opening_hours = found[0].strip()
-                    break
-        return address, opening_hours
-
-    def _extract_structured_data(self, response):
-        """Extraction brute des scripts JSON-LD"""
-        data = []
-        for script in response.css('script[type="application/ld+json"]::text').getall():
-            try:
-                json_data = json.loads(script)
-                data.append(json_data)
-            except Exception:
-                continue
-        return data
-    
-    def _has_video(self, response) -> bool:
-        """Détecter la présence de vidéos"""
-        # Chercher les balises video
-        video_tags = response.css('video').getall()
-        if video_tags:
-            logger.info(f"🎥 Vidéos trouvées: {len(video_tags)} balises video")
-            return True
-        
-        # Chercher les iframes YouTube/Vimeo
-        iframe_srcs = response.css('iframe::attr(src)').getall()
-        video_platforms = ['youtube', 'vimeo', 'dailymotion', 'vimeo']
-        
-        for src in iframe_srcs:
-            if any(platform in src.lower() for platform in video_platforms):
-                logger.info(f"🎥 Vidéo iframe trouvée: {src}")
-                return True
-        
-        # Chercher les liens vers des vidéos
-        video_links = response.css('a[href*="youtube"], a[href*="vimeo"], a[href*="dailymotion"]').getall()
-        if video_links:
-            logger.info(f"🎥 Liens vidéo trouvés: {len(video_links)}")
-            return True
-        
-        return False
-    
-    def _count_videos(self, response) -> int:
-        """Compter le nombre de vidéos"""
-        count = 0
-        
-        # Balises video
-        count += len(response.css('video').getall())
-        
-        # Iframes vidéo
-        iframe_srcs = response.css('iframe::attr(src)').getall()
-        video_platforms = ['youtube', 'vimeo', 'dailymotion']
-        for src in iframe_srcs:
-            if any(platform in src.lower() for platform in video_platforms):
-                count += 1
-        
-        # Liens vidéo
-        video_links = response.css('a[href*="youtube"], a[href*="vimeo"], a[href*="dailymotion"]').getall()
-        count += len(video_links)
-        
-        return count
-    
-    def _has_images(self, response) -> bool:
-        """Détecter la présence d'images"""
-        images = response.css('img').getall()
-        if images:
-            logger.info(f"🖼️ Images trouvées: {len(images)}")
-            return True
-        return False
-    
-    def _count_images(self, response) -> int:
-        """Compter le nombre d'images"""
-        return len(response.css('img').getall())
-    
-    def _extract_text_summary(self, response) -> str:
-        """Extraire un résumé du texte de la page"""
-        # Extraire le texte des paragraphes
-        paragraphs = response.css('p::text').getall()
-        text = ' '.join([p.strip() for p in paragraphs if p.strip()])
-        
-        # Limiter à 500 caractères
-        if len(text) > 500:
-            text = text[:500] + "..."
-        
-        return text
-    
-    def _has_products_services(self, response) -> bool:
-        """Détecter la présence de produits/services"""
-        # Mots-clés liés aux produits/services
-        keywords = ['produit', 'service', 'tarif', 'prix', 'commander', 'acheter', 'réservation', 'booking']
-        page_text = response.text.lower()
-        
-        for keyword in keywords:
-            if keyword in page_text:
-                logger.info(f"🛍️ Produits/services détectés (mot-clé: {keyword})")
-                return True
-        
-        return False
-    
-    def _has_contact_form(self, response) -> bool:
-        """Détecter la présence d'un formulaire de contact"""
-        # Chercher les formulaires
-        forms = response.css('form').getall()
-        if forms:
-            logger.info(f"📝 Formulaires trouvés: {len(forms)}")
-            return True
-        
-        # Chercher les liens de contact
-        contact_links = response.css('a[href*="contact"], a[href*="nous-contacter"]').getall()
-        if contact_links:
-            logger.info(f"📝 Liens de contact trouvés: {len(contact_links)}")
-            return True
-        
-        return False
-
-    def _extract_from_raw_content(self, raw_content: str, url: str) -> dict:
+    def _extract_from_raw_content(self, raw_content: str, url: str, body: Optional[bytes] = None) -> dict:
         """Extraire les données depuis le contenu brut"""
         logger.info(f"🔍 [RAW] Extraction depuis le contenu brut de {url}")
         logger.info(f"📏 [RAW] Taille du contenu brut: {len(raw_content)} caractères")
         
         # Essayer différents encodages si le contenu semble tronqué
-        if len(raw_content) < 1000:
-            logger.warning(f"⚠️ [RAW] Contenu brut trop court, tentative de décodage alternatif")
-            try:
-                # Essayer de récupérer le contenu depuis la réponse
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-                }
-                response = requests.get(url, headers=headers, timeout=10)
-                if response.status_code == 200:
-                    raw_content = response.text
-                    logger.info(f"📄 [RAW] Contenu récupéré via requests: {len(raw_content)} caractères")
-            except Exception as e:
-                logger.warning(f"⚠️ [RAW] Échec récupération via requests: {str(e)}")
+        # Pas de nouvelle requête : ce callback tourne dans le réacteur partagé par tous les crawls
+        if len(raw_content) < 1000 and body:
+            logger.warning(f"⚠️ [RAW] Contenu brut trop court, décodage alternatif du corps reçu")
+            for encoding in ('cp1252', 'latin-1'):
+                decoded = body.decode(encoding, errors='ignore')
+                if len(decoded) > len(raw_content):
+                    raw_content = decoded
+                    logger.info(f"📄 [RAW] Contenu décodé en {encoding}: {len(raw_content)} caractères")
+                    break
         
-        # Extraction des emails
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, raw_content)
+        # Emails, téléphones et réseaux sociaux en une seule passe
+        found = find_all(raw_content)
+        emails = found.pop('email', [])
+        phones = found.pop('phone', [])
         logger.info(f"📧 [RAW] {len(emails)} emails trouvés dans le contenu brut")
         for email in emails:
             logger.info(f"   📧 [RAW] Email trouvé: {email}")
-        
-        # Extraction des téléphones
-        phone_pattern = r'(?:\+33|0033|33|0)[1-9](?:[ .-]?\d{2}){4}'
-        phones = re.findall(phone_pattern, raw_content)
         logger.info(f"📞 [RAW] {len(phones)} téléphones trouvés dans le contenu brut")
         for phone in phones:
             logger.info(f"   📞 [RAW] Téléphone trouvé: {phone}")
@@ -622,21 +211,11 @@ class WebsiteSpider(scrapy.Spider):
         description = desc_match.group(1) if desc_match else ""
         logger.info(f"📄 [RAW] Description extraite: {description[:100]}...")
         
-        # Extraction des réseaux sociaux
+        # Réseaux sociaux (URLs trouvées lors de la même passe)
         social_media = {}
-        social_patterns = {
-            'instagram': r'https?://[^\s"\'>]*instagram[^\s"\'>]*',
-            'facebook': r'https?://[^\s"\'>]*facebook[^\s"\'>]*',
-            'twitter': r'https?://[^\s"\'>]*twitter[^\s"\'>]*',
-            'linkedin': r'https?://[^\s"\'>]*linkedin[^\s"\'>]*',
-            'youtube': r'https?://[^\s"\'>]*youtube[^\s"\'>]*',
-        }
-        
-        for platform, pattern in social_patterns.items():
-            matches = re.findall(pattern, raw_content, re.IGNORECASE)
-            if matches:
-                social_media[platform] = list(set(matches))
-                logger.info(f"📱 [RAW] {platform}: {len(matches)} liens trouvés")
+        for platform, matches in found.items():
+            social_media[platform] = list(dict.fromkeys(matches))
+            logger.info(f"📱 [RAW] {platform}: {len(matches)} liens trouvés")
         
         logger.info(f"📱 [RAW] {len(social_media)} réseaux sociaux trouvés")
         
@@ -665,8 +244,10 @@ class WebsiteSpider(scrapy.Spider):
 class ScrapyWebsiteScraperImproved:
     """Scraper de sites web amélioré avec analyse IA"""
     
-    def __init__(self):
-        self.ai_service = None
+    def __init__(self, ai_service=None):
+        self.ai_service = ai_service
+        if self.ai_service is not None:
+            return
         try:
             from app.services.ai_analysis_service import AIAnalysisService
             self.ai_service = AIAnalysisService()
@@ -684,39 +265,75 @@ class ScrapyWebsiteScraperImproved:
         Returns:
             Le code HTML brut ou None si erreur
         """
+        return self.fetch_html(url)['html']
+    
+    def fetch_html(self, url: str) -> Dict[str, Any]:
+        """
+        Récupère le HTML d'un site en passant par le cache disque (requête conditionnelle)
+        
+        Args:
+            url: L'URL du site à scraper
+            
+        Returns:
+            {'html', 'unchanged', 'cache_status', 'truncated', 'rejected', 'content_type'} ; html vaut None si erreur
+            rejected: contenu non HTML (PDF, image...) refusé dès les en-têtes
+            truncated: page trop volumineuse réduite à son début et sa fin
+        """
         try:
             logger.info(f"🔍 [SCRAPER] Récupération HTML brut pour {url}")
             
-            # Utiliser requests directement pour plus de contrôle
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate',  # Pas de br pour éviter les problèmes
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            # Décoder le contenu
-            html_content = response.text
-            
-            logger.info(f"✅ [SCRAPER] HTML récupéré: {len(html_content)} caractères")
-            return html_content
+            # Couche HTTP partagée : connexions et DNS réutilisés entre sites
+            fetcher = get_http_fetcher()
+            if Config.HTML_CACHE_ENABLED:
+                fetched = get_html_cache().fetch(url, fetcher, timeout=Config.REQUEST_TIMEOUT)
+            else:
+                fetched = fetcher.fetch(url, timeout=Config.REQUEST_TIMEOUT)
+                fetched.update(html=fetched['text'], unchanged=False, cache_status='disabled')
+            
+            details = {key: fetched.get(key) for key in ('truncated', 'rejected', 'content_type')}
+            if not fetched['success']:
+                logger.error(f"❌ [SCRAPER] Erreur récupération HTML: {fetched['error']}")
+                return {'html': None, 'unchanged': False, 'cache_status': fetched.get('cache_status'),
+                        'error': fetched['error'], **details}
+            
+            html_content = fetched['html']
+            logger.info(f"✅ [SCRAPER] HTML récupéré: {len(html_content)} caractères (cache: {fetched['cache_status']})")
+            if fetched.get('truncated'):
+                logger.warning(f"✂️ [SCRAPER] Page trop volumineuse, seuls le début et la fin sont analysés pour {url}")
+            return {'html': html_content, 'unchanged': fetched['unchanged'], 'cache_status': fetched['cache_status'], **details}
                 
         except Exception as e:
             logger.error(f"❌ [SCRAPER] Erreur récupération HTML: {str(e)}")
-            return None
+            return {'html': None, 'unchanged': False, 'cache_status': None, 'error': str(e),
+                    'truncated': False, 'rejected': None, 'content_type': None}
+    
+    def get_raw_html_many(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Récupère le HTML brut de plusieurs sites en parallèle
+        
+        Args:
+            urls: Les URLs des sites
+            
+        Returns:
+            HTML par URL (None si erreur)
+        """
+        logger.info(f"🔍 [SCRAPER] Récupération HTML brut de {len(urls)} sites en parallèle")
+        html_by_url = {}
+        for fetched in get_http_fetcher().fetch_many(urls, timeout=Config.REQUEST_TIMEOUT):
+            html_by_url[fetched['url']] = fetched['text'] if fetched['success'] else None
+        logger.info(f"✅ [SCRAPER] {sum(1 for html in html_by_url.values() if html)}/{len(urls)} pages récupérées")
+        return html_by_url
     
-    def analyze_with_ai(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def analyze_with_ai(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                        page_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse le HTML avec l'IA
         
         Args:
             html_content: Le code HTML brut
             url: L'URL du site
+            fields: Champs à extraire uniquement (None = analyse complète)
+            page_text: Texte de la page déjà converti (cf. AIAnalysisService.prepare_page_text)
             
         Returns:
             Résultat de l'analyse IA
@@ -727,7 +344,7 @@ class ScrapyWebsiteScraperImproved:
         
         try:
             logger.info(f"🤖 [SCRAPER] Début analyse IA pour {url}")
-            result = self.ai_service.analyze_website(html_content, url)
+            result = self.ai_service.analyze_website(html_content, url, fields, page_text)
             logger.info(f"✅ [SCRAPER] Analyse IA terminée")
             return result
             
@@ -735,13 +352,16 @@ class ScrapyWebsiteScraperImproved:
             logger.error(f"❌ [SCRAPER] Erreur analyse IA: {str(e)}")
             return {"error": f"Erreur analyse IA: {str(e)}"}
     
-    def analyze_with_ai_full_html(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def analyze_with_ai_full_html(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                                 page_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse le HTML COMPLET avec l'IA (sans troncature)
         
         Args:
             html_content: Le code HTML brut complet
             url: L'URL du site
+            fields: Champs à extraire uniquement (None = analyse complète)
+            page_text: Texte de la page déjà converti
             
         Returns:
             Résultat de l'analyse IA
@@ -755,7 +375,7 @@ class ScrapyWebsiteScraperImproved:
             logger.info(f"📏 [SCRAPER FULL] HTML complet: {len(html_content)} caractères")
             
             # Utiliser la nouvelle méthode d'analyse HTML complet
-            result = self.ai_service.analyze_website_full_html(html_content, url)
+            result = self.ai_service.analyze_website_full_html(html_content, url, fields, page_text)
             logger.info(f"✅ [SCRAPER FULL] Analyse IA HTML complet terminée")
             return result
             
@@ -763,13 +383,16 @@ class ScrapyWebsiteScraperImproved:
             logger.error(f"❌ [SCRAPER FULL] Erreur analyse IA HTML complet: {str(e)}")
             return {"error": f"Erreur analyse IA HTML complet: {str(e)}"}
     
-    def analyze_with_ai_chunked(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def analyze_with_ai_chunked(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                                page_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse le HTML en sections avec l'IA
         
         Args:
             html_content: Le code HTML brut complet
             url: L'URL du site
+            fields: Champs à extraire uniquement (None = analyse complète)
+            page_text: Texte de la page déjà converti
             
         Returns:
             Résultat de l'analyse IA par sections
@@ -783,7 +406,7 @@ class ScrapyWebsiteScraperImproved:
             logger.info(f"📏 [SCRAPER CHUNKED] HTML complet: {len(html_content)} caractères")
             
             # Utiliser la nouvelle méthode d'analyse par sections
-            result = self.ai_service.analyze_website_chunked(html_content, url)
+            result = self.ai_service.analyze_website_chunked(html_content, url, fields, page_text)
             logger.info(f"✅ [SCRAPER CHUNKED] Analyse IA par sections terminée")
             return result
             
@@ -791,42 +414,187 @@ class ScrapyWebsiteScraperImproved:
             logger.error(f"❌ [SCRAPER CHUNKED] Erreur analyse IA par sections: {str(e)}")
             return {"error": f"Erreur analyse IA par sections: {str(e)}"}
     
-    def scrape_website_with_ai(self, url: str) -> Optional[Dict[str, Any]]:
+    def collect_site_signals(self, url: str, html_content: str, crawl_pages: bool = True) -> Dict[str, Any]:
+        """
+        Extraction déterministe de l'accueil, complétée par l'exploration bornée
+        des pages contact / mentions légales / à propos si des champs manquent
+        
+        Args:
+            url: L'URL du site
+            html_content: HTML de la page d'accueil
+            crawl_pages: Autoriser l'exploration des pages internes
+            
+        Returns:
+            {'signals', 'pages', 'missing_fields', 'stop_reason'} (cf. SiteCrawler.crawl)
+            et 'home' (signaux de la page d'accueil)
+        """
+        home_signals = extract_html_signals(html_content, url)
+        if crawl_pages and Config.SITE_CRAWL_ENABLED:
+            crawl = SiteCrawler().crawl(url, home_signals)
+        else:
+            crawl = {
+                'signals': {field: home_signals.get(field) for field in MERGED_FIELDS},
+                'pages': [],
+                'missing_fields': missing_fields(home_signals),
+                'stop_reason': 'disabled',
+                'sitemap': None
+            }
+        record_value('site_web.crawled_pages', len(crawl['pages']))
+        crawl['home'] = home_signals
+        return crawl
+    
+    def render_js_shell(self, url: str, html_content: str, render_js: bool = True) -> Dict[str, Any]:
+        """
+        Rendre dans le navigateur une page dont le contenu est produit par JavaScript
+        
+        Args:
+            url: L'URL de la page
+            html_content: HTML obtenu par la requête HTTP
+            render_js: Autoriser le rendu navigateur
+            
+        Returns:
+            {'html' (rendu, ou HTML d'origine), 'js_shell' (cf. detect_js_shell), 'rendered'}
+        """
+        shell = detect_js_shell(html_content)
+        record_value('js_render.shell', 1 if shell['is_shell'] else 0)
+        outcome = {'html': html_content, 'js_shell': shell, 'rendered': False}
+        if not shell['is_shell']:
+            return outcome
+        
+        markers = ', '.join(shell['markers']) or 'aucun marqueur'
+        if not (render_js and Config.JS_RENDER_ENABLED):
+            logger.info(f"🧩 [SCRAPER] Page JavaScript détectée ({markers}, {shell['text_chars']} caractères de texte), rendu non autorisé pour {url}")
+            return outcome
+        
+        logger.info(f"🧩 [SCRAPER] Page JavaScript détectée ({markers}, {shell['text_chars']} caractères de texte), rendu navigateur de {url}")
+        with measure_stage('js_render'):
+            rendered = get_js_renderer().render(url)
+        # Le rendu ne remplace la page que s'il apporte du texte
+        if rendered['success'] and visible_text_length(rendered['html']) > shell['text_chars']:
+            outcome.update(html=rendered['html'], rendered=True)
+        return outcome
+    
+    def scrape_website_with_ai(self, url: str, allow_full_html: bool = True, use_ai: bool = True,
+                               skip_if_unchanged: bool = False, crawl_pages: bool = True,
+                               render_js: bool = True) -> Optional[Dict[str, Any]]:
         """
         Scrape un site web avec analyse IA
         
         Args:
             url: L'URL du site à scraper
+            allow_full_html: Autoriser l'analyse complète / par sections des gros HTML
+            use_ai: Autoriser l'analyse IA (sinon analyse HTML manuelle)
+            skip_if_unchanged: Ne pas analyser une page identique à la version en cache
+            crawl_pages: Explorer les pages contact / mentions légales si des champs manquent
+            render_js: Rendre dans le navigateur les pages produites par JavaScript
             
         Returns:
-            Résultat complet avec analyse IA
+            Résultat complet avec analyse IA (ai_analysis vaut None si la page est inchangée),
+            truncated (page réduite à son début et sa fin), rejected si le contenu n'est pas du HTML,
+            js_shell / rendered (page JavaScript, rendue ou non dans le navigateur), text_tokens
+            (tokens du texte envoyé à l'IA, None si l'IA n'est pas appelée)
+            et llm_gate (appels et tokens évités par l'extraction déterministe)
         """
         try:
             logger.info(f"🚀 [SCRAPER] Début scraping IA pour {url}")
+            started = time.time()
             
             # 1. Récupérer le HTML brut
-            html_content = self.get_raw_html(url)
+            fetched = self.fetch_html(url)
+            html_content = fetched['html']
+            if fetched['rejected']:
+                logger.warning(f"🚫 [SCRAPER] {url} n'est pas une page HTML ({fetched['content_type'] or fetched['rejected']}), analyse ignorée")
+                return {
+                    "url": url,
+                    "scraping_success": False,
+                    "rejected": fetched['rejected'],
+                    "content_type": fetched['content_type'],
+                    "error": fetched['error']
+                }
             if not html_content:
                 logger.error(f"❌ [SCRAPER] Impossible de récupérer le HTML pour {url}")
                 return None
             
-            # 2. Choisir la méthode d'analyse selon la taille du HTML
-            if len(html_content) > 200000:  # Très gros HTML
-                logger.info(f"📏 [SCRAPER] HTML très volumineux ({len(html_content)} caractères), utilisation de l'analyse par sections")
-                ai_result = self.analyze_with_ai_chunked(html_content, url)
-            elif len(html_content) > 100000:  # Gros HTML
-                logger.info(f"📏 [SCRAPER] HTML volumineux ({len(html_content)} caractères), utilisation de l'analyse complète")
-                ai_result = self.analyze_with_ai_full_html(html_content, url)
-            else:  # HTML normal
-                logger.info(f"📏 [SCRAPER] HTML normal ({len(html_content)} caractères), utilisation de l'analyse standard")
-                ai_result = self.analyze_with_ai(html_content, url)
+            if fetched['unchanged'] and skip_if_unchanged:
+                logger.info(f"♻️ [SCRAPER] Page inchangée depuis la dernière analyse, analyse IA évitée pour {url}")
+                return {
+                    "url": url,
+                    "scraping_success": True,
+                    "unchanged": True,
+                    "cache_status": fetched['cache_status'],
+                    "html_size": len(html_content),
+                    "analysis_mode": "unchanged",
+                    "ai_analysis": None,
+                    "timestamp": time.time()
+                }
+            
+            # Pages JavaScript (Wix, React...) : rendu navigateur, sinon requête HTTP seule
+            js = self.render_js_shell(url, html_content, render_js)
+            html_content = js['html']
+            
+            record_value('site_web.html_size', len(html_content))
+            
+            # Extraction déterministe (accueil + pages contact / mentions légales)
+            crawl = self.collect_site_signals(url, html_content, crawl_pages)
+            # Durée hors IA (récupération, rendu, exploration) : base des estimations de durée
+            record_value('latency.site_web_fetch', time.time() - started)
+            
+            deterministic = build_deterministic_analysis(crawl['signals'], crawl['home'])
+            gaps = missing_target_fields(deterministic) if Config.LLM_GATE_ENABLED else None
+            gate = None
+            text_tokens = None
+            
+            # 2. Choisir la méthode d'analyse selon la taille du texte et le budget
+            if not use_ai:
+                logger.info(f"⏱️ [SCRAPER] Analyse IA désactivée, analyse HTML manuelle ({len(html_content)} caractères)")
+                analysis_mode = "manual"
+                ai_result = self.ai_service.analyze_website_without_ai(html_content, url) if self.ai_service else {"error": "Service IA non disponible"}
+            elif gaps == []:
+                logger.info(f"🎯 [SCRAPER] Champs cibles trouvés sans IA, analyse OpenAI évitée pour {url}")
+                analysis_mode = "deterministic"
+                ai_result = deterministic
+            else:
+                if gaps:
+                    logger.info(f"🎯 [SCRAPER] Champs manquants après extraction déterministe: {', '.join(gaps)}")
+                # Texte compact envoyé à l'IA : la méthode d'analyse dépend de son nombre de tokens
+                page_text = self.ai_service.prepare_page_text(html_content, url) if self.ai_service else html_content
+                text_tokens = count_tokens(page_text)
+                record_value('site_web.text_tokens', text_tokens)
+                analysis_mode = analysis_mode_for(text_tokens, allow_full_html)
+                if analysis_mode == "chunked":  # Texte trop long pour un seul appel
+                    logger.info(f"📏 [SCRAPER] Texte très volumineux ({text_tokens} tokens), utilisation de l'analyse par sections")
+                    ai_result = self.analyze_with_ai_chunked(html_content, url, gaps, page_text)
+                elif analysis_mode == "full_html":  # Gros texte
+                    logger.info(f"📏 [SCRAPER] Texte volumineux ({text_tokens} tokens), utilisation de l'analyse complète")
+                    ai_result = self.analyze_with_ai_full_html(html_content, url, gaps, page_text)
+                else:  # Texte normal (ou analyse complète non autorisée)
+                    logger.info(f"📏 [SCRAPER] Texte normal ({text_tokens} tokens), utilisation de l'analyse standard")
+                    ai_result = self.analyze_with_ai(html_content, url, gaps, page_text)
+                if gaps:
+                    ai_result = merge_gap_analysis(deterministic, ai_result, gaps)
+            
+            if use_ai and gaps is not None:
+                gate = gate_savings(text_tokens, gaps, allow_full_html)
+                record_value('llm_gate.llm_called', 1 if gate['llm_called'] else 0)
+                record_value('llm_gate.tokens_saved', gate['tokens_saved'])
+                logger.info(f"💰 [SCRAPER] Filtre LLM: {gate['calls_saved']} appel(s) et ~{gate['tokens_saved']} tokens évités")
             
             # 3. Combiner les résultats
             final_result = {
                 "url": url,
                 "scraping_success": True,
+                "unchanged": fetched['unchanged'],
+                "cache_status": fetched['cache_status'],
                 "html_size": len(html_content),
+                "text_tokens": text_tokens,
+                "truncated": fetched['truncated'],
+                "js_shell": js['js_shell']['is_shell'],
+                "rendered": js['rendered'],
+                "analysis_mode": analysis_mode,
                 "ai_analysis": ai_result,
+                "site_signals": crawl['signals'],
+                "crawl": {key: crawl[key] for key in ('pages', 'missing_fields', 'stop_reason', 'sitemap')},
+                "llm_gate": gate,
                 "timestamp": time.time()
             }
             
@@ -843,7 +611,7 @@ class ScrapyWebsiteScraperImproved:
     
     def scrape_website(self, url: str) -> Optional[Dict[str, Any]]:
         """
-        Scraper un site web avec Scrapy en utilisant un processus séparé
+        Scraper un site web avec Scrapy via le worker persistant
         
         Args:
             url: URL du site web à scraper
@@ -853,116 +621,38 @@ class ScrapyWebsiteScraperImproved:
         """
         try:
             logger.info(f"🚀 Démarrage du scraping Scrapy pour: {url}")
+            from app.scrapers.crawler_worker import get_crawler_worker
             
-            # Créer un fichier temporaire pour les résultats
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                temp_filename = temp_file.name
-            
-            # Correction : ajouter le chemin racine du projet dans sys.path du script généré
-            project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
-            project_root_escaped = json.dumps(project_root)
-            temp_filename_escaped = json.dumps(temp_filename)
-            script_content = f'''
-import sys
-import os
-import json
-import scrapy
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-
-# Ajouter le chemin racine du projet dans sys.path
-sys.path.insert(0, {project_root_escaped})
-
-from app.scrapers.scrapy_spider_improved import WebsiteSpider
-
-def run_spider():
-    try:
-        # Configuration Scrapy
-        settings = get_project_settings()
-        settings.update({{
-            'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'ROBOTSTXT_OBEY': False,
-            'DOWNLOAD_DELAY': 1,
-            'CONCURRENT_REQUESTS': 1,
-            'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
-            'AUTOTHROTTLE_ENABLED': True,
-            'AUTOTHROTTLE_START_DELAY': 1,
-            'AUTOTHROTTLE_MAX_DELAY': 3,
-            'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
-            'COOKIES_ENABLED': False,
-            'TELNETCONSOLE_ENABLED': False,
-            'LOG_LEVEL': 'ERROR',  # Réduire les logs
-        }})
-        
-        # Créer le processus de crawling
-        process = CrawlerProcess(settings)
-        process.crawl(WebsiteSpider, url="{url}", result_path={temp_filename_escaped})
-        process.start()
-        
-    except Exception as e:
-        print(f"Erreur: {{str(e)}}", file=sys.stderr)
-
-if __name__ == "__main__":
-    run_spider()
-'''
-            
-            # Créer le script temporaire
-            script_filename = temp_filename.replace('.json', '_script.py')
-            with open(script_filename, 'w', encoding='utf-8') as f:
-                f.write(script_content)
+            result_data = get_crawler_worker().crawl(url)
+            if result_data and result_data.get('scraping_success'):
+                logger.info(f"✅ Scraping Scrapy réussi pour {url}")
+                return result_data
             
-            # Exécuter le script dans un processus séparé
-            try:
-                result = subprocess.run(
-                    [sys.executable, script_filename],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                    cwd=os.getcwd()
-                )
-                
-                # Log du stdout et stderr du sous-processus
-                if result.stdout:
-                    logger.info(f"[SCRAPY STDOUT] {result.stdout}")
-                if result.stderr:
-                    logger.error(f"[SCRAPY STDERR] {result.stderr}")
-                
-                # Vérifier si le fichier de résultats existe
-                if os.path.exists(temp_filename):
-                    with open(temp_filename, 'r', encoding='utf-8') as f:
-                        result_data = json.load(f)
-                    
-                    if result_data and result_data.get('scraping_success'):
-                        logger.info(f"✅ Scraping Scrapy réussi pour {url}")
-                        return result_data
-                    else:
-                        logger.error(f"❌ Échec du scraping Scrapy pour {url}")
-                        return None
-                else:
-                    logger.error(f"❌ Aucun fichier de résultats généré pour {url}")
-                    if result.stderr:
-                        logger.error(f"Erreur: {result.stderr}")
-                    return None
-                    
-            except subprocess.TimeoutExpired:
-                logger.error(f"❌ Timeout du scraping Scrapy pour {url}")
-                return None
-            except Exception as e:
-                logger.error(f"❌ Erreur lors de l'exécution du processus: {str(e)}")
-                return None
-            finally:
-                # Nettoyer les fichiers temporaires
-                try:
-                    os.unlink(temp_filename)
-                    if os.path.exists(temp_filename.replace('_script.py', '.json')):
-                        os.unlink(temp_filename.replace('_script.py', '.json'))
-                except:
-                    pass
+            logger.error(f"❌ Échec du scraping Scrapy pour {url}: {result_data.get('error', 'Erreur inconnue')}")
+            return None
                 
         except Exception as e:
             logger.error(f"❌ Erreur lors du scraping Scrapy {url}: {str(e)}")
             return None
     
+    def stream_websites(self, urls: List[str], timeout: Optional[float] = None):
+        """
+        Scraper plusieurs sites en parallèle et restituer chaque résultat dès qu'il est prêt
+        
+        Args:
+            urls: Liste des URLs à scraper
+            timeout: Délai maximum pour le lot (secondes)
+            
+        Yields:
+            Données extraites de chaque site (succès ou échec), dans l'ordre de fin
+        """
+        from app.scrapers.crawler_worker import get_crawler_worker
+        
+        batch = get_crawler_worker().submit(urls)
+        # Délai du lot proportionnel au nombre de vagues de requêtes parallèles
+        waves = max(1, -(-len(batch.urls) // Config.CRAWLER_CONCURRENT_REQUESTS))
+        yield from batch.stream(timeout or Config.CRAWLER_TIMEOUT * waves)
+    
     def scrape_multiple_websites(self, urls: List[str]) -> List[Dict[str, Any]]:
         """
         Scraper plusieurs sites web
@@ -975,13 +665,12 @@ if __name__ == "__main__":
         """
         results = []
         
-        for url in urls:
-            logger.info(f"🔄 Scraping de {url}")
-            result = self.scrape_website(url)
-            if result:
+        logger.info(f"🔄 Scraping de {len(urls)} sites en parallèle")
+        for result in self.stream_websites(urls):
+            if result.get('scraping_success'):
                 results.append(result)
             else:
-                logger.warning(f"⚠️ Échec du scraping pour {url}")
+                logger.warning(f"⚠️ Échec du scraping pour {result.get('url')}: {result.get('error', 'Erreur inconnue')}")
         
         logger.info(f"📊 Scraping terminé: {len(results)}/{len(urls)} sites traités avec succès")
         return results 
\ No newline at end of file
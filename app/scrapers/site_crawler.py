@@ -0,0 +1,224 @@
+"""
+Exploration bornée des pages internes d'un site (contact, mentions légales, à propos)
+
+Les emails et téléphones se trouvent souvent sur /contact ou /mentions-legales
+plutôt que sur la page d'accueil. À partir des liens de l'accueil, les pages les
+mieux classées sont récupérées en parallèle, analysées par l'extraction
+déterministe (html_signals) et fusionnées avec les signaux de l'accueil.
+
+Les pages candidates du sitemap (sitemap_discovery) complètent les liens de
+l'accueil, pour atteindre les pages absentes du HTML (menus rendus en JavaScript).
+
+Bornes : nombre de pages, profondeur et durée par site. L'exploration s'arrête dès
+que les champs requis (SITE_CRAWL_REQUIRED_FIELDS) sont trouvés.
+"""
+
+import time
+from concurrent.futures import as_completed, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urldefrag
+
+from app.config import Config
+from app.scrapers.html_signals import extract_html_signals
+from app.utils.http_fetcher import get_http_fetcher
+from app.utils.logger import get_logger
+from app.utils.pattern_matcher import classify_social_url
+
+logger = get_logger('site_crawler')
+
+# Mots-clés (chemin ou texte du lien) et priorité des pages à explorer
+PAGE_KEYWORDS = [
+    ('contact', 10),
+    ('mentions', 8),
+    ('legal', 8),
+    ('propos', 6),
+    ('about', 6),
+    ('qui-sommes', 6),
+    ('qui sommes', 6),
+    ('equipe', 4),
+    ('team', 4),
+    ('horaires', 3),
+    ('acces', 3),
+    ('access', 3),
+    ('infos', 2),
+]
+
+SKIPPED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.zip', '.doc', '.docx', '.mp4', '.mp3')
+
+# Signaux fusionnés entre les pages
+MERGED_FIELDS = ['emails', 'phones', 'social_media', 'address', 'opening_hours']
+
+def _site_host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def _normalize(url: str) -> str:
+    """URL sans fragment ni slash final (détection des pages déjà vues)"""
+    return urldefrag(url)[0].rstrip('/')
+
+def rank_page_links(page_links: List[List[str]], page_url: str, seen: set) -> List[Tuple[int, str]]:
+    """
+    Classer les liens internes d'une page par intérêt (contact d'abord)
+
+    Returns:
+        [(score, url)] triés par score décroissant, liens sans mot-clé exclus
+    """
+    host = _site_host(page_url)
+    ranked: Dict[str, int] = {}
+    for href, text in page_links:
+        url = urldefrag(urljoin(page_url, href))[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or _site_host(url) != host:
+            continue
+        if parsed.path.lower().endswith(SKIPPED_EXTENSIONS) or _normalize(url) in seen:
+            continue
+        search_text = f"{parsed.path} {text}".lower()
+        score = max((weight for keyword, weight in PAGE_KEYWORDS if keyword in search_text), default=0)
+        if score and score > ranked.get(url, 0):
+            ranked[url] = score
+    return sorted(((score, url) for url, score in ranked.items()), key=lambda item: -item[0])
+
+def merge_signals(merged: Dict[str, Any], signals: Dict[str, Any]):
+    """Fusionner les signaux d'une page dans les signaux du site (sans doublons)"""
+    for key in ('emails', 'phones'):
+        merged[key] = list(dict.fromkeys(merged.get(key, []) + signals.get(key, [])))
+    social_media = merged.setdefault('social_media', {})
+    for platform, urls in signals.get('social_media', {}).items():
+        social_media[platform] = list(dict.fromkeys(social_media.get(platform, []) + urls))
+    for key in ('address', 'opening_hours'):
+        if not merged.get(key) and signals.get(key):
+            merged[key] = signals[key]
+
+def missing_fields(signals: Dict[str, Any], required: Optional[List[str]] = None) -> List[str]:
+    """Champs requis encore absents (réseaux sociaux : au moins une URL de réseau social)"""
+    required = Config.SITE_CRAWL_REQUIRED_FIELDS if required is None else required
+    missing = []
+    for field in required:
+        value = signals.get(field)
+        if field == 'social_media':
+            value = any(classify_social_url(url) for urls in (value or {}).values() for url in urls)
+        if not value:
+            missing.append(field)
+    return missing
+
+class SiteCrawler:
+    """Exploration bornée des pages internes d'un site"""
+
+    def __init__(self, max_pages: Optional[int] = None, max_depth: Optional[int] = None,
+                 time_budget: Optional[float] = None, fetcher=None, discovery=None):
+        self.max_pages = Config.SITE_CRAWL_MAX_PAGES if max_pages is None else max_pages
+        self.max_depth = Config.SITE_CRAWL_MAX_DEPTH if max_depth is None else max_depth
+        self.time_budget = Config.SITE_CRAWL_TIME_BUDGET if time_budget is None else time_budget
+        self.fetcher = fetcher or get_http_fetcher()
+        if discovery is None and Config.SITEMAP_ENABLED:
+            from app.scrapers.sitemap_discovery import get_sitemap_discovery
+            discovery = get_sitemap_discovery()
+        self.discovery = discovery
+
+    def crawl(self, url: str, home_signals: Dict[str, Any], required: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Explorer les pages internes à partir des signaux de la page d'accueil
+
+        Args:
+            url: URL de la page d'accueil
+            home_signals: Résultat de extract_html_signals pour l'accueil
+            required: Champs dont la présence arrête l'exploration
+
+        Returns:
+            {'signals': signaux fusionnés, 'pages': pages explorées, 'missing_fields': champs absents,
+             'stop_reason': 'complete' | 'max_pages' | 'max_depth' | 'time_budget' | 'no_links',
+             'sitemap': bilan de la découverte par sitemap (None si non utilisée)}
+        """
+        merged = {field: home_signals.get(field) for field in MERGED_FIELDS}
+        merged['emails'] = list(merged['emails'] or [])
+        merged['phones'] = list(merged['phones'] or [])
+        merged['social_media'] = {platform: list(urls) for platform, urls in (merged['social_media'] or {}).items()}
+
+        pages: List[Dict[str, Any]] = []
+        missing = missing_fields(merged, required)
+        if not missing:
+            return {'signals': merged, 'pages': pages, 'missing_fields': [], 'stop_reason': 'complete', 'sitemap': None}
+
+        start = time.time()
+        seen = {_normalize(url)}
+        links = home_signals.get('page_links', [])
+        sitemap = None
+        if self.discovery is not None:
+            # Au plus la moitié du budget pour robots.txt et les sitemaps (résultat en cache par domaine)
+            try:
+                discovered = self.discovery.candidate_links(url, self.time_budget / 2)
+                sitemap = {key: discovered[key] for key in ('sitemaps', 'urls', 'cached')}
+                sitemap['candidates'] = len(discovered['links'])
+                links = links + discovered['links']
+            except Exception as e:
+                logger.warning(f"⚠️ [CRAWL] Découverte par sitemap impossible pour {url}: {str(e)}")
+        frontier = rank_page_links(links, url, seen)
+        stop_reason = None
+        depth = 1
+
+        while frontier and depth <= self.max_depth:
+            slots = self.max_pages - len(pages)
+            remaining = self.time_budget - (time.time() - start)
+            if slots <= 0:
+                stop_reason = 'max_pages'
+                break
+            if remaining <= 0:
+                stop_reason = 'time_budget'
+                break
+
+            batch = [page_url for _, page_url in frontier[:slots]]
+            seen.update(_normalize(page_url) for page_url in batch)
+            logger.info(f"🧭 [CRAWL] {url}: profondeur {depth}, {len(batch)} page(s) - champs manquants: {', '.join(missing)}")
+
+            futures = {self.fetcher.submit(page_url, min(Config.REQUEST_TIMEOUT, remaining)): page_url for page_url in batch}
+            next_links: List[List[str]] = []
+            try:
+                for future in as_completed(futures, timeout=remaining):
+                    page = self._process_page(futures[future], future.result())
+                    pages.append(page)
+                    if not page['success']:
+                        continue
+                    merge_signals(merged, page['signals'])
+                    next_links.extend([urljoin(page['url'], href), text] for href, text in page['signals'].get('page_links', []))
+                    missing = missing_fields(merged, required)
+                    if not missing:
+                        stop_reason = 'complete'
+                        break
+            except FuturesTimeoutError:
+                stop_reason = 'time_budget'
+                logger.warning(f"⏱️ [CRAWL] Budget de {self.time_budget}s atteint pour {url}")
+            finally:
+                for future in futures:
+                    future.cancel()  # pages pas encore lancées
+
+            if stop_reason in ('complete', 'time_budget'):
+                break
+            frontier = rank_page_links(next_links, url, seen)
+            depth += 1
+        else:
+            stop_reason = 'max_depth' if frontier else 'no_links'
+
+        logger.info(f"✅ [CRAWL] {url}: {len(pages)} page(s) explorée(s) en {time.time() - start:.1f}s "
+                    f"({stop_reason}), champs manquants: {', '.join(missing) or 'aucun'}")
+        return {
+            'signals': merged,
+            'pages': [{'url': page['url'], 'success': page['success']} for page in pages],
+            'missing_fields': missing,
+            'stop_reason': stop_reason,
+            'sitemap': sitemap
+        }
+
+    @staticmethod
+    def _process_page(page_url: str, fetched: Dict[str, Any]) -> Dict[str, Any]:
+        """Extraction déterministe d'une page récupérée"""
+        if not fetched['success'] or not fetched['text']:
+            logger.warning(f"⚠️ [CRAWL] Page ignorée {page_url}: {fetched.get('error')}")
+            return {'url': page_url, 'success': False, 'signals': None}
+        try:
+            signals = extract_html_signals(fetched['text'], fetched['final_url'])
+        except Exception as e:
+            logger.warning(f"⚠️ [CRAWL] Extraction impossible pour {page_url}: {str(e)}")
+            return {'url': page_url, 'success': False, 'signals': None}
+        logger.info(f"📄 [CRAWL] {page_url}: {len(signals['emails'])} email(s), {len(signals['phones'])} téléphone(s), "
+                    f"{len(signals['social_media'])} réseau(x) social(aux)")
+        return {'url': page_url, 'success': True, 'signals': signals}
@@ -0,0 +1,189 @@
+"""
+Découverte des pages d'un site par robots.txt et sitemap.xml
+
+Les menus rendus en JavaScript échappent aux liens de la page d'accueil ; le
+sitemap liste en revanche toutes les pages publiées. Les sitemaps (index compris,
+éventuellement compressés) sont lus en flux : les URLs sont extraites au fil de
+la lecture sans construire l'arbre XML complet. Les pages sont classées par motif
+d'URL (contact, a-propos, mentions-legales...) avec les mêmes poids que
+l'exploration (site_crawler) et filtrées par les règles de robots.txt.
+
+Le résultat est conservé par domaine (SITEMAP_CACHE_TTL).
+"""
+
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+from lxml import etree
+
+from app.config import Config
+from app.scrapers.site_crawler import rank_page_links
+from app.utils.http_fetcher import get_http_fetcher
+from app.utils.logger import get_logger
+
+logger = get_logger('sitemap_discovery')
+
+ROBOTS_CONTENT_TYPES = ['text/plain']
+DEFAULT_SITEMAP_PATHS = ['/sitemap.xml', '/sitemap_index.xml']
+GZIP_MAGIC = b'\x1f\x8b'
+
+MAX_CANDIDATES = 20  # pages candidates conservées par domaine
+
+def _domain(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def _localname(element) -> str:
+    return etree.QName(element).localname
+
+def _read_locs(parser) -> Iterator[Tuple[str, str]]:
+    """URLs terminées depuis la dernière lecture, éléments traités libérés"""
+    for _, element in parser.read_events():
+        name = _localname(element)
+        if name == 'loc':
+            parent = element.getparent()
+            kind = 'sitemap' if parent is not None and _localname(parent) == 'sitemap' else 'url'
+            if element.text and element.text.strip():
+                yield kind, element.text.strip()
+        elif name in ('url', 'sitemap'):
+            # Mémoire bornée : l'entrée et ses prédécesseurs ne servent plus
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+def iter_sitemap_locs(chunks: Iterable[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Lire un sitemap en flux
+
+    Yields:
+        ('url', adresse d'une page) ou ('sitemap', adresse d'un sitemap enfant d'un index)
+    """
+    parser = etree.XMLPullParser(events=('end',), resolve_entities=False, no_network=True)
+    decompressor = None
+    started = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not started:
+            started = True
+            if chunk[:2] == GZIP_MAGIC:  # sitemap.xml.gz
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        parser.feed(chunk)
+        yield from _read_locs(parser)
+
+class SitemapDiscovery:
+    """Pages candidates d'un site d'après robots.txt et ses sitemaps, avec cache par domaine"""
+
+    def __init__(self, fetcher=None, cache_ttl: Optional[float] = None):
+        self.fetcher = fetcher or get_http_fetcher()
+        self.cache_ttl = Config.SITEMAP_CACHE_TTL if cache_ttl is None else cache_ttl
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def candidate_links(self, url: str, time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Pages les plus susceptibles de contenir les coordonnées
+
+        Args:
+            url: Une URL du site (page d'accueil)
+            time_budget: Durée maximale de la découverte (secondes)
+
+        Returns:
+            {'links': [[url, '']] au format page_links, 'sitemaps': sitemaps lus,
+             'urls': URLs lues, 'cached': résultat issu du cache}
+        """
+        domain = _domain(url)
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(domain)
+            if entry and entry[0] > now:
+                self.stats['hits'] += 1
+                return dict(entry[1], cached=True)
+            self.stats['misses'] += 1
+
+        discovered = self._discover(url, now + (time_budget or Config.SITEMAP_TIMEOUT * Config.SITEMAP_MAX_FILES))
+        with self._lock:
+            self._cache[domain] = (time.time() + self.cache_ttl, discovered)
+        return dict(discovered, cached=False)
+
+    def clear(self):
+        """Vider le cache"""
+        with self._lock:
+            self._cache.clear()
+
+    def _timeout(self, deadline: float) -> float:
+        return max(0.5, min(Config.SITEMAP_TIMEOUT, deadline - time.time()))
+
+    def _read_robots(self, root: str, deadline: float) -> Tuple[Optional[RobotFileParser], List[str]]:
+        """Règles et sitemaps déclarés dans robots.txt (None si absent)"""
+        fetched = self.fetcher.fetch(urljoin(root, '/robots.txt'), timeout=self._timeout(deadline),
+                                     content_types=ROBOTS_CONTENT_TYPES)
+        if not fetched['success'] or not fetched['text']:
+            return None, []
+        robots = RobotFileParser()
+        robots.parse(fetched['text'].splitlines())
+        return robots, list(robots.site_maps() or [])
+
+    def _discover(self, url: str, deadline: float) -> Dict[str, Any]:
+        parsed = urlparse(url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        robots, declared = self._read_robots(root, deadline)
+        queue = deque(declared or [urljoin(root, path) for path in DEFAULT_SITEMAP_PATHS])
+        tried_defaults = not declared
+
+        pages: List[str] = []
+        read_files = 0
+        while queue and read_files < Config.SITEMAP_MAX_FILES and len(pages) < Config.SITEMAP_MAX_URLS:
+            if time.time() >= deadline:
+                logger.warning(f"⏱️ [SITEMAP] Délai atteint pour {root}")
+                break
+            sitemap_url = queue.popleft()
+            children: List[str] = []
+            chunks = self.fetcher.iter_bytes(sitemap_url, self._timeout(deadline), max_bytes=Config.SITEMAP_MAX_BYTES)
+            try:
+                for kind, loc in iter_sitemap_locs(chunks):
+                    if kind == 'sitemap':
+                        children.append(loc)
+                    else:
+                        pages.append(loc)
+                    if len(pages) >= Config.SITEMAP_MAX_URLS or time.time() >= deadline:
+                        break
+                read_files += 1
+            except Exception as e:
+                logger.debug(f"⚠️ [SITEMAP] Lecture impossible de {sitemap_url}: {str(e)}")
+                continue
+            finally:
+                chunks.close()
+            if tried_defaults:
+                queue.clear()  # /sitemap_index.xml inutile si /sitemap.xml existe
+                tried_defaults = False
+            # Sitemaps de pages avant ceux des articles / produits (WordPress, Shopify...)
+            queue.extend(sorted(children, key=lambda loc: 0 if 'page' in loc.lower() else 1))
+
+        ranked = rank_page_links([[page, ''] for page in pages], url, set())
+        if robots is not None:
+            ranked = [(score, page) for score, page in ranked if robots.can_fetch('*', page)]
+        links = [[page, ''] for _, page in ranked[:MAX_CANDIDATES]]
+
+        logger.info(f"🗺️ [SITEMAP] {root}: {len(pages)} URL(s) dans {read_files} sitemap(s), {len(links)} page(s) candidate(s)")
+        return {'links': links, 'sitemaps': read_files, 'urls': len(pages)}
+
+# Instance partagée par le processus
+_discovery: Optional[SitemapDiscovery] = None
+_discovery_lock = threading.Lock()
+
+def get_sitemap_discovery() -> SitemapDiscovery:
+    """Obtenir la découverte par sitemap partagée (créée à la première demande)"""
+    global _discovery
+    with _discovery_lock:
+        if _discovery is None:
+            _discovery = SitemapDiscovery()
+    return _discovery
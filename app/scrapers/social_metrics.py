@@ -0,0 +1,140 @@
+"""
+Compteurs des profils Facebook et Instagram lus dans la page
+
+Les deux réseaux exposent abonnés, abonnements, publications et mentions
+J'aime dans la balise og:description (« 1,234 Followers, 56 Following,
+78 Posts - See Instagram photos... », « Nom. 1 234 J'aime · 56 en parlent. »)
+et dans le texte accessible de l'en-tête du profil. Ces signaux sont lus
+avant toute capture : la capture et l'analyse Vision ne servent plus qu'aux
+profils dont les compteurs ne sont pas dans la page (mur de connexion,
+mise en page inconnue).
+
+Le texte du profil (bio Instagram, description Facebook) et les contacts qu'il
+contient (e-mail, téléphone, site) sont lus au même endroit. Tant que le lead
+n'a pas encore de texte de profil, son absence de la page compte comme un champ
+manquant : la première analyse passe donc par Vision comme avant. Ensuite seuls
+les compteurs décident de la capture, au prix des contacts visibles uniquement
+sur l'image (boutons de contact, adresse) qui ne sont plus relus.
+
+Les valeurs sont conservées telles qu'affichées (« 1,2 K ») : elles passent
+ensuite par le même parse_social_count que les réponses de l'analyse Vision.
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+
+from app.config import Config
+from app.utils.pattern_matcher import find_all, classify_social_url
+
+# Nombre affiché : "1234", "1 234", "12,345", "1,2 K", "3,4 millions"
+_COUNT = r"(\d(?:[\d.,  ]|\s(?=\d))*(?:\s?(?:[kKmM](?![^\W\d_])|mille|millions?))?)"
+LABELS = {
+    'followers': r"followers?|abonné(?:e)?s|people follow|personnes suivent",
+    'following': r"following|abonnements|suivi\(e\)s|suivis",
+    'posts': r"posts|publications",
+    'likes': r"likes|people like|(?:mentions )?j[’']aime|personnes aiment"
+}
+PATTERNS = {field: re.compile(rf"{_COUNT}\s*(?:{label})(?![^\W\d_])", re.IGNORECASE)
+            for field, label in LABELS.items()}
+_ANY_COUNT = re.compile(rf"{_COUNT}\s*(?:{'|'.join(LABELS.values())}|talking about this|en parlent|were here|"
+                        rf"personnes étaient ici)[^·•.]*[·•.]?\s*", re.IGNORECASE)
+MAX_DESCRIPTION_CHARS = 500
+# Champ texte du profil de chaque réseau dans le résultat
+PROFILE_FIELDS = {'facebook': 'description', 'instagram': 'bio'}
+# Lignes de l'en-tête Instagram qui ne font pas partie de la bio (boutons, abonnés en commun)
+_INSTAGRAM_CHROME = re.compile(r"^(?:follow|following|message|suivre|suivi\(e\)|contacter|envoyer un message|"
+                               r"s['’]abonner|plus|more|followed by .*|suivi\(e\) par .*)$", re.IGNORECASE)
+_WEBSITE = re.compile(r"(?<![@\w.-])(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:/[^\s·•]*)?",
+                      re.IGNORECASE)
+
+def _clean(text: Optional[str]) -> str:
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+def parse_profile_counts(text: str, fields: List[str]) -> Dict[str, str]:
+    """Premier compteur trouvé pour chaque champ ('followers', 'following', 'posts', 'likes')"""
+    counts = {}
+    if not text:
+        return counts
+    text = text.replace('\n', ' · ')
+    for field in fields:
+        match = PATTERNS[field].search(text)
+        if match:
+            counts[field] = _clean(match.group(1))
+    return counts
+
+def _facebook_description(meta: Dict[str, str]) -> str:
+    """og:description d'une page Facebook sans le nom ni les compteurs en tête"""
+    description = _clean(meta.get('og:description') or meta.get('description'))
+    counts = list(_ANY_COUNT.finditer(description))
+    if counts:
+        description = description[counts[-1].end():]
+    else:
+        title = _clean(meta.get('og:title'))
+        if title and description.startswith(title):
+            description = description[len(title):]
+    return description.strip(' .·•')[:MAX_DESCRIPTION_CHARS]
+
+def _instagram_bio(header_text: str) -> str:
+    """Bio Instagram : lignes de l'en-tête après les compteurs, sans le nom affiché ni les boutons"""
+    lines = [_clean(line) for line in (header_text or '').split('\n')]
+    lines = [line for line in lines if line]
+    last_count = max((index for index, line in enumerate(lines) if _ANY_COUNT.match(line)), default=None)
+    if last_count is None:
+        return ''
+    bio = [line for line in lines[last_count + 1:] if not _INSTAGRAM_CHROME.match(line)]
+    return '\n'.join(bio[1:])[:MAX_DESCRIPTION_CHARS]
+
+def extract_contact_info(text: str) -> Dict[str, str]:
+    """E-mail, téléphone et site cités dans le texte d'un profil (mêmes clés que l'analyse Vision)"""
+    if not text:
+        return {}
+    found = find_all(text, ('email', 'phone'))
+    contact = {key: found[key][0] for key in ('email', 'phone') if found.get(key)}
+    without_emails = text
+    for email in found.get('email', []):
+        without_emails = without_emails.replace(email, ' ')
+    for match in _WEBSITE.finditer(without_emails):
+        if not classify_social_url(match.group(0)):
+            contact['website'] = match.group(0).rstrip('.,;:)')
+            break
+    return contact
+
+def extract_profile_metrics(platform: str, meta: Dict[str, str], header_text: str = '') -> Dict[str, Any]:
+    """
+    Compteurs d'un profil à partir des balises meta (og:description, description)
+    puis du texte de l'en-tête pour les champs absents des balises
+
+    Returns:
+        {'followers': '1,2 K', 'following', 'posts', 'likes', 'description' ou 'bio',
+         'contact_info', 'source': 'dom'} (seulement les champs trouvés)
+    """
+    fields = ['followers', 'following', 'posts'] if platform == 'instagram' else ['followers', 'likes']
+    metrics: Dict[str, Any] = {}
+    for text in (meta.get('og:description'), meta.get('description'), header_text):
+        missing = [field for field in fields if field not in metrics]
+        if not missing:
+            break
+        metrics.update(parse_profile_counts(text, missing))
+
+    if metrics:
+        profile = _facebook_description(meta) if platform == 'facebook' else _instagram_bio(header_text)
+        if profile:
+            metrics[PROFILE_FIELDS[platform]] = profile
+            contact = extract_contact_info(profile)
+            if contact:
+                metrics['contact_info'] = contact
+        metrics['source'] = 'dom'
+    return metrics
+
+def missing_metrics(platform: str, metrics: Optional[Dict[str, Any]], profile_known: bool = False) -> List[str]:
+    """
+    Champs requis (SOCIAL_DOM_REQUIRED_FIELDS) absents : l'analyse Vision reste nécessaire s'il en manque
+
+    Le texte du profil (bio, description) est requis aussi tant que le lead n'en a pas
+    (profile_known=False) : c'est la seule source de ses contacts quand la page ne l'expose pas.
+    """
+    metrics = metrics or {}
+    fields = list(Config.SOCIAL_DOM_REQUIRED_FIELDS.get(platform, ['followers']))
+    if not profile_known:
+        fields.append(PROFILE_FIELDS.get(platform, 'description'))
+    return [field for field in fields if not metrics.get(field)]
@@ -2,22 +2,46 @@
 Service d'analyse IA pour l'extraction intelligente de données web
 """
 
+import contextvars
 import os
+import re
 import json
-import requests
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, Optional, List
+from app.config import Config
 from app.prompts import WEBSITE_ANALYSIS_PROMPT, SCREENSHOT_ANALYSIS_PROMPT, LEAD_SCORING_PROMPT, SYSTEM_PROMPT
+from app.scrapers.page_text import MAX_CHUNKS, html_to_text, split_text_into_chunks
+from app.services.extraction_gate import TARGET_FIELDS, LIST_FIELDS, build_gap_prompt, empty_analysis
+from app.utils.llm_cache import get_llm_cache
+from app.utils.llm_telemetry import record_llm_call
+from app.utils.openai_client import get_openai_client
+from app.utils.token_counter import count_tokens, truncate_to_tokens
+from app.utils.validators import is_valid_email, is_valid_phone
+from app.utils.pattern_matcher import ADDRESS_PATTERNS, find_all, scan
+from app.utils.screenshot_preprocessing import prepare_screenshot
 
 logger = logging.getLogger(__name__)
 
+WEBSITE_SYSTEM_MESSAGE = "Tu es un expert en analyse de sites web. Tu extrais les informations importantes et tu retournes UNIQUEMENT un JSON valide."
+WEBSITE_FULL_SYSTEM_MESSAGE = WEBSITE_SYSTEM_MESSAGE + " Analyse TOUT le HTML fourni."
+VISION_SYSTEM_MESSAGE = "Tu es un expert en analyse d'images de réseaux sociaux. Tu extrais les informations importantes et tu retournes UNIQUEMENT un JSON valide."
+
+# Longueur minimale d'un champ texte jugé fiable (arrêt anticipé de l'analyse par sections)
+CONFIDENT_MIN_CHARS = {'adresse': 10, 'description': 30}
+
+# Sections analysées simultanément pour tout le processus (tous leads confondus)
+_chunk_slots = threading.BoundedSemaphore(Config.CHUNK_ANALYSIS_GLOBAL_LIMIT)
+
 class AIAnalysisService:
     """Service d'analyse IA pour extraire les informations des sites web"""
     
     def __init__(self):
         """Initialise le service d'analyse IA"""
         self.api_key = os.getenv('OPENAI_API_KEY')
-        self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.api_url = f"{Config.OPENAI_API_BASE.rstrip('/')}/chat/completions"
         
         if not self.api_key:
             logger.error("❌ [AI] Clé API OpenAI manquante")
@@ -25,23 +49,22 @@ class AIAnalysisService:
         
         logger.info("✅ Service IA initialisé")
     
-    def analyze_website(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def analyze_website(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                        page_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse un site web avec l'IA
+        
+        fields: champs à extraire uniquement (prompt ciblé, cf. extraction_gate), None = analyse complète
+        page_text: texte de la page déjà converti (cf. prepare_page_text)
         """
         try:
             logger.info(f"🤖 [AI] Début analyse IA pour {url}")
             
-            # Smart truncation pour éviter les limites de tokens
-            truncated_html = self._smart_truncate_html(html_content)
-            logger.info(f"📏 [AI] HTML original: {len(html_content)} caractères")
-            logger.info(f"📏 [AI] HTML smart-truncated: {len(truncated_html)} caractères")
-            
-            # Créer le prompt avec le template configurable
-            prompt = self._create_analysis_prompt(truncated_html, url)
+            # Texte compact réduit au budget de l'analyse standard
+            prompt = self._standard_prompt(html_content, url, fields, page_text)
             
             # Appeler l'API OpenAI
-            response = self._call_openai_api(prompt)
+            response = self._call_openai_api(prompt, 'site_web_gap' if fields else 'site_web')
             
             if response:
                 logger.info("✅ [AI] JSON parsé avec succès")
@@ -54,20 +77,21 @@ class AIAnalysisService:
             logger.error(f"❌ [AI] Erreur analyse IA: {str(e)}")
             return self._get_fallback_result_with_html_analysis(html_content, url)
     
-    def analyze_website_full_html(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def analyze_website_full_html(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                                  page_text: Optional[str] = None) -> Dict[str, Any]:
         """
-        Analyse un site web avec le HTML COMPLET (sans troncature)
-        Utilise GPT-4 pour gérer de gros contextes
+        Analyse un site web avec le texte COMPLET de la page (sans troncature)
+        Utilise OPENAI_FULL_MODEL pour gérer de gros contextes
         """
         try:
-            logger.info(f"🤖 [AI FULL] Début analyse HTML complet pour {url}")
-            logger.info(f"📏 [AI FULL] HTML complet: {len(html_content)} caractères")
+            logger.info(f"🤖 [AI FULL] Début analyse texte complet pour {url}")
+            text = page_text if page_text is not None else self.prepare_page_text(html_content, url)
             
-            # Créer le prompt avec le HTML complet
-            prompt = self._create_analysis_prompt(html_content, url)
+            # Créer le prompt avec le texte complet
+            prompt = self._create_analysis_prompt(text, url, fields)
             
-            # Appeler l'API OpenAI avec GPT-4
-            response = self._call_openai_api_full(prompt)
+            # Appeler l'API OpenAI avec le modèle à grand contexte
+            response = self._call_openai_api_full(prompt, 'site_web_full_gap' if fields else 'site_web_full')
             
             if response:
                 logger.info("✅ [AI FULL] JSON parsé avec succès")
@@ -80,27 +104,22 @@ class AIAnalysisService:
             logger.error(f"❌ [AI FULL] Erreur analyse IA: {str(e)}")
             return self._get_fallback_result_with_html_analysis(html_content, url)
     
-    def analyze_website_chunked(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def analyze_website_chunked(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                                page_text: Optional[str] = None) -> Dict[str, Any]:
         """
-        Analyse un site web en divisant le HTML en sections
+        Analyse un site web en divisant le texte de la page en sections
         """
         try:
             logger.info(f"🤖 [AI CHUNKED] Début analyse par sections pour {url}")
-            logger.info(f"📏 [AI CHUNKED] HTML complet: {len(html_content)} caractères")
+            text = page_text if page_text is not None else self.prepare_page_text(html_content, url)
             
-            # Diviser le HTML en sections
-            chunks = self._split_html_into_chunks(html_content)
-            logger.info(f"📦 [AI CHUNKED] HTML divisé en {len(chunks)} sections")
+            # Diviser le texte en sections de LLM_CHUNK_TOKENS tokens
+            chunks = split_text_into_chunks(text, Config.LLM_CHUNK_TOKENS, MAX_CHUNKS)
+            logger.info(f"📦 [AI CHUNKED] Texte divisé en {len(chunks)} sections")
             
-            # Analyser chaque section
-            all_results = []
-            for i, chunk in enumerate(chunks):
-                logger.info(f"🔍 [AI CHUNKED] Analyse section {i+1}/{len(chunks)} ({len(chunk)} caractères)")
-                
-                # Analyser cette section
-                chunk_result = self._analyze_html_chunk(chunk, url, f"Section {i+1}")
-                if chunk_result:
-                    all_results.append(chunk_result)
+            # Analyser les sections en parallèle
+            targets = fields or Config.CHUNK_ANALYSIS_TARGET_FIELDS
+            all_results = [result for result in self._analyze_chunks_parallel(chunks, url, fields, targets) if result]
             
             # Fusionner tous les résultats
             final_result = self._merge_chunk_results(all_results, url)
@@ -112,152 +131,52 @@ class AIAnalysisService:
             logger.error(f"❌ [AI CHUNKED] Erreur analyse par sections: {str(e)}")
             return self._get_fallback_result_with_html_analysis(html_content, url)
     
-    def _smart_truncate_html(self, html_content: str) -> str:
+    def analyze_website_without_ai(self, html_content: str, url: str = "") -> Dict[str, Any]:
         """
-        Tronque intelligemment le HTML en préservant les sections importantes
+        Analyse HTML manuelle, sans appel OpenAI (budget de temps dépassé)
         """
-        if len(html_content) <= 15000:
-            return html_content
-        
-        logger.info(f"📏 [AI] HTML original: {len(html_content)} caractères")
-        
-        # Chercher les sections importantes
-        important_sections = []
-        
-        # 1. Header (premiers 5000 caractères)
-        header = html_content[:5000]
-        important_sections.append(("Header", header))
-        
-        # 2. Chercher les sections contact/footer
-        contact_keywords = ['contact', 'footer', 'adresse', 'téléphone', 'email', 'social']
-        for keyword in contact_keywords:
-            start = html_content.lower().find(keyword)
-            if start != -1:
-                end = min(start + 5000, len(html_content))  # Augmenté de 3000 à 5000
-                section = html_content[start:end]
-                important_sections.append((f"Section {keyword}", section))
-        
-        # 3. Chercher les réseaux sociaux - AMÉLIORÉ
-        social_keywords = ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']
-        social_patterns = [
-            r'https?://[^\s"\'>]*facebook[^\s"\'>]*',
-            r'https?://[^\s"\'>]*instagram[^\s"\'>]*',
-            r'https?://[^\s"\'>]*twitter[^\s"\'>]*',
-            r'https?://[^\s"\'>]*linkedin[^\s"\'>]*',
-            r'https?://[^\s"\'>]*youtube[^\s"\'>]*',
-            r'https?://[^\s"\'>]*tiktok[^\s"\'>]*',
-        ]
-        
-        # Chercher par mots-clés
-        for keyword in social_keywords:
-            start = html_content.lower().find(keyword)
-            if start != -1:
-                end = min(start + 5000, len(html_content))  # Augmenté de 2000 à 5000
-                section = html_content[start:end]
-                important_sections.append((f"Social {keyword}", section))
-        
-        # Chercher par patterns regex - NOUVEAU : Plus exhaustif
-        import re
-        for i, pattern in enumerate(social_patterns):
-            matches = re.finditer(pattern, html_content, re.IGNORECASE)
-            for match in matches:
-                start = max(0, match.start() - 3000)  # Augmenté de 2000 à 3000
-                end = min(len(html_content), match.end() + 3000)  # Augmenté de 2000 à 3000
-                section = html_content[start:end]
-                platform = social_keywords[i] if i < len(social_keywords) else f"social_{i}"
-                important_sections.append((f"Social {platform} (regex)", section))
-        
-        # 4. Chercher les horaires/tarifs
-        info_keywords = ['horaires', 'tarifs', 'prix', 'ouverture']
-        for keyword in info_keywords:
-            start = html_content.lower().find(keyword)
-            if start != -1:
-                end = min(start + 3000, len(html_content))
-                section = html_content[start:end]
-                important_sections.append((f"Info {keyword}", section))
-        
-        # 5. Chercher les icônes réseaux sociaux (classes CSS) - NOUVEAU
-        icon_patterns = [
-            r'class=["\'][^"\']*facebook[^"\']*["\']',
-            r'class=["\'][^"\']*instagram[^"\']*["\']',
-            r'class=["\'][^"\']*twitter[^"\']*["\']',
-            r'class=["\'][^"\']*linkedin[^"\']*["\']',
-            r'class=["\'][^"\']*youtube[^"\']*["\']',
-            r'class=["\'][^"\']*social[^"\']*["\']',
-            r'class=["\'][^"\']*bi-facebook[^"\']*["\']',  # Bootstrap Icons
-            r'class=["\'][^"\']*bi-instagram[^"\']*["\']',
-            r'class=["\'][^"\']*bi-twitter[^"\']*["\']',
-            r'class=["\'][^"\']*bi-linkedin[^"\']*["\']',
-            r'class=["\'][^"\']*bi-youtube[^"\']*["\']',
-        ]
-        
-        for i, pattern in enumerate(icon_patterns):
-            matches = re.finditer(pattern, html_content, re.IGNORECASE)
-            for match in matches:
-                start = max(0, match.start() - 2000)  # Augmenté de 1000 à 2000
-                end = min(len(html_content), match.end() + 2000)
-                section = html_content[start:end]
-                platform = social_keywords[i] if i < len(social_keywords) else f"icon_{i}"
-                important_sections.append((f"Icon {platform}", section))
-        
-        # 6. NOUVEAU : Chercher dans le footer spécifiquement
-        footer_patterns = [
-            r'<footer[^>]*>.*?</footer>',
-            r'<div[^>]*class=["\'][^"\']*footer[^"\']*["\'][^>]*>.*?</div>',
-        ]
-        
-        for pattern in footer_patterns:
-            matches = re.finditer(pattern, html_content, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                section = match.group(0)
-                important_sections.append(("Footer", section))
-        
-        # 7. NOUVEAU : Chercher les liens externes
-        external_link_pattern = r'<a[^>]*href=["\'](https?://[^"\']*facebook[^"\']*|https?://[^"\']*instagram[^"\']*|https?://[^"\']*twitter[^"\']*|https?://[^"\']*linkedin[^"\']*|https?://[^"\']*youtube[^"\']*|https?://[^"\']*tiktok[^"\']*)["\'][^>]*>'
-        matches = re.finditer(external_link_pattern, html_content, re.IGNORECASE)
-        for match in matches:
-            start = max(0, match.start() - 1000)
-            end = min(len(html_content), match.end() + 1000)
-            section = html_content[start:end]
-            important_sections.append(("External Social Link", section))
-        
-        # Combiner les sections importantes
-        combined_html = ""
-        for section_name, section_content in important_sections:
-            combined_html += f"\n<!-- {section_name} -->\n{section_content}\n"
-        
-        # Si on a encore de la place, ajouter le début du HTML
-        remaining_chars = 15000 - len(combined_html)
-        if remaining_chars > 0:
-            combined_html = html_content[:remaining_chars] + combined_html
-        
-        # Tronquer si nécessaire
-        if len(combined_html) > 15000:
-            combined_html = combined_html[:15000]
-        
-        logger.info(f"📏 [AI] HTML smart-truncated: {len(combined_html)} caractères")
-        logger.info(f"📏 [AI] Sections préservées: {[name for name, _ in important_sections]}")
+        logger.info(f"🔍 [AI] Analyse sans IA pour {url} ({len(html_content)} caractères)")
+        result = self._get_fallback_result_with_html_analysis(html_content, url)
+        result["error"] = "Analyse manuelle (analyse IA reportée)"
+        return result
+    
+    def prepare_page_text(self, html_content: str, url: str = "") -> str:
+        """
+        Texte compact de la page envoyé à l'IA (cf. page_text.html_to_text)
         
-        return combined_html
+        Une page sans texte exploitable est transmise telle quelle.
+        """
+        text = html_to_text(html_content, url)
+        if not text.strip():
+            logger.warning(f"⚠️ [AI] Aucun texte exploitable pour {url}, HTML transmis tel quel")
+            return html_content
+        logger.info(f"📏 [AI] Page convertie: {len(html_content)} caractères HTML -> {count_tokens(text)} tokens de texte")
+        return text
     
-    def _create_analysis_prompt(self, html_content: str, url: str) -> str:
-        """Crée le prompt pour l'analyse IA en utilisant le template configurable"""
-        return WEBSITE_ANALYSIS_PROMPT.format(url=url, html_content=html_content)
+    def _standard_prompt(self, html_content: str, url: str, fields: Optional[List[str]] = None,
+                         page_text: Optional[str] = None) -> str:
+        """Prompt de l'analyse standard : texte réduit à LLM_STANDARD_MAX_TOKENS tokens"""
+        text = page_text if page_text is not None else self.prepare_page_text(html_content, url)
+        truncated_text = truncate_to_tokens(text, Config.LLM_STANDARD_MAX_TOKENS)
+        if len(truncated_text) < len(text):
+            logger.info(f"✂️ [AI] Texte réduit à {Config.LLM_STANDARD_MAX_TOKENS} tokens")
+        return self._create_analysis_prompt(truncated_text, url, fields)
     
-    def _call_openai_api(self, prompt: str) -> Optional[Dict[str, Any]]:
-        """Appelle l'API OpenAI"""
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "gpt-3.5-turbo",
+    def _create_analysis_prompt(self, page_content: str, url: str, fields: Optional[List[str]] = None) -> str:
+        """Crée le prompt pour l'analyse IA en utilisant le template configurable (restreint aux champs demandés)"""
+        if fields:
+            logger.info(f"🎯 [AI] Prompt ciblé sur les champs manquants: {', '.join(fields)}")
+            return build_gap_prompt(fields, url, page_content)
+        return WEBSITE_ANALYSIS_PROMPT.format(url=url, page_content=page_content)
+    
+    def _website_payload(self, prompt: str, full_html: bool = False) -> Dict[str, Any]:
+        """Corps de la requête d'analyse d'un site (OPENAI_FULL_MODEL pour le texte complet)"""
+        return {
+            "model": Config.OPENAI_FULL_MODEL if full_html else "gpt-3.5-turbo",
             "messages": [
                 {
                     "role": "system",
-                    "content": "Tu es un expert en analyse de sites web. Tu extrais les informations importantes et tu retournes UNIQUEMENT un JSON valide."
+                    "content": WEBSITE_FULL_SYSTEM_MESSAGE if full_html else WEBSITE_SYSTEM_MESSAGE
                 },
                 {
                     "role": "user",
@@ -265,186 +184,215 @@ class AIAnalysisService:
                 }
             ],
             "temperature": 0.1,
-            "max_tokens": 4000
+            "max_tokens": Config.LLM_OUTPUT_TOKENS
+        }
+    
+    def _vision_payload(self, prompt: str, encoded_image: str, mime: str = 'image/png',
+                        detail: Optional[str] = None) -> Dict[str, Any]:
+        """Corps de la requête d'analyse d'une capture d'écran (cf. prepare_screenshot)"""
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": VISION_SYSTEM_MESSAGE
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prompt
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{mime};base64,{encoded_image}",
+                                "detail": detail or Config.VISION_DETAIL
+                            }
+                        }
+                    ]
+                }
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.1
         }
+    
+    def build_website_request(self, html_content: str, url: str = "", fields: Optional[List[str]] = None,
+                              page_text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Requête d'analyse standard d'un site, sans l'envoyer (mode batch)
+        
+        Returns:
+            {'body': corps de la requête, 'prompt': prompt utilisateur}
+        """
+        prompt = self._standard_prompt(html_content, url, fields, page_text)
+        return {'body': self._website_payload(prompt), 'prompt': prompt}
+    
+    def build_screenshot_request(self, screenshot_path: str, platform: str) -> Optional[Dict[str, Any]]:
+        """
+        Requête d'analyse d'une capture d'écran, sans l'envoyer (mode batch)
+        
+        Returns:
+            {'body', 'prompt', 'image'} ou None si la capture est introuvable
+        """
+        image = prepare_screenshot(screenshot_path, platform)
+        if image is None:
+            logger.error(f"❌ [AI] Fichier capture introuvable: {screenshot_path}")
+            return None
+        prompt = SCREENSHOT_ANALYSIS_PROMPT.format(platform=platform)
+        return {'body': self._vision_payload(prompt, image['encoded'], image['mime'], image['detail']),
+                'prompt': prompt, 'image': image['encoded']}
+    
+    @staticmethod
+    def parse_json_content(content: str) -> Optional[Dict[str, Any]]:
+        """JSON contenu dans la réponse du modèle (None si absent ou invalide)"""
+        json_start = content.find('{')
+        json_end = content.rfind('}') + 1
+        if json_start == -1 or json_end <= json_start:
+            return None
+        json_content = content[json_start:json_end]
+        try:
+            return json.loads(json_content)
+        except json.JSONDecodeError:
+            # Même nettoyage que pour les réponses Vision
+            try:
+                return json.loads(json_content.strip().replace('\n', ' ').replace('\r', ' ').replace('  ', ' '))
+            except json.JSONDecodeError:
+                return None
+    
+    def _cache_key(self, data: Dict[str, Any], prompt: str, image: Optional[str] = None) -> Optional[str]:
+        """Clé de cache d'un appel OpenAI (None si le cache est désactivé)"""
+        cache = get_llm_cache()
+        if cache is None:
+            return None
+        params = {key: value for key, value in data.items() if key not in ('model', 'messages')}
+        return cache.make_key(data['model'], data['messages'][0]['content'], prompt, params, image)
+    
+    def _cached_response(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Réponse déjà obtenue pour un appel identique"""
+        cache = get_llm_cache()
+        return cache.get(cache_key) if cache and cache_key else None
+    
+    def _cache_response(self, cache_key: Optional[str], model: str, parsed_result: Dict[str, Any], api_result: Dict[str, Any]):
+        """Conserver une réponse JSON valide avec les tokens consommés"""
+        cache = get_llm_cache()
+        if cache and cache_key:
+            cache.store(cache_key, model, parsed_result, (api_result.get('usage') or {}).get('total_tokens', 0))
+    
+    def _call_openai_api(self, prompt: str, call_type: str = 'site_web') -> Optional[Dict[str, Any]]:
+        """Appelle l'API OpenAI"""
+        
+        data = self._website_payload(prompt)
+        
+        cache_key = self._cache_key(data, prompt)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            record_llm_call(call_type, data['model'], cached=True)
+            return cached
         
+        started = time.perf_counter()
+        result, outcome, error = None, 'api_error', None
         try:
             logger.info(f"📡 [AI] Appel API OpenAI avec {len(prompt)} caractères")
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=60
-            )
-            response.raise_for_status()
-            
-            result = response.json()
+            result = get_openai_client().chat_completion(data)
             content = result['choices'][0]['message']['content']
             
-            # Essayer de parser le JSON
-            try:
-                # Chercher le JSON dans la réponse
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    json_content = content[json_start:json_end]
-                    parsed_result = json.loads(json_content)
-                    logger.info("✅ [AI] JSON parsé avec succès")
-                    return parsed_result
-                else:
-                    logger.error(f"❌ [AI] Aucun JSON trouvé dans la réponse")
-                    logger.error(f"📄 [AI] Réponse complète: {content}")
-                    return None
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ [AI] Erreur parsing JSON: {str(e)}")
-                logger.error(f"📄 [AI] Contenu reçu: {content}")
+            # JSON de la réponse, extrait comme pour les réponses de lots (parse_json_content)
+            parsed_result = self.parse_json_content(content)
+            if parsed_result is None:
+                logger.error(f"❌ [AI] Aucun JSON valide dans la réponse")
+                logger.error(f"📄 [AI] Réponse complète: {content}")
+                outcome = 'invalid_json'
                 return None
+            logger.info("✅ [AI] JSON parsé avec succès")
+            self._cache_response(cache_key, data['model'], parsed_result, result)
+            outcome = 'ok'
+            return parsed_result
                 
         except Exception as e:
             logger.error(f"❌ [AI] Erreur API OpenAI: {str(e)}")
+            error = str(e)
             return None
+        finally:
+            record_llm_call(call_type, data['model'], (result or {}).get('usage'), time.perf_counter() - started,
+                            outcome=outcome, error=error)
     
-    def _call_openai_api_full(self, prompt: str) -> Optional[Dict[str, Any]]:
-        """Appelle l'API OpenAI avec GPT-4 pour gérer de gros contextes"""
+    def _call_openai_api_full(self, prompt: str, call_type: str = 'site_web_full') -> Optional[Dict[str, Any]]:
+        """Appelle l'API OpenAI avec OPENAI_FULL_MODEL pour gérer de gros contextes"""
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        data = self._website_payload(prompt, full_html=True)  # modèle à grand contexte au lieu de GPT-3.5-turbo
         
-        data = {
-            "model": "gpt-4",  # Utiliser GPT-4 au lieu de GPT-3.5-turbo
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "Tu es un expert en analyse de sites web. Tu extrais les informations importantes et tu retournes UNIQUEMENT un JSON valide. Analyse TOUT le HTML fourni."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.1,
-            "max_tokens": 4000
-        }
+        cache_key = self._cache_key(data, prompt)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            record_llm_call(call_type, data['model'], cached=True)
+            return cached
         
+        started = time.perf_counter()
+        result, outcome, error = None, 'api_error', None
         try:
             logger.info(f"📡 [AI FULL] Appel API OpenAI avec {len(prompt)} caractères")
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=60
-            )
-            response.raise_for_status()
-            
-            result = response.json()
+            result = get_openai_client().chat_completion(data)
             content = result['choices'][0]['message']['content']
             
-            # Essayer de parser le JSON
-            try:
-                # Chercher le JSON dans la réponse
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    json_content = content[json_start:json_end]
-                    parsed_result = json.loads(json_content)
-                    logger.info("✅ [AI FULL] JSON parsé avec succès")
-                    return parsed_result
-                else:
-                    logger.error(f"❌ [AI FULL] Aucun JSON trouvé dans la réponse")
-                    logger.error(f"📄 [AI FULL] Réponse complète: {content}")
-                    return None
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ [AI FULL] Erreur parsing JSON: {str(e)}")
-                logger.error(f"📄 [AI FULL] Contenu reçu: {content}")
+            # JSON de la réponse, extrait comme pour les réponses de lots (parse_json_content)
+            parsed_result = self.parse_json_content(content)
+            if parsed_result is None:
+                logger.error(f"❌ [AI FULL] Aucun JSON valide dans la réponse")
+                logger.error(f"📄 [AI FULL] Réponse complète: {content}")
+                outcome = 'invalid_json'
                 return None
+            logger.info("✅ [AI FULL] JSON parsé avec succès")
+            self._cache_response(cache_key, data['model'], parsed_result, result)
+            outcome = 'ok'
+            return parsed_result
                 
         except Exception as e:
             logger.error(f"❌ [AI FULL] Erreur API OpenAI: {str(e)}")
+            error = str(e)
             return None
+        finally:
+            record_llm_call(call_type, data['model'], (result or {}).get('usage'), time.perf_counter() - started,
+                            outcome=outcome, error=error)
     
-    def _call_openai_vision_api(self, prompt: str, encoded_image: str) -> Optional[Dict[str, Any]]:
+    def _call_openai_vision_api(self, prompt: str, encoded_image: str, call_type: str = 'vision',
+                                mime: str = 'image/png', detail: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Appelle l'API OpenAI Vision pour analyser une image"""
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        data = self._vision_payload(prompt, encoded_image, mime, detail)
         
-        data = {
-            "model": "gpt-4o",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "Tu es un expert en analyse d'images de réseaux sociaux. Tu extrais les informations importantes et tu retournes UNIQUEMENT un JSON valide."
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{encoded_image}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            "max_tokens": 2000,
-            "temperature": 0.1
-        }
+        cache_key = self._cache_key(data, prompt, encoded_image)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            record_llm_call(call_type, data['model'], cached=True)
+            return cached
         
+        started = time.perf_counter()
+        result, outcome, error = None, 'api_error', None
         try:
-            response = requests.post(self.api_url, headers=headers, json=data, timeout=60)
+            result = get_openai_client().chat_completion(data)
+            content = result['choices'][0]['message']['content']
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                
-                # Essayer de parser le JSON
-                try:
-                    # Nettoyer le contenu pour extraire le JSON
-                    json_start = content.find('{')
-                    json_end = content.rfind('}') + 1
-                    
-                    if json_start == -1 or json_end == 0:
-                        logger.error(f"❌ [AI] Aucun JSON trouvé dans la réponse Vision")
-                        logger.error(f"📄 [AI] Contenu reçu: {content[:500]}...")
-                        return None
-                    
-                    json_content = content[json_start:json_end]
-                    
-                    # Nettoyer le JSON des caractères problématiques
-                    json_content = json_content.strip()
-                    json_content = json_content.replace('\n', ' ').replace('\r', ' ')
-                    json_content = json_content.replace('  ', ' ')
-                    
-                    parsed_result = json.loads(json_content)
-                    logger.info(f"✅ [AI] JSON Vision parsé avec succès")
-                    return parsed_result
-                    
-                except json.JSONDecodeError as e:
-                    logger.error(f"❌ [AI] Erreur parsing JSON Vision: {str(e)}")
-                    logger.error(f"📄 [AI] Contenu reçu complet: {content}")
-                    logger.error(f"📄 [AI] JSON extrait: {json_content}")
-                    return None
-                    
-            else:
-                logger.error(f"❌ [AI] Erreur API Vision: {response.status_code} - {response.text}")
+            # JSON de la réponse, extrait comme pour les réponses de lots (parse_json_content)
+            parsed_result = self.parse_json_content(content)
+            if parsed_result is None:
+                logger.error(f"❌ [AI] Aucun JSON valide dans la réponse Vision")
+                logger.error(f"📄 [AI] Contenu reçu: {content[:500]}...")
+                outcome = 'invalid_json'
                 return None
+            logger.info(f"✅ [AI] JSON Vision parsé avec succès")
+            self._cache_response(cache_key, data['model'], parsed_result, result)
+            outcome = 'ok'
+            return parsed_result
                 
         except Exception as e:
             logger.error(f"❌ [AI] Erreur appel API Vision: {str(e)}")
+            error = str(e)
             return None
+        finally:
+            record_llm_call(call_type, data['model'], (result or {}).get('usage'), time.perf_counter() - started,
+                            outcome=outcome, error=error)
     
     def _get_fallback_result(self, url: str) -> Dict[str, Any]:
         """Résultat de fallback en cas d'échec - AMÉLIORÉ avec analyse HTML"""
@@ -515,90 +463,44 @@ class AIAnalysisService:
     
     def _analyze_html_social_media(self, html_content: str) -> Dict[str, Any]:
         """Analyse manuelle des réseaux sociaux dans le HTML"""
-        import re
-        
         social_media = {}
+        bare_links = {}
+        
+        # Une seule passe : URLs absolues et liens sans schéma (facebook.com/..., fb.com/..., x.com/...)
+        for match in scan(html_content, ('social', 'social_link')):
+            if match.kind == 'social':
+                if match.label not in social_media:
+                    social_media[match.label] = match.value
+                    logger.info(f"📱 [FALLBACK] {match.label} trouvé: {match.value}")
+            else:
+                bare_links.setdefault(match.label, f"https://{match.value}")
         
-        # Patterns pour les réseaux sociaux
-        social_patterns = {
-            'facebook': [
-                r'https?://[^\s"\'>]*facebook[^\s"\'>]*',
-                r'facebook\.com/[^\s"\'>]*',
-                r'fb\.com/[^\s"\'>]*'
-            ],
-            'instagram': [
-                r'https?://[^\s"\'>]*instagram[^\s"\'>]*',
-                r'instagram\.com/[^\s"\'>]*'
-            ],
-            'twitter': [
-                r'https?://[^\s"\'>]*twitter[^\s"\'>]*',
-                r'x\.com/[^\s"\'>]*',
-                r'twitter\.com/[^\s"\'>]*'
-            ],
-            'linkedin': [
-                r'https?://[^\s"\'>]*linkedin[^\s"\'>]*',
-                r'linkedin\.com/[^\s"\'>]*'
-            ],
-            'youtube': [
-                r'https?://[^\s"\'>]*youtube[^\s"\'>]*',
-                r'youtube\.com/[^\s"\'>]*'
-            ],
-            'tiktok': [
-                r'https?://[^\s"\'>]*tiktok[^\s"\'>]*',
-                r'tiktok\.com/[^\s"\'>]*'
-            ]
-        }
-        
-        # Chercher dans le HTML
-        for platform, patterns in social_patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                if matches:
-                    # Nettoyer et dédupliquer les URLs
-                    clean_urls = []
-                    for match in matches:
-                        if match.startswith('http'):
-                            clean_urls.append(match)
-                        else:
-                            clean_urls.append(f"https://{match}")
-                    
-                    if clean_urls:
-                        social_media[platform] = list(set(clean_urls))[0]  # Prendre le premier
-                        logger.info(f"📱 [FALLBACK] {platform} trouvé: {social_media[platform]}")
-                        break  # Passer au réseau suivant
+        # Lien sans schéma seulement si aucune URL complète pour la plateforme
+        for platform, url in bare_links.items():
+            if platform not in social_media:
+                social_media[platform] = url
+                logger.info(f"📱 [FALLBACK] {platform} trouvé: {url}")
         
         return social_media
     
     def _analyze_html_contact(self, html_content: str) -> Dict[str, Any]:
         """Analyse manuelle des contacts dans le HTML"""
-        import re
-        
         contact_info = {
             "emails": [],
             "telephones": [],
             "adresse": ""
         }
         
-        # Chercher les emails
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, html_content)
-        contact_info["emails"] = list(set(emails))  # Dédupliquer
-        
-        # Chercher les téléphones français
-        phone_pattern = r'(?:\+33|0033|33|0)[1-9](?:[ .-]?\d{2}){4}'
-        phones = re.findall(phone_pattern, html_content)
-        contact_info["telephones"] = list(set(phones))  # Dédupliquer
+        # Emails et téléphones français en une seule passe (motifs partagés de pattern_matcher)
+        found = find_all(html_content, ('email', 'phone'))
+        contact_info["emails"] = list(dict.fromkeys(found.get('email', [])))  # Dédupliquer
+        contact_info["telephones"] = list(dict.fromkeys(found.get('phone', [])))
         
         # Chercher l'adresse (pattern basique)
-        address_patterns = [
-            r'<address[^>]*>([^<]+)</address>',
-            r'class=["\'][^"\']*address[^"\']*["\'][^>]*>([^<]+)</',
-        ]
-        
-        for pattern in address_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            if matches:
-                contact_info["adresse"] = matches[0].strip()
+        for pattern in ADDRESS_PATTERNS:
+            match = pattern.search(html_content)
+            if match:
+                contact_info["adresse"] = match.group(1).strip()
                 break
         
         logger.info(f"📧 [FALLBACK] {len(contact_info['emails'])} emails trouvés")
@@ -706,21 +608,18 @@ class AIAnalysisService:
         try:
             logger.info(f"🤖 [AI] Analyse capture {platform}: {screenshot_path}")
             
-            # Vérifier que le fichier existe
-            if not os.path.exists(screenshot_path):
+            # Capture recadrée sur l'en-tête, réduite et réencodée (base64)
+            image = prepare_screenshot(screenshot_path, platform)
+            if image is None:
                 logger.error(f"❌ [AI] Fichier capture introuvable: {screenshot_path}")
                 return self._get_social_media_fallback(platform)
             
-            # Lire l'image et la convertir en base64
-            import base64
-            with open(screenshot_path, "rb") as image_file:
-                encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
-            
             # Créer le prompt pour l'analyse de capture d'écran
             prompt = SCREENSHOT_ANALYSIS_PROMPT.format(platform=platform)
             
             # Appeler l'API OpenAI Vision pour analyser la capture d'écran
-            response = self._call_openai_vision_api(prompt, encoded_image)
+            response = self._call_openai_vision_api(prompt, image['encoded'], f"vision_{platform}",
+                                                    image['mime'], image['detail'])
             
             if response:
                 logger.info(f"✅ [AI] Analyse capture {platform} réussie")
@@ -842,82 +741,18 @@ class AIAnalysisService:
             logger.error(f"❌ [AI] Erreur scoring lead: {str(e)}")
             return {"error": str(e), "score": 0.0, "status": "error"}
 
-    def _split_html_into_chunks(self, html_content: str) -> List[str]:
-        """
-        Divise le HTML en sections intelligentes
-        """
-        chunks = []
-        
-        # 1. Header (premiers 10000 caractères)
-        header_size = min(10000, len(html_content))
-        chunks.append(html_content[:header_size])
-        
-        # 2. Chercher les sections importantes
-        important_sections = []
-        
-        # Footer (derniers 10000 caractères)
-        footer_size = min(10000, len(html_content))
-        if len(html_content) > footer_size:
-            chunks.append(html_content[-footer_size:])
-        
-        # Sections avec réseaux sociaux
-        social_keywords = ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']
-        for keyword in social_keywords:
-            start = html_content.lower().find(keyword)
-            if start != -1:
-                chunk_start = max(0, start - 5000)
-                chunk_end = min(len(html_content), start + 5000)
-                section = html_content[chunk_start:chunk_end]
-                chunks.append(section)
-        
-        # Sections contact
-        contact_keywords = ['contact', 'footer', 'adresse', 'téléphone', 'email']
-        for keyword in contact_keywords:
-            start = html_content.lower().find(keyword)
-            if start != -1:
-                chunk_start = max(0, start - 5000)
-                chunk_end = min(len(html_content), start + 5000)
-                section = html_content[chunk_start:chunk_end]
-                chunks.append(section)
-        
-        # 3. Diviser le reste en chunks de 15000 caractères
-        remaining_html = html_content
-        for chunk in chunks:
-            # Retirer les sections déjà traitées du HTML restant
-            remaining_html = remaining_html.replace(chunk, "")
-        
-        # Diviser le HTML restant
-        chunk_size = 15000
-        for i in range(0, len(remaining_html), chunk_size):
-            chunk = remaining_html[i:i + chunk_size]
-            if len(chunk) > 1000:  # Ignorer les chunks trop petits
-                chunks.append(chunk)
-        
-        # Dédupliquer et limiter le nombre de chunks
-        unique_chunks = []
-        seen_chunks = set()
-        
-        for chunk in chunks:
-            chunk_hash = hash(chunk[:1000])  # Hash des 1000 premiers caractères
-            if chunk_hash not in seen_chunks and len(chunk) > 1000:
-                unique_chunks.append(chunk)
-                seen_chunks.add(chunk_hash)
-            
-            # Limiter à 5 chunks maximum pour éviter trop d'appels API
-            if len(unique_chunks) >= 5:
-                break
-        
-        logger.info(f"📦 [CHUNKED] {len(unique_chunks)} sections uniques créées")
-        return unique_chunks
-    
-    def _analyze_html_chunk(self, html_chunk: str, url: str, chunk_name: str) -> Optional[Dict[str, Any]]:
+    def _analyze_html_chunk(self, html_chunk: str, url: str, chunk_name: str,
+                            fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Analyse une section du HTML
         """
         try:
+            if fields:
+                return self._call_openai_api(build_gap_prompt(fields, url, f"[{chunk_name}]\n{html_chunk}"), 'site_web_chunk')
+            
             # Créer un prompt spécifique pour cette section
             prompt = f"""
-Analyse cette section HTML et extrait les informations importantes.
+Analyse cette section de page web (texte mis en forme, liens au format [texte](url)) et extrait les informations importantes.
 
 SECTION: {chunk_name}
 URL: {url}
@@ -949,81 +784,128 @@ RETOURNE UNIQUEMENT UN JSON VALIDE:
   }}
 }}
 
-HTML:
+CONTENU:
 {html_chunk}
 """
             
             # Appeler l'API avec cette section
-            response = self._call_openai_api(prompt)
+            response = self._call_openai_api(prompt, 'site_web_chunk')
             return response
             
         except Exception as e:
             logger.error(f"❌ [CHUNKED] Erreur analyse section {chunk_name}: {str(e)}")
             return None
     
+    def _analyze_chunks_parallel(self, chunks: List[str], url: str, fields: Optional[List[str]],
+                                 targets: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyse les sections en parallèle (CHUNK_ANALYSIS_WORKERS par lead,
+        CHUNK_ANALYSIS_GLOBAL_LIMIT pour le processus). Les réponses sont fusionnées
+        à leur arrivée ; dès que tous les champs cibles ont une valeur fiable, les
+        sections pas encore envoyées sont annulées.
+        
+        Returns:
+            Résultats dans l'ordre des sections (None : échec ou section annulée)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        if not chunks:
+            return results
+        complete = threading.Event()
+        merged = empty_analysis()
+        merge_lock = threading.Lock()
+        
+        def analyze(index: int, chunk: str):
+            # Attente d'un emplacement global, abandonnée si la fusion est déjà complète
+            while not _chunk_slots.acquire(timeout=0.5):
+                if complete.is_set():
+                    return
+            try:
+                if complete.is_set():
+                    return
+                logger.info(f"🔍 [AI CHUNKED] Analyse section {index+1}/{len(chunks)} ({len(chunk)} caractères)")
+                result = self._analyze_html_chunk(chunk, url, f"Section {index+1}", fields)
+            finally:
+                _chunk_slots.release()
+            
+            # Fusion dans le thread de la section : la section suivante voit aussitôt l'arrêt
+            with merge_lock:
+                if result and not complete.is_set():
+                    results[index] = result
+                    self._merge_chunk_into(merged, result)
+                    if self._chunk_targets_complete(merged, targets):
+                        complete.set()
+        
+        executor = ThreadPoolExecutor(max_workers=min(Config.CHUNK_ANALYSIS_WORKERS, len(chunks)), thread_name_prefix='ai-chunk')
+        try:
+            # Contexte copié : les appels des sections restent rattachés au lead (télémétrie)
+            futures = [executor.submit(contextvars.copy_context().run, analyze, index, chunk)
+                       for index, chunk in enumerate(chunks)]
+            for future in as_completed(futures):
+                future.result()
+                if complete.is_set():
+                    skipped = len(chunks) - sum(1 for result in results if result)
+                    logger.info(f"⏹️ [AI CHUNKED] Champs cibles trouvés, {skipped} section(s) non utilisée(s)")
+                    break
+        finally:
+            # Les sections déjà envoyées se terminent en arrière-plan (réponses mises en cache)
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+    
+    @staticmethod
+    def _chunk_targets_complete(merged: Dict[str, Any], targets: List[str]) -> bool:
+        """Tous les champs cibles ont une valeur fiable (email / téléphone valide, texte assez long)"""
+        for field in targets:
+            section, key = TARGET_FIELDS[field]
+            value = (merged.get(section) or {}).get(key)
+            if not value:
+                return False
+            if field == 'emails' and not any(is_valid_email(email) for email in value):
+                return False
+            if field == 'telephones' and not any(is_valid_phone(phone) for phone in value):
+                return False
+            if field not in LIST_FIELDS and len(str(value).strip()) < CONFIDENT_MIN_CHARS.get(field, 1):
+                return False
+        return True
+    
+    def _merge_chunk_into(self, merged_result: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Fusionne le résultat d'une section (en place) : listes cumulées, première valeur trouvée pour le reste
+        """
+        # Fusionner les emails et téléphones
+        contact = result.get('contact') or {}
+        merged_result['contact']['emails'] = list(dict.fromkeys(merged_result['contact']['emails'] + list(contact.get('emails') or [])))
+        merged_result['contact']['telephones'] = list(dict.fromkeys(merged_result['contact']['telephones'] + list(contact.get('telephones') or [])))
+        
+        # Fusionner les réseaux sociaux
+        social = result.get('reseaux_sociaux') or {}
+        for platform, url in social.items():
+            if url and url not in merged_result['reseaux_sociaux'].values():
+                merged_result['reseaux_sociaux'][platform] = url
+        
+        # Prendre la première description/entreprise trouvée
+        entreprise = result.get('entreprise') or {}
+        for key in ('nom', 'description', 'type'):
+            if not merged_result['entreprise'][key]:
+                merged_result['entreprise'][key] = entreprise.get(key, '')
+        
+        if not merged_result['contact']['adresse']:
+            merged_result['contact']['adresse'] = contact.get('adresse', '')
+        
+        # Champs pratiques (prompt ciblé) : première valeur trouvée
+        for key in ('horaires', 'tarifs', 'services'):
+            if not merged_result['pratique'][key]:
+                merged_result['pratique'][key] = (result.get('pratique') or {}).get(key) or merged_result['pratique'][key]
+    
     def _merge_chunk_results(self, chunk_results: List[Dict[str, Any]], url: str) -> Dict[str, Any]:
         """
-        Fusionne les résultats de toutes les sections
+        Fusionne les résultats de toutes les sections (dans l'ordre des sections)
         """
-        merged_result = {
-            "contact": {
-                "emails": [],
-                "telephones": [],
-                "adresse": ""
-            },
-            "entreprise": {
-                "nom": "",
-                "type": "",
-                "description": "",
-                "produits_services": [],
-                "public_cible": ""
-            },
-            "pratique": {
-                "horaires": "",
-                "tarifs": "",
-                "services": []
-            },
-            "reseaux_sociaux": {},
-            "medias": {
-                "images": 0,
-                "videos": 0,
-                "types_images": []
-            }
-        }
-        
-        # Fusionner les contacts
-        all_emails = set()
-        all_phones = set()
-        
+        merged_result = empty_analysis()
         for result in chunk_results:
-            if not result:
-                continue
-                
-            # Fusionner les emails
-            emails = result.get('contact', {}).get('emails', [])
-            all_emails.update(emails)
-            
-            # Fusionner les téléphones
-            phones = result.get('contact', {}).get('telephones', [])
-            all_phones.update(phones)
-            
-            # Fusionner les réseaux sociaux
-            social = result.get('reseaux_sociaux', {})
-            for platform, url in social.items():
-                if url and url not in merged_result['reseaux_sociaux'].values():
-                    merged_result['reseaux_sociaux'][platform] = url
-            
-            # Prendre la première description/entreprise trouvée
-            if not merged_result['entreprise']['nom']:
-                merged_result['entreprise']['nom'] = result.get('entreprise', {}).get('nom', '')
-            
-            if not merged_result['entreprise']['description']:
-                merged_result['entreprise']['description'] = result.get('entreprise', {}).get('description', '')
-        
-        # Mettre à jour les contacts fusionnés
-        merged_result['contact']['emails'] = list(all_emails)
-        merged_result['contact']['telephones'] = list(all_phones)
+            if result:
+                self._merge_chunk_into(merged_result, result)
         
-        logger.info(f"🔗 [CHUNKED] Fusion terminée: {len(merged_result['reseaux_sociaux'])} réseaux sociaux, {len(all_emails)} emails, {len(all_phones)} téléphones")
+        logger.info(f"🔗 [CHUNKED] Fusion terminée: {len(merged_result['reseaux_sociaux'])} réseaux sociaux, "
+                    f"{len(merged_result['contact']['emails'])} emails, {len(merged_result['contact']['telephones'])} téléphones")
         
-        return merged_result
\ No newline at end of file
+        return merged_result
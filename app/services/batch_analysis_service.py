@@ -0,0 +1,402 @@
+"""
+Analyses IA différées par l'API Batch d'OpenAI
+
+Pour les réanalyses de nuit, la latence n'a pas d'importance : les requêtes
+d'analyse de sites et de captures d'écran sont accumulées dans des fichiers
+JSONL (un par modèle, BATCH_MAX_REQUESTS lignes au plus), envoyées en lot,
+suivies jusqu'à leur traitement (24 h au plus, à moitié prix), puis les
+réponses sont reportées sur les leads.
+
+Les corps de requête sont ceux des appels synchrones (AIAnalysisService) :
+une réponse déjà en cache (llm_cache) est appliquée sans passer par un lot, et
+les réponses reçues alimentent le cache. Le suivi de chaque lot est enregistré
+dans BATCH_DIR pour reprendre la collecte après un redémarrage.
+
+OPENAI_API_BASE permet de viser un serveur local qui imite les points d'accès
+batch (scripts/openai_batch_stub.py).
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from app.config import Config
+from app.database.database import db
+from app.database.models import Lead
+from app.services.extraction_gate import build_deterministic_analysis, merge_gap_analysis, missing_target_fields
+from app.utils.llm_cache import get_llm_cache
+from app.utils.llm_telemetry import record_llm_call
+from app.utils.logger import get_logger, LeadLogger
+from app.utils.openai_client import OpenAIClient, get_openai_client
+from app.utils.screenshot_preprocessing import screenshot_dhash
+
+logger = get_logger('batch_analysis')
+
+CHAT_ENDPOINT = '/v1/chat/completions'
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+SOCIAL_PLATFORMS = ('facebook', 'instagram')
+
+def make_custom_id(kind: str, lead_id: int) -> str:
+    """Identifiant d'une requête du lot : étape (site_web, facebook, instagram) et lead"""
+    return f"{kind}-{lead_id}"
+
+def parse_custom_id(custom_id: str):
+    kind, lead_id = custom_id.rsplit('-', 1)
+    return kind, int(lead_id)
+
+class OpenAIBatchClient:
+    """Points d'accès fichiers et lots de l'API OpenAI (client HTTP partagé : pool et reprises)"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, timeout: float = 120):
+        if api_key or base_url:
+            self.http = OpenAIClient(api_key=api_key, base_url=base_url)
+        else:
+            self.http = get_openai_client()
+        self.timeout = (Config.OPENAI_CONNECT_TIMEOUT, timeout)
+
+    def upload(self, path: str) -> str:
+        """Envoyer un fichier JSONL de requêtes (identifiant du fichier)"""
+        # Contenu lu d'avance : renvoyé tel quel en cas de reprise (429)
+        with open(path, 'rb') as f:
+            content = f.read()
+        response = self.http.request('POST', '/files', data={'purpose': 'batch'},
+                                     files={'file': (os.path.basename(path), content, 'application/jsonl')},
+                                     timeout=self.timeout, retry=False)
+        return response.json()['id']
+
+    def create(self, input_file_id: str, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Créer un lot à partir d'un fichier envoyé"""
+        response = self.http.request('POST', '/batches', json={
+            'input_file_id': input_file_id,
+            'endpoint': CHAT_ENDPOINT,
+            'completion_window': Config.BATCH_COMPLETION_WINDOW,
+            'metadata': metadata or {}
+        }, timeout=self.timeout, retry=False)
+        return response.json()
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """État d'un lot"""
+        return self.http.request('GET', f'/batches/{batch_id}', timeout=self.timeout).json()
+
+    def download(self, file_id: str) -> str:
+        """Contenu d'un fichier de résultats (JSONL)"""
+        return self.http.request('GET', f'/files/{file_id}/content', timeout=self.timeout).text
+
+class BatchAnalysisService:
+    """Accumule les analyses IA, les envoie en lots et reporte les réponses sur les leads"""
+
+    def __init__(self, ai_service=None, client: Optional[OpenAIBatchClient] = None, batch_dir: Optional[str] = None):
+        if ai_service is None:
+            from app.services.service_registry import get_ai_analysis_service
+            ai_service = get_ai_analysis_service()
+        self.ai_service = ai_service
+        self.client = client or OpenAIBatchClient()
+        self.batch_dir = batch_dir or Config.BATCH_DIR
+        os.makedirs(self.batch_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}   # custom_id -> {'line', 'model', 'meta'}
+        self.resolved: Dict[str, Dict[str, Any]] = {}   # réponses disponibles sans lot (cache, extraction déterministe)
+        self.stats = {'queued': 0, 'cached': 0, 'deterministic': 0, 'skipped': 0}
+
+    # ----- Accumulation -----
+
+    def _queue(self, custom_id: str, request: Dict[str, Any], meta: Dict[str, Any]):
+        body = request['body']
+        cache_key = self.ai_service._cache_key(body, request['prompt'], request.get('image'))
+        cached = self.ai_service._cached_response(cache_key)
+        with self._lock:
+            if cached is not None:
+                self.resolved[custom_id] = dict(meta, response=cached)
+                self.stats['cached'] += 1
+                return
+            self._pending[custom_id] = {
+                'line': {'custom_id': custom_id, 'method': 'POST', 'url': CHAT_ENDPOINT, 'body': body},
+                'model': body['model'],
+                'meta': dict(meta, cache_key=cache_key)
+            }
+            self.stats['queued'] += 1
+
+    def add_website(self, lead_id: int, html_content: str, url: str, fields: Optional[List[str]] = None,
+                    base: Optional[Dict[str, Any]] = None, site_signals: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Ajouter l'analyse d'un site (analyse standard, HTML réduit)
+
+        Args:
+            fields: Champs demandés (None = analyse complète)
+            base: Analyse déterministe complétée par la réponse (cf. extraction_gate)
+            site_signals: Signaux du site reportés sur le lead avec la réponse
+        """
+        custom_id = make_custom_id('site_web', lead_id)
+        request = self.ai_service.build_website_request(html_content, url, fields)
+        self._queue(custom_id, request, {'lead_id': lead_id, 'kind': 'site_web', 'fields': fields,
+                                         'base': base, 'site_signals': site_signals})
+        return custom_id
+
+    def add_screenshot(self, lead_id: int, screenshot_path: str, platform: str) -> Optional[str]:
+        """Ajouter l'analyse Vision d'une capture (None si la capture est introuvable)"""
+        request = self.ai_service.build_screenshot_request(screenshot_path, platform)
+        if request is None:
+            self.stats['skipped'] += 1
+            return None
+        custom_id = make_custom_id(platform, lead_id)
+        self._queue(custom_id, request, {'lead_id': lead_id, 'kind': platform})
+        return custom_id
+
+    def prepare_lead_website(self, lead: Lead, website_scraper) -> str:
+        """
+        Récupérer le site d'un lead et préparer son analyse : l'extraction
+        déterministe passe d'abord, seuls les champs cibles manquants sont demandés
+
+        Returns:
+            'queued', 'deterministic' (aucun appel nécessaire) ou 'skipped'
+        """
+        fetched = website_scraper.fetch_html(lead.site_web)
+        if fetched['rejected'] or not fetched['html']:
+            self.stats['skipped'] += 1
+            return 'skipped'
+        crawl = website_scraper.collect_site_signals(lead.site_web, fetched['html'])
+        deterministic = build_deterministic_analysis(crawl['signals'], crawl['home'])
+        gaps = missing_target_fields(deterministic) if Config.LLM_GATE_ENABLED else None
+        if gaps == []:
+            with self._lock:
+                self.resolved[make_custom_id('site_web', lead.id)] = {
+                    'lead_id': lead.id, 'kind': 'site_web', 'fields': [], 'base': deterministic,
+                    'site_signals': crawl['signals'], 'response': None
+                }
+                self.stats['deterministic'] += 1
+            return 'deterministic'
+        self.add_website(lead.id, fetched['html'], lead.site_web, gaps,
+                         deterministic if gaps else None, crawl['signals'])
+        return 'queued'
+
+    def prepare_lead_screenshots(self, lead: Lead) -> int:
+        """Préparer l'analyse des captures existantes d'un lead (nombre de requêtes)"""
+        added = 0
+        for platform, path in (('facebook', lead.facebook_screenshot_path), ('instagram', lead.instagram_screenshot_path)):
+            if path and self.add_screenshot(lead.id, path, platform):
+                added += 1
+        return added
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    # ----- Envoi et suivi -----
+
+    def _manifest_path(self, batch_id: str) -> str:
+        return os.path.join(self.batch_dir, f"{batch_id}.json")
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        path = self._manifest_path(manifest['batch_id'])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def submit(self, description: str = '') -> List[Dict[str, Any]]:
+        """
+        Écrire les requêtes accumulées en JSONL et créer les lots
+
+        Returns:
+            Suivi des lots créés ({'batch_id', 'status', 'model', 'input_path', 'requests', ...})
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        by_model: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in pending.values():
+            by_model.setdefault(entry['model'], []).append(entry)
+
+        manifests = []
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        for model, entries in by_model.items():
+            for start in range(0, len(entries), Config.BATCH_MAX_REQUESTS):
+                part = entries[start:start + Config.BATCH_MAX_REQUESTS]
+                input_path = os.path.join(self.batch_dir, f"{stamp}-{model}-{start // Config.BATCH_MAX_REQUESTS}.jsonl")
+                with open(input_path, 'w', encoding='utf-8') as f:
+                    for entry in part:
+                        f.write(json.dumps(entry['line'], ensure_ascii=False) + '\n')
+
+                try:
+                    file_id = self.client.upload(input_path)
+                    batch = self.client.create(file_id, {'description': description or 'reanalyse', 'model': model})
+                except Exception as e:
+                    # Requêtes remises en attente pour un prochain envoi
+                    logger.error(f"❌ [BATCH] Envoi impossible de {input_path}: {str(e)}")
+                    with self._lock:
+                        for entry in part:
+                            self._pending.setdefault(entry['line']['custom_id'], entry)
+                    continue
+
+                manifest = {
+                    'batch_id': batch['id'],
+                    'status': batch.get('status'),
+                    'model': model,
+                    'input_path': input_path,
+                    'input_file_id': file_id,
+                    'created_at': time.time(),
+                    'applied': False,
+                    'requests': {entry['line']['custom_id']: entry['meta'] for entry in part}
+                }
+                self._save_manifest(manifest)
+                manifests.append(manifest)
+                logger.info(f"📦 [BATCH] Lot {batch['id']} créé: {len(part)} requête(s) {model}")
+        return manifests
+
+    def manifests(self, include_applied: bool = False) -> List[Dict[str, Any]]:
+        """Lots enregistrés (non encore appliqués par défaut)"""
+        manifests = []
+        for name in sorted(os.listdir(self.batch_dir)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.batch_dir, name), 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if include_applied or not manifest.get('applied'):
+                manifests.append(manifest)
+        return manifests
+
+    def refresh(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Mettre à jour l'état d'un lot"""
+        batch = self.client.retrieve(manifest['batch_id'])
+        manifest.update(status=batch.get('status'), output_file_id=batch.get('output_file_id'),
+                        error_file_id=batch.get('error_file_id'), request_counts=batch.get('request_counts'))
+        self._save_manifest(manifest)
+        return manifest
+
+    def wait(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Consulter les lots en cours jusqu'à ce qu'ils soient terminés (ou jusqu'au délai)"""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            manifests = [self.refresh(manifest) for manifest in self.manifests()]
+            running = [m for m in manifests if m['status'] not in TERMINAL_STATUSES]
+            if not running or (deadline and time.time() >= deadline):
+                return manifests
+            logger.info(f"⏳ [BATCH] {len(running)} lot(s) en cours, prochaine consultation dans {Config.BATCH_POLL_INTERVAL}s")
+            time.sleep(Config.BATCH_POLL_INTERVAL)
+
+    def collect(self, manifest: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Réponses d'un lot terminé, ajoutées au cache des réponses
+
+        Returns:
+            {custom_id: métadonnées de la requête + 'response' (None en cas d'échec)}
+        """
+        results = {custom_id: dict(meta, response=None) for custom_id, meta in manifest['requests'].items()}
+        cache = get_llm_cache()
+        for file_id in (manifest.get('output_file_id'), manifest.get('error_file_id')):
+            if not file_id:
+                continue
+            for line in self.client.download(file_id).splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                entry = results.get(item.get('custom_id'))
+                if entry is None:
+                    continue
+                response = item.get('response') or {}
+                body = response.get('body') or {}
+                call_type = 'batch_site_web' if entry['kind'] == 'site_web' else f"batch_vision_{entry['kind']}"
+                if response.get('status_code') != 200:
+                    record_llm_call(call_type, manifest['model'], outcome='api_error', lead_id=entry['lead_id'], batch=True,
+                                    error=json.dumps(item.get('error') or body.get('error'), ensure_ascii=False))
+                    continue
+                try:
+                    parsed = self.ai_service.parse_json_content(body['choices'][0]['message']['content'])
+                except (KeyError, IndexError, TypeError):
+                    parsed = None
+                record_llm_call(call_type, manifest['model'], body.get('usage'), outcome='ok' if parsed is not None else 'invalid_json',
+                                lead_id=entry['lead_id'], batch=True)
+                if parsed is None:
+                    continue
+                entry['response'] = parsed
+                if cache and entry.get('cache_key'):
+                    cache.store(entry['cache_key'], manifest['model'], parsed, (body.get('usage') or {}).get('total_tokens', 0))
+        return results
+
+    # ----- Report sur les leads -----
+
+    def apply(self, results: Dict[str, Dict[str, Any]], scraping_service=None) -> Dict[str, int]:
+        """Reporter les réponses sur les leads (compteurs par issue)"""
+        if scraping_service is None:
+            from app.services.service_registry import get_scraping_service
+            scraping_service = get_scraping_service()
+
+        counts = {'applied': 0, 'failed': 0, 'missing_lead': 0}
+        for custom_id, entry in results.items():
+            lead = db.session.get(Lead, entry['lead_id'])
+            if lead is None:
+                counts['missing_lead'] += 1
+                continue
+            lead_logger = LeadLogger(lead.id, lead.nom)
+            try:
+                if entry['kind'] == 'site_web':
+                    applied = self._apply_website(lead, entry, scraping_service, lead_logger)
+                else:
+                    applied = self._apply_screenshot(lead, entry, scraping_service, lead_logger)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                lead_logger.error(f"❌ [BATCH] Report impossible de {custom_id}: {str(e)}")
+                applied = False
+            counts['applied' if applied else 'failed'] += 1
+        return counts
+
+    def _apply_website(self, lead: Lead, entry: Dict[str, Any], scraping_service, lead_logger: LeadLogger) -> bool:
+        analysis = entry['response']
+        if entry.get('base') is not None:
+            analysis = merge_gap_analysis(entry['base'], analysis, entry.get('fields') or []) if entry.get('fields') else entry['base']
+        if not analysis:
+            lead_logger.warning(f"⚠️ [BATCH] Pas de réponse exploitable pour le site de {lead.nom}")
+            return False
+        scraping_service._update_lead_with_ai_analysis(lead, analysis, lead_logger)
+        scraping_service._update_lead_with_site_signals(lead, entry.get('site_signals'), lead_logger)
+        lead.mark_refreshed('site_web')
+        lead.update_log("site_web: réanalysé en lot (API Batch)")
+        return True
+
+    def _apply_screenshot(self, lead: Lead, entry: Dict[str, Any], scraping_service, lead_logger: LeadLogger) -> bool:
+        platform = entry['kind']
+        if not entry['response']:
+            lead.update_ai_log(f"Analyse {platform} en lot sans réponse exploitable")
+            return False
+        result = dict(entry['response'], analysis_success=True)
+        # Empreinte de la capture analysée : les captures suivantes identiques réutilisent cette analyse
+        image_hash = screenshot_dhash(getattr(lead, f"{platform}_screenshot_path") or '', platform)
+        if image_hash:
+            lead.set_vision_fingerprint(platform, image_hash, result)
+        if platform == 'facebook':
+            scraping_service._apply_facebook_analysis(lead, result, lead_logger)
+        else:
+            scraping_service._apply_instagram_analysis(lead, result, lead_logger)
+        lead.update_ai_log(f"Analyse {platform} en lot (API Batch) réussie")
+        return True
+
+    def collect_and_apply(self, scraping_service=None) -> Dict[str, Any]:
+        """
+        Reporter les réponses disponibles : lots terminés non encore appliqués et
+        réponses obtenues sans lot (cache, extraction déterministe)
+        """
+        summary = {'batches': 0, 'applied': 0, 'failed': 0, 'missing_lead': 0, 'running': 0}
+        with self._lock:
+            resolved, self.resolved = self.resolved, {}
+        if resolved:
+            for key, value in self.apply(resolved, scraping_service).items():
+                summary[key] += value
+
+        for manifest in self.manifests():
+            if manifest.get('status') not in TERMINAL_STATUSES:
+                manifest = self.refresh(manifest)
+            if manifest['status'] not in TERMINAL_STATUSES:
+                summary['running'] += 1
+                continue
+            for key, value in self.apply(self.collect(manifest), scraping_service).items():
+                summary[key] += value
+            manifest['applied'] = True
+            self._save_manifest(manifest)
+            summary['batches'] += 1
+            logger.info(f"✅ [BATCH] Lot {manifest['batch_id']} ({manifest['status']}) reporté sur les leads")
+        return summary
@@ -0,0 +1,350 @@
+"""
+Estimation à blanc du coût et de la durée d'un scraping
+
+Aucun appel payant n'est effectué : l'estimation s'appuie sur l'historique de
+couverture en base, les taux observés par le pipeline (filtrage, doublons),
+les taux de réussite des caches (réponses OpenAI, pages inchangées, analyses
+Vision réutilisées) et les latences mesurées par étape. Les valeurs par défaut
+ne servent que tant qu'aucune mesure n'est disponible.
+
+Les leads sont déroulés un par un comme dans le scraping : au-delà des seuils
+de SCRAPING_DEGRADATION_THRESHOLDS, les étapes abandonnées par RunBudget ne
+sont plus comptées (ni coût, ni durée) et sont reportées à un enrichissement.
+"""
+
+import math
+from typing import Dict, Any, Optional, List
+from app.config import Config
+from app.database.models import Lead
+from app.prompts import SCREENSHOT_ANALYSIS_PROMPT
+from app.scrapers.google_maps_v2_continuous import GoogleMapsScraperV2Continuous
+from app.scrapers.page_text import analysis_mode_for
+from app.services.extraction_gate import DEFAULT_TEXT_TOKENS, WEBSITE_OUTPUT_TOKENS, estimate_llm_usage
+from app.utils.html_cache import get_html_cache
+from app.utils.llm_cache import get_llm_cache
+from app.utils.pipeline_metrics import get_average, get_samples
+from app.utils.screenshot_preprocessing import vision_image_tokens
+from app.utils.token_counter import count_tokens
+from app.utils.validators import is_social_media_url
+from app.utils.logger import SystemLogger
+
+# Valeurs utilisées en l'absence de mesures
+DEFAULTS = {
+    'places.results_per_page': 20,
+    'places.filter_pass_rate': 0.5,
+    'places.unique_rate': 0.7,
+    'site_web.text_tokens': DEFAULT_TEXT_TOKENS,
+    'vision.image_tokens': vision_image_tokens(Config.VISION_MAX_WIDTH, Config.VISION_MAX_HEIGHT, Config.VISION_DETAIL),
+    'latency.google_maps_per_lead': 1.5,
+    'latency.site_web_fetch': 8.0,      # site hors IA : récupération, rendu, exploration
+    'latency.llm.site_web': 10.0,       # par appel OpenAI non servi par le cache
+    'latency.social_capture': 30.0,     # lecture des compteurs et captures d'un lead
+    'latency.llm.vision': 12.0,
+    'website_rate': 0.7,
+    'facebook_rate': 0.5,
+    'instagram_rate': 0.4
+}
+
+PAGES_PER_SEARCH = 3            # Google Places renvoie au plus 3 pages de 20 résultats
+PAGE_TOKEN_DELAY = 2            # secondes entre deux pages (cf. _search_with_strategy)
+SEARCH_DELAY = 3                # secondes entre deux recherches (cf. search_continuous_until_target)
+MAX_SEARCHES = 10
+GEOCODING_CALLS = 3             # test à l'initialisation + pipeline + recherche continue
+
+VISION_OUTPUT_TOKENS = 500
+
+class ScrapingCostEstimator:
+    """Estimation du coût et de la durée d'un scraping sans appel payant"""
+
+    def __init__(self):
+        self.basis: Dict[str, str] = {}
+
+    def _metric(self, name: str) -> float:
+        """Valeur mesurée d'une métrique, sinon valeur par défaut"""
+        value = get_average(name)
+        if value is None:
+            self.basis[name] = 'défaut'
+            return DEFAULTS[name]
+        self.basis[name] = 'mesuré'
+        return value
+
+    def _coverage_rates(self, business_type: str) -> Dict[str, float]:
+        """Part des leads existants avec site web, Facebook et Instagram (historique en base)"""
+        query = Lead.query
+        if business_type:
+            typed = query.filter(Lead.business_type == business_type)
+            if typed.count() > 0:
+                query = typed
+
+        leads = query.with_entities(Lead.site_web, Lead.facebook_url, Lead.instagram_url).limit(2000).all()
+        if not leads:
+            for name in ('website_rate', 'facebook_rate', 'instagram_rate'):
+                self.basis[name] = 'défaut'
+            return {name: DEFAULTS[name] for name in ('website_rate', 'facebook_rate', 'instagram_rate')}
+
+        total = len(leads)
+        websites = sum(1 for lead in leads if lead.site_web and not is_social_media_url(lead.site_web)[0])
+        facebook = sum(1 for lead in leads if lead.facebook_url)
+        instagram = sum(1 for lead in leads if lead.instagram_url)
+        for name in ('website_rate', 'facebook_rate', 'instagram_rate'):
+            self.basis[name] = f'historique ({total} leads)'
+        return {
+            'website_rate': websites / total,
+            'facebook_rate': facebook / total,
+            'instagram_rate': instagram / total
+        }
+
+    def _llm_cost(self, model: str, input_tokens: float, output_tokens: float) -> float:
+        """Coût OpenAI en USD"""
+        price_in, price_out = Config.OPENAI_PRICING.get(model, (0.0, 0.0))
+        return input_tokens / 1000 * price_in + output_tokens / 1000 * price_out
+
+    def _cache_rates(self) -> Dict[str, float]:
+        """
+        Taux de réussite mesurés des caches (0 tant qu'aucune mesure n'est disponible)
+
+        Returns:
+            {'llm_hit_rate', 'html_unchanged_rate', 'vision_reuse_rate'}
+        """
+        llm_cache = get_llm_cache()
+        measured = {
+            'llm_hit_rate': llm_cache.summary()['hit_rate'] if llm_cache else None,
+            'html_unchanged_rate': get_html_cache().summary()['unchanged_rate'] if Config.HTML_CACHE_ENABLED else None,
+            'vision_reuse_rate': get_average('vision.reused') if Config.VISION_CHANGE_DETECTION_ENABLED else None
+        }
+        rates = {}
+        for name, value in measured.items():
+            self.basis[name] = 'mesuré' if value is not None else 'défaut'
+            rates[name] = value or 0.0
+        return rates
+
+    def _text_sizes(self) -> List[float]:
+        """Tailles de texte des sites analysés (tokens)"""
+        sizes: List[float] = get_samples('site_web.text_tokens')
+        if sizes:
+            self.basis['site_web.text_tokens'] = 'mesuré'
+            return sizes
+        self.basis['site_web.text_tokens'] = 'défaut'
+        return [DEFAULTS['site_web.text_tokens']]
+
+    def _website_llm_profile(self, sizes: List[float], allow_full_html: bool = True) -> Dict[str, Dict[str, float]]:
+        """
+        Répartition des analyses de site par modèle, pondérée par les tailles de texte observées (tokens)
+
+        Returns:
+            {modèle: {'calls', 'input_tokens', 'output_tokens'}} pour un site envoyé à l'analyse
+            (caches non déduits)
+        """
+        # Part des sites encore envoyés à OpenAI après l'extraction déterministe (cf. extraction_gate)
+        llm_rate = get_average('llm_gate.llm_called')
+        self.basis['llm_gate.llm_called'] = 'mesuré' if llm_rate is not None else 'défaut'
+        llm_rate = 1.0 if llm_rate is None else llm_rate
+
+        profile: Dict[str, Dict[str, float]] = {}
+        for size in sizes:
+            usage = estimate_llm_usage(int(size), allow_full_html=allow_full_html)
+            entry = profile.setdefault(usage['model'], {'calls': 0.0, 'input_tokens': 0.0, 'output_tokens': 0.0})
+            entry['calls'] += llm_rate * usage['calls'] / len(sizes)
+            entry['input_tokens'] += llm_rate * usage['input_tokens'] / len(sizes)
+            entry['output_tokens'] += llm_rate * usage['calls'] * WEBSITE_OUTPUT_TOKENS / len(sizes)
+        return profile
+
+    @staticmethod
+    def _add_usage(by_model: Dict[str, Dict[str, float]], model: str, usage: Dict[str, float], factor: float):
+        entry = by_model.setdefault(model, {'calls': 0.0, 'input_tokens': 0.0, 'output_tokens': 0.0})
+        for key in ('calls', 'input_tokens', 'output_tokens'):
+            entry[key] += usage[key] * factor
+
+    def estimate_scraping_smart(self, location: str, business_type: Optional[str] = "",
+                                max_results: int = 20, min_rating: float = 4.0,
+                                min_reviews: int = 10, radius: int = 5000,
+                                anti_hotels: bool = False, wide_search: bool = False) -> Dict[str, Any]:
+        """
+        Estimer un appel à ScrapingService.start_scraping_smart avec les mêmes paramètres
+
+        Returns:
+            Appels Places, tokens et appels LLM, captures navigateur, coût (USD), durée (minutes),
+            demande ramenée à MAX_LEADS_PER_REQUEST (leads.clamped) et étapes reportées
+            par le budget de temps (time_budget)
+        """
+        self.basis = {}
+        business_type = business_type or "bar"
+        requested = max_results
+        max_results = min(max_results, Config.MAX_LEADS_PER_REQUEST)
+        if requested > max_results:
+            SystemLogger.warning(f"⚠️ [ESTIMATION] Max résultats {requested} ramené à {max_results} (MAX_LEADS_PER_REQUEST)")
+        SystemLogger.info(f"🧮 [ESTIMATION] {location} - {business_type}, {max_results} leads, recherche {'large' if wide_search else 'précise'}")
+
+        # --- Recherche Google Places ---
+        results_per_page = self._metric('places.results_per_page')
+        pass_rate = self._metric('places.filter_pass_rate')
+        unique_rate = self._metric('places.unique_rate')
+
+        if wide_search:
+            strategies_count = 2
+        else:
+            strategies_count = len(GoogleMapsScraperV2Continuous._get_search_strategies(business_type, radius))
+
+        candidates_per_search = results_per_page * PAGES_PER_SEARCH * pass_rate
+        unique_per_search = candidates_per_search * unique_rate
+
+        # Au-delà des stratégies disponibles, la recherche rejoue la première (que des doublons)
+        productive_searches = min(strategies_count, MAX_SEARCHES)
+        reachable = productive_searches * unique_per_search
+        if unique_per_search > 0 and reachable >= max_results:
+            searches = math.ceil(max_results / unique_per_search)
+        else:
+            searches = MAX_SEARCHES
+        expected_leads = int(min(max_results, reachable))
+
+        nearby_calls = searches * PAGES_PER_SEARCH
+        details_calls = int(round(searches * candidates_per_search))
+        places_cost = (GEOCODING_CALLS * Config.PLACES_GEOCODING_COST +
+                       nearby_calls * Config.PLACES_NEARBY_SEARCH_COST +
+                       details_calls * Config.PLACES_DETAILS_COST)
+
+        search_seconds = searches * ((PAGES_PER_SEARCH - 1) * PAGE_TOKEN_DELAY + SEARCH_DELAY)
+        search_seconds += expected_leads * self._metric('latency.google_maps_per_lead')
+
+        # --- Taux par lead : couverture, caches, compteurs lus dans la page ---
+        rates = self._coverage_rates(business_type)
+        caches = self._cache_rates()
+        website_rate = rates['website_rate']
+        social_rate = min(1.0, rates['facebook_rate'] + rates['instagram_rate'])
+
+        # Sites réellement envoyés à OpenAI : page modifiée et réponse absente du cache
+        website_call_share = (1.0 - caches['html_unchanged_rate']) * (1.0 - caches['llm_hit_rate'])
+        sizes = self._text_sizes()
+        profiles = {allow: self._website_llm_profile(sizes, allow) for allow in (True, False)}
+        large_share = sum(1 for size in sizes if analysis_mode_for(int(size)) != 'standard') / len(sizes)
+
+        # Profils encore capturés après la lecture des compteurs dans la page, puis analyses Vision payantes
+        captures_per_lead = 0.0
+        for platform in ('facebook', 'instagram'):
+            dom_rate = get_average(f'social.dom_hit.{platform}')
+            self.basis[f'social.dom_hit.{platform}'] = 'mesuré' if dom_rate is not None else 'défaut'
+            captures_per_lead += rates[f'{platform}_rate'] * (1.0 - (dom_rate or 0.0))
+        vision_calls_per_capture = (1.0 - caches['vision_reuse_rate']) * (1.0 - caches['llm_hit_rate'])
+        vision_usage = {
+            'calls': 1.0,
+            'input_tokens': self._metric('vision.image_tokens') + count_tokens(SCREENSHOT_ANALYSIS_PROMPT),
+            'output_tokens': VISION_OUTPUT_TOKENS
+        }
+
+        fetch_seconds = self._metric('latency.site_web_fetch')
+        llm_site_seconds = self._metric('latency.llm.site_web')
+        capture_seconds = self._metric('latency.social_capture')
+        vision_seconds = self._metric('latency.llm.vision')
+
+        # --- Déroulé des leads avec le budget de temps (cf. RunBudget.allows) ---
+        thresholds = Config.SCRAPING_DEGRADATION_THRESHOLDS
+        max_seconds = Config.MAX_SCRAPING_TIME
+        elapsed = search_seconds
+        dropped_at: Dict[str, float] = {}
+        deferred = {stage: 0.0 for stage in ('full_html', 'website_ai', 'screenshots', 'vision')}
+        by_model: Dict[str, Dict[str, float]] = {}
+        social_profiles = vision_captures = 0.0
+
+        for index in range(expected_leads):
+            ratio = elapsed / max_seconds if max_seconds else 1.0
+            allowed = {stage: ratio < threshold for stage, threshold in thresholds.items()}
+            for stage, ok in allowed.items():
+                if not ok:
+                    dropped_at.setdefault(stage, elapsed)
+
+            # Site web : récupération et analyse HTML toujours faites, IA selon le budget
+            lead_seconds = website_rate * fetch_seconds
+            if allowed.get('website_ai', True):
+                allow_full_html = allowed.get('full_html', True)
+                if not allow_full_html:
+                    deferred['full_html'] += website_rate * large_share
+                factor = website_rate * website_call_share
+                for model, usage in profiles[allow_full_html].items():
+                    self._add_usage(by_model, model, usage, factor)
+                    lead_seconds += usage['calls'] * factor * llm_site_seconds
+            else:
+                deferred['website_ai'] += website_rate
+
+            # Réseaux sociaux : captures puis Vision selon le budget
+            if allowed.get('screenshots', True):
+                social_profiles += rates['facebook_rate'] + rates['instagram_rate']
+                vision_captures += captures_per_lead
+                lead_seconds += social_rate * capture_seconds
+                if allowed.get('vision', True):
+                    factor = captures_per_lead * vision_calls_per_capture
+                    self._add_usage(by_model, 'gpt-4o', vision_usage, factor)
+                    lead_seconds += factor * vision_seconds
+                else:
+                    deferred['vision'] += captures_per_lead
+            else:
+                deferred['screenshots'] += social_rate
+
+            if index < expected_leads - 1:
+                lead_seconds += Config.DELAY_BETWEEN_REQUESTS
+            elapsed += lead_seconds
+
+        llm_cost = 0.0
+        for model, entry in by_model.items():
+            entry['cost_usd'] = round(self._llm_cost(model, entry['input_tokens'], entry['output_tokens']), 4)
+            llm_cost += entry['cost_usd']
+            for key in ('calls', 'input_tokens', 'output_tokens'):
+                entry[key] = int(round(entry[key]))
+
+        dropped_stages = [{'stage': stage, 'after_minutes': round(dropped_at[stage] / 60, 1)}
+                          for stage in sorted(thresholds, key=thresholds.get) if stage in dropped_at]
+
+        estimate = {
+            'parameters': {
+                'location': location,
+                'business_type': business_type,
+                'max_results': requested,
+                'min_rating': min_rating,
+                'min_reviews': min_reviews,
+                'radius': radius,
+                'anti_hotels': anti_hotels,
+                'wide_search': wide_search
+            },
+            'leads': {
+                'requested': requested,
+                'target': max_results,
+                'clamped': requested > max_results,
+                'max_per_request': Config.MAX_LEADS_PER_REQUEST,
+                'expected': expected_leads,
+                'target_reachable': expected_leads >= max_results,
+                'with_website': int(round(expected_leads * website_rate)),
+                'with_social': int(round(expected_leads * social_rate))
+            },
+            'places': {
+                'searches': searches,
+                'geocoding_calls': GEOCODING_CALLS,
+                'nearby_search_calls': nearby_calls,
+                'details_calls': details_calls,
+                'cost_usd': round(places_cost, 4)
+            },
+            'llm': {
+                'calls': sum(entry['calls'] for entry in by_model.values()),
+                'input_tokens': sum(entry['input_tokens'] for entry in by_model.values()),
+                'output_tokens': sum(entry['output_tokens'] for entry in by_model.values()),
+                'cost_usd': round(llm_cost, 4),
+                'by_model': by_model
+            },
+            'caches': dict(caches, website_call_share=round(website_call_share, 3),
+                           vision_call_share=round(vision_calls_per_capture, 3)),
+            'browser': {
+                'profiles': int(round(social_profiles)),
+                'captures': int(round(vision_captures))
+            },
+            'total_cost_usd': round(places_cost + llm_cost, 4),
+            'duration_minutes': round(elapsed / 60, 1),
+            'exceeds_time_budget': elapsed > max_seconds,
+            'time_budget': {
+                'max_seconds': max_seconds,
+                'dropped_stages': dropped_stages,
+                'deferred_leads': {stage: int(round(count)) for stage, count in deferred.items() if count}
+            },
+            'basis': self.basis
+        }
+
+        SystemLogger.info(f"🧮 [ESTIMATION] ~{expected_leads} leads, ~${estimate['total_cost_usd']:.2f}, ~{estimate['duration_minutes']} min"
+                          f"{', étapes reportées: ' + ', '.join(stage['stage'] for stage in dropped_stages) if dropped_stages else ''}")
+        return estimate
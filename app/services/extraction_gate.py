@@ -0,0 +1,179 @@
+"""
+Extraction déterministe avant l'analyse IA d'un site web
+
+Les signaux extraits sans IA (html_signals + pages contact / mentions légales)
+sont mis au format de l'analyse IA. OpenAI n'est appelé que pour les champs
+cibles (LLM_GATE_TARGET_FIELDS) encore manquants, avec un prompt restreint à
+ces champs. Les appels et tokens évités sont estimés pour chaque site.
+"""
+
+import json
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.config import Config
+from app.prompts import WEBSITE_ANALYSIS_PROMPT, WEBSITE_GAP_ANALYSIS_PROMPT, WEBSITE_GAP_FIELD_INSTRUCTIONS
+from app.scrapers.page_text import MAX_CHUNKS, analysis_mode_for
+from app.utils.pattern_matcher import classify_social_url
+from app.utils.pipeline_metrics import get_average
+from app.utils.token_counter import count_tokens
+from app.utils.validators import is_valid_email
+
+# Champ cible → (section, clé) dans le résultat de l'analyse IA
+TARGET_FIELDS: Dict[str, Tuple[str, str]] = {
+    'emails': ('contact', 'emails'),
+    'telephones': ('contact', 'telephones'),
+    'adresse': ('contact', 'adresse'),
+    'nom': ('entreprise', 'nom'),
+    'type': ('entreprise', 'type'),
+    'description': ('entreprise', 'description'),
+    'horaires': ('pratique', 'horaires'),
+    'tarifs': ('pratique', 'tarifs'),
+    'services': ('pratique', 'services'),
+    'facebook': ('reseaux_sociaux', 'facebook'),
+    'instagram': ('reseaux_sociaux', 'instagram'),
+}
+
+LIST_FIELDS = {'emails', 'telephones', 'services'}
+
+# Noms de fichiers pris pour des emails dans src / srcset (logo@2x.png)
+ASSET_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.svg', '.gif')
+
+CHUNK_PROMPT_TOKENS = 250     # consignes du prompt d'une section (cf. _analyze_html_chunk)
+WEBSITE_OUTPUT_TOKENS = 800  # réponse moyenne d'une analyse de site
+DEFAULT_TEXT_TOKENS = 2000   # texte d'une page d'accueil tant qu'aucune mesure n'est disponible
+
+def empty_analysis() -> Dict[str, Any]:
+    """Résultat d'analyse vide (même structure que l'analyse IA)"""
+    return {
+        "contact": {"emails": [], "telephones": [], "adresse": ""},
+        "entreprise": {"nom": "", "type": "", "description": "", "produits_services": [], "public_cible": ""},
+        "pratique": {"horaires": "", "tarifs": "", "services": []},
+        "reseaux_sociaux": {},
+        "medias": {"images": 0, "videos": 0, "types_images": []}
+    }
+
+def clean_emails(emails: Optional[List[str]]) -> List[str]:
+    """Emails valides, sans les noms d'images capturés par l'expression régulière"""
+    return [email for email in emails or []
+            if is_valid_email(email) and not email.lower().endswith(ASSET_EXTENSIONS)]
+
+def build_deterministic_analysis(signals: Dict[str, Any], home_signals: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mettre les signaux déterministes au format de l'analyse IA
+
+    Args:
+        signals: Signaux fusionnés du site (accueil + pages explorées)
+        home_signals: Signaux de la page d'accueil (titre, description, médias)
+    """
+    analysis = empty_analysis()
+    analysis['contact']['emails'] = clean_emails(signals.get('emails'))
+    analysis['contact']['telephones'] = list(signals.get('phones') or [])
+    analysis['contact']['adresse'] = signals.get('address') or ''
+    analysis['entreprise']['nom'] = home_signals.get('title') or ''
+    analysis['entreprise']['description'] = home_signals.get('description') or ''
+    analysis['pratique']['horaires'] = signals.get('opening_hours') or ''
+
+    # Une URL de profil par plateforme, validée par le domaine
+    for platform, urls in (signals.get('social_media') or {}).items():
+        url = next((url for url in urls if classify_social_url(url) == platform), None)
+        if url:
+            analysis['reseaux_sociaux'][platform] = url
+
+    analysis['medias']['images'] = home_signals.get('images_count', 0)
+    analysis['medias']['videos'] = home_signals.get('videos_count', 0)
+    analysis['source'] = 'deterministe'
+    return analysis
+
+def missing_target_fields(analysis: Dict[str, Any], targets: Optional[List[str]] = None) -> List[str]:
+    """Champs cibles vides dans une analyse"""
+    targets = Config.LLM_GATE_TARGET_FIELDS if targets is None else targets
+    return [field for field in targets
+            if not analysis.get(TARGET_FIELDS[field][0], {}).get(TARGET_FIELDS[field][1])]
+
+def merge_gap_analysis(analysis: Dict[str, Any], ai_result: Optional[Dict[str, Any]], fields: List[str]) -> Dict[str, Any]:
+    """Compléter l'analyse déterministe (en place) avec les champs demandés à l'IA"""
+    analysis['source'] = 'deterministe+ia'
+    analysis['champs_ia'] = list(fields)
+    if not ai_result:
+        return analysis
+    if ai_result.get('error'):
+        analysis['error'] = ai_result['error']
+
+    for field in fields:
+        section, key = TARGET_FIELDS[field]
+        value = (ai_result.get(section) or {}).get(key)
+        if not value:
+            continue
+        if field in LIST_FIELDS:
+            analysis[section][key] = list(dict.fromkeys(analysis[section][key] + list(value)))
+        else:
+            analysis[section][key] = value
+    return analysis
+
+def gap_schema(fields: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Structure JSON attendue pour les seuls champs demandés"""
+    schema: Dict[str, Dict[str, Any]] = {}
+    for field in fields:
+        section, key = TARGET_FIELDS[field]
+        schema.setdefault(section, {})[key] = [] if field in LIST_FIELDS else ""
+    return schema
+
+def build_gap_prompt(fields: List[str], url: str, page_content: str) -> str:
+    """Prompt d'analyse restreint aux champs manquants"""
+    instructions = '\n'.join(f"- {WEBSITE_GAP_FIELD_INSTRUCTIONS[field]}" for field in fields)
+    schema = json.dumps(gap_schema(fields), ensure_ascii=False, indent=2)
+    return WEBSITE_GAP_ANALYSIS_PROMPT.format(instructions=instructions, schema=schema, url=url, page_content=page_content)
+
+def estimate_llm_usage(text_tokens: int, fields: Optional[List[str]] = None, allow_full_html: bool = True) -> Dict[str, Any]:
+    """
+    Estimer les appels et tokens d'une analyse IA de site (cf. page_text.analysis_mode_for)
+
+    Args:
+        text_tokens: Tokens du texte de la page d'accueil
+        fields: Champs demandés (None = analyse complète)
+        allow_full_html: Analyse complète / par sections autorisée
+
+    Returns:
+        {'mode', 'model', 'calls', 'input_tokens', 'tokens'} ; tokens inclut la réponse estimée
+    """
+    if fields is None:
+        overhead, chunk_overhead, output_ratio = count_tokens(WEBSITE_ANALYSIS_PROMPT), CHUNK_PROMPT_TOKENS, 1.0
+    else:
+        overhead = chunk_overhead = count_tokens(build_gap_prompt(fields, '', ''))
+        output_ratio = min(1.0, len(fields) / len(TARGET_FIELDS))
+
+    mode = analysis_mode_for(text_tokens, allow_full_html)
+    model = 'gpt-3.5-turbo'
+    if mode == 'chunked':
+        calls = min(MAX_CHUNKS, math.ceil(text_tokens / Config.LLM_CHUNK_TOKENS))
+        input_tokens = min(text_tokens, calls * Config.LLM_CHUNK_TOKENS) + calls * chunk_overhead
+    elif mode == 'full_html':
+        model = Config.OPENAI_FULL_MODEL
+        calls, input_tokens = 1, text_tokens + overhead
+    else:
+        calls, input_tokens = 1, min(text_tokens, Config.LLM_STANDARD_MAX_TOKENS) + overhead
+
+    return {'mode': mode, 'model': model, 'calls': calls, 'input_tokens': input_tokens,
+            'tokens': input_tokens + calls * WEBSITE_OUTPUT_TOKENS * output_ratio}
+
+def gate_savings(text_tokens: Optional[int], fields: List[str], allow_full_html: bool = True) -> Dict[str, Any]:
+    """
+    Appels et tokens évités par rapport à une analyse IA complète
+
+    Args:
+        text_tokens: Tokens du texte de la page (None = non mesuré, taille moyenne des pages analysées)
+        fields: Champs demandés à l'IA ([] = aucun appel)
+    """
+    if text_tokens is None:
+        text_tokens = int(get_average('site_web.text_tokens', DEFAULT_TEXT_TOKENS))
+    full = estimate_llm_usage(text_tokens, None, allow_full_html)
+    if not fields:
+        return {'llm_called': False, 'ai_fields': [], 'calls_saved': full['calls'], 'tokens_saved': int(full['tokens'])}
+    narrowed = estimate_llm_usage(text_tokens, fields, allow_full_html)
+    return {
+        'llm_called': True,
+        'ai_fields': list(fields),
+        'calls_saved': full['calls'] - narrowed['calls'],
+        'tokens_saved': int(max(0.0, full['tokens'] - narrowed['tokens']))
+    }
@@ -0,0 +1,307 @@
+"""
+Planificateur de rafraîchissement en arrière-plan des leads existants
+
+Sélectionne les leads dont les données sont les plus anciennes par rapport à leur
+score (ou dont l'enrichissement a été reporté par le budget de temps d'un scraping),
+et ne relance que les étapes périmées (Google Maps, site web, réseaux sociaux)
+sous un budget journalier d'appels API et de captures navigateur, réparti à rythme
+constant sur la journée.
+"""
+
+import threading
+from datetime import datetime, timedelta, date
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import or_
+from app.config import Config
+from app.database.database import db
+from app.database.models import Lead
+from app.utils.logger import SystemLogger
+from app.utils.validators import is_social_media_url
+
+# Colonne de fraîcheur associée à chaque étape
+STAGE_FIELDS = {
+    'google_maps': 'google_maps_refreshed_at',
+    'site_web': 'site_web_refreshed_at',
+    'social': 'social_refreshed_at'
+}
+
+# Intervalle entre deux rafraîchissements (secondes)
+MIN_TICK_INTERVAL = 30
+MAX_TICK_INTERVAL = 3600
+
+# Obsolescence attribuée à une étape reportée par le budget de temps d'un scraping
+PENDING_STALENESS = 2.0
+
+# Leads chargés au plus par sélection (les plus périmés)
+PREFILTER_LIMIT = 500
+
+class RefreshScheduler:
+    """Planificateur de rafraîchissement des leads sous budget journalier"""
+
+    def __init__(self, app=None, api_budget: Optional[int] = None, browser_budget: Optional[int] = None,
+                 max_age_days: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.api_budget = api_budget if api_budget is not None else Config.REFRESH_DAILY_API_BUDGET
+        self.browser_budget = browser_budget if browser_budget is not None else Config.REFRESH_DAILY_BROWSER_BUDGET
+        self.max_age_days = max_age_days or Config.REFRESH_MAX_AGE_DAYS
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Consommation du jour
+        self._day = date.today()
+        self._api_used = 0
+        self._browser_used = 0
+
+        self._history: List[Dict[str, Any]] = []
+        self._next_tick_at: Optional[datetime] = None
+
+    # ----- Budget -----
+
+    def _reset_budget_if_new_day(self):
+        """Remettre les compteurs à zéro au changement de jour"""
+        today = date.today()
+        if today != self._day:
+            SystemLogger.info(f"🔄 [REFRESH] Nouveau jour, budget remis à zéro (hier: {self._api_used} API, {self._browser_used} captures)")
+            self._day = today
+            self._api_used = 0
+            self._browser_used = 0
+
+    def remaining_budget(self) -> Dict[str, int]:
+        """Budget restant pour la journée"""
+        self._reset_budget_if_new_day()
+        return {
+            'api': max(0, self.api_budget - self._api_used),
+            'browser': max(0, self.browser_budget - self._browser_used)
+        }
+
+    def _stage_cost(self, lead: Lead, stage: str) -> Dict[str, int]:
+        """Coût d'une étape en appels API et captures navigateur"""
+        if stage == 'social':
+            # Une capture + un appel Vision par réseau social
+            networks = int(bool(lead.facebook_url)) + int(bool(lead.instagram_url))
+            return {'api': networks, 'browser': networks}
+        # Place Details ou analyse OpenAI du site
+        return {'api': 1, 'browser': 0}
+
+    # ----- Sélection -----
+
+    def _stage_applicable(self, lead: Lead, stage: str) -> bool:
+        """Vérifier que l'étape a un sens pour ce lead"""
+        if stage == 'google_maps':
+            return bool(lead.place_id)
+        if stage == 'site_web':
+            if not lead.site_web or lead.site_web_statut == 'non_html':
+                return False
+            is_social, _ = is_social_media_url(lead.site_web)
+            return not is_social
+        if stage == 'social':
+            return bool(lead.facebook_url or lead.instagram_url)
+        return False
+
+    def staleness(self, lead: Lead, stage: str, now: Optional[datetime] = None) -> float:
+        """
+        Obsolescence d'une étape : âge rapporté à l'âge maximum, pondéré par le score
+
+        Un lead à 100 points est considéré périmé deux fois plus tôt qu'un lead à 0.
+        Une valeur >= 1 signifie que l'étape doit être rafraîchie.
+        """
+        now = now or datetime.utcnow()
+        reference = getattr(lead, STAGE_FIELDS[stage]) or lead.created_at
+        if not reference:
+            return float('inf')
+
+        age_days = max(0.0, (now - reference).total_seconds() / 86400)
+        score = lead.score_opportunite or lead.score_ia or 0.0
+        priority = 1.0 + max(0.0, min(float(score), 100.0)) / 100.0
+        return age_days * priority / self.max_age_days[stage]
+
+    def _prefilter_staleness(self, row, now: datetime) -> float:
+        """Obsolescence maximale d'une ligne du préfiltre (étapes reportées en tête)"""
+        value = max(self.staleness(row, stage, now) for stage in STAGE_FIELDS)
+        if row.enrichissement_en_attente is not None:
+            value = max(value, PENDING_STALENESS)
+        return value
+
+    def select_candidates(self, limit: int = 20) -> List[Tuple[float, Lead, List[str]]]:
+        """
+        Sélectionner les leads les plus périmés
+
+        Returns:
+            Liste (obsolescence max, lead, étapes périmées) triée par obsolescence décroissante
+        """
+        now = datetime.utcnow()
+
+        # Préfiltre SQL : la pondération par le score divise l'âge maximum par 2 au plus
+        conditions = []
+        for stage, field in STAGE_FIELDS.items():
+            column = getattr(Lead, field)
+            threshold = now - timedelta(days=self.max_age_days[stage] / 2.0)
+            conditions.append(column.is_(None))
+            conditions.append(column < threshold)
+        conditions.append(Lead.enrichissement_en_attente.isnot(None))
+
+        # Classement sur les seules colonnes de fraîcheur : les PREFILTER_LIMIT leads les plus périmés
+        # sont chargés, quel que soit leur ordre de mise à jour
+        rows = Lead.query.filter(or_(*conditions)).with_entities(
+            Lead.id, Lead.created_at, Lead.score_opportunite, Lead.score_ia, Lead.enrichissement_en_attente,
+            *[getattr(Lead, field) for field in STAGE_FIELDS.values()]).all()
+        ranked = sorted(rows, key=lambda row: self._prefilter_staleness(row, now), reverse=True)[:PREFILTER_LIMIT]
+        leads = Lead.query.filter(Lead.id.in_([row.id for row in ranked])).all() if ranked else []
+
+        candidates = []
+        for lead in leads:
+            stale_stages = []
+            max_staleness = 0.0
+            pending_stages = lead.pending_refresh_stages()
+            for stage in STAGE_FIELDS:
+                if not self._stage_applicable(lead, stage):
+                    continue
+                value = self.staleness(lead, stage, now)
+                if stage in pending_stages:
+                    # Enrichissement incomplet : prioritaire quel que soit l'âge
+                    value = max(value, PENDING_STALENESS)
+                if value >= 1.0:
+                    stale_stages.append(stage)
+                    max_staleness = max(max_staleness, value)
+            if stale_stages:
+                candidates.append((max_staleness, lead, stale_stages))
+
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        return candidates[:limit]
+
+    # ----- Exécution -----
+
+    def _get_scraping_service(self):
+        """Service de scraping partagé du processus"""
+        from app.services.service_registry import get_scraping_service
+        return get_scraping_service()
+
+    def tick(self) -> Optional[Dict[str, Any]]:
+        """
+        Rafraîchir le lead le plus périmé dont au moins une étape tient dans le budget
+
+        Doit être appelé dans un contexte d'application Flask.
+        """
+        with self._lock:
+            remaining = self.remaining_budget()
+            if remaining['api'] <= 0:
+                SystemLogger.info("⏸️ [REFRESH] Budget API du jour épuisé")
+                return None
+
+            for staleness, lead, stages in self.select_candidates():
+                # Ne garder que les étapes qui tiennent dans le budget restant
+                affordable = []
+                planned = {'api': 0, 'browser': 0}
+                for stage in stages:
+                    cost = self._stage_cost(lead, stage)
+                    if (planned['api'] + cost['api'] <= remaining['api'] and
+                            planned['browser'] + cost['browser'] <= remaining['browser']):
+                        affordable.append(stage)
+                        planned['api'] += cost['api']
+                        planned['browser'] += cost['browser']
+
+                if not affordable:
+                    continue
+
+                SystemLogger.info(f"🔄 [REFRESH] Lead {lead.id} ({lead.nom}) obsolescence {staleness:.2f}, étapes: {affordable}")
+                try:
+                    results = self._get_scraping_service().refresh_lead(lead, affordable)
+                except Exception as e:
+                    SystemLogger.error(f"❌ [REFRESH] Erreur rafraîchissement lead {lead.id}: {str(e)}")
+                    db.session.rollback()
+                    results = {stage: False for stage in affordable}
+
+                # Le budget est consommé même en cas d'échec (les appels ont eu lieu)
+                self._api_used += planned['api']
+                self._browser_used += planned['browser']
+
+                entry = {
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'lead_id': lead.id,
+                    'lead_name': lead.nom,
+                    'staleness': round(staleness, 2),
+                    'stages': results
+                }
+                self._history.append(entry)
+                self._history = self._history[-100:]
+                return entry
+
+            SystemLogger.debug("✅ [REFRESH] Aucun lead périmé dans le budget restant")
+            return None
+
+    def seconds_until_next_tick(self) -> float:
+        """
+        Répartir le budget restant uniformément sur le reste de la journée
+        """
+        remaining = self.remaining_budget()
+        now = datetime.now()
+        end_of_day = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        seconds_left = max(1.0, (end_of_day - now).total_seconds())
+
+        if remaining['api'] <= 0:
+            # Attendre le lendemain
+            return seconds_left
+
+        interval = seconds_left / remaining['api']
+        return max(MIN_TICK_INTERVAL, min(MAX_TICK_INTERVAL, interval))
+
+    def _run_loop(self):
+        """Boucle du thread d'arrière-plan"""
+        SystemLogger.info("🚀 [REFRESH] Planificateur de rafraîchissement démarré")
+        while not self._stop_event.is_set():
+            try:
+                with self.app.app_context():
+                    self.tick()
+            except Exception as e:
+                SystemLogger.error(f"❌ [REFRESH] Erreur dans la boucle: {str(e)}")
+
+            interval = self.seconds_until_next_tick()
+            self._next_tick_at = datetime.now() + timedelta(seconds=interval)
+            self._stop_event.wait(interval)
+        SystemLogger.info("🛑 [REFRESH] Planificateur de rafraîchissement arrêté")
+
+    def start(self):
+        """Démarrer le thread d'arrière-plan"""
+        if self.app is None:
+            raise ValueError("Application Flask requise pour démarrer le planificateur")
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrêter le thread d'arrière-plan"""
+        self._stop_event.set()
+
+    def status(self) -> Dict[str, Any]:
+        """État du planificateur pour l'API"""
+        remaining = self.remaining_budget()
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'day': self._day.isoformat(),
+            'api_budget': self.api_budget,
+            'api_used': self._api_used,
+            'api_remaining': remaining['api'],
+            'browser_budget': self.browser_budget,
+            'browser_used': self._browser_used,
+            'browser_remaining': remaining['browser'],
+            'next_tick_at': self._next_tick_at.isoformat() if self._next_tick_at else None,
+            'recent': self._history[-10:]
+        }
+
+# Instance partagée par le processus
+_scheduler: Optional[RefreshScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_refresh_scheduler(app=None) -> RefreshScheduler:
+    """Obtenir le planificateur partagé (créé à la première demande)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RefreshScheduler(app)
+        elif app is not None and _scheduler.app is None:
+            _scheduler.app = app
+    return _scheduler
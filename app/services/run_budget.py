@@ -0,0 +1,100 @@
+"""
+Budget de temps d'un scraping (MAX_SCRAPING_TIME)
+
+À l'approche de l'échéance, les étapes coûteuses et optionnelles sont abandonnées
+pour les leads restants, dans l'ordre défini par SCRAPING_DEGRADATION_THRESHOLDS.
+Les étapes peu coûteuses (données Google Maps, récupération du HTML, analyse HTML
+manuelle, score) sont toujours effectuées. Les leads concernés sont marqués pour
+un enrichissement ultérieur par le planificateur de rafraîchissement.
+
+Le bilan du scraping reprend aussi les appels OpenAI évités par l'extraction
+déterministe (cf. extraction_gate). run_id rattache les appels OpenAI du
+scraping à sa télémétrie (cf. llm_telemetry).
+"""
+
+import time
+from typing import Dict, Any, List, Optional, Set
+from app.config import Config
+from app.utils.llm_telemetry import new_run_id
+from app.utils.logger import SystemLogger
+
+class RunBudget:
+    """Échéance et étapes abandonnées d'un scraping"""
+
+    def __init__(self, max_seconds: Optional[float] = None, thresholds: Optional[Dict[str, float]] = None):
+        self.max_seconds = max_seconds or Config.MAX_SCRAPING_TIME
+        self.thresholds = thresholds or Config.SCRAPING_DEGRADATION_THRESHOLDS
+        self.started_at = time.time()
+        self.run_id = new_run_id()
+
+        self.skipped: Dict[str, int] = {}
+        self.pending_leads: Set[int] = set()
+        self._announced: Set[str] = set()
+        self.llm_gate = {'sites': 0, 'llm_calls': 0, 'calls_saved': 0, 'tokens_saved': 0}
+
+    def elapsed(self) -> float:
+        """Temps écoulé depuis le début du scraping (secondes)"""
+        return time.time() - self.started_at
+
+    def remaining(self) -> float:
+        """Temps restant avant l'échéance (secondes)"""
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def elapsed_ratio(self) -> float:
+        """Part du budget de temps consommée"""
+        return self.elapsed() / self.max_seconds if self.max_seconds else 1.0
+
+    def is_expired(self) -> bool:
+        """Échéance dépassée"""
+        return self.elapsed() >= self.max_seconds
+
+    def allows(self, stage: str) -> bool:
+        """
+        Vérifier si une étape optionnelle peut encore être lancée
+
+        Les étapes absentes des seuils ne sont jamais abandonnées.
+        """
+        threshold = self.thresholds.get(stage)
+        if threshold is None:
+            return True
+
+        allowed = self.elapsed_ratio() < threshold
+        if not allowed and stage not in self._announced:
+            self._announced.add(stage)
+            SystemLogger.warning(f"⏱️ [BUDGET] {self.elapsed():.0f}s/{self.max_seconds}s écoulées, étape '{stage}' abandonnée pour les leads restants")
+        return allowed
+
+    def skip(self, lead, stage: str, logger=None):
+        """Enregistrer une étape abandonnée pour un lead (enrichissement ultérieur)"""
+        self.skipped[stage] = self.skipped.get(stage, 0) + 1
+        lead.add_pending_enrichment(stage)
+        if lead.id:
+            self.pending_leads.add(lead.id)
+        if logger:
+            logger.warning(f"⏱️ [BUDGET] Étape '{stage}' reportée (budget de temps)")
+
+    def record_llm_gate(self, gate: Optional[Dict[str, Any]]):
+        """Cumuler les appels et tokens évités par le filtre LLM pour un site"""
+        if not gate:
+            return
+        self.llm_gate['sites'] += 1
+        self.llm_gate['llm_calls'] += 1 if gate['llm_called'] else 0
+        self.llm_gate['calls_saved'] += gate['calls_saved']
+        self.llm_gate['tokens_saved'] += gate['tokens_saved']
+
+    def dropped_stages(self) -> List[str]:
+        """Étapes abandonnées jusqu'ici, dans l'ordre de dégradation"""
+        return [stage for stage in sorted(self.thresholds, key=self.thresholds.get) if stage in self._announced]
+
+    def summary(self) -> Dict[str, Any]:
+        """Bilan du budget de temps pour le résultat du scraping"""
+        return {
+            'run_id': self.run_id,
+            'max_seconds': self.max_seconds,
+            'elapsed_seconds': round(self.elapsed(), 1),
+            'expired': self.is_expired(),
+            'dropped_stages': self.dropped_stages(),
+            'skipped': dict(self.skipped),
+            'leads_pending_enrichment': sorted(self.pending_leads),
+            'llm_gate': dict(self.llm_gate)
+        }
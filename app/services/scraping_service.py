@@ -4,15 +4,23 @@ Service principal d'orchestration du scraping
 
 import time
 import os
+from datetime import datetime
+from contextlib import nullcontext
 from typing import List, Dict, Any, Optional
-from app.database.models import Lead
+from app.database.models import Lead, WebsiteAnalysis
 from app.database.database import db
 from app.utils.logger import LeadLogger, SystemLogger
-from app.utils.validators import is_valid_url, is_social_media_url
-from app.scrapers.google_maps_v2_continuous import GoogleMapsScraperV2Continuous
-from app.scrapers.scrapy_spider_improved import ScrapyWebsiteScraperImproved
-from app.services.screenshot_service import ScreenshotService
-from app.services.ai_analysis_service import AIAnalysisService
+from app.utils.validators import is_valid_url, is_social_media_url, parse_social_count
+from app.utils.pipeline_metrics import measure_stage, record_value
+from app.utils.screenshot_preprocessing import screenshot_dhash, hash_distance
+from app.services.service_registry import (
+    get_google_maps_service, get_website_scraper, get_screenshot_service, get_ai_analysis_service
+)
+from app.services.run_budget import RunBudget
+from app.utils.llm_cache import llm_cache_bypass, is_bypassed
+from app.utils.llm_telemetry import llm_context, bind_llm_context, reset_llm_context, get_llm_summary
+from app.services.website_dedup import website_key, shared_entry, branch_independent, get_website_flights
+from app.scrapers.google_maps_v2_continuous import BUSINESS_TYPES
 from app.config import Config
 from dotenv import load_dotenv
 
@@ -30,28 +38,28 @@ class ScrapingService:
             
             # Initialisation des services avec gestion d'erreurs spécifiques
             try:
-                self.google_maps_service = GoogleMapsScraperV2Continuous()
+                self.google_maps_service = get_google_maps_service()
                 SystemLogger.info("✅ Service Google Maps initialisé")
             except Exception as e:
                 SystemLogger.error(f"❌ Erreur initialisation Google Maps: {str(e)}")
                 raise ValueError(f"Impossible d'initialiser le service Google Maps: {str(e)}")
             
             try:
-                self.website_scraper = ScrapyWebsiteScraperImproved()
+                self.website_scraper = get_website_scraper()
                 SystemLogger.info("✅ Service de scraping web initialisé")
             except Exception as e:
                 SystemLogger.error(f"❌ Erreur initialisation scraper web: {str(e)}")
                 raise ValueError(f"Impossible d'initialiser le scraper web: {str(e)}")
             
             try:
-                self.screenshot_service = ScreenshotService()
+                self.screenshot_service = get_screenshot_service()
                 SystemLogger.info("✅ Service de captures d'écran initialisé")
             except Exception as e:
                 SystemLogger.error(f"❌ Erreur initialisation service screenshots: {str(e)}")
                 raise ValueError(f"Impossible d'initialiser le service de captures d'écran: {str(e)}")
             
             try:
-                self.ai_analysis_service = AIAnalysisService()
+                self.ai_analysis_service = get_ai_analysis_service()
                 SystemLogger.info("✅ Service d'analyse IA initialisé")
             except Exception as e:
                 SystemLogger.error(f"❌ Erreur initialisation service IA: {str(e)}")
@@ -99,12 +107,20 @@ class ScrapingService:
         Returns:
             Résultat du scraping avec statistiques
         """
+        # Échéance du scraping : les étapes coûteuses sont abandonnées à son approche
+        run_budget = RunBudget()
+        
+        if max_results > Config.MAX_LEADS_PER_REQUEST:
+            SystemLogger.warning(f"⚠️ [PIPELINE SMART] Max résultats {max_results} ramené à {Config.MAX_LEADS_PER_REQUEST} (MAX_LEADS_PER_REQUEST)")
+            max_results = Config.MAX_LEADS_PER_REQUEST
+        
         SystemLogger.info(f"🚀 [PIPELINE SMART] --- DÉBUT SCRAPING OPTIMISÉ ---")
         SystemLogger.info(f"📍 [PIPELINE SMART] Localisation: {location}")
         SystemLogger.info(f"🏢 [PIPELINE SMART] Type d'entreprise: {business_type or 'Tous'}")
         SystemLogger.info(f"📊 [PIPELINE SMART] Filtres: note >= {min_rating}, avis >= {min_reviews}")
         SystemLogger.info(f"📏 [PIPELINE SMART] Rayon: {radius}m")
         SystemLogger.info(f"🎯 [PIPELINE SMART] Max résultats: {max_results}")
+        SystemLogger.info(f"⏱️ [PIPELINE SMART] Budget de temps: {run_budget.max_seconds}s")
         
         try:
             # Étape 1: Créer ou récupérer la zone
@@ -124,6 +140,7 @@ class ScrapingService:
             # Étape 2: Recherche continue jusqu'à obtenir le nombre de bars uniques souhaité
             SystemLogger.info(f"🔍 [PIPELINE SMART] Étape 2: Recherche continue Google Maps...")
             SystemLogger.info(f"🔍 [PIPELINE SMART] Mode recherche: {'LARGE' if wide_search else 'PRÉCIS'}")
+            search_start = time.time()
             businesses = self.google_maps_service.search_continuous_until_target(
                 location=location,
                 target_count=max_results,
@@ -135,6 +152,8 @@ class ScrapingService:
                 max_searches=10,
                 wide_search=wide_search
             )
+            if businesses:
+                record_value('latency.google_maps_per_lead', (time.time() - search_start) / len(businesses))
             
             # Filtre anti-hôtels si demandé
             if anti_hotels:
@@ -161,7 +180,8 @@ class ScrapingService:
                         SystemLogger.warning(f"⚠️ [PIPELINE SMART] Entreprise sans place_id: {name}")
                         continue
                     
-                    lead = self._process_business_smart(business, None) # Pas de zone_id pour le scraping classique
+                    with llm_context(run_id=run_budget.run_id):
+                        lead = self._process_business_smart(business, None, run_budget) # Pas de zone_id pour le scraping classique
                     if lead:
                         SystemLogger.info(f"✅ [PIPELINE SMART] Lead traité: {lead.nom} (ID: {lead.id})")
                         if lead.id:  # Lead existant mis à jour
@@ -196,6 +216,20 @@ class ScrapingService:
             SystemLogger.info(f"   - Leads créés: {leads_created}")
             SystemLogger.info(f"   - Leads mis à jour: {leads_updated}")
             SystemLogger.info(f"💰 [PIPELINE SMART] Coût API total: ${total_api_cost:.4f}")
+            time_budget = run_budget.summary()
+            SystemLogger.info(f"⏱️ [PIPELINE SMART] Durée: {time_budget['elapsed_seconds']}s/{time_budget['max_seconds']}s")
+            if time_budget['dropped_stages']:
+                SystemLogger.warning(f"⏱️ [PIPELINE SMART] Étapes abandonnées: {', '.join(time_budget['dropped_stages'])}")
+                SystemLogger.warning(f"⏱️ [PIPELINE SMART] Leads à enrichir plus tard: {len(time_budget['leads_pending_enrichment'])}")
+            llm_gate = time_budget['llm_gate']
+            if llm_gate['sites']:
+                SystemLogger.info(f"🎯 [PIPELINE SMART] Filtre LLM: {llm_gate['llm_calls']}/{llm_gate['sites']} site(s) envoyés à OpenAI, "
+                                  f"{llm_gate['calls_saved']} appel(s) et ~{llm_gate['tokens_saved']} tokens évités")
+            llm_usage = get_llm_summary(run_id=run_budget.run_id)
+            for call_type, usage in llm_usage['by_call_type'].items():
+                SystemLogger.info(f"🧾 [PIPELINE SMART] OpenAI {call_type}: {usage['calls']} appel(s) ({usage['cache_hits']} en cache), "
+                                  f"{usage['input_tokens']}+{usage['output_tokens']} tokens, ${usage['cost']:.4f}, "
+                                  f"p95 {usage['latency']['p95']:.1f}s")
             
             # Sauvegarder les changements
             db.session.commit()
@@ -207,7 +241,9 @@ class ScrapingService:
                 'leads_created': leads_created,
                 'leads_updated': leads_updated,
                 'api_cost': total_api_cost,
-                'optimization_savings': f"{(len(businesses) * 0.0179) - total_api_cost:.4f}"
+                'optimization_savings': f"{(len(businesses) * 0.0179) - total_api_cost:.4f}",
+                'time_budget': time_budget,
+                'llm_usage': llm_usage
             }
             
             SystemLogger.info(f"🎉 [PIPELINE SMART] --- FIN SCRAPING OPTIMISÉ ---")
@@ -230,6 +266,10 @@ class ScrapingService:
         Returns:
             Résultat du scraping
         """
+        if max_results > Config.MAX_LEADS_PER_REQUEST:
+            SystemLogger.warning(f"⚠️ [PIPELINE CLASSIC] Max résultats {max_results} ramené à {Config.MAX_LEADS_PER_REQUEST} (MAX_LEADS_PER_REQUEST)")
+            max_results = Config.MAX_LEADS_PER_REQUEST
+        
         SystemLogger.info(f"🚀 [PIPELINE CLASSIC] --- DÉBUT SCRAPING CLASSIQUE ---")
         SystemLogger.info(f"📍 [PIPELINE CLASSIC] Localisation: {location}")
         SystemLogger.info(f"🏢 [PIPELINE CLASSIC] Type d'entreprise: {business_type or 'Tous'}")
@@ -302,7 +342,8 @@ class ScrapingService:
             db.session.rollback()
             return {'success': False, 'message': f'Erreur: {str(e)}', 'leads_processed': 0}
     
-    def _process_business_smart(self, business_data: Dict[str, Any], zone_id: Optional[int] = None) -> Optional[Lead]:
+    def _process_business_smart(self, business_data: Dict[str, Any], zone_id: Optional[int] = None,
+                                run_budget: Optional[RunBudget] = None) -> Optional[Lead]:
         """Traiter une entreprise avec les nouvelles fonctionnalités optimisées"""
         SystemLogger.info(f"🔧 [PROCESS SMART] Début du traitement: {business_data.get('name')}")
         
@@ -326,6 +367,7 @@ class ScrapingService:
             lead.note_google = business_data.get('rating')
             lead.nb_avis_google = business_data.get('user_ratings_total')
             lead.business_type = business_data.get('business_type')  # Type réel de Google Places
+            lead.place_id = business_data.get('place_id')
             
             # Stocker les coordonnées GPS
             latitude = business_data.get('latitude')
@@ -348,11 +390,15 @@ class ScrapingService:
             if not lead.business_type and business_data.get('business_type'):
                 lead.business_type = business_data.get('business_type')
                 SystemLogger.info(f"🔄 [PROCESS SMART] Business type mis à jour: {lead.business_type}")
+            if not lead.place_id and business_data.get('place_id'):
+                lead.place_id = business_data.get('place_id')
         
         # Logger pour ce lead
         lead_logger = LeadLogger(lead.id, lead.nom)
         lead_logger.info("🚀 [PROCESS SMART] Début du traitement optimisé")
         
+        # Appels OpenAI rattachés à ce lead (télémétrie)
+        llm_tokens = bind_llm_context(lead_id=lead.id)
         try:
             # Étape 1: Validation des données Google Maps
             if not business_data.get('name'):
@@ -361,6 +407,7 @@ class ScrapingService:
             lead_logger.info("✅ [PROCESS SMART] Étape 1: Données Google Maps OK")
             # Étape 1: Données Google Maps
             lead.update_log("google_maps_scraped: OK")
+            lead.mark_refreshed('google_maps')
             
             # Étape 2: Site web
             website_url = business_data.get('website')
@@ -381,11 +428,12 @@ class ScrapingService:
                         lead.instagram_url = website_url
                     
                     # Scraper le réseau social
-                    self._scrape_social_media(lead, lead_logger)
+                    self._scrape_social_media(lead, lead_logger, run_budget)
                 else:
                     lead_logger.info(f"🌐 [PROCESS SMART] Scraping du site web classique...")
                     # Scraper le site web
-                    self._scrape_website(lead, lead_logger)
+                    with measure_stage('site_web'):
+                        self._scrape_website(lead, lead_logger, run_budget)
                     
                     # APRÈS l'analyse IA du site web, vérifier si des réseaux sociaux ont été trouvés
                     if lead.ai_analysis:
@@ -406,7 +454,7 @@ class ScrapingService:
                         # Lancer l'analyse IA des réseaux sociaux si au moins un a été trouvé
                         if facebook_found or instagram_found:
                             lead_logger.info("[PROCESS SMART] Lancement de l'analyse IA des réseaux sociaux...")
-                            self._scrape_social_media(lead, lead_logger)
+                            self._scrape_social_media(lead, lead_logger, run_budget)
             else:
                 lead_logger.info("⚠️ [PROCESS SMART] Aucun site web valide trouvé")
                 lead.update_log("site_web: NOK (pas d'URL)")
@@ -415,12 +463,12 @@ class ScrapingService:
             if not lead.facebook_url and business_data.get('facebook_url'):
                 lead_logger.info(f"📘 [PROCESS SMART] Facebook additionnel détecté: {business_data.get('facebook_url')}")
                 lead.facebook_url = business_data.get('facebook_url')
-                self._scrape_social_media(lead, lead_logger)
+                self._scrape_social_media(lead, lead_logger, run_budget)
             
             if not lead.instagram_url and business_data.get('instagram_url'):
                 lead_logger.info(f"📷 [PROCESS SMART] Instagram additionnel détecté: {business_data.get('instagram_url')}")
                 lead.instagram_url = business_data.get('instagram_url')
-                self._scrape_social_media(lead, lead_logger)
+                self._scrape_social_media(lead, lead_logger, run_budget)
             
             # Finaliser le statut
             lead.set_statut('succès')
@@ -429,9 +477,7 @@ class ScrapingService:
 
             # Appel du scoring IA (RAG) pour générer l'argumentaire
             try:
-                from app.services.ai_analysis_service import AIAnalysisService
-                ai_service = AIAnalysisService()
-                ai_result = ai_service.score_lead_with_rag(lead)
+                ai_result = self.ai_analysis_service.score_lead_with_rag(lead)
                 
                 # Stocker les résultats du scoring IA
                 if ai_result.get('score'):
@@ -452,14 +498,22 @@ class ScrapingService:
             lead.update_log(f"error: {str(e)}")
             SystemLogger.error(f"❌ [PROCESS SMART] Erreur lors du traitement de {lead.nom}: {str(e)}")
             return None
+        finally:
+            reset_llm_context(llm_tokens)
     
-    def _scrape_website(self, lead: Lead, logger: LeadLogger):
+    def _scrape_website(self, lead: Lead, logger: LeadLogger, run_budget: Optional[RunBudget] = None) -> bool:
         """
         Scrape le site web avec le nouveau système IA
+        
+        Args:
+            run_budget: Budget de temps du scraping (analyses coûteuses abandonnées à l'approche de l'échéance)
+        
+        Returns:
+            True si le site a été analysé
         """
         if not lead.site_web:
             logger.info("❌ Pas d'URL de site web à scraper")
-            return
+            return False
         
         try:
             logger.info(f"🌐 [WEBSITE] Début scraping IA pour {lead.site_web}")
@@ -467,19 +521,87 @@ class ScrapingService:
             # Validation de l'URL
             if not is_valid_url(lead.site_web):
                 logger.error(f"❌ [WEBSITE] URL invalide: {lead.site_web}")
-                return
+                return False
             
-            # Utiliser le nouveau scraper IA
-            scraper = ScrapyWebsiteScraperImproved()
-            result = scraper.scrape_website_with_ai(lead.site_web)
+            allow_full_html = run_budget is None or run_budget.allows('full_html')
+            use_ai = run_budget is None or run_budget.allows('website_ai')
+            crawl_pages = run_budget is None or run_budget.allows('site_crawl')
+            render_js = run_budget is None or run_budget.allows('js_render')
+            
+            # Une page inchangée n'est réanalysée que si l'analyse précédente est incomplète ou
+            # en échec (fallback manuel, erreur), ou si une réanalyse est forcée
+            forced = is_bypassed()
+            previous_ok = isinstance(lead.ai_analysis, dict) and bool(lead.ai_analysis) and not lead.ai_analysis.get('error')
+            skip_if_unchanged = previous_ok and 'site_web' not in lead.pending_refresh_stages() and not forced
+            
+            # Site déjà analysé pour un autre lead (chaîne, Linktree...) : analyse partagée réutilisée
+            key = website_key(lead.site_web) if Config.WEBSITE_DEDUP_ENABLED else None
+            if key and not forced:
+                stored = self._find_shared_website_analysis(lead, key)
+                if stored:
+                    return self._apply_shared_website_analysis(lead, key, stored.to_dict(), logger)
+            
+            def scrape():
+                # Utiliser le nouveau scraper IA
+                scraped = self.website_scraper.scrape_website_with_ai(
+                    lead.site_web,
+                    allow_full_html=allow_full_html,
+                    use_ai=use_ai,
+                    skip_if_unchanged=skip_if_unchanged,
+                    crawl_pages=crawl_pages,
+                    render_js=render_js
+                )
+                return scraped, self._skipped_website_stages(scraped, allow_full_html, use_ai, crawl_pages, render_js)
+            
+            if key:
+                # Un seul téléchargement pour les leads du même site analysés en même temps
+                (result, skipped), shared = get_website_flights().do(key, scrape)
+                entry = shared_entry(result) if shared else None
+                if entry and not skipped:
+                    return self._apply_shared_website_analysis(lead, key, entry, logger)
+                if shared:
+                    result, skipped = scrape()
+                record_value('site_web.shared', 0)
+            else:
+                result, skipped = scrape()
+            
+            if result and result.get('rejected'):
+                # PDF, image... : pas d'analyse HTML, le lead est signalé pour un autre traitement
+                lead.site_web_statut = 'non_html'
+                lead.mark_refreshed('site_web')
+                lead.update_log(f"site_web: contenu non HTML ({result.get('content_type') or result['rejected']})")
+                db.session.commit()
+                self._store_website_analysis(lead, key, result, True, logger)
+                logger.warning(f"🚫 [WEBSITE] {lead.site_web} n'est pas une page HTML ({result.get('content_type') or result['rejected']})")
+                return False
+            
+            if result and result.get('unchanged') and result.get('ai_analysis') is None:
+                lead.mark_refreshed('site_web')
+                lead.update_log("site_web: inchangé (analyse IA conservée)")
+                db.session.commit()
+                logger.info(f"♻️ [WEBSITE] Site inchangé, analyse IA précédente conservée pour {lead.site_web}")
+                return True
             
             if result and result.get('scraping_success'):
                 ai_analysis = result.get('ai_analysis', {})
                 
                 # Mettre à jour le lead avec les données IA
+                lead.mark_refreshed('site_web')
+                lead.site_web_statut = 'tronque' if result.get('truncated') else 'ok'
+                if result.get('truncated'):
+                    lead.update_log("site_web: page trop volumineuse, début et fin analysés")
+                for stage in skipped:
+                    run_budget.skip(lead, stage, logger)
+                if result.get('rendered'):
+                    lead.update_log("site_web: page JavaScript rendue dans le navigateur")
+                if run_budget:
+                    run_budget.record_llm_gate(result.get('llm_gate'))
                 self._update_lead_with_ai_analysis(lead, ai_analysis, logger)
+                self._update_lead_with_site_signals(lead, result.get('site_signals'), logger)
+                self._store_website_analysis(lead, key, result, not skipped, logger)
                 
                 logger.info(f"✅ [WEBSITE] Scraping IA terminé pour {lead.site_web}")
+                return True
             else:
                 error_msg = result.get('error', 'Erreur inconnue') if result else 'Pas de résultat'
                 logger.error(f"❌ [WEBSITE] Échec du scraping IA pour {lead.site_web}: {error_msg}")
@@ -492,6 +614,85 @@ class ScrapingService:
             logger.error(f"❌ [WEBSITE] Erreur de validation pour {lead.site_web}: {str(e)}")
         except Exception as e:
             logger.error(f"❌ [WEBSITE] Erreur inattendue pour {lead.site_web}: {str(e)}")
+        
+        return False
+    
+    def _skipped_website_stages(self, result: Optional[Dict[str, Any]], allow_full_html: bool, use_ai: bool,
+                                crawl_pages: bool, render_js: bool) -> List[str]:
+        """Étapes de l'analyse du site abandonnées faute de budget (à refaire lors d'un enrichissement)"""
+        if not result or not result.get('scraping_success'):
+            return []
+        skipped = []
+        if not use_ai:
+            skipped.append('website_ai')
+        elif not allow_full_html and (result.get('text_tokens') or 0) > Config.LLM_STANDARD_MAX_TOKENS:
+            skipped.append('full_html')
+        if not crawl_pages and result.get('crawl', {}).get('missing_fields'):
+            skipped.append('site_crawl')
+        if not render_js and result.get('js_shell'):
+            skipped.append('js_render')
+        return skipped
+    
+    def _find_shared_website_analysis(self, lead: Lead, key: str) -> Optional[WebsiteAnalysis]:
+        """Analyse enregistrée réutilisable pour ce lead (récente, complète, produite par un autre lead)"""
+        try:
+            stored = WebsiteAnalysis.query.filter_by(cle=key).first()
+        except Exception as e:
+            SystemLogger.warning(f"⚠️ [DEDUP] Lecture des analyses partagées impossible: {str(e)}")
+            return None
+        if not stored or not stored.complete or stored.source_lead_id == lead.id:
+            return None  # le rafraîchissement du lead d'origine refait l'analyse
+        if not stored.is_fresh(Config.WEBSITE_DEDUP_MAX_AGE_DAYS):
+            return None
+        return stored
+    
+    def _apply_shared_website_analysis(self, lead: Lead, key: str, entry: Dict[str, Any], logger: LeadLogger) -> bool:
+        """
+        Appliquer au lead l'analyse d'un site partagé, sans les coordonnées ni
+        les horaires propres à chaque établissement
+        
+        Returns:
+            True si le lead a reçu une analyse (False pour un contenu non HTML)
+        """
+        record_value('site_web.shared', 1)
+        WebsiteAnalysis.query.filter_by(cle=key).update({WebsiteAnalysis.reutilisations: WebsiteAnalysis.reutilisations + 1})
+        lead.mark_refreshed('site_web')
+        lead.site_web_statut = entry['site_web_statut']
+        
+        if entry['site_web_statut'] == 'non_html':
+            lead.update_log(f"site_web: contenu non HTML (analyse partagée {key})")
+            db.session.commit()
+            logger.warning(f"🚫 [WEBSITE] {lead.site_web} n'est pas une page HTML (analyse partagée {key})")
+            return False
+        
+        ai_analysis, signals = branch_independent(entry['ai_analysis'], entry['site_signals'], key)
+        lead.update_log(f"site_web: analyse partagée reprise ({key}), coordonnées et horaires non copiés")
+        self._update_lead_with_ai_analysis(lead, ai_analysis, logger)
+        self._update_lead_with_site_signals(lead, signals, logger)
+        logger.info(f"🔗 [WEBSITE] Analyse partagée de {key} réutilisée, aucun téléchargement ni appel OpenAI")
+        return True
+    
+    def _store_website_analysis(self, lead: Lead, key: Optional[str], result: Dict[str, Any], complete: bool,
+                                logger: LeadLogger):
+        """Enregistrer l'analyse du site pour les autres leads qui le référencent"""
+        entry = shared_entry(result) if key else None
+        if not entry:
+            return
+        try:
+            stored = WebsiteAnalysis.query.filter_by(cle=key).first()
+            if stored is None:
+                stored = WebsiteAnalysis(cle=key, url=lead.site_web, reutilisations=0)
+                db.session.add(stored)
+            for field, value in entry.items():
+                setattr(stored, field, value)
+            stored.url = lead.site_web
+            stored.complete = complete
+            stored.source_lead_id = lead.id
+            db.session.commit()
+        except Exception as e:
+            # Analyse enregistrée en même temps par un autre processus : la sienne sera réutilisée
+            db.session.rollback()
+            logger.warning(f"⚠️ [DEDUP] Analyse partagée non enregistrée pour {key}: {str(e)}")
     
     def _update_lead_with_ai_analysis(self, lead: Lead, ai_analysis: Dict[str, Any], logger: LeadLogger):
         """
@@ -550,20 +751,77 @@ class ScrapingService:
         except Exception as e:
             logger.error(f"❌ [LEAD] Erreur mise à jour lead: {str(e)}")
     
-    def _scrape_social_media(self, lead: Lead, logger: LeadLogger):
+    def _update_lead_with_site_signals(self, lead: Lead, signals: Optional[Dict[str, Any]], logger: LeadLogger):
+        """
+        Compléter le lead avec l'extraction déterministe du site (accueil + pages
+        contact / mentions légales) : seuls les champs encore vides sont remplis
+        """
+        if not signals:
+            return
+        try:
+            filled = []
+            if not lead.site_web_email and signals.get('emails'):
+                lead.site_web_email = signals['emails'][0]
+                filled.append('email')
+            if not lead.site_web_telephone and signals.get('phones'):
+                lead.site_web_telephone = signals['phones'][0]
+                filled.append('téléphone')
+            if not lead.site_web_adresse and signals.get('address'):
+                lead.site_web_adresse = signals['address']
+                filled.append('adresse')
+            if not lead.site_web_horaires and signals.get('opening_hours'):
+                horaires = signals['opening_hours']
+                lead.site_web_horaires = ', '.join(horaires) if isinstance(horaires, list) else str(horaires)
+                filled.append('horaires')
+            
+            social_media = signals.get('social_media', {})
+            if not lead.facebook_url:
+                facebook_url = next((url for url in social_media.get('facebook', []) if self._is_valid_facebook_page(url)), None)
+                if facebook_url:
+                    lead.facebook_url = facebook_url
+                    filled.append('facebook')
+            if not lead.instagram_url:
+                instagram_url = next((url for url in social_media.get('instagram', [])
+                                      if is_social_media_url(url)[1] == 'instagram' and '/p/' not in url
+                                      and not any(ext in url.lower() for ext in ['.css', '.js', '.png', '.jpg', '.gif', '.ico', '.svg', '.woff', '.ttf'])), None)
+                if instagram_url:
+                    lead.instagram_url = instagram_url
+                    filled.append('instagram')
+            
+            if filled:
+                db.session.commit()
+                logger.info(f"🧭 [LEAD] Complété par l'extraction du site: {', '.join(filled)}")
+        except Exception as e:
+            logger.error(f"❌ [LEAD] Erreur mise à jour depuis l'extraction du site: {str(e)}")
+    
+    def _scrape_social_media(self, lead: Lead, logger: LeadLogger, run_budget: Optional[RunBudget] = None) -> bool:
         """Nouvelle méthode : Capture d'écran + analyse IA des réseaux sociaux"""
+        with measure_stage('social'):
+            return self._scrape_social_media_steps(lead, logger, run_budget)
+    
+    def _scrape_social_media_steps(self, lead: Lead, logger: LeadLogger, run_budget: Optional[RunBudget] = None) -> bool:
+        """Étapes de capture et d'analyse des réseaux sociaux"""
         logger.info("[PIPELINE] --- DÉBUT SCRAPING SOCIAL MEDIA ---")
         try:
+            if run_budget and not run_budget.allows('screenshots'):
+                run_budget.skip(lead, 'screenshots', logger)
+                db.session.commit()
+                return False
+            
+
             logger.info("[PIPELINE] Capture d'écran des réseaux sociaux...")
             # Préparer les données du lead pour la capture
             lead_data = {
                 'id': lead.id,
                 'facebook_url': lead.facebook_url,
-                'instagram_url': lead.instagram_url
+                'instagram_url': lead.instagram_url,
+                'facebook_profile': lead.intro_facebook or lead.description_facebook,
+                'instagram_profile': lead.bio_instagram
             }
             
-            # Étape 1: Capture d'écran
-            screenshots = self.screenshot_service.capture_social_media(lead_data)
+            # Étape 1: Compteurs lus dans la page, capture d'écran si la page ne les expose pas
+            with measure_stage('social_capture'):
+                screenshots = self.screenshot_service.capture_social_media(lead_data)
             
             # Sauvegarder les chemins des captures d'écran
             if screenshots.get('facebook_screenshot'):
@@ -574,241 +832,44 @@ class ScrapingService:
                 lead.instagram_screenshot_path = screenshots['instagram_screenshot']
                 logger.info(f"Capture Instagram sauvegardée: {lead.instagram_screenshot_path}")
             
+            # Compteurs complets lus dans la page : aucune analyse Vision
+            ai_results = {}
+            for platform in ('facebook', 'instagram'):
+                metrics = screenshots.get(f'{platform}_metrics')
+                if metrics and not screenshots.get(f'{platform}_screenshot'):
+                    logger.info(f"📊 [{platform.upper()}] Compteurs lus dans la page, analyse Vision évitée")
+                    ai_results[f'{platform}_data'] = metrics
+                    self._apply_social_result(lead, platform, metrics, logger)
+            
+            vision_platforms = [platform for platform in ('facebook', 'instagram') if screenshots.get(f'{platform}_screenshot')]
+            # Captures conservées, analyse Vision reportée si le budget de temps est dépassé ;
+            # les compteurs déjà lus dans la page sont tout de même notés
+            vision_deferred = bool(vision_platforms) and run_budget is not None and not run_budget.allows('vision')
+            if vision_deferred:
+                vision_platforms = []
+                if not ai_results:
+                    run_budget.skip(lead, 'vision', logger)
+                    db.session.commit()
+                    return False
+            
             # Étape 2: Analyse IA des captures d'écran
-            logger.info("[PIPELINE] Analyse IA des captures d'écran...")
-            ai_service = AIAnalysisService()
+            if vision_platforms:
+                logger.info("[PIPELINE] Analyse IA des captures d'écran...")
             
             # Analyser chaque screenshot séparément
-            ai_results = {}
-            if screenshots.get('facebook_screenshot'):
-                fb_result = ai_service.analyze_social_media_screenshots(screenshots['facebook_screenshot'], 'facebook')
-                ai_results['facebook_data'] = fb_result
-                
-                # Stocker les données Facebook dans les champs appropriés
-                if fb_result.get('followers'):
-                    followers_str = fb_result['followers']
-                    try:
-                        # Nettoyer la chaîne et gérer les minuscules
-                        followers_clean = followers_str.strip().upper()
-                        if 'K' in followers_clean:
-                            followers_num = float(followers_clean.replace('K', '').replace(',', '.').replace(' ', '')) * 1000
-                            lead.nb_followers_facebook = int(followers_num)
-                        elif 'M' in followers_clean:
-                            followers_num = float(followers_clean.replace('M', '').replace(',', '.').replace(' ', '')) * 1000000
-                            lead.nb_followers_facebook = int(followers_num)
-                        else:
-                            # Essayer de convertir directement
-                            followers_clean = followers_str.replace(',', '').replace(' ', '')
-                            lead.nb_followers_facebook = int(followers_clean)
-                    except Exception as e:
-                        logger.warning(f"Erreur conversion followers Facebook: {str(e)}")
-                        # Essayer une conversion plus robuste
-                        try:
-                            import re
-                            # Extraire les chiffres avec regex
-                            numbers = re.findall(r'\d+(?:\.\d+)?', followers_str)
-                            if numbers:
-                                if 'k' in followers_str.lower():
-                                    lead.nb_followers_facebook = int(float(numbers[0]) * 1000)
-                                elif 'm' in followers_str.lower():
-                                    lead.nb_followers_facebook = int(float(numbers[0]) * 1000000)
-                                else:
-                                    lead.nb_followers_facebook = int(float(numbers[0]))
-                                logger.info(f"✅ Conversion followers Facebook réussie avec regex: {lead.nb_followers_facebook}")
-                        except Exception as e2:
-                            logger.warning(f"Échec conversion followers Facebook avec regex: {str(e2)}")
-                
-                if fb_result.get('likes') and fb_result['likes'] != 'Non visible':
-                    likes_str = fb_result['likes']
-                    try:
-                        # Nettoyer la chaîne et gérer les minuscules
-                        likes_clean = likes_str.strip().upper()
-                        if 'K' in likes_clean:
-                            likes_num = float(likes_clean.replace('K', '').replace(',', '.').replace(' ', '')) * 1000
-                            lead.nb_likes_facebook = int(likes_num)
-                        elif 'M' in likes_clean:
-                            likes_num = float(likes_clean.replace('M', '').replace(',', '.').replace(' ', '')) * 1000000
-                            lead.nb_likes_facebook = int(likes_num)
-                        else:
-                            # Essayer de convertir directement
-                            likes_clean = likes_str.replace(',', '').replace(' ', '')
-                            lead.nb_likes_facebook = int(likes_clean)
-                    except Exception as e:
-                        logger.warning(f"Erreur conversion likes Facebook: {str(e)}")
-                        # Essayer une conversion plus robuste
-                        try:
-                            import re
-                            # Extraire les chiffres avec regex
-                            numbers = re.findall(r'\d+(?:\.\d+)?', likes_str)
-                            if numbers:
-                                if 'k' in likes_str.lower():
-                                    lead.nb_likes_facebook = int(float(numbers[0]) * 1000)
-                                elif 'm' in likes_str.lower():
-                                    lead.nb_likes_facebook = int(float(numbers[0]) * 1000000)
-                                else:
-                                    lead.nb_likes_facebook = int(float(numbers[0]))
-                                logger.info(f"✅ Conversion likes Facebook réussie avec regex: {lead.nb_likes_facebook}")
-                        except Exception as e2:
-                            logger.warning(f"Échec conversion likes Facebook avec regex: {str(e2)}")
-                
-                # Stocker l'intro Facebook (informations complètes)
-                if fb_result.get('intro'):
-                    lead.intro_facebook = fb_result['intro']
-                elif fb_result.get('description'):
-                    lead.description_facebook = fb_result['description']
-                
-                # Stocker les informations de contact Facebook
-                if fb_result.get('contact_info') and isinstance(fb_result['contact_info'], dict):
-                    contact = fb_result['contact_info']
-                    if contact.get('phone') and contact['phone'] != 'Non visible':
-                        lead.facebook_telephone = contact['phone']
-                    if contact.get('email') and contact['email'] != 'Non visible':
-                        lead.facebook_email = contact['email']
-                    if contact.get('address') and contact['address'] != 'Non visible':
-                        lead.facebook_adresse = contact['address']
-                    if contact.get('website') and contact['website'] != 'Non visible':
-                        lead.facebook_site_web = contact['website']
-                
-                # Créer une chaîne de statistiques pour l'affichage
-                stats_parts = []
-                if fb_result.get('followers'):
-                    stats_parts.append(f"{fb_result['followers']} followers")
-                if fb_result.get('likes') and fb_result['likes'] != 'Non visible':
-                    stats_parts.append(f"{fb_result['likes']} likes")
-                if stats_parts:
-                    lead.facebook_stats = " • ".join(stats_parts)
-            
-            if screenshots.get('instagram_screenshot'):
-                insta_result = ai_service.analyze_social_media_screenshots(screenshots['instagram_screenshot'], 'instagram')
-                ai_results['instagram_data'] = insta_result
-                
-                # Stocker les données Instagram dans les champs appropriés
-                if insta_result.get('followers'):
-                    followers_str = insta_result['followers']
-                    try:
-                        # Nettoyer la chaîne et gérer les minuscules
-                        followers_clean = followers_str.strip().upper()
-                        if 'K' in followers_clean:
-                            followers_num = float(followers_clean.replace('K', '').replace(',', '.').replace(' ', '')) * 1000
-                            lead.nb_followers_instagram = int(followers_num)
-                        elif 'M' in followers_clean:
-                            followers_num = float(followers_clean.replace('M', '').replace(',', '.').replace(' ', '')) * 1000000
-                            lead.nb_followers_instagram = int(followers_num)
-                        else:
-                            # Essayer de convertir directement
-                            followers_clean = followers_str.replace(',', '').replace(' ', '')
-                            lead.nb_followers_instagram = int(followers_clean)
-                    except Exception as e:
-                        logger.warning(f"Erreur conversion followers Instagram: {str(e)}")
-                        # Essayer une conversion plus robuste
-                        try:
-                            import re
-                            # Extraire les chiffres avec regex
-                            numbers = re.findall(r'\d+(?:\.\d+)?', followers_str)
-                            if numbers:
-                                if 'k' in followers_str.lower():
-                                    lead.nb_followers_instagram = int(float(numbers[0]) * 1000)
-                                elif 'm' in followers_str.lower():
-                                    lead.nb_followers_instagram = int(float(numbers[0]) * 1000000)
-                                else:
-                                    lead.nb_followers_instagram = int(float(numbers[0]))
-                                logger.info(f"✅ Conversion followers Instagram réussie avec regex: {lead.nb_followers_instagram}")
-                        except Exception as e2:
-                            logger.warning(f"Échec conversion followers Instagram avec regex: {str(e2)}")
-                
-                # Traiter le following Instagram
-                if insta_result.get('following'):
-                    following_str = insta_result['following']
-                    try:
-                        # Nettoyer la chaîne et gérer les minuscules
-                        following_clean = following_str.strip().upper()
-                        if 'K' in following_clean:
-                            following_num = float(following_clean.replace('K', '').replace(',', '.').replace(' ', '')) * 1000
-                            lead.nb_following_instagram = int(following_num)
-                        elif 'M' in following_clean:
-                            following_num = float(following_clean.replace('M', '').replace(',', '.').replace(' ', '')) * 1000000
-                            lead.nb_following_instagram = int(following_num)
-                        else:
-                            # Essayer de convertir directement
-                            following_clean = following_str.replace(',', '').replace(' ', '')
-                            lead.nb_following_instagram = int(following_clean)
-                    except Exception as e:
-                        logger.warning(f"Erreur conversion following Instagram: {str(e)}")
-                        # Essayer une conversion plus robuste
-                        try:
-                            import re
-                            # Extraire les chiffres avec regex
-                            numbers = re.findall(r'\d+(?:\.\d+)?', following_str)
-                            if numbers:
-                                if 'k' in following_str.lower():
-                                    lead.nb_following_instagram = int(float(numbers[0]) * 1000)
-                                elif 'm' in following_str.lower():
-                                    lead.nb_following_instagram = int(float(numbers[0]) * 1000000)
-                                else:
-                                    lead.nb_following_instagram = int(float(numbers[0]))
-                                logger.info(f"✅ Conversion following Instagram réussie avec regex: {lead.nb_following_instagram}")
-                        except Exception as e2:
-                            logger.warning(f"Échec conversion following Instagram avec regex: {str(e2)}")
-                
-                if insta_result.get('posts'):
-                    posts_str = insta_result['posts']
-                    try:
-                        # Nettoyer la chaîne et gérer les minuscules
-                        posts_clean = posts_str.strip().upper()
-                        if 'K' in posts_clean:
-                            posts_num = float(posts_clean.replace('K', '').replace(',', '.').replace(' ', '')) * 1000
-                            lead.nb_posts_instagram = int(posts_num)
-                        elif 'M' in posts_clean:
-                            posts_num = float(posts_clean.replace('M', '').replace(',', '.').replace(' ', '')) * 1000000
-                            lead.nb_posts_instagram = int(posts_num)
-                        else:
-                            # Essayer de convertir directement
-                            posts_clean = posts_str.replace(',', '').replace(' ', '')
-                            lead.nb_posts_instagram = int(posts_clean)
-                    except Exception as e:
-                        logger.warning(f"Erreur conversion posts Instagram: {str(e)}")
-                        # Essayer une conversion plus robuste
-                        try:
-                            import re
-                            # Extraire les chiffres avec regex
-                            numbers = re.findall(r'\d+(?:\.\d+)?', posts_str)
-                            if numbers:
-                                if 'k' in posts_str.lower():
-                                    lead.nb_posts_instagram = int(float(numbers[0]) * 1000)
-                                elif 'm' in posts_str.lower():
-                                    lead.nb_posts_instagram = int(float(numbers[0]) * 1000000)
-                                else:
-                                    lead.nb_posts_instagram = int(float(numbers[0]))
-                                logger.info(f"✅ Conversion posts Instagram réussie avec regex: {lead.nb_posts_instagram}")
-                        except Exception as e2:
-                            logger.warning(f"Échec conversion posts Instagram avec regex: {str(e2)}")
-                
-                # Stocker la bio Instagram
-                if insta_result.get('bio'):
-                    lead.bio_instagram = insta_result['bio']
-                elif insta_result.get('description'):
-                    lead.bio_instagram = insta_result['description']
-                
-                # Stocker les informations de contact Instagram
-                if insta_result.get('contact_info') and isinstance(insta_result['contact_info'], dict):
-                    contact = insta_result['contact_info']
-                    if contact.get('phone') and contact['phone'] != 'Non visible':
-                        lead.instagram_telephone = contact['phone']
-                    if contact.get('email') and contact['email'] != 'Non visible':
-                        lead.instagram_email = contact['email']
-                    if contact.get('address') and contact['address'] != 'Non visible':
-                        lead.instagram_adresse = contact['address']
-                    if contact.get('website') and contact['website'] != 'Non visible':
-                        lead.instagram_site_web = contact['website']
-                
-                # Créer une chaîne de statistiques pour l'affichage
-                stats_parts = []
-                if insta_result.get('followers'):
-                    stats_parts.append(f"{insta_result['followers']} followers")
-                if insta_result.get('posts'):
-                    stats_parts.append(f"{insta_result['posts']} posts")
-                if stats_parts:
-                    lead.instagram_stats = " • ".join(stats_parts)
+            for platform in vision_platforms:
+                result = self._analyze_screenshot(lead, platform, screenshots[f'{platform}_screenshot'], logger)
+                record_value(f"social.vision_hit.{platform}", 1 if result.get('followers') else 0)
+                # Compteurs partiels lus dans la page : préférés à la lecture de l'image
+                dom_counts = {field: value for field, value in (screenshots.get(f'{platform}_metrics') or {}).items()
+                              if field in ('followers', 'following', 'posts', 'likes')}
+                result = dict(result, **dom_counts)
+                ai_results[f'{platform}_data'] = result
+                self._apply_social_result(lead, platform, result, logger)
+            
+            ai_results['analysis_success'] = any(
+                data.get('analysis_success') or data.get('source') == 'dom'
+                for key, data in ai_results.items() if key.endswith('_data'))
             
             # Traiter les résultats Facebook et Instagram (données déjà traitées dans les sections précédentes)
             if ai_results.get('facebook_data'):
@@ -841,15 +902,214 @@ class ScrapingService:
                 lead.set_ai_status('erreur')
                 lead.update_ai_log("Erreur lors de l'analyse IA")
             
+            lead.mark_refreshed('social')
+            if vision_deferred:
+                # Après mark_refreshed : l'analyse Vision des captures reste en attente
+                run_budget.skip(lead, 'vision', logger)
             logger.info("[PIPELINE] Commit DB après social media.")
             db.session.commit()
             logger.info("Analyse IA des réseaux sociaux terminée avec succès")
+            return True
             
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse IA des réseaux sociaux: {str(e)}")
             lead.set_ai_status('erreur')
             lead.update_ai_log(f"Erreur: {str(e)}")
             db.session.commit()
+            return False
+    
+    def _analyze_screenshot(self, lead: Lead, platform: str, screenshot_path: str, logger: LeadLogger) -> Dict[str, Any]:
+        """
+        Analyse Vision d'une capture, sauf si l'en-tête du profil est inchangé depuis
+        la dernière analyse (empreinte dHash à VISION_HASH_THRESHOLD bits près) :
+        l'analyse précédente est alors réutilisée sans appel OpenAI, tant qu'elle est
+        plus récente que l'âge de rafraîchissement des réseaux sociaux
+        """
+        image_hash = screenshot_dhash(screenshot_path, platform) if Config.VISION_CHANGE_DETECTION_ENABLED else None
+        previous = lead.get_vision_fingerprint(platform)
+        if image_hash and previous and previous.get('analysis') and not is_bypassed():
+            distance = hash_distance(image_hash, previous.get('hash'))
+            age = datetime.utcnow() - datetime.fromisoformat(previous['analyzed_at'])
+            max_age = min(Config.VISION_REUSE_MAX_AGE_DAYS, Config.REFRESH_MAX_AGE_DAYS['social'])
+            if distance is not None and distance <= Config.VISION_HASH_THRESHOLD and age.days < max_age:
+                logger.info(f"♻️ [VISION] Capture {platform} inchangée ({distance} bit(s) d'écart), analyse du "
+                            f"{previous['analyzed_at'][:10]} réutilisée")
+                record_value('vision.reused', 1)
+                return dict(previous['analysis'], analysis_success=True)
+        
+        record_value('vision.reused', 0)
+        result = self.ai_analysis_service.analyze_social_media_screenshots(screenshot_path, platform)
+        if image_hash and result.get('analysis_success'):
+            lead.set_vision_fingerprint(platform, image_hash, result)
+        return result
+    
+    def _apply_social_result(self, lead: Lead, platform: str, result: Dict[str, Any], logger: LeadLogger):
+        """Reporter sur le lead le résultat d'une plateforme (Vision ou compteurs lus dans la page)"""
+        if platform == 'facebook':
+            self._apply_facebook_analysis(lead, result, logger)
+        else:
+            self._apply_instagram_analysis(lead, result, logger)
+    
+    def _apply_count(self, lead: Lead, field: str, value: Any, label: str, logger: LeadLogger):
+        """Reporter un compteur affiché ("1,2K", "12 345"...) sur le lead"""
+        count = parse_social_count(value)
+        if count is None:
+            logger.warning(f"Erreur conversion {label}: {value!r}")
+            return
+        setattr(lead, field, count)
+    
+    def _apply_facebook_analysis(self, lead: Lead, fb_result: Dict[str, Any], logger: LeadLogger):
+        """Reporter sur le lead l'analyse Vision d'une capture Facebook ou les compteurs lus dans la page"""
+        # Stocker les données Facebook dans les champs appropriés
+        if fb_result.get('followers'):
+            self._apply_count(lead, 'nb_followers_facebook', fb_result['followers'], 'followers Facebook', logger)
+        
+        if fb_result.get('likes') and fb_result['likes'] != 'Non visible':
+            self._apply_count(lead, 'nb_likes_facebook', fb_result['likes'], 'likes Facebook', logger)
+        
+        # Stocker l'intro Facebook (informations complètes)
+        if fb_result.get('intro'):
+            lead.intro_facebook = fb_result['intro']
+        elif fb_result.get('description'):
+            lead.description_facebook = fb_result['description']
+        
+        # Stocker les informations de contact Facebook
+        if fb_result.get('contact_info') and isinstance(fb_result['contact_info'], dict):
+            contact = fb_result['contact_info']
+            if contact.get('phone') and contact['phone'] != 'Non visible':
+                lead.facebook_telephone = contact['phone']
+            if contact.get('email') and contact['email'] != 'Non visible':
+                lead.facebook_email = contact['email']
+            if contact.get('address') and contact['address'] != 'Non visible':
+                lead.facebook_adresse = contact['address']
+            if contact.get('website') and contact['website'] != 'Non visible':
+                lead.facebook_site_web = contact['website']
+        
+        # Créer une chaîne de statistiques pour l'affichage
+        stats_parts = []
+        if fb_result.get('followers'):
+            stats_parts.append(f"{fb_result['followers']} followers")
+        if fb_result.get('likes') and fb_result['likes'] != 'Non visible':
+            stats_parts.append(f"{fb_result['likes']} likes")
+        if stats_parts:
+            lead.facebook_stats = " • ".join(stats_parts)
+    
+    def _apply_instagram_analysis(self, lead: Lead, insta_result: Dict[str, Any], logger: LeadLogger):
+        """Reporter sur le lead l'analyse Vision d'une capture Instagram ou les compteurs lus dans la page"""
+        # Stocker les données Instagram dans les champs appropriés
+        if insta_result.get('followers'):
+            self._apply_count(lead, 'nb_followers_instagram', insta_result['followers'], 'followers Instagram', logger)
+        
+        # Traiter le following Instagram
+        if insta_result.get('following'):
+            self._apply_count(lead, 'nb_following_instagram', insta_result['following'], 'following Instagram', logger)
+        
+        if insta_result.get('posts'):
+            self._apply_count(lead, 'nb_posts_instagram', insta_result['posts'], 'posts Instagram', logger)
+        
+        # Stocker la bio Instagram
+        if insta_result.get('bio'):
+            lead.bio_instagram = insta_result['bio']
+        elif insta_result.get('description'):
+            lead.bio_instagram = insta_result['description']
+        
+        # Stocker les informations de contact Instagram
+        if insta_result.get('contact_info') and isinstance(insta_result['contact_info'], dict):
+            contact = insta_result['contact_info']
+            if contact.get('phone') and contact['phone'] != 'Non visible':
+                lead.instagram_telephone = contact['phone']
+            if contact.get('email') and contact['email'] != 'Non visible':
+                lead.instagram_email = contact['email']
+            if contact.get('address') and contact['address'] != 'Non visible':
+                lead.instagram_adresse = contact['address']
+            if contact.get('website') and contact['website'] != 'Non visible':
+                lead.instagram_site_web = contact['website']
+        
+        # Créer une chaîne de statistiques pour l'affichage
+        stats_parts = []
+        if insta_result.get('followers'):
+            stats_parts.append(f"{insta_result['followers']} followers")
+        if insta_result.get('posts'):
+            stats_parts.append(f"{insta_result['posts']} posts")
+        if stats_parts:
+            lead.instagram_stats = " • ".join(stats_parts)
+    
+    def refresh_google_maps_data(self, lead: Lead, logger: LeadLogger) -> bool:
+        """
+        Rafraîchir la note, le nombre d'avis et les coordonnées Google Maps d'un lead existant
+        
+        Un seul appel Place Details, limité aux champs qui évoluent.
+        """
+        if not lead.place_id:
+            logger.warning("⚠️ [REFRESH] Pas de place_id, rafraîchissement Google Maps impossible")
+            return False
+        
+        details = self.google_maps_service._get_place_details(
+            lead.place_id,
+            fields=['rating', 'user_ratings_total', 'formatted_phone_number', 'website', 'formatted_address']
+        )
+        if not details:
+            logger.error(f"❌ [REFRESH] Détails Google Maps indisponibles pour {lead.place_id}")
+            return False
+        
+        if details.get('rating') is not None:
+            lead.note_google = details['rating']
+        if details.get('user_ratings_total') is not None:
+            lead.nb_avis_google = details['user_ratings_total']
+        if details.get('formatted_phone_number'):
+            lead.google_maps_telephone = details['formatted_phone_number']
+        if details.get('formatted_address'):
+            lead.google_maps_adresse = details['formatted_address']
+        if details.get('website') and details['website'] != lead.site_web:
+            logger.info(f"🌐 [REFRESH] Nouveau site web: {details['website']}")
+            lead.site_web = details['website']
+        
+        lead.mark_refreshed('google_maps')
+        lead.update_log("google_maps_refreshed: OK")
+        db.session.commit()
+        logger.info(f"✅ [REFRESH] Google Maps rafraîchi: note {lead.note_google}, {lead.nb_avis_google} avis")
+        return True
+    
+    def refresh_lead(self, lead: Lead, stages: List[str], force: bool = False) -> Dict[str, bool]:
+        """
+        Relancer uniquement les étapes demandées (google_maps, site_web, social) pour un lead
+        
+        Args:
+            force: Réanalyse forcée (réponses OpenAI en cache ignorées)
+        
+        Returns:
+            Résultat par étape
+        """
+        lead_logger = LeadLogger(lead.id, lead.nom)
+        lead_logger.info(f"🔄 [REFRESH] Étapes à rafraîchir: {', '.join(stages)}")
+        results = {}
+        
+        for stage in stages:
+            try:
+                with llm_context(lead_id=lead.id), (llm_cache_bypass() if force else nullcontext()):
+                    if stage == 'google_maps':
+                        results[stage] = self.refresh_google_maps_data(lead, lead_logger)
+                    elif stage == 'site_web':
+                        results[stage] = self._scrape_website(lead, lead_logger)
+                    elif stage == 'social':
+                        results[stage] = self._scrape_social_media(lead, lead_logger)
+                    else:
+                        lead_logger.warning(f"⚠️ [REFRESH] Étape inconnue: {stage}")
+                        results[stage] = False
+            except Exception as e:
+                lead_logger.error(f"❌ [REFRESH] Erreur étape {stage}: {str(e)}")
+                db.session.rollback()
+                results[stage] = False
+        
+        # Le score dépend des données rafraîchies
+        try:
+            lead.score_opportunite = self._calculate_opportunity_score(lead)
+            db.session.commit()
+        except Exception as e:
+            lead_logger.error(f"❌ [REFRESH] Erreur recalcul du score: {str(e)}")
+            db.session.rollback()
+        
+        return results
     
     def _calculate_opportunity_score(self, lead: Lead) -> float:
         """
@@ -966,7 +1226,7 @@ class ScrapingService:
     
     def get_business_types(self) -> List[str]:
         """Récupérer les types d'entreprises disponibles"""
-        return self.google_maps_service.get_business_types()
+        return list(BUSINESS_TYPES)
     
     def _is_valid_facebook_page(self, url: str) -> bool:
         """Vérifie si l'URL Facebook est une page publique (pas un partage, post, event, etc.)"""
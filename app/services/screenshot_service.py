@@ -4,12 +4,34 @@ Service de capture d'écran des réseaux sociaux avec Playwright
 
 import os
 import time
+import threading
 from pathlib import Path
 from typing import Optional, Dict, Any
 from playwright.sync_api import sync_playwright, Browser, Page
 from app.utils.logger import SystemLogger
+from app.utils.pipeline_metrics import record_value
+from app.scrapers.social_metrics import extract_profile_metrics, missing_metrics
 from app.config import Config
 
+# En-tête affiché une fois le profil chargé
+PROFILE_SELECTORS = {'facebook': 'h1', 'instagram': 'header'}
+# Zone dont le texte accessible porte les compteurs (repli des balises meta)
+HEADER_SELECTORS = {'facebook': '[role="main"]', 'instagram': 'header'}
+MAX_HEADER_CHARS = 3000
+
+# Balises meta et texte de l'en-tête, lus en un seul aller-retour avec le navigateur
+PAGE_SIGNALS_SCRIPT = """(selector) => {
+    const meta = {};
+    for (const element of document.querySelectorAll('meta[property], meta[name]')) {
+        const key = (element.getAttribute('property') || element.getAttribute('name') || '').toLowerCase();
+        if (['og:title', 'og:description', 'description'].includes(key) && !meta[key]) {
+            meta[key] = element.getAttribute('content') || '';
+        }
+    }
+    const header = document.querySelector(selector);
+    return {meta: meta, header: header ? header.innerText.slice(0, %d) : ''};
+}""" % MAX_HEADER_CHARS
+
 class ScreenshotService:
     """Service de capture d'écran des réseaux sociaux"""
     
@@ -18,6 +40,9 @@ class ScreenshotService:
         self.screenshots_dir.mkdir(exist_ok=True)
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
+        # Instance partagée entre requêtes : un seul navigateur à la fois
+        self._lock = threading.Lock()
+        self._cookies_loaded = set()
         
         # Chemins des cookies
         self.facebook_cookies_path = 'fb_cookies.pkl'
@@ -40,6 +65,7 @@ class ScreenshotService:
         )
         if self.browser:
             self.page = self.browser.new_page()
+        self._cookies_loaded = set()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -132,32 +158,19 @@ class ScreenshotService:
             SystemLogger.error(f"Erreur capture Instagram {instagram_url}: {str(e)}")
             return None
     
-    def capture_instagram_profile_zoom(self, instagram_url: str, lead_id: int) -> Optional[str]:
+    def capture_instagram_profile_zoom(self, instagram_url: str, lead_id: int, navigate: bool = True) -> Optional[str]:
         """
         Capture d'écran d'un profil Instagram avec session - format optimisé pour centrer le contenu
+
+        navigate=False : le profil est déjà ouvert (lecture des compteurs par open_profile)
         """
         try:
             if not self.page:
                 SystemLogger.error("Page non initialisée")
                 return None
             SystemLogger.info(f"Capture d'écran Instagram optimisée: {instagram_url}")
-            # Aller d'abord sur Instagram pour charger les cookies
-            self.page.goto('https://www.instagram.com/', wait_until='networkidle', timeout=30000)
-            # Charger les cookies Instagram si disponibles
-            if self.load_selenium_cookies_to_playwright(self.instagram_cookies_path):
-                self.page.reload()
-                time.sleep(3)
-            # Naviguer vers le profil
-            self.page.goto(instagram_url, wait_until='networkidle', timeout=40000)
-            time.sleep(5)
-            # Attendre la présence de la bio ou du nombre de followers
-            try:
-                self.page.wait_for_selector('header', timeout=15000)
-                self.page.wait_for_selector('img[alt*="photo de profil"], img[alt*="profile photo"], img[alt*="Photo de profil"]', timeout=10000)
-            except Exception:
-                SystemLogger.warning("Header ou photo de profil Instagram non trouvé, continuation...")
-            # Attendre que le contenu soit chargé
-            time.sleep(3)
+            if navigate:
+                self.open_profile(instagram_url, 'instagram')
             
             # Viewport optimisé pour Instagram (plus étroit pour centrer le contenu)
             self.page.set_viewport_size({'width': 1200, 'height': 800})
@@ -169,7 +182,7 @@ class ScreenshotService:
             
             # Centrer le contenu en scrollant légèrement si nécessaire
             self.page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(1)
+            self._wait_for_render()
             
             # Capturer l'écran
             filename = f"instagram_lead_{lead_id}_{int(time.time())}.png"
@@ -231,31 +244,19 @@ class ScreenshotService:
             SystemLogger.error(f"Erreur capture Facebook {facebook_url}: {str(e)}")
             return None
     
-    def capture_facebook_profile_zoom(self, facebook_url: str, lead_id: int) -> Optional[str]:
+    def capture_facebook_profile_zoom(self, facebook_url: str, lead_id: int, navigate: bool = True) -> Optional[str]:
         """
-        Capture d'écran d'une page Facebook avec session - format horizontal zoom +25% (2400x1350), scroll 400px
+        Capture d'écran d'une page Facebook avec session - format horizontal zoom +25% (2400x1350), scroll 700px
+
+        navigate=False : la page est déjà ouverte (lecture des compteurs par open_profile)
         """
         try:
             if not self.page:
                 SystemLogger.error("Page non initialisée")
                 return None
             SystemLogger.info(f"Capture d'écran Facebook zoom +25%: {facebook_url}")
-            # Aller d'abord sur Facebook pour charger les cookies
-            self.page.goto('https://www.facebook.com/', wait_until='networkidle', timeout=30000)
-            # Charger les cookies Facebook si disponibles
-            if self.load_selenium_cookies_to_playwright(self.facebook_cookies_path):
-                self.page.reload()
-                time.sleep(3)
-            # Naviguer vers la page
-            self.page.goto(facebook_url, wait_until='networkidle', timeout=40000)
-            time.sleep(5)
-            # Attendre la présence du nom de la page ou du nombre de likes
-            try:
-                self.page.wait_for_selector('h1', timeout=15000)
-            except Exception:
-                SystemLogger.warning("Nom de la page Facebook non trouvé, continuation...")
-            # Attendre que le contenu soit chargé
-            time.sleep(3)
+            if navigate:
+                self.open_profile(facebook_url, 'facebook')
             # Viewport horizontal zoom +25% (2400x1350)
             self.page.set_viewport_size({'width': 2400, 'height': 1350})
             # Appliquer un zoom de 125% via le navigateur
@@ -263,10 +264,9 @@ class ScreenshotService:
             # Alternative avec transform scale
             self.page.evaluate("document.body.style.transform = 'scale(1.25)'")
             self.page.evaluate("document.body.style.transformOrigin = 'top left'")
-            time.sleep(2)
             # Scroll de 700px vers le bas
             self.page.evaluate("window.scrollTo(0, 700)")
-            time.sleep(1)
+            self._wait_for_render()
             # Capturer uniquement le viewport visible
             filename = f"facebook_lead_{lead_id}_{int(time.time())}.png"
             filepath = self.screenshots_dir / filename
@@ -280,46 +280,110 @@ class ScreenshotService:
             SystemLogger.error(f"Erreur capture Facebook zoom {facebook_url}: {str(e)}")
             return None
     
-    def capture_social_media(self, lead_data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    # ----- Compteurs lus dans la page -----
+    
+    def _load_cookies_once(self, platform: str):
+        """Cookies de session d'une plateforme, ajoutés au contexte avant la première navigation"""
+        if platform in self._cookies_loaded:
+            return
+        self._cookies_loaded.add(platform)
+        cookies_path = self.facebook_cookies_path if platform == 'facebook' else self.instagram_cookies_path
+        self.load_selenium_cookies_to_playwright(cookies_path)
+    
+    def open_profile(self, url: str, platform: str) -> bool:
+        """
+        Ouvrir un profil et attendre son en-tête (au plus SOCIAL_PAGE_TIMEOUT)
+        
+        Returns:
+            True si l'en-tête du profil est affiché
+        """
+        self._load_cookies_once(platform)
+        self.page.goto(url, wait_until='domcontentloaded', timeout=40000)
+        try:
+            self.page.wait_for_selector(PROFILE_SELECTORS[platform], timeout=Config.SOCIAL_PAGE_TIMEOUT)
+            return True
+        except Exception:
+            SystemLogger.warning(f"⚠️ [SOCIAL] En-tête du profil {platform} non trouvé, continuation...")
+            return False
+    
+    def read_profile_metrics(self, platform: str) -> Dict[str, Any]:
+        """Compteurs du profil ouvert : balises meta puis texte de l'en-tête"""
+        try:
+            page_data = self.page.evaluate(PAGE_SIGNALS_SCRIPT, HEADER_SELECTORS[platform])
+        except Exception as e:
+            SystemLogger.warning(f"⚠️ [SOCIAL] Lecture de la page {platform} impossible: {str(e)}")
+            return {}
+        return extract_profile_metrics(platform, page_data.get('meta') or {}, page_data.get('header') or '')
+    
+    def _wait_for_render(self):
+        """Attendre la fin des chargements (au plus SOCIAL_NETWORKIDLE_TIMEOUT) puis l'affichage du zoom et du scroll"""
+        try:
+            self.page.wait_for_load_state('networkidle', timeout=Config.SOCIAL_NETWORKIDLE_TIMEOUT)
+        except Exception:
+            pass  # flux continus (vidéos, messagerie) : la page ne devient jamais inactive
+        self.page.evaluate("() => new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)))")
+    
+    def _capture_platform(self, platform: str, url: str, lead_id: int, dom_first: bool, result: Dict[str, Any],
+                          profile_known: bool = False):
+        """Compteurs et texte du profil lus dans la page, puis capture seulement s'il en manque"""
+        self.open_profile(url, platform)
+        if dom_first:
+            metrics = self.read_profile_metrics(platform)
+            missing = missing_metrics(platform, metrics, profile_known)
+            record_value(f"social.dom_hit.{platform}", 0 if missing else 1)
+            if not missing:
+                SystemLogger.info(f"📊 [SOCIAL] Compteurs {platform} lus dans la page, capture inutile: {metrics}")
+                result[f'{platform}_metrics'] = metrics
+                return
+            SystemLogger.info(f"📸 [SOCIAL] Compteurs {platform} absents de la page ({', '.join(missing)}), capture pour Vision")
+            if metrics:
+                result[f'{platform}_metrics'] = metrics
+        capture = self.capture_facebook_profile_zoom if platform == 'facebook' else self.capture_instagram_profile_zoom
+        result[f'{platform}_screenshot'] = capture(url, lead_id, navigate=False)
+    
+    def capture_social_media(self, lead_data: Dict[str, Any], dom_first: Optional[bool] = None) -> Dict[str, Any]:
         """
-        Capture d'écran des réseaux sociaux d'un lead avec zoom +25% et scroll optimisé
+        Compteurs et captures d'écran des réseaux sociaux d'un lead
+        
+        Les compteurs (abonnés, abonnements, publications, J'aime) et le texte du
+        profil sont d'abord lus dans la page ; la capture (zoom +25%, scroll optimisé)
+        n'est faite que s'il manque un champ requis (SOCIAL_DOM_REQUIRED_FIELDS), ou
+        le texte du profil tant que le lead n'en a pas.
         
         Args:
-            lead_data: Données du lead avec facebook_url et instagram_url
+            lead_data: Données du lead avec facebook_url et instagram_url, et
+                facebook_profile / instagram_profile (texte du profil déjà connu)
+            dom_first: lire les compteurs avant de capturer (défaut : SOCIAL_DOM_FIRST_ENABLED) ;
+                False pour toujours capturer
             
         Returns:
-            Dictionnaire avec les chemins des captures d'écran
+            Dictionnaire avec les chemins des captures d'écran (facebook_screenshot,
+            instagram_screenshot) et les compteurs lus dans la page (facebook_metrics,
+            instagram_metrics)
         """
-        result: Dict[str, Optional[str]] = {
+        if dom_first is None:
+            dom_first = Config.SOCIAL_DOM_FIRST_ENABLED
+        result: Dict[str, Any] = {
             'facebook_screenshot': None,
-            'instagram_screenshot': None
+            'instagram_screenshot': None,
+            'facebook_metrics': None,
+            'instagram_metrics': None
         }
         
         try:
-            with self as screenshot_service:
-                # Capture Facebook avec zoom +25% et scroll 700px
-                if lead_data.get('facebook_url'):
-                    facebook_url = lead_data['facebook_url']
-                    # Validation de l'URL Facebook
-                    if self._is_valid_social_media_url(facebook_url, 'facebook'):
-                        result['facebook_screenshot'] = screenshot_service.capture_facebook_profile_zoom(
-                            facebook_url, 
-                            lead_data['id']
-                        )
-                    else:
-                        SystemLogger.warning(f"⚠️ URL Facebook invalide ignorée: {facebook_url}")
-                
-                # Capture Instagram avec zoom +25%
-                if lead_data.get('instagram_url'):
-                    instagram_url = lead_data['instagram_url']
-                    # Validation de l'URL Instagram
-                    if self._is_valid_social_media_url(instagram_url, 'instagram'):
-                        result['instagram_screenshot'] = screenshot_service.capture_instagram_profile_zoom(
-                            instagram_url, 
-                            lead_data['id']
-                        )
-                    else:
-                        SystemLogger.warning(f"⚠️ URL Instagram invalide ignorée: {instagram_url}")
+            with self._lock, self as screenshot_service:
+                for platform in ('facebook', 'instagram'):
+                    url = lead_data.get(f'{platform}_url')
+                    if not url:
+                        continue
+                    if not self._is_valid_social_media_url(url, platform):
+                        SystemLogger.warning(f"⚠️ URL {platform.capitalize()} invalide ignorée: {url}")
+                        continue
+                    try:
+                        screenshot_service._capture_platform(platform, url, lead_data['id'], dom_first, result,
+                                                               bool(lead_data.get(f'{platform}_profile')))
+                    except Exception as e:
+                        SystemLogger.error(f"Erreur capture {platform} {url}: {str(e)}")
                     
         except Exception as e:
             SystemLogger.error(f"Erreur lors de la capture des réseaux sociaux: {str(e)}")
@@ -0,0 +1,63 @@
+"""
+Registre des services partagés par le processus
+
+Les services coûteux à construire (client Google Maps, scraper web, service IA,
+service de captures, service de scraping) sont créés une seule fois, à la première
+demande, puis partagés entre les requêtes. Les routes en lecture seule n'en ont
+pas besoin et interrogent directement la base.
+"""
+
+import threading
+from typing import Dict, Any, Callable
+from app.utils.logger import SystemLogger
+
+_services: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Obtenir un service partagé, en le créant à la première demande
+
+    Un échec de création n'est pas mémorisé : la demande suivante réessaie.
+    """
+    service = _services.get(name)
+    if service is not None:
+        return service
+
+    with _lock:
+        service = _services.get(name)
+        if service is None:
+            SystemLogger.info(f"🧩 [REGISTRY] Création du service partagé: {name}")
+            service = factory()
+            _services[name] = service
+    return service
+
+def get_google_maps_service():
+    """Scraper Google Maps partagé (client googlemaps)"""
+    from app.scrapers.google_maps_v2_continuous import GoogleMapsScraperV2Continuous
+    return _get_or_create('google_maps', GoogleMapsScraperV2Continuous)
+
+def get_ai_analysis_service():
+    """Service d'analyse IA partagé"""
+    from app.services.ai_analysis_service import AIAnalysisService
+    return _get_or_create('ai_analysis', AIAnalysisService)
+
+def get_website_scraper():
+    """Scraper de sites web partagé (utilise le service IA partagé)"""
+    from app.scrapers.scrapy_spider_improved import ScrapyWebsiteScraperImproved
+    return _get_or_create('website_scraper', lambda: ScrapyWebsiteScraperImproved(ai_service=get_ai_analysis_service()))
+
+def get_screenshot_service():
+    """Service de captures d'écran partagé (les captures sont sérialisées)"""
+    from app.services.screenshot_service import ScreenshotService
+    return _get_or_create('screenshot', ScreenshotService)
+
+def get_scraping_service():
+    """Service de scraping partagé"""
+    from app.services.scraping_service import ScrapingService
+    return _get_or_create('scraping', ScrapingService)
+
+def reset_services():
+    """Oublier les services créés (rechargement de configuration)"""
+    with _lock:
+        _services.clear()
@@ -0,0 +1,162 @@
+"""
+Analyse partagée des sites web référencés par plusieurs leads
+
+Les chaînes et franchises indiquent souvent le même site pour toutes leurs
+adresses, et de nombreux leads pointent vers la même page Linktree, TheFork ou
+Facebook. L'analyse d'un site est enregistrée sous son URL canonique
+(WebsiteAnalysis) : les leads suivants la réutilisent sans nouveau
+téléchargement ni appel OpenAI, en ne reprenant que les champs indépendants de
+l'établissement (description, services, réseaux sociaux...). Les coordonnées et
+horaires, propres à chaque adresse, ne sont pas copiés.
+
+Les analyses simultanées d'un même site (scrapings parallèles, rafraîchissement
+en arrière-plan) sont regroupées : un seul lead télécharge et analyse, les
+autres attendent son résultat.
+"""
+
+import copy
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+from app.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger('website_dedup')
+
+TRACKING_PREFIXES = ('utm_', 'mc_')
+TRACKING_PARAMS = {'fbclid', 'gclid', 'msclkid', 'ref', 'hl'}
+INDEX_PAGES = ('index.html', 'index.htm', 'index.php', 'accueil', 'home')
+
+# Champs propres à chaque établissement : jamais copiés depuis une analyse partagée
+BRANCH_FIELDS = {
+    'contact': {'emails': [], 'telephones': [], 'adresse': ''},
+    'pratique': {'horaires': ''},
+}
+SHARED_SIGNAL_FIELDS = ('social_media',)
+
+def website_key(url: str) -> Optional[str]:
+    """
+    URL canonique d'un site : schéma, www, page d'index, paramètres de suivi et
+    ancre ignorés. Une page d'accueil est identifiée par son hôte seul ; les
+    sous-domaines restent distincts (sites hébergés sur wixsite.com, etc.).
+    """
+    if not url:
+        return None
+    parsed = urlparse(url.strip() if '://' in url else f"http://{url.strip()}")
+    host = (parsed.hostname or '').lower()
+    if not host:
+        return None
+    if host.startswith('www.'):
+        host = host[4:]
+
+    path = parsed.path.rstrip('/')
+    last = path.rsplit('/', 1)[-1].lower()
+    if last in INDEX_PAGES:
+        path = path[:-len(last)].rstrip('/')
+    query = urlencode(sorted((name, value) for name, value in parse_qsl(parsed.query)
+                             if not name.lower().startswith(TRACKING_PREFIXES) and name.lower() not in TRACKING_PARAMS))
+    return host + path + (f"?{query}" if query else '')
+
+def shared_entry(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Données réutilisables d'un résultat de scrape_website_with_ai (champs de WebsiteAnalysis)
+
+    Returns:
+        None si le site n'a pas été analysé (échec, page inchangée sans nouvelle analyse)
+    """
+    if not result:
+        return None
+    if result.get('rejected'):
+        return {'ai_analysis': None, 'site_signals': None, 'analysis_mode': None, 'html_size': None,
+                'site_web_statut': 'non_html'}
+    if not result.get('scraping_success') or not result.get('ai_analysis'):
+        return None
+    return {
+        'ai_analysis': result['ai_analysis'],
+        'site_signals': result.get('site_signals'),
+        'analysis_mode': result.get('analysis_mode'),
+        'html_size': result.get('html_size'),
+        'site_web_statut': 'tronque' if result.get('truncated') else 'ok'
+    }
+
+def branch_independent(ai_analysis: Optional[Dict[str, Any]], site_signals: Optional[Dict[str, Any]],
+                       key: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Copie d'une analyse partagée sans les champs propres à un établissement
+
+    Returns:
+        (analyse IA, signaux du site) à appliquer au lead
+    """
+    analysis = copy.deepcopy(ai_analysis or {})
+    for section, fields in BRANCH_FIELDS.items():
+        if isinstance(analysis.get(section), dict):
+            analysis[section].update(copy.deepcopy(fields))
+    analysis['analyse_partagee'] = key
+    signals = {field: copy.deepcopy((site_signals or {}).get(field)) for field in SHARED_SIGNAL_FIELDS}
+    return analysis, signals
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Regroupe les appels simultanés pour une même clé : un seul s'exécute, les autres reçoivent son résultat"""
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        self.wait_timeout = wait_timeout or Config.WEBSITE_DEDUP_WAIT_TIMEOUT
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {'leaders': 0, 'shared': 0, 'timeouts': 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Exécuter fn, ou attendre l'exécution déjà en cours pour la même clé
+
+        Returns:
+            (résultat, partagé) ; partagé vaut True si le résultat vient d'un autre appel
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats['leaders'] += 1
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            if flight.done.wait(self.wait_timeout):
+                self.stats['shared'] += 1
+                return flight.result, True
+            # Analyse en cours trop longue : ce lead fait la sienne
+            self.stats['timeouts'] += 1
+            logger.warning(f"⏱️ [DEDUP] Attente dépassée pour {key}, analyse indépendante")
+            return fn(), False
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        """Nombre d'analyses en cours"""
+        with self._lock:
+            return len(self._flights)
+
+# Instance partagée par le processus
+_flights: Optional[SingleFlight] = None
+_flights_lock = threading.Lock()
+
+def get_website_flights() -> SingleFlight:
+    """Obtenir le regroupement des analyses de sites partagé (créé à la première demande)"""
+    global _flights
+    with _flights_lock:
+        if _flights is None:
+            _flights = SingleFlight()
+    return _flights
@@ -0,0 +1,284 @@
+"""
+Cache disque du HTML des sites des leads
+
+Les pages sont stockées par empreinte de contenu (SHA-256), avec un index par URL
+qui conserve ETag et Last-Modified. Au passage suivant, la page est revalidée par
+une requête conditionnelle : une réponse 304, ou un corps identique, est signalée
+comme « inchangée » pour que l'analyse IA puisse être évitée.
+
+Éviction par âge (HTML_CACHE_MAX_AGE_DAYS) et par taille totale (HTML_CACHE_MAX_SIZE_MB).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from app.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger('html_cache')
+
+# Éviction déclenchée toutes les N écritures
+EVICTION_INTERVAL = 50
+
+class HtmlCache:
+    """Cache HTML adressé par contenu, avec revalidation conditionnelle"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_age_days: Optional[float] = None,
+                 max_size_mb: Optional[float] = None):
+        self.cache_dir = cache_dir or Config.HTML_CACHE_DIR
+        self.max_age_seconds = (max_age_days or Config.HTML_CACHE_MAX_AGE_DAYS) * 86400
+        self.max_bytes = int((max_size_mb or Config.HTML_CACHE_MAX_SIZE_MB) * 1024 * 1024)
+
+        self.index_dir = os.path.join(self.cache_dir, 'index')
+        self.bodies_dir = os.path.join(self.cache_dir, 'bodies')
+        os.makedirs(self.index_dir, exist_ok=True)
+        os.makedirs(self.bodies_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._writes = 0
+        self.stats = {'hits_unchanged': 0, 'changed': 0, 'misses': 0, 'errors': 0}
+
+    # ----- Stockage -----
+
+    @staticmethod
+    def body_hash(html: str) -> str:
+        """Empreinte du contenu"""
+        return hashlib.sha256(html.encode('utf-8', errors='ignore')).hexdigest()
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.index_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.bodies_dir, body_hash + '.html')
+
+    @staticmethod
+    def _write_atomic(path: str, content: str):
+        """Écrire un fichier sans laisser de version partielle"""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def get_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """Entrée d'index d'une URL (None si absente, expirée ou corps manquant)"""
+        path = self._index_path(url)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+            if time.time() - entry.get('stored_at', 0) > self.max_age_seconds:
+                self._remove_entry(path)
+                return None
+            if not os.path.exists(self._body_path(entry['body_hash'])):
+                self._remove_entry(path)
+                return None
+            return entry
+
+    def read_body(self, entry: Dict[str, Any]) -> Optional[str]:
+        """HTML stocké pour une entrée"""
+        try:
+            with open(self._body_path(entry['body_hash']), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, html: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+              truncated: bool = False) -> Dict[str, Any]:
+        """Enregistrer une page et ses validateurs (truncated : page réduite à son début et sa fin)"""
+        body_hash = self.body_hash(html)
+        now = time.time()
+        entry = {
+            'url': url,
+            'body_hash': body_hash,
+            'size': len(html.encode('utf-8', errors='ignore')),
+            'etag': etag,
+            'last_modified': last_modified,
+            'truncated': truncated,
+            'stored_at': now,
+            'validated_at': now
+        }
+        with self._lock:
+            body_path = self._body_path(body_hash)
+            if not os.path.exists(body_path):
+                self._write_atomic(body_path, html)
+            self._write_atomic(self._index_path(url), json.dumps(entry))
+
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self.evict()
+        return entry
+
+    def touch(self, url: str, entry: Dict[str, Any], etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Marquer une entrée comme revalidée (validateurs éventuellement renouvelés)"""
+        entry = dict(entry)
+        entry['validated_at'] = time.time()
+        entry['stored_at'] = entry['validated_at']
+        if etag:
+            entry['etag'] = etag
+        if last_modified:
+            entry['last_modified'] = last_modified
+        with self._lock:
+            self._write_atomic(self._index_path(url), json.dumps(entry))
+
+    def _remove_entry(self, index_path: str):
+        try:
+            os.remove(index_path)
+        except OSError:
+            pass
+
+    # ----- Éviction -----
+
+    def evict(self) -> Dict[str, int]:
+        """
+        Supprimer les entrées trop anciennes, puis les plus anciennes jusqu'à
+        repasser sous la taille maximale, et enfin les corps orphelins
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            removed_entries = 0
+            for name in os.listdir(self.index_dir):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.index_dir, name)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    self._remove_entry(path)
+                    removed_entries += 1
+                    continue
+                if now - entry.get('stored_at', 0) > self.max_age_seconds:
+                    self._remove_entry(path)
+                    removed_entries += 1
+                    continue
+                entries.append((entry.get('validated_at', 0), path, entry))
+
+            # Taille des corps encore référencés (un corps peut être partagé par plusieurs URLs)
+            sizes: Dict[str, int] = {}
+            references: Dict[str, int] = {}
+            for _, _, entry in entries:
+                sizes[entry['body_hash']] = entry.get('size', 0)
+                references[entry['body_hash']] = references.get(entry['body_hash'], 0) + 1
+            total = sum(sizes.values())
+
+            entries.sort(key=lambda e: e[0])
+            for _, path, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove_entry(path)
+                removed_entries += 1
+                body_hash = entry['body_hash']
+                references[body_hash] -= 1
+                if references[body_hash] == 0:
+                    total -= sizes.pop(body_hash)
+
+            removed_bodies = 0
+            for name in os.listdir(self.bodies_dir):
+                if name.endswith('.html') and name[:-5] not in sizes:
+                    try:
+                        os.remove(os.path.join(self.bodies_dir, name))
+                        removed_bodies += 1
+                    except OSError:
+                        pass
+
+        if removed_entries or removed_bodies:
+            logger.info(f"🧹 [HTML CACHE] Éviction: {removed_entries} entrées, {removed_bodies} pages supprimées")
+        return {'entries_removed': removed_entries, 'bodies_removed': removed_bodies, 'total_bytes': total}
+
+    # ----- Récupération -----
+
+    def _count(self, name: str):
+        """Incrémenter un compteur (fetch est appelé depuis plusieurs threads)"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Compteurs du cache (part des pages récupérées inchangées depuis la dernière visite)"""
+        with self._lock:
+            stats = dict(self.stats)
+        fetched = stats['hits_unchanged'] + stats['changed'] + stats['misses']
+        return dict(stats, unchanged_rate=round(stats['hits_unchanged'] / fetched, 3) if fetched else None)
+
+    def fetch(self, url: str, fetcher, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Récupérer une page via le cache (requête conditionnelle si déjà connue)
+
+        Returns:
+            {'url', 'success', 'html', 'unchanged', 'cache_status', 'error', 'truncated', 'rejected', 'content_type'}
+            cache_status: 'miss', 'not_modified' (304), 'same_content' ou 'changed'
+            rejected / truncated : cf. HttpFetcher.fetch
+        """
+        entry = self.get_entry(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        fetched = fetcher.fetch(url, timeout=timeout, headers=headers or None)
+        result = {'url': url, 'success': False, 'html': None, 'unchanged': False, 'cache_status': 'miss', 'error': fetched['error'],
+                  'truncated': fetched.get('truncated', False), 'rejected': fetched.get('rejected'),
+                  'content_type': fetched.get('content_type')}
+        if not fetched['success']:
+            self._count('errors')
+            return result
+
+        response_headers = {k.lower(): v for k, v in fetched['headers'].items()}
+        etag = response_headers.get('etag')
+        last_modified = response_headers.get('last-modified')
+
+        if fetched['status_code'] == 304 and entry:
+            html = self.read_body(entry)
+            if html is not None:
+                self.touch(url, entry, etag, last_modified)
+                self._count('hits_unchanged')
+                logger.info(f"♻️ [HTML CACHE] {url} non modifié (304)")
+                result.update(success=True, html=html, unchanged=True, cache_status='not_modified',
+                              truncated=entry.get('truncated', False))
+                return result
+            # Corps perdu : récupérer la page sans condition
+            fetched = fetcher.fetch(url, timeout=timeout)
+            result.update(truncated=fetched.get('truncated', False), rejected=fetched.get('rejected'),
+                          content_type=fetched.get('content_type'))
+            if not fetched['success']:
+                self._count('errors')
+                result['error'] = fetched['error']
+                return result
+
+        html = fetched['text'] or ''
+        if entry and self.body_hash(html) == entry['body_hash']:
+            self.touch(url, entry, etag, last_modified)
+            self._count('hits_unchanged')
+            logger.info(f"♻️ [HTML CACHE] {url} identique au contenu en cache")
+            result.update(success=True, html=html, unchanged=True, cache_status='same_content')
+            return result
+
+        self.store(url, html, etag, last_modified, truncated=result['truncated'])
+        if entry:
+            self._count('changed')
+            result['cache_status'] = 'changed'
+        else:
+            self._count('misses')
+        result.update(success=True, html=html)
+        return result
+
+# Instance partagée par le processus
+_cache: Optional[HtmlCache] = None
+_cache_lock = threading.Lock()
+
+def get_html_cache() -> HtmlCache:
+    """Obtenir le cache HTML partagé (créé à la première demande)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HtmlCache()
+    return _cache
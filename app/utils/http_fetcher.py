@@ -0,0 +1,439 @@
+"""
+Couche de récupération HTTP partagée pour les sites des leads
+
+- pool de connexions (keep-alive, TLS réutilisé entre requêtes)
+- cache DNS avec durée de vie et taille bornée, limité aux connexions du
+  fetcher (adaptateur requests et transport httpx) : la résolution des autres
+  bibliothèques du processus (OpenAI, base de données, Playwright) est inchangée
+- HTTP/2 via httpx lorsqu'il est installé avec h2
+- limite de requêtes simultanées par hôte (sémaphores retirés quand l'hôte est inactif)
+- récupération de plusieurs sites en parallèle (fetch_many / submit)
+- lecture en flux : contenus non HTML rejetés dès les en-têtes, pages trop
+  volumineuses réduites à leur début et leur fin sans charger tout le corps
+"""
+
+import itertools
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+
+from app.config import Config
+from app.utils.logger import get_logger
+
+try:
+    import httpx
+    import httpcore
+    import h2  # noqa: F401  (requis par httpx pour HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    httpcore = None
+    HTTP2_AVAILABLE = False
+
+logger = get_logger('http_fetcher')
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',  # Pas de br pour éviter les problèmes
+    'Upgrade-Insecure-Requests': '1',
+}
+
+STREAM_CHUNK_SIZE = 16384
+TRUNCATION_MARKER = '\n<!-- [contenu tronqué: {skipped} octets omis] -->\n'
+
+# Signatures de fichiers binaires servis sans Content-Type
+BINARY_SIGNATURES = (b'%PDF', b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'PK\x03\x04', b'RIFF')
+
+# ----- Cache DNS -----
+
+_dns_cache: Dict[tuple, tuple] = {}
+_dns_lock = threading.Lock()
+
+def _evict_dns_entries(now: float):
+    """Retirer les entrées expirées puis, au-delà de HTTP_DNS_CACHE_MAX_ENTRIES, les plus anciennes (verrou tenu)"""
+    for key in [key for key, entry in _dns_cache.items() if entry[0] <= now]:
+        del _dns_cache[key]
+    overflow = len(_dns_cache) - Config.HTTP_DNS_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        # Ordre d'insertion du dict : les premières entrées sont les plus anciennes
+        for key in list(itertools.islice(_dns_cache, overflow)):
+            del _dns_cache[key]
+
+def cached_getaddrinfo(host, port, *args, **kwargs):
+    """getaddrinfo avec cache (durée de vie HTTP_DNS_CACHE_TTL, HTTP_DNS_CACHE_MAX_ENTRIES entrées au plus)"""
+    key = (host, port) + args + tuple(sorted(kwargs.items()))
+    now = time.time()
+    with _dns_lock:
+        entry = _dns_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+    result = socket.getaddrinfo(host, port, *args, **kwargs)
+    with _dns_lock:
+        _dns_cache.pop(key, None)
+        _dns_cache[key] = (now + Config.HTTP_DNS_CACHE_TTL, result)
+        if len(_dns_cache) > Config.HTTP_DNS_CACHE_MAX_ENTRIES:
+            _evict_dns_entries(now)
+    return result
+
+def resolve_host(host: str, port: int) -> List[str]:
+    """Adresses IP d'un hôte (cache DNS), dans l'ordre de getaddrinfo"""
+    infos = cached_getaddrinfo(host.strip('[]'), port, 0, socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+def clear_dns_cache():
+    """Vider le cache DNS"""
+    with _dns_lock:
+        _dns_cache.clear()
+
+class _CachedDnsConnectionMixin:
+    """Connexion urllib3 résolue par le cache DNS (le nom d'hôte reste utilisé pour SNI et le certificat)"""
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = resolve_host(host, self.port)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        last_error = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                last_error = e
+            finally:
+                self._dns_host = host
+        raise last_error or NewConnectionError(self, f"Aucune adresse pour {host}")
+
+class _CachedDnsHTTPConnection(_CachedDnsConnectionMixin, HTTPConnection):
+    pass
+
+class _CachedDnsHTTPSConnection(_CachedDnsConnectionMixin, HTTPSConnection):
+    pass
+
+class _CachedDnsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDnsHTTPConnection
+
+class _CachedDnsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDnsHTTPSConnection
+
+class CachedDnsAdapter(HTTPAdapter):
+    """Adaptateur requests dont les connexions passent par le cache DNS"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CachedDnsHTTPConnectionPool,
+            'https': _CachedDnsHTTPSConnectionPool
+        }
+
+if httpcore is not None:
+    class _CachedDnsBackend(httpcore.SyncBackend):
+        """Connexions TCP httpcore résolues par le cache DNS"""
+
+        def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+            try:
+                addresses = resolve_host(host, port)
+            except OSError as e:
+                raise httpcore.ConnectError(str(e)) from e
+            last_error = None
+            for address in addresses:
+                try:
+                    return super().connect_tcp(address, port, timeout, local_address, socket_options)
+                except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                    last_error = e
+            raise last_error or httpcore.ConnectError(f"Aucune adresse pour {host}")
+
+    class CachedDnsTransport(httpx.HTTPTransport):
+        """Transport httpx (HTTP/2) dont les connexions passent par le cache DNS"""
+
+        def __init__(self, limits: 'httpx.Limits', http2: bool = True):
+            super().__init__(http2=http2, limits=limits)
+            self._pool = httpcore.ConnectionPool(
+                ssl_context=httpx.create_ssl_context(),
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry,
+                http1=True,
+                http2=http2,
+                network_backend=_CachedDnsBackend()
+            )
+
+# ----- Lecture bornée -----
+
+def content_type_of(headers) -> str:
+    """Type MIME d'une réponse, sans paramètres (charset...)"""
+    return (headers.get('content-type') or '').split(';')[0].strip().lower()
+
+def looks_binary(first_bytes: bytes) -> bool:
+    """Début de corps d'un fichier binaire (PDF, image, archive)"""
+    return first_bytes.startswith(BINARY_SIGNATURES) or b'\x00' in first_bytes[:512]
+
+def read_bounded_body(chunks: Iterator[bytes], max_bytes: Optional[int] = None, head_bytes: Optional[int] = None,
+                      tail_bytes: Optional[int] = None, max_download: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Lire un corps en flux sans dépasser max_bytes en mémoire
+
+    Tant que le corps tient dans max_bytes il est conservé entier ; au-delà, seuls
+    le début (head_bytes) et une fin glissante (tail_bytes) sont gardés.
+
+    Returns:
+        {'head': début (ou corps entier), 'tail': fin (None si corps entier),
+         'total': octets lus, 'binary': corps binaire détecté, 'complete': lu jusqu'au bout}
+    """
+    max_bytes = max_bytes or Config.HTTP_MAX_BODY_BYTES
+    head_bytes = head_bytes or Config.HTTP_BODY_HEAD_BYTES
+    tail_bytes = tail_bytes or Config.HTTP_BODY_TAIL_BYTES
+    max_download = max_download or Config.HTTP_MAX_DOWNLOAD_BYTES
+
+    buffer = bytearray()
+    head: Optional[bytes] = None
+    total = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if total == 0 and looks_binary(chunk):
+            return {'head': b'', 'tail': None, 'total': len(chunk), 'binary': True, 'complete': False}
+        total += len(chunk)
+        buffer += chunk
+        if head is None and len(buffer) > max_bytes:
+            head = bytes(buffer[:head_bytes])
+            del buffer[:head_bytes]
+        if head is not None and len(buffer) > tail_bytes:
+            del buffer[:-tail_bytes]
+        if total >= max_download:
+            return {'head': head if head is not None else bytes(buffer), 'tail': bytes(buffer) if head is not None else None,
+                    'total': total, 'binary': False, 'complete': False}
+
+    if head is None:
+        return {'head': bytes(buffer), 'tail': None, 'total': total, 'binary': False, 'complete': True}
+    return {'head': head, 'tail': bytes(buffer), 'total': total, 'binary': False, 'complete': True}
+
+def _decode(data: bytes, encoding: Optional[str], errors: str = 'replace') -> str:
+    try:
+        return data.decode(encoding or 'utf-8', errors=errors)
+    except LookupError:
+        return data.decode('utf-8', errors=errors)
+
+# ----- Récupération -----
+
+class HttpFetcher:
+    """Client HTTP partagé avec pool de connexions et limites par hôte"""
+
+    def __init__(self, pool_size: Optional[int] = None, per_host_limit: Optional[int] = None,
+                 max_workers: Optional[int] = None, use_http2: Optional[bool] = None):
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.per_host_limit = per_host_limit or Config.HTTP_PER_HOST_LIMIT
+        self.max_workers = max_workers or Config.HTTP_MAX_WORKERS
+
+        # requests : pool par hôte, réutilisé entre threads
+        self._session = requests.Session()
+        adapter = CachedDnsAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=1)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._session.headers.update(DEFAULT_HEADERS)
+
+        # httpx : HTTP/2 multiplexé lorsque disponible
+        use_http2 = Config.HTTP2_ENABLED if use_http2 is None else use_http2
+        self._http2_client = None
+        if use_http2 and HTTP2_AVAILABLE:
+            self._http2_client = httpx.Client(
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                transport=CachedDnsTransport(
+                    limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                )
+            )
+            logger.info("✅ [FETCH] HTTP/2 activé (httpx)")
+
+        # Hôte → [sémaphore, requêtes en cours ou en attente]
+        self._host_slots: Dict[str, list] = {}
+        self._semaphores_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='http-fetch')
+
+    @contextmanager
+    def _host_semaphore(self, url: str):
+        """
+        Limiter les requêtes simultanées vers un même hôte
+
+        Le sémaphore d'un hôte est retiré dès qu'aucune requête ne l'utilise ni ne l'attend :
+        le dictionnaire ne garde que les hôtes actifs, même après des milliers de domaines.
+        """
+        host = urlparse(url).netloc.lower()
+        with self._semaphores_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = [threading.BoundedSemaphore(self.per_host_limit), 0]
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._semaphores_lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._host_slots[host]
+
+    def fetch(self, url: str, timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None,
+              content_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Récupérer une page
+
+        content_types: types MIME acceptés (HTTP_HTML_CONTENT_TYPES par défaut)
+
+        Returns:
+            {'url', 'success', 'status_code', 'final_url', 'text', 'headers', 'http_version', 'elapsed', 'error',
+             'content_type', 'body_bytes', 'truncated', 'rejected'}
+            rejected: 'content_type' ou 'binary' si la réponse n'est pas une page HTML
+            truncated: page trop volumineuse, text ne contient que son début et sa fin
+        """
+        timeout = timeout or Config.REQUEST_TIMEOUT
+        result = {
+            'url': url,
+            'success': False,
+            'status_code': None,
+            'final_url': url,
+            'text': None,
+            'headers': {},
+            'http_version': None,
+            'elapsed': 0.0,
+            'error': None,
+            'content_type': None,
+            'body_bytes': 0,
+            'truncated': False,
+            'rejected': None
+        }
+
+        start = time.time()
+        with self._host_semaphore(url):
+            try:
+                if self._http2_client is not None:
+                    with self._http2_client.stream('GET', url, timeout=timeout, headers=headers) as response:
+                        result['http_version'] = response.http_version
+                        result['final_url'] = str(response.url)
+                        self._read_response(response, response.iter_bytes(STREAM_CHUNK_SIZE), response.encoding, result, content_types)
+                else:
+                    with self._session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+                        result['http_version'] = 'HTTP/1.1'
+                        result['final_url'] = response.url
+                        self._read_response(response, response.iter_content(STREAM_CHUNK_SIZE), response.encoding, result, content_types)
+            except Exception as e:
+                result['error'] = str(e)
+        result['elapsed'] = time.time() - start
+
+        if result['success']:
+            truncated = f", tronqué ({result['body_bytes']} octets)" if result['truncated'] else ''
+            logger.info(f"✅ [FETCH] {url}: {len(result['text'])} caractères en {result['elapsed']:.2f}s ({result['http_version']}){truncated}")
+        elif result['rejected']:
+            logger.warning(f"🚫 [FETCH] {url} ignoré: {result['error']}")
+        else:
+            logger.warning(f"⚠️ [FETCH] Échec {url}: {result['error']}")
+        return result
+
+    @staticmethod
+    def _read_response(response, chunks: Iterator[bytes], encoding: Optional[str], result: Dict[str, Any],
+                       content_types: Optional[List[str]] = None):
+        """Vérifier le statut et le type de contenu, puis lire le corps en flux (borné)"""
+        result['status_code'] = response.status_code
+        result['headers'] = dict(response.headers)
+        if response.status_code != 304:  # 304 : réponse à une requête conditionnelle
+            response.raise_for_status()
+
+        content_type = content_type_of(response.headers)
+        result['content_type'] = content_type or None
+        if content_type and content_type not in (content_types or Config.HTTP_HTML_CONTENT_TYPES):
+            result['rejected'] = 'content_type'
+            result['error'] = f"Contenu non HTML ({content_type})"
+            return
+
+        body = read_bounded_body(chunks)
+        result['body_bytes'] = body['total']
+        if body['binary']:
+            result['rejected'] = 'binary'
+            result['error'] = "Contenu binaire sans type déclaré"
+            return
+
+        if body['tail'] is None:
+            text = _decode(body['head'], encoding)
+        else:
+            # Coupures en milieu de caractère ignorées aux jonctions
+            skipped = body['total'] - len(body['head']) - len(body['tail'])
+            text = (_decode(body['head'], encoding, 'ignore') + TRUNCATION_MARKER.format(skipped=skipped) +
+                    _decode(body['tail'], encoding, 'ignore'))
+        result['truncated'] = body['tail'] is not None or not body['complete']
+        result['text'] = text
+        result['success'] = True
+
+    def iter_bytes(self, url: str, timeout: Optional[float] = None, max_bytes: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Lire un document en flux, par blocs (sitemaps volumineux)
+
+        Le corps n'est jamais chargé en entier ; la lecture s'arrête à max_bytes
+        (HTTP_MAX_DOWNLOAD_BYTES par défaut). Les erreurs HTTP sont levées.
+        """
+        timeout = timeout or Config.REQUEST_TIMEOUT
+        max_bytes = max_bytes or Config.HTTP_MAX_DOWNLOAD_BYTES
+        read = 0
+        with self._host_semaphore(url):
+            if self._http2_client is not None:
+                with self._http2_client.stream('GET', url, timeout=timeout) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_bytes(STREAM_CHUNK_SIZE):
+                        yield chunk
+                        read += len(chunk)
+                        if read >= max_bytes:
+                            break
+            else:
+                with self._session.get(url, timeout=timeout, stream=True) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        yield chunk
+                        read += len(chunk)
+                        if read >= max_bytes:
+                            break
+
+    def submit(self, url: str, timeout: Optional[float] = None) -> Future:
+        """Lancer la récupération d'une page en arrière-plan"""
+        return self._executor.submit(self.fetch, url, timeout)
+
+    def fetch_many(self, urls: List[str], timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Récupérer plusieurs pages en parallèle (limites par hôte respectées)
+
+        Yields:
+            Le résultat de chaque page, dans l'ordre de fin
+        """
+        futures = [self.submit(url, timeout) for url in dict.fromkeys(urls) if url]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def close(self):
+        """Fermer les connexions et le pool de threads"""
+        self._executor.shutdown(wait=False)
+        self._session.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+# Instance partagée par le processus
+_fetcher: Optional[HttpFetcher] = None
+_fetcher_lock = threading.Lock()
+
+def get_http_fetcher() -> HttpFetcher:
+    """Obtenir la couche de récupération partagée (créée à la première demande)"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+    return _fetcher
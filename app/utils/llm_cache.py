@@ -0,0 +1,191 @@
+"""
+Cache disque des réponses OpenAI
+
+Une réponse est réutilisée pour un appel identique : même modèle, même gabarit
+(message système et paramètres de l'appel) et même entrée normalisée (prompt aux
+espaces près, image éventuelle). Les relances, les sites partagés et les reprises
+après une interruption n'appellent plus OpenAI pour un contenu déjà analysé.
+
+Seules les réponses JSON valides sont conservées. Éviction par âge
+(LLM_CACHE_TTL_DAYS) et par taille totale (LLM_CACHE_MAX_SIZE_MB), les entrées
+les moins récemment utilisées en premier. Une réanalyse forcée contourne la
+lecture du cache (llm_cache_bypass) et remplace l'entrée.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+from app.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger('llm_cache')
+
+# Éviction déclenchée toutes les N écritures
+EVICTION_INTERVAL = 50
+
+_WHITESPACE = re.compile(r'\s+')
+# ContextVar : suit les sections analysées en parallèle (copy_context)
+_bypass: ContextVar[bool] = ContextVar('llm_cache_bypass', default=False)
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', errors='ignore')).hexdigest()
+
+def normalize_input(text: str) -> str:
+    """Entrée normalisée : espaces consécutifs et bords ignorés"""
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+def template_hash(system_prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Empreinte du gabarit d'un appel (message système et paramètres)"""
+    return _sha256(system_prompt + json.dumps(params or {}, sort_keys=True))
+
+def input_hash(prompt: str, image: Optional[str] = None) -> str:
+    """Empreinte de l'entrée normalisée (prompt et image encodée)"""
+    return _sha256(normalize_input(prompt) + (_sha256(image) if image else ''))
+
+@contextmanager
+def llm_cache_bypass():
+    """Réanalyse forcée : les appels du bloc ignorent les réponses en cache"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+def is_bypassed() -> bool:
+    return _bypass.get()
+
+class LlmCache:
+    """Réponses OpenAI indexées par modèle, gabarit et entrée"""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl_days: Optional[float] = None,
+                 max_size_mb: Optional[float] = None):
+        self.cache_dir = cache_dir or Config.LLM_CACHE_DIR
+        self.ttl_seconds = (ttl_days or Config.LLM_CACHE_TTL_DAYS) * 86400
+        self.max_bytes = int((max_size_mb or Config.LLM_CACHE_MAX_SIZE_MB) * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._writes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0, 'tokens_saved': 0}
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, params: Optional[Dict[str, Any]] = None,
+                 image: Optional[str] = None) -> str:
+        """Clé d'un appel : modèle, empreinte du gabarit, empreinte de l'entrée"""
+        return _sha256(f"{model}:{template_hash(system_prompt, params)}:{input_hash(prompt, image)}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Réponse en cache (None si absente, expirée ou contournée)"""
+        if is_bypassed():
+            with self._lock:
+                self.stats['bypassed'] += 1
+            return None
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self.stats['misses'] += 1
+                return None
+            if time.time() - entry.get('stored_at', 0) > self.ttl_seconds:
+                self._remove(path)
+                self.stats['misses'] += 1
+                return None
+            # Date d'accès : les entrées les moins utilisées partent en premier
+            os.utime(path)
+            self.stats['hits'] += 1
+            self.stats['tokens_saved'] += entry.get('tokens', 0)
+
+        logger.info(f"♻️ [LLM CACHE] Réponse {entry.get('model')} réutilisée (~{entry.get('tokens', 0)} tokens évités)")
+        return entry['response']
+
+    def store(self, key: str, model: str, response: Dict[str, Any], tokens: int = 0):
+        """Enregistrer une réponse valide (tokens : consommation de l'appel, pour les économies)"""
+        entry = {'model': model, 'response': response, 'tokens': int(tokens or 0), 'stored_at': time.time()}
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError, ValueError) as e:
+                self._remove(tmp_path)
+                logger.warning(f"⚠️ [LLM CACHE] Réponse non enregistrée: {str(e)}")
+                return
+            self.stats['stores'] += 1
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self.evict()
+
+    def evict(self) -> Dict[str, int]:
+        """Supprimer les entrées expirées, puis les moins récemment utilisées au-delà de la taille maximale"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            removed = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                # mtime = dernière utilisation ; l'âge d'écriture est vérifié à la lecture
+                if now - stat.st_mtime > self.ttl_seconds:
+                    self._remove(path)
+                    removed += 1
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                removed += 1
+                total -= size
+
+        if removed:
+            logger.info(f"🧹 [LLM CACHE] Éviction: {removed} réponses supprimées")
+        return {'entries_removed': removed, 'total_bytes': total}
+
+    def summary(self) -> Dict[str, Any]:
+        """Compteurs du cache (taux de réussite, tokens évités)"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        return dict(stats, hit_rate=round(stats['hits'] / lookups, 3) if lookups else None)
+
+# Instance partagée par le processus
+_cache: Optional[LlmCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LlmCache]:
+    """Obtenir le cache des réponses OpenAI partagé (None si désactivé)"""
+    global _cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LlmCache()
+    return _cache
@@ -0,0 +1,226 @@
+"""
+Télémétrie des appels OpenAI : un enregistrement par appel
+
+Chaque appel d'AIAnalysisService (et chaque réponse d'un lot Batch) est
+enregistré avec son type (site_web, site_web_full, site_web_chunk, vision...),
+le modèle, les tokens d'entrée et de sortie, la latence, l'usage du cache,
+l'issue et le coût estimé (OPENAI_PRICING). Le lead et le scraping en cours
+sont repris du contexte (llm_context), y compris dans les threads des
+analyses par sections lancés avec copy_context.
+
+Les appels récents restent en mémoire, comme le buffer de logs ; l'historique
+complet est ajouté à LLM_TELEMETRY_FILE (une ligne JSON par appel) pour les
+bilans sur plusieurs jours (summarize_llm_calls(load_llm_calls())). Au-delà de
+LLM_TELEMETRY_MAX_SIZE_MB le fichier est renommé en .1, .2... et seules
+LLM_TELEMETRY_BACKUP_COUNT archives sont gardées.
+"""
+
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.pipeline_metrics import record_value
+
+logger = get_logger('llm_telemetry')
+
+BATCH_PRICE_FACTOR = 0.5  # API Batch : moitié prix
+
+_lead_id: ContextVar[Optional[int]] = ContextVar('llm_lead_id', default=None)
+_run_id: ContextVar[Optional[str]] = ContextVar('llm_run_id', default=None)
+
+_calls: deque = deque(maxlen=Config.LLM_TELEMETRY_MAX_CALLS)
+_lock = threading.Lock()
+
+def new_run_id() -> str:
+    """Identifiant d'un scraping (horodatage lisible + suffixe aléatoire)"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+def bind_llm_context(lead_id: Optional[int] = None, run_id: Optional[str] = None) -> list:
+    """Rattacher les appels suivants à un lead / un scraping (jetons à rendre à reset_llm_context)"""
+    tokens = []
+    if lead_id is not None:
+        tokens.append((_lead_id, _lead_id.set(lead_id)))
+    if run_id is not None:
+        tokens.append((_run_id, _run_id.set(run_id)))
+    return tokens
+
+def reset_llm_context(tokens: list):
+    for variable, token in reversed(tokens):
+        variable.reset(token)
+
+@contextmanager
+def llm_context(lead_id: Optional[int] = None, run_id: Optional[str] = None):
+    """Appels OpenAI du bloc rattachés au lead et au scraping donnés"""
+    tokens = bind_llm_context(lead_id, run_id)
+    try:
+        yield
+    finally:
+        reset_llm_context(tokens)
+
+def current_llm_context() -> Dict[str, Any]:
+    return {'lead_id': _lead_id.get(), 'run_id': _run_id.get()}
+
+def llm_call_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Coût estimé d'un appel (USD)"""
+    price_in, price_out = Config.OPENAI_PRICING.get(model, (0.0, 0.0))
+    return input_tokens / 1000 * price_in + output_tokens / 1000 * price_out
+
+def _rotated_paths(path: str) -> List[str]:
+    """Archives existantes du fichier, de la plus ancienne à la plus récente"""
+    return [f"{path}.{index}" for index in range(Config.LLM_TELEMETRY_BACKUP_COUNT, 0, -1)
+            if os.path.exists(f"{path}.{index}")]
+
+def _rotate_if_needed(path: str):
+    """Décaler path → path.1 → path.2... quand le fichier dépasse LLM_TELEMETRY_MAX_SIZE_MB"""
+    max_bytes = Config.LLM_TELEMETRY_MAX_SIZE_MB * 1024 * 1024
+    if max_bytes <= 0 or not os.path.exists(path) or os.path.getsize(path) < max_bytes:
+        return
+    backups = Config.LLM_TELEMETRY_BACKUP_COUNT
+    if backups <= 0:
+        os.remove(path)
+        return
+    for index in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{index}"):
+            os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+    os.replace(path, f"{path}.1")
+    logger.info(f"🗂️ [LLM TELEMETRY] Rotation de {path} ({backups} archive(s) max)")
+
+def _append_to_file(entry: Dict[str, Any]):
+    path = Config.LLM_TELEMETRY_FILE
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _rotate_if_needed(path)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    except OSError as e:
+        logger.warning(f"⚠️ [LLM TELEMETRY] Écriture impossible dans {path}: {str(e)}")
+
+def record_llm_call(call_type: str, model: str, usage: Optional[Dict[str, Any]] = None,
+                    latency: Optional[float] = None, cached: bool = False, outcome: str = 'ok',
+                    error: Optional[str] = None, lead_id: Optional[int] = None, batch: bool = False) -> Dict[str, Any]:
+    """
+    Enregistrer un appel
+
+    usage: champ 'usage' de la réponse OpenAI (prompt_tokens, completion_tokens)
+    outcome: 'ok', 'invalid_json' (réponse sans JSON exploitable) ou 'api_error'
+    cached: réponse servie par le cache disque (aucun token facturé)
+    """
+    if not Config.LLM_TELEMETRY_ENABLED:
+        return {}
+    usage = usage or {}
+    input_tokens = 0 if cached else int(usage.get('prompt_tokens') or 0)
+    output_tokens = 0 if cached else int(usage.get('completion_tokens') or 0)
+    cost = llm_call_cost(model, input_tokens, output_tokens) * (BATCH_PRICE_FACTOR if batch else 1)
+    context = current_llm_context()
+    entry = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'run_id': context['run_id'],
+        'lead_id': lead_id if lead_id is not None else context['lead_id'],
+        'call_type': call_type,
+        'model': model,
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'latency': round(latency, 3) if latency is not None else None,
+        'cached': cached,
+        'outcome': outcome,
+        'cost': round(cost, 6),
+        'error': (error or '')[:300] or None
+    }
+    with _lock:
+        _calls.append(entry)
+        _append_to_file(entry)
+    if latency is not None and not cached:
+        record_value(f"latency.llm.{call_type}", latency)
+    return entry
+
+def get_llm_calls(limit: int = 100, lead_id: Optional[int] = None, run_id: Optional[str] = None,
+                  call_type: str = '') -> List[Dict[str, Any]]:
+    """Appels récents (les plus récents en premier), filtrés par lead, scraping ou type"""
+    with _lock:
+        calls = list(_calls)
+    calls = [call for call in calls
+             if (lead_id is None or call['lead_id'] == lead_id)
+             and (run_id is None or call['run_id'] == run_id)
+             and (not call_type or call['call_type'] == call_type)]
+    return list(reversed(calls))[:limit]
+
+def load_llm_calls(path: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Historique du fichier JSONL et de ses archives, du plus ancien au plus récent (since : horodatage ISO minimal)"""
+    path = path or Config.LLM_TELEMETRY_FILE
+    calls = []
+    for file_path in _rotated_paths(path) + [path]:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    call = json.loads(line)
+                except ValueError:
+                    continue
+                if since and call.get('timestamp', '') < since:
+                    continue
+                calls.append(call)
+    return calls
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    def percentile(ratio: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))]
+    return {'avg': round(sum(ordered) / len(ordered), 6), 'p50': round(percentile(0.5), 6),
+            'p95': round(percentile(0.95), 6), 'max': round(ordered[-1], 6)}
+
+def summarize_llm_calls(calls: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Bilan par type d'appel et par modèle : nombre, cache, erreurs, tokens,
+    coût total et distributions (moyenne, p50, p95, max) du coût et de la latence
+    """
+    groups: Dict[str, Dict[str, List[Dict[str, Any]]]] = {'by_call_type': {}, 'by_model': {}}
+    all_calls = []
+    for call in calls:
+        all_calls.append(call)
+        groups['by_call_type'].setdefault(call['call_type'], []).append(call)
+        groups['by_model'].setdefault(call['model'], []).append(call)
+
+    def aggregate(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        billed = [call for call in items if not call['cached']]
+        return {
+            'calls': len(items),
+            'cache_hits': len(items) - len(billed),
+            'errors': sum(1 for call in items if call['outcome'] != 'ok'),
+            'input_tokens': sum(call['input_tokens'] for call in items),
+            'output_tokens': sum(call['output_tokens'] for call in items),
+            'cost': round(sum(call['cost'] for call in items), 6),
+            'cost_per_call': _distribution([call['cost'] for call in billed]),
+            'latency': _distribution([call['latency'] for call in billed if call['latency'] is not None])
+        }
+
+    total = aggregate(all_calls)
+    summary = {key: {name: aggregate(items) for name, items in group.items()} for key, group in groups.items()}
+    summary['total'] = total
+    summary['leads'] = len({call['lead_id'] for call in all_calls if call['lead_id'] is not None})
+    return summary
+
+def get_llm_summary(run_id: Optional[str] = None, lead_id: Optional[int] = None) -> Dict[str, Any]:
+    """Bilan des appels en mémoire (tous, d'un scraping ou d'un lead)"""
+    with _lock:
+        calls = list(_calls)
+    return summarize_llm_calls(call for call in calls
+                               if (run_id is None or call['run_id'] == run_id)
+                               and (lead_id is None or call['lead_id'] == lead_id))
+
+def clear_llm_calls():
+    """Vider les appels en mémoire (le fichier JSONL est conservé)"""
+    with _lock:
+        _calls.clear()
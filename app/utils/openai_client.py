@@ -0,0 +1,215 @@
+"""
+Client HTTP partagé pour l'API OpenAI
+
+- pool de connexions (keep-alive, TLS réutilisé entre appels et entre threads)
+- reprises des erreurs passagères (429, 5xx, coupures réseau) avec attente
+  exponentielle aléatoire ; l'en-tête Retry-After est respecté
+- délai de réponse par modèle (OPENAI_TIMEOUTS) : GPT-4 répond plus lentement
+  que GPT-3.5 sur un même prompt
+- limite de débit partagée : après un 429, ou quand les en-têtes
+  x-ratelimit-remaining-* tombent à zéro, tous les appels du processus
+  attendent la levée de la limite au lieu de la heurter chacun leur tour
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.pipeline_metrics import record_value
+
+logger = get_logger('openai_client')
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+_DURATION_UNITS = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+
+class OpenAIError(Exception):
+    """Échec définitif d'un appel OpenAI (statut HTTP None pour une erreur réseau)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Attente demandée par le serveur (retry-after-ms, Retry-After en secondes ou date HTTP)"""
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Durée des en-têtes x-ratelimit-reset-* ('20ms', '1.5s', '6m0s') en secondes"""
+    if not value:
+        return None
+    seconds, number = 0.0, ''
+    index = 0
+    while index < len(value):
+        char = value[index]
+        if char.isdigit() or char == '.':
+            number += char
+            index += 1
+            continue
+        unit = 'ms' if value.startswith('ms', index) else char
+        if unit not in _DURATION_UNITS or not number:
+            return None
+        seconds += float(number) * _DURATION_UNITS[unit]
+        number = ''
+        index += len(unit)
+    return seconds if not number else seconds + float(number)
+
+class OpenAIClient:
+    """Appels HTTP vers l'API OpenAI, partagés par tous les chemins d'analyse IA"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_retries: Optional[int] = None, pool_size: Optional[int] = None):
+        self.api_key = api_key or Config.OPENAI_API_KEY or os.getenv('OPENAI_API_KEY')
+        self.base_url = (base_url or Config.OPENAI_API_BASE).rstrip('/')
+        self.max_retries = Config.OPENAI_MAX_RETRIES if max_retries is None else max_retries
+        pool_size = pool_size or Config.OPENAI_POOL_SIZE
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Authorization'] = f"Bearer {self.api_key}"
+
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'failures': 0}
+
+    def timeout_for(self, model: Optional[str]) -> tuple:
+        """(connexion, lecture) en secondes pour un modèle"""
+        read_timeout = Config.OPENAI_TIMEOUTS.get(model, Config.OPENAI_DEFAULT_TIMEOUT)
+        return (Config.OPENAI_CONNECT_TIMEOUT, read_timeout)
+
+    # ----- Limite de débit partagée -----
+
+    def _block(self, seconds: float, reason: str):
+        """Suspendre tous les appels du processus pendant seconds"""
+        until = time.time() + seconds
+        with self._lock:
+            if until <= self._blocked_until:
+                return
+            self._blocked_until = until
+        logger.warning(f"⏳ [OPENAI] Appels suspendus {seconds:.1f}s ({reason})")
+
+    def _wait_if_blocked(self):
+        while True:
+            with self._lock:
+                delay = self._blocked_until - time.time()
+            if delay <= 0:
+                return
+            time.sleep(min(delay, 1.0))
+
+    def _track_rate_limits(self, headers):
+        """Anticiper la limite quand l'API annonce zéro requête ou token restant"""
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            if remaining is not None and remaining.strip() == '0':
+                reset = parse_reset_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if reset:
+                    self._block(min(reset, Config.OPENAI_RETRY_AFTER_MAX), f"quota de {kind} épuisé")
+
+    # ----- Appels -----
+
+    def _backoff(self, attempt: int) -> float:
+        """Attente exponentielle aléatoire (full jitter)"""
+        return random.uniform(0, min(Config.OPENAI_BACKOFF_MAX, Config.OPENAI_BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, method: str, path: str, timeout=None, retry: bool = True, **kwargs) -> requests.Response:
+        """
+        Requête vers l'API avec reprises des erreurs passagères
+
+        path: relatif à OPENAI_API_BASE ('/chat/completions', '/batches'...)
+        retry: False pour les créations non idempotentes (POST /files, /batches) :
+            après un 5xx ou un délai dépassé la ressource a pu être créée, seul
+            un 429 (requête refusée) est repris
+
+        Raises:
+            OpenAIError: erreur non reprise (4xx) ou reprises épuisées
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        timeout = timeout or (Config.OPENAI_CONNECT_TIMEOUT, Config.OPENAI_DEFAULT_TIMEOUT)
+        attempt = 0
+        while True:
+            self._wait_if_blocked()
+            with self._lock:
+                self.stats['requests'] += 1
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error, status, retry_after = None, f"{type(e).__name__}: {e}", None, None
+            else:
+                self._track_rate_limits(response.headers)
+                if response.status_code < 400:
+                    record_value('openai.retries', attempt)
+                    return response
+                error, status = f"HTTP {response.status_code}: {response.text[:300]}", response.status_code
+                retry_after = parse_retry_after(response.headers)
+                if status == 429:
+                    with self._lock:
+                        self.stats['rate_limited'] += 1
+                # 429 insufficient_quota : crédit épuisé, une reprise n'y changera rien
+                if status not in RETRYABLE_STATUSES or 'insufficient_quota' in response.text[:1000]:
+                    with self._lock:
+                        self.stats['failures'] += 1
+                    raise OpenAIError(error, status)
+
+            if (attempt >= self.max_retries or (retry_after or 0) > Config.OPENAI_RETRY_AFTER_MAX
+                    or (not retry and status != 429)):
+                with self._lock:
+                    self.stats['failures'] += 1
+                record_value('openai.retries', attempt)
+                raise OpenAIError(f"{error} (après {attempt + 1} tentative(s))", status)
+
+            delay = self._backoff(attempt)
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, Config.OPENAI_BACKOFF_BASE)
+            if status == 429:
+                # Les autres threads attendent aussi au lieu d'aggraver la limite
+                self._block(delay, "429 Too Many Requests")
+            attempt += 1
+            with self._lock:
+                self.stats['retries'] += 1
+            logger.warning(f"🔁 [OPENAI] {error[:120]} ; nouvelle tentative {attempt}/{self.max_retries} dans {delay:.1f}s")
+            time.sleep(delay)
+
+    def chat_completion(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Appel /chat/completions (réponse JSON complète), délai selon le modèle"""
+        response = self.request('POST', '/chat/completions', json=data, timeout=self.timeout_for(data.get('model')))
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+# Instance partagée par le processus
+_client: Optional[OpenAIClient] = None
+_client_lock = threading.Lock()
+
+def get_openai_client() -> OpenAIClient:
+    """Obtenir le client OpenAI partagé (créé à la première demande)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAIClient()
+    return _client
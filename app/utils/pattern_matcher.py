@@ -0,0 +1,140 @@
+"""
+Détection précompilée des réseaux sociaux, emails et téléphones
+
+Tous les motifs sont réunis dans une seule expression compilée : un texte est
+parcouru une fois, quel que soit le nombre de plateformes, et chaque occurrence
+est restituée avec son type, son libellé (plateforme) et sa position.
+
+Les occurrences ne se chevauchent pas : un email ou un numéro contenu dans une
+URL de réseau social fait partie de cette URL.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+SOCIAL_PLATFORMS = ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']
+
+SOCIAL_DOMAINS = {
+    'facebook': ['facebook.com', 'fb.com'],
+    'instagram': ['instagram.com', 'instagr.am'],
+    'twitter': ['twitter.com', 'x.com'],
+    'linkedin': ['linkedin.com'],
+    'youtube': ['youtube.com', 'youtu.be'],
+    'tiktok': ['tiktok.com'],
+}
+_DOMAIN_PLATFORMS = {domain: platform for platform, domains in SOCIAL_DOMAINS.items() for domain in domains}
+
+_URL_CHARS = r'[^\s"\'>]'
+_PLATFORMS_ALT = '|'.join(SOCIAL_PLATFORMS)
+# Domaine non précédé d'une lettre (netflix.com n'est pas x.com)
+_DOMAINS_ALT = r'(?<![\w-])(?:' + '|'.join(re.escape(d) for d in _DOMAIN_PLATFORMS) + ')'
+
+# Motifs par type, dans l'ordre de priorité à une même position
+PATTERNS = {
+    # URL absolue contenant le nom d'une plateforme
+    'social': rf'https?://{_URL_CHARS}*(?:{_PLATFORMS_ALT}){_URL_CHARS}*',
+    # Lien sans schéma vers un domaine de réseau social (facebook.com/..., youtu.be/...)
+    'social_link': rf'{_DOMAINS_ALT}/{_URL_CHARS}*',
+    # Chemin relatif commençant par une plateforme (/facebook...)
+    'social_path': rf'/(?:{_PLATFORMS_ALT}){_URL_CHARS}*',
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone': r'(?:\+33|0033|33|0)[1-9](?:[ .-]?\d{2}){4}',
+}
+
+EMAIL_PATTERN = re.compile(PATTERNS['email'])
+PHONE_PATTERN = re.compile(PATTERNS['phone'])
+PLATFORM_PATTERN = re.compile(_PLATFORMS_ALT, re.IGNORECASE)
+DOMAIN_PATTERN = re.compile(_DOMAINS_ALT, re.IGNORECASE)
+
+# Balise <a> pointant vers une URL sociale, et classes CSS d'icônes (fa-facebook, bi-instagram, social-links...)
+SOCIAL_LINK_TAG_PATTERN = re.compile(rf'<a[^>]*href=["\'](https?://[^"\']*(?:{_PLATFORMS_ALT})[^"\']*)["\'][^>]*>', re.IGNORECASE)
+SOCIAL_ICON_CLASS_PATTERN = re.compile(rf'class=["\'][^"\']*({_PLATFORMS_ALT}|social)[^"\']*["\']', re.IGNORECASE)
+
+# Adresse dans une balise <address> ou un élément de classe *address* (analyse HTML manuelle)
+ADDRESS_PATTERNS = [
+    re.compile(r'<address[^>]*>([^<]+)</address>', re.IGNORECASE),
+    re.compile(r'class=["\'][^"\']*address[^"\']*["\'][^>]*>([^<]+)</', re.IGNORECASE),
+]
+
+DEFAULT_KINDS = ('social', 'email', 'phone')
+
+class PatternMatch(NamedTuple):
+    """Occurrence trouvée dans un texte"""
+    kind: str   # 'social', 'social_link', 'social_path', 'email' ou 'phone'
+    label: str  # plateforme pour les réseaux sociaux, sinon le type
+    value: str
+    start: int
+    end: int
+
+@lru_cache(maxsize=None)
+def _compiled(kinds: Tuple[str, ...]):
+    """Expression unique pour une combinaison de types"""
+    return re.compile('|'.join(f'(?P<{kind}>{PATTERNS[kind]})' for kind in kinds), re.IGNORECASE)
+
+def platforms_in(text: str) -> List[str]:
+    """Plateformes dont le nom apparaît dans le texte (ordre d'apparition)"""
+    if not text:
+        return []
+    return list(dict.fromkeys(m.group(0).lower() for m in PLATFORM_PATTERN.finditer(text)))
+
+def scan(text: str, kinds: Iterable[str] = DEFAULT_KINDS) -> Iterator[PatternMatch]:
+    """
+    Parcourir un texte une seule fois et restituer les occurrences typées
+
+    Une URL contenant plusieurs plateformes est restituée une fois par plateforme.
+    """
+    if not text:
+        return
+    for match in _compiled(tuple(kinds)).finditer(text):
+        kind = match.lastgroup
+        value = match.group(0)
+        start, end = match.span()
+        if kind == 'social':
+            for platform in platforms_in(value):
+                yield PatternMatch(kind, platform, value, start, end)
+        elif kind == 'social_link':
+            domain = DOMAIN_PATTERN.match(value).group(0).lower()
+            yield PatternMatch(kind, _DOMAIN_PLATFORMS[domain], value, start, end)
+        elif kind == 'social_path':
+            yield PatternMatch(kind, PLATFORM_PATTERN.match(value, 1).group(0).lower(), value, start, end)
+        else:
+            yield PatternMatch(kind, kind, value, start, end)
+
+def find_all(text: str, kinds: Iterable[str] = DEFAULT_KINDS) -> Dict[str, List[str]]:
+    """Valeurs trouvées regroupées par libellé (plateforme, 'email', 'phone'), dans l'ordre"""
+    found: Dict[str, List[str]] = {}
+    for match in scan(text, kinds):
+        found.setdefault(match.label, []).append(match.value)
+    return found
+
+def classify_social_url(url: str) -> Optional[str]:
+    """Plateforme d'une URL de réseau social d'après son domaine (None sinon)"""
+    if not url:
+        return None
+    match = DOMAIN_PATTERN.search(url)
+    return _DOMAIN_PLATFORMS[match.group(0).lower()] if match else None
+
+def first_positions(text: str, keywords: Iterable[str]) -> Dict[str, int]:
+    """
+    Première position de chaque mot-clé (insensible à la casse), en un seul parcours
+
+    Équivalent de text.lower().find(keyword) pour chaque mot-clé, sans copier le texte.
+    """
+    keywords = list(dict.fromkeys(kw.lower() for kw in keywords))
+    if not text or not keywords:
+        return {}
+    pattern = _keywords_pattern(tuple(keywords))
+    positions: Dict[str, int] = {}
+    for match in pattern.finditer(text):
+        keyword = match.group(1).lower()
+        if keyword not in positions:
+            positions[keyword] = match.start()
+            if len(positions) == len(keywords):
+                break
+    return positions
+
+@lru_cache(maxsize=64)
+def _keywords_pattern(keywords: Tuple[str, ...]):
+    # Lookahead : les mots-clés qui se chevauchent sont tous trouvés
+    return re.compile('(?=(' + '|'.join(re.escape(kw) for kw in keywords) + '))', re.IGNORECASE)
@@ -0,0 +1,78 @@
+"""
+Mesures du pipeline de scraping (latences par étape, tailles, taux observés)
+
+Les mesures sont conservées en mémoire, comme le buffer de logs, et servent
+à l'estimation des coûts et durées avant un lancement.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+# Échantillons par métrique (les plus récents)
+_samples: Dict[str, List[float]] = {}
+_max_samples = 500
+_lock = threading.Lock()
+
+def record_value(metric: str, value: float):
+    """Enregistrer une valeur observée (latence en secondes, taille, taux...)"""
+    with _lock:
+        samples = _samples.setdefault(metric, [])
+        samples.append(float(value))
+        if len(samples) > _max_samples:
+            del samples[:-_max_samples]
+
+@contextmanager
+def measure_stage(stage: str):
+    """Mesurer la durée d'une étape du pipeline"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_value(f"latency.{stage}", time.perf_counter() - start)
+
+def get_average(metric: str, default: Optional[float] = None) -> Optional[float]:
+    """Moyenne des valeurs observées, ou valeur par défaut si aucune mesure"""
+    with _lock:
+        samples = list(_samples.get(metric, []))
+    if not samples:
+        return default
+    return sum(samples) / len(samples)
+
+def get_stage_latency(stage: str, default: Optional[float] = None) -> Optional[float]:
+    """Latence moyenne mesurée d'une étape (secondes)"""
+    return get_average(f"latency.{stage}", default)
+
+def get_samples(metric: str) -> List[float]:
+    """Copie des valeurs observées pour une métrique"""
+    with _lock:
+        return list(_samples.get(metric, []))
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    """Percentile simple sur une liste triée"""
+    index = min(len(sorted_values) - 1, int(round(ratio * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def get_metrics_summary() -> Dict[str, Any]:
+    """Résumé de toutes les métriques (nombre, moyenne, p50, p95)"""
+    with _lock:
+        snapshot = {metric: list(samples) for metric, samples in _samples.items()}
+
+    summary = {}
+    for metric, samples in snapshot.items():
+        if not samples:
+            continue
+        ordered = sorted(samples)
+        summary[metric] = {
+            'count': len(ordered),
+            'avg': sum(ordered) / len(ordered),
+            'p50': _percentile(ordered, 0.5),
+            'p95': _percentile(ordered, 0.95)
+        }
+    return summary
+
+def clear_metrics():
+    """Vider toutes les mesures"""
+    with _lock:
+        _samples.clear()
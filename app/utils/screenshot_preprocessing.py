@@ -0,0 +1,186 @@
+"""
+Préparation des captures d'écran avant l'analyse Vision
+
+Les captures Playwright (jusqu'à 2400x1350 en PNG pour Facebook) sont
+envoyées telles quelles : plusieurs Mo encodés en base64, et l'API les
+découpe en tuiles de 512 px facturées chacune. Avant l'envoi, la capture est :
+
+- recadrée sur l'en-tête du profil (VISION_CROP_HEIGHT par plateforme) et
+  débarrassée des marges unies de chaque côté de la mise en page centrée
+- réduite à VISION_MAX_WIDTH x VISION_MAX_HEIGHT (4 tuiles au plus en
+  détail 'high' : nom, abonnés et bio restent lisibles)
+- réencodée en JPEG ou WebP (VISION_IMAGE_FORMAT), ou en PNG s'il est plus
+  compact (pages presque uniquement textuelles)
+
+Pillow lit l'image depuis le fichier : seule l'image réduite est encodée en
+base64. Sans Pillow, la capture d'origine est envoyée comme auparavant.
+"""
+
+import base64
+import io
+import math
+import os
+from typing import Dict, Any, Optional
+
+from app.config import Config
+from app.utils.logger import get_logger
+from app.utils.pipeline_metrics import record_value
+
+try:
+    from PIL import Image, ImageChops
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = ImageChops = None
+    PIL_AVAILABLE = False
+
+logger = get_logger('screenshot_preprocessing')
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp', 'PNG': 'image/png'}
+MARGIN_TOLERANCE = 12  # écart de couleur toléré pour une marge « unie »
+MIN_CONTENT_RATIO = 0.4  # une marge retirée laisse au moins 40 % de la largeur
+TILE_SIZE = 512
+TILE_OVERFLOW_RATIO = 0.1  # dépassement d'une rangée de tuiles rogné par une réduction de 10 % au plus
+
+def vision_image_tokens(width: int, height: int, detail: str = 'high') -> int:
+    """
+    Tokens facturés pour une image (règle des modèles GPT-4o / GPT-4 Vision)
+
+    'low' : 85 tokens ; 'high' : image ramenée dans 2048x2048 puis son petit
+    côté à 768 px, 85 tokens + 170 par tuile de 512 px
+    """
+    if detail == 'low':
+        return 85
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+def _trim_side_margins(image):
+    """Retirer les bandes unies à gauche et à droite (couleur du coin supérieur gauche)"""
+    background = Image.new(image.mode, image.size, image.getpixel((0, 0)))
+    difference = ImageChops.difference(image, background).convert('L').point(lambda value: 255 if value > MARGIN_TOLERANCE else 0)
+    box = difference.getbbox()
+    if not box:
+        return image
+    left, right = box[0], box[2]
+    if right - left < image.width * MIN_CONTENT_RATIO:
+        return image
+    return image.crop((left, 0, right, image.height))
+
+def header_region(image, platform: str):
+    """En-tête du profil : haut de la capture (VISION_CROP_HEIGHT), sans les marges latérales"""
+    crop_height = Config.VISION_CROP_HEIGHT.get(platform, 1.0)
+    if crop_height < 1.0:
+        image = image.crop((0, 0, image.width, max(1, int(image.height * crop_height))))
+    return _trim_side_margins(image)
+
+def _fit_tiles(image):
+    """Réduire légèrement une image qui dépasse de peu un multiple de 512 px (une rangée de tuiles en moins)"""
+    scale = 1.0
+    for size in image.size:
+        overflow = size % TILE_SIZE
+        if size > TILE_SIZE and 0 < overflow <= size * TILE_OVERFLOW_RATIO:
+            scale = min(scale, (size - overflow) / size)
+    if scale == 1.0:
+        return image
+    return image.resize((int(image.width * scale), int(image.height * scale)), Image.LANCZOS)
+
+def _encode(image, image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=Config.VISION_IMAGE_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+def _original(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        data = f.read()
+    return {'encoded': base64.b64encode(data).decode('ascii'), 'mime': 'image/png', 'width': None, 'height': None,
+            'bytes': len(data), 'original_bytes': len(data), 'tokens': None, 'detail': Config.VISION_DETAIL,
+            'preprocessed': False}
+
+def prepare_screenshot(path: str, platform: str) -> Optional[Dict[str, Any]]:
+    """
+    Capture prête pour l'API Vision
+
+    Returns:
+        {'encoded': base64, 'mime', 'width', 'height', 'bytes', 'original_bytes',
+         'tokens': tokens image estimés, 'detail', 'preprocessed'} ou None si le fichier est introuvable
+    """
+    if not os.path.exists(path):
+        return None
+    if not PIL_AVAILABLE or not Config.VISION_PREPROCESS_ENABLED:
+        return _original(path)
+
+    try:
+        with Image.open(path) as source:
+            original_size = source.size
+            image = source.convert('RGB')
+    except Exception as e:
+        logger.warning(f"⚠️ [VISION PREP] Lecture impossible de {path}, capture envoyée telle quelle: {str(e)}")
+        return _original(path)
+
+    image = header_region(image, platform)
+    image.thumbnail((Config.VISION_MAX_WIDTH, Config.VISION_MAX_HEIGHT), Image.LANCZOS)
+    image = _fit_tiles(image)
+
+    image_format = Config.VISION_IMAGE_FORMAT.upper()
+    if image_format not in MIME_TYPES:
+        image_format = 'JPEG'
+    data = _encode(image, image_format)
+    if image_format != 'PNG':
+        # Pages presque uniquement textuelles : le PNG est parfois plus compact
+        png = _encode(image, 'PNG')
+        if len(png) < len(data):
+            data, image_format = png, 'PNG'
+
+    result = {
+        'encoded': base64.b64encode(data).decode('ascii'),
+        'mime': MIME_TYPES[image_format],
+        'width': image.width,
+        'height': image.height,
+        'bytes': len(data),
+        'original_bytes': os.path.getsize(path),
+        'tokens': vision_image_tokens(image.width, image.height, Config.VISION_DETAIL),
+        'detail': Config.VISION_DETAIL,
+        'preprocessed': True
+    }
+    record_value('vision.image_tokens', result['tokens'])
+    record_value('vision.payload_bytes', len(result['encoded']))
+    logger.info(f"🖼️ [VISION PREP] {platform}: {original_size[0]}x{original_size[1]} -> {image.width}x{image.height} "
+                f"{image_format}, {result['original_bytes'] // 1024} Ko -> {result['bytes'] // 1024} Ko, "
+                f"{vision_image_tokens(*original_size, Config.VISION_DETAIL)} -> {result['tokens']} tokens image")
+    return result
+
+# ----- Détection des captures inchangées -----
+
+def screenshot_dhash(path: str, platform: str, hash_size: Optional[int] = None) -> Optional[str]:
+    """
+    Empreinte perceptuelle (dHash) de l'en-tête d'une capture, en hexadécimal
+
+    L'en-tête est réduit en niveaux de gris à (hash_size + 1) x hash_size pixels ;
+    chaque bit compare deux pixels voisins. Deux captures d'un même profil
+    (bandeau, nom, compteurs, bio) ne diffèrent que de quelques bits.
+    None sans Pillow ou si la capture est illisible.
+    """
+    if not PIL_AVAILABLE or not os.path.exists(path):
+        return None
+    hash_size = hash_size or Config.VISION_HASH_SIZE
+    try:
+        with Image.open(path) as source:
+            image = header_region(source.convert('RGB'), platform)
+    except Exception as e:
+        logger.warning(f"⚠️ [VISION PREP] Empreinte impossible pour {path}: {str(e)}")
+        return None
+    pixels = list(image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return format(bits, f"0{hash_size * hash_size // 4}x")
+
+def hash_distance(first: Optional[str], second: Optional[str]) -> Optional[int]:
+    """Nombre de bits différents entre deux empreintes (None si elles ne sont pas comparables)"""
+    if not first or not second or len(first) != len(second):
+        return None
+    return bin(int(first, 16) ^ int(second, 16)).count('1')
@@ -0,0 +1,51 @@
+"""
+Comptage des tokens des prompts OpenAI
+
+Avec tiktoken installé, les tokens sont comptés avec l'encodage du modèle ;
+sinon ils sont estimés à un token pour CHARS_PER_TOKEN caractères. Les choix
+d'analyse (standard, complète, par sections) et la réduction du texte envoyé
+s'appuient sur ces comptes.
+"""
+
+import math
+from functools import lru_cache
+from typing import Optional
+
+from app.utils.logger import get_logger
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+logger = get_logger('token_counter')
+
+CHARS_PER_TOKEN = 4
+DEFAULT_MODEL = 'gpt-3.5-turbo'
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+def count_tokens(text: Optional[str], model: str = DEFAULT_MODEL) -> int:
+    """Nombre de tokens d'un texte pour un modèle"""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """Début d'un texte limité à max_tokens tokens"""
+    if not text or max_tokens <= 0:
+        return ''
+    if TIKTOKEN_AVAILABLE:
+        encoding = _encoding(model)
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
@@ -4,6 +4,7 @@ Utilitaires de validation des données
 
 import re
 from urllib.parse import urlparse
+from app.utils.pattern_matcher import classify_social_url
 
 def is_valid_email(email):
     """Valider un email"""
@@ -79,21 +80,8 @@ def is_social_media_url(url):
     if not url:
         return False, None
     
-    social_patterns = {
-        'facebook': r'facebook\.com|fb\.com',
-        'instagram': r'instagram\.com|instagr\.am',
-        'twitter': r'twitter\.com|x\.com',
-        'linkedin': r'linkedin\.com',
-        'youtube': r'youtube\.com|youtu\.be',
-        'tiktok': r'tiktok\.com'
-    }
-    
-    url_lower = url.lower()
-    for platform, pattern in social_patterns.items():
-        if re.search(pattern, url_lower):
-            return True, platform
-    
-    return False, None
+    platform = classify_social_url(url)
+    return platform is not None, platform
 
 def clean_text(text, max_length=None):
     """Nettoyer un texte"""
@@ -118,4 +106,41 @@ def extract_domain_from_url(url):
         parsed = urlparse(url)
         return parsed.netloc.lower()
     except:
-        return None 
\ No newline at end of file
+        return None 
+
+_COUNT_PATTERN = re.compile(
+    r'(\d[\d\s.,  \']*)\s*(millions?|mille|[kmb])?(?![a-z])', re.IGNORECASE)
+_COUNT_MULTIPLIERS = {'k': 1000, 'mille': 1000, 'm': 1000000, 'million': 1000000, 'millions': 1000000,
+                      'b': 1000000000}
+
+def parse_social_count(value):
+    """
+    Convertir un compteur de réseau social en entier
+
+    Formats acceptés : 1234, "1 234", "12,345", "1.234", "1,2K", "1.2k",
+    "2,5 M", "12 mille", "1,2 k abonnés"... None si aucun nombre n'est lisible
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    match = _COUNT_PATTERN.search(str(value))
+    if not match:
+        return None
+    number = re.sub(r"[\s  ']", '', match.group(1)).rstrip('.,')
+    suffix = (match.group(2) or '').lower()
+
+    separators = re.findall(r'[.,]', number)
+    if separators:
+        groups = re.split(r'[.,]', number)
+        if len(set(separators)) == 1 and (len(separators) > 1 or len(groups[-1]) == 3) and not suffix:
+            # Séparateur de milliers : "12,345", "1.234.567"
+            number = ''.join(groups)
+        else:
+            # Dernier séparateur décimal, les autres de milliers : "1,2K", "1.234,5"
+            number = ''.join(groups[:-1]) + '.' + groups[-1]
+    try:
+        return int(round(float(number) * _COUNT_MULTIPLIERS.get(suffix, 1)))
+    except ValueError:
+        return None
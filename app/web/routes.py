@@ -3,14 +3,18 @@ Routes Flask pour l'interface web
 """
 
 from flask import render_template, request, jsonify, redirect, url_for, current_app, send_file
-from app.services.scraping_service import ScrapingService
-from app.services.screenshot_service import ScreenshotService
-from app.services.ai_analysis_service import AIAnalysisService
+from app.services.cost_estimator import ScrapingCostEstimator
+from app.services.service_registry import get_scraping_service, get_screenshot_service, get_ai_analysis_service
 from app.utils.logger import get_logger, get_logs, get_logs_summary, clear_logs, SystemLogger, WebLogger
 from app.database.models import Lead
+from app.scrapers.google_maps_v2_continuous import BUSINESS_TYPES
 from app.database.database import db
 import os
 from app.utils.gcp_billing import get_gcp_monthly_cost
+from app.utils.llm_cache import get_llm_cache, llm_cache_bypass
+from app.utils.validators import parse_social_count
+from app.utils.llm_telemetry import llm_context, get_llm_calls, get_llm_summary, load_llm_calls, summarize_llm_calls
+from contextlib import nullcontext
 from app.prompts import WEBSITE_ANALYSIS_PROMPT, SCREENSHOT_ANALYSIS_PROMPT, LEAD_SCORING_PROMPT, SYSTEM_PROMPT
 import json
 
@@ -118,6 +122,7 @@ def register_routes(app):
             max_results = data.get('max_results', 20)
             anti_hotels = bool(int(data.get('anti_hotels', 0)))
             wide_search = bool(int(data.get('wide_search', 0)))
+            dry_run = bool(int(data.get('dry_run', 0)))
             
             logger.info(f"📍 [API] Paramètres reçus:")
             logger.info(f"   - Localisation: {location}")
@@ -135,7 +140,26 @@ def register_routes(app):
                     'message': 'Localisation requise'
                 }), 400
             
-            scraping_service = ScrapingService()
+            if dry_run:
+                # Estimation seule : aucun appel Google Places, OpenAI ou navigateur
+                estimate = ScrapingCostEstimator().estimate_scraping_smart(
+                    location=location,
+                    business_type=business_type,
+                    max_results=max_results,
+                    min_rating=min_rating,
+                    min_reviews=min_reviews,
+                    radius=radius,
+                    anti_hotels=anti_hotels,
+                    wide_search=wide_search
+                )
+                logger.info(f"🧮 [API] Estimation à blanc: ${estimate['total_cost_usd']:.2f}, {estimate['duration_minutes']} min")
+                return jsonify({
+                    'success': True,
+                    'dry_run': True,
+                    'estimate': estimate
+                })
+            
+            scraping_service = get_scraping_service()
             result = scraping_service.start_scraping_smart(
                 location=location,
                 business_type=business_type,
@@ -168,9 +192,8 @@ def register_routes(app):
         try:
             WebLogger.debug("Récupération des types d'entreprises")
             
-            with app.app_context():
-                scraping_service = ScrapingService()
-                business_types = scraping_service.get_business_types()
+            # Liste constante : aucun service à construire
+            business_types = BUSINESS_TYPES
             
             # Créer une liste formatée pour l'interface
             formatted_types = []
@@ -228,9 +251,7 @@ def register_routes(app):
         try:
             WebLogger.debug(f"Récupération du lead {lead_id}")
             
-            with app.app_context():
-                scraping_service = ScrapingService()
-                lead = scraping_service.get_lead_by_id(lead_id)
+            lead = Lead.query.get(lead_id)
             
             if not lead:
                 WebLogger.warning(f"Lead {lead_id} non trouvé")
@@ -255,15 +276,15 @@ def register_routes(app):
     def get_status():
         """API pour obtenir le statut de l'application"""
         try:
-            with app.app_context():
-                scraping_service = ScrapingService()
-                leads = scraping_service.get_leads(limit=1)
+            leads_count = Lead.query.count()
+            llm_cache = get_llm_cache()
             
             return jsonify({
                 'success': True,
                 'status': 'running',
                 'database_connected': True,
-                'leads_count': len(leads) if leads else 0
+                'leads_count': leads_count,
+                'llm_cache': llm_cache.summary() if llm_cache else None
             })
             
         except Exception as e:
@@ -274,6 +295,85 @@ def register_routes(app):
                 'message': f'Erreur: {str(e)}'
             }), 500
     
+    @app.route('/api/refresh/status')
+    def refresh_status():
+        """API pour obtenir l'état du planificateur de rafraîchissement"""
+        try:
+            from app.services.refresh_scheduler import get_refresh_scheduler
+            scheduler = get_refresh_scheduler(app)
+            
+            return jsonify({
+                'success': True,
+                'scheduler': scheduler.status()
+            })
+            
+        except Exception as e:
+            WebLogger.error(f"Erreur API refresh status: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': f'Erreur: {str(e)}'
+            }), 500
+    
+    @app.route('/api/refresh/run-once', methods=['POST'])
+    def refresh_run_once():
+        """API pour rafraîchir immédiatement le lead le plus périmé (dans le budget du jour)"""
+        try:
+            from app.services.refresh_scheduler import get_refresh_scheduler
+            WebLogger.info("Rafraîchissement manuel demandé")
+            scheduler = get_refresh_scheduler(app)
+            entry = scheduler.tick()
+            
+            return jsonify({
+                'success': True,
+                'refreshed': entry,
+                'message': 'Lead rafraîchi' if entry else 'Aucun lead périmé dans le budget restant'
+            })
+            
+        except Exception as e:
+            WebLogger.error(f"Erreur API refresh run-once: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': f'Erreur: {str(e)}'
+            }), 500
+    
+    @app.route('/api/lead/<int:lead_id>/refresh', methods=['POST'])
+    def refresh_single_lead(lead_id):
+        """API pour rafraîchir les étapes d'un lead ({"stages": [...], "force": true} : réponses en cache ignorées)"""
+        try:
+            from app.config import Config
+            data = request.get_json(silent=True) or {}
+            force = bool(data.get('force'))
+            stages = data.get('stages') or list(Config.REFRESH_MAX_AGE_DAYS)
+            unknown = [stage for stage in stages if stage not in Config.REFRESH_MAX_AGE_DAYS]
+            if unknown:
+                return jsonify({
+                    'success': False,
+                    'message': f"Étapes inconnues: {', '.join(unknown)}"
+                }), 400
+            
+            lead = Lead.query.get(lead_id)
+            if not lead:
+                return jsonify({
+                    'success': False,
+                    'message': 'Lead non trouvé'
+                }), 404
+            
+            WebLogger.info(f"Rafraîchissement demandé pour le lead {lead_id}: {stages}{' (forcé)' if force else ''}")
+            results = get_scraping_service().refresh_lead(lead, stages, force=force)
+            
+            return jsonify({
+                'success': True,
+                'results': results,
+                'message': 'Lead rafraîchi'
+            })
+            
+        except Exception as e:
+            WebLogger.error(f"Erreur API refresh lead {lead_id}: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': f'Erreur: {str(e)}'
+            }), 500
+    
     # Nouvelles routes pour les logs
     @app.route('/api/logs')
     def get_logs_api():
@@ -335,6 +435,55 @@ def register_routes(app):
                 'message': f'Erreur: {str(e)}'
             }), 500
     
+    @app.route('/api/llm/calls')
+    def get_llm_calls_api():
+        """API pour récupérer les derniers appels OpenAI (filtres : lead_id, run_id, call_type)"""
+        try:
+            limit = int(request.args.get('limit', 100))
+            lead_id = request.args.get('lead_id', type=int)
+            run_id = request.args.get('run_id') or None
+            call_type = request.args.get('call_type', '')
+            
+            calls = get_llm_calls(limit=limit, lead_id=lead_id, run_id=run_id, call_type=call_type)
+            
+            return jsonify({
+                'success': True,
+                'calls': calls,
+                'count': len(calls)
+            })
+            
+        except Exception as e:
+            WebLogger.error(f"Erreur API LLM calls: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': f'Erreur: {str(e)}'
+            }), 500
+    
+    @app.route('/api/llm/summary')
+    def get_llm_summary_api():
+        """API pour le bilan des appels OpenAI par type et par modèle (coût, tokens, latences)
+        
+        ?history=1 : historique complet du fichier JSONL (depuis ?since=2026-10-01)
+        """
+        try:
+            if request.args.get('history'):
+                summary = summarize_llm_calls(load_llm_calls(since=request.args.get('since')))
+            else:
+                summary = get_llm_summary(run_id=request.args.get('run_id') or None,
+                                          lead_id=request.args.get('lead_id', type=int))
+            
+            return jsonify({
+                'success': True,
+                'summary': summary
+            })
+            
+        except Exception as e:
+            WebLogger.error(f"Erreur API LLM summary: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': f'Erreur: {str(e)}'
+            }), 500
+    
     @app.route('/api/sessions/facebook', methods=['POST'])
     def facebook_session():
         """API pour créer une session Facebook"""
@@ -442,8 +591,8 @@ def register_routes(app):
                 }
                 
                 # Capture d'écran
-                screenshot_service = ScreenshotService()
-                screenshots = screenshot_service.capture_social_media(lead_data)
+                screenshot_service = get_screenshot_service()
+                screenshots = screenshot_service.capture_social_media(lead_data, dom_first=False)
                 
                 # Sauvegarder les chemins
                 if screenshots.get('facebook_screenshot'):
@@ -470,9 +619,10 @@ def register_routes(app):
     
     @app.route('/api/lead/<int:lead_id>/analyze', methods=['POST'])
     def analyze_screenshots(lead_id):
-        """API pour analyser les captures d'écran d'un lead"""
+        """API pour analyser les captures d'écran d'un lead ({"force": true} : réponses en cache ignorées)"""
         try:
-            WebLogger.info(f"Analyse IA demandée pour le lead {lead_id}")
+            force = bool((request.get_json(silent=True) or {}).get('force'))
+            WebLogger.info(f"Analyse IA demandée pour le lead {lead_id}{' (forcée)' if force else ''}")
             
             with app.app_context():
                 # Récupérer le lead
@@ -502,17 +652,18 @@ def register_routes(app):
                 lead.update_ai_log("Début de l'analyse IA")
                 db.session.commit()
                 
-                ai_service = AIAnalysisService()
+                ai_service = get_ai_analysis_service()
                 
                 # Analyser chaque screenshot séparément
                 ai_results = {}
-                if screenshots.get('facebook_screenshot'):
-                    fb_result = ai_service.analyze_social_media_screenshots(screenshots['facebook_screenshot'], 'facebook')
-                    ai_results['facebook_data'] = fb_result
-                
-                if screenshots.get('instagram_screenshot'):
-                    insta_result = ai_service.analyze_social_media_screenshots(screenshots['instagram_screenshot'], 'instagram')
-                    ai_results['instagram_data'] = insta_result
+                with llm_context(lead_id=lead.id), (llm_cache_bypass() if force else nullcontext()):
+                    if screenshots.get('facebook_screenshot'):
+                        fb_result = ai_service.analyze_social_media_screenshots(screenshots['facebook_screenshot'], 'facebook')
+                        ai_results['facebook_data'] = fb_result
+                    
+                    if screenshots.get('instagram_screenshot'):
+                        insta_result = ai_service.analyze_social_media_screenshots(screenshots['instagram_screenshot'], 'instagram')
+                        ai_results['instagram_data'] = insta_result
                 
                 # Traiter les résultats Facebook
                 if ai_results.get('facebook_data'):
@@ -528,25 +679,12 @@ def register_routes(app):
                                 if len(stats_parts) >= 2:
                                     likes_part = stats_parts[0].strip()
                                     followers_part = stats_parts[1].strip()
-                                    import re
-                                    likes_match = re.search(r'(\d+(?:\.\d+)?)\s*[KMB]?', likes_part)
-                                    followers_match = re.search(r'(\d+(?:\.\d+)?)\s*[KMB]?', followers_part)
-                                    if likes_match:
-                                        likes_str = likes_match.group(1)
-                                        if 'K' in likes_part:
-                                            lead.nb_likes_facebook = int(float(likes_str) * 1000)
-                                        elif 'M' in likes_part:
-                                            lead.nb_likes_facebook = int(float(likes_str) * 1000000)
-                                        else:
-                                            lead.nb_likes_facebook = int(likes_str)
-                                    if followers_match:
-                                        followers_str = followers_match.group(1)
-                                        if 'K' in followers_part:
-                                            lead.nb_followers_facebook = int(float(followers_str) * 1000)
-                                        elif 'M' in followers_part:
-                                            lead.nb_followers_facebook = int(float(followers_str) * 1000000)
-                                        else:
-                                            lead.nb_followers_facebook = int(followers_str)
+                                    likes = parse_social_count(likes_part)
+                                    followers = parse_social_count(followers_part)
+                                    if likes is not None:
+                                        lead.nb_likes_facebook = likes
+                                    if followers is not None:
+                                        lead.nb_followers_facebook = followers
                             except Exception as e:
                                 WebLogger.warning(f"Erreur extraction likes/followers Facebook: {str(e)}")
                         lead.update_ai_log(f"Analyse Facebook IA réussie: {lead.facebook_stats}")
@@ -630,11 +768,8 @@ def register_routes(app):
         try:
             WebLogger.info("Recalcul des scores d'opportunité demandé")
             with app.app_context():
-                from app.services.scraping_service import ScrapingService
-                from app.services.ai_analysis_service import AIAnalysisService
-                scraping_service = ScrapingService()
-                ai_service = AIAnalysisService()
-                leads = scraping_service.get_leads(limit=10000)  # Tous les leads
+                ai_service = get_ai_analysis_service()
+                leads = Lead.query.order_by(Lead.created_at.desc()).limit(10000).all()  # Tous les leads
                 updated = 0
                 errors = 0
                 for lead in leads:
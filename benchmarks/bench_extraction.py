@@ -0,0 +1,278 @@
+"""
+Benchmark hors ligne de l'extraction sur un corpus de pages d'accueil synthétiques
+
+Les pages de benchmarks/corpus sont générées pour reproduire les mises en page
+rencontrées sur les sites des leads (WordPress, JSON-LD, page builder, coquille
+JavaScript...) : ce ne sont pas des pages réelles enregistrées. Les débits et
+rappels mesurés sont donc indicatifs.
+
+Aucun site ni OpenAI n'est appelé. Pour chaque étape (extraction WebsiteSpider,
+texte de l'analyse standard, sections de l'analyse par sections, analyse HTML
+manuelle de repli), le script mesure le débit, le pic mémoire (tracemalloc) et
+le rappel des champs attendus (benchmarks/corpus/expected.json) :
+- extracteurs : valeurs retrouvées parmi les emails, téléphones, Facebook,
+  Instagram et code postal attendus ;
+- texte et sections : valeurs attendues encore présentes dans le contenu
+  transmis à l'IA.
+Les tokens transmis à l'IA par page (texte converti) sont comparés à ceux du
+HTML brut.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_extraction --repeat 5 --output bench_extraction.json
+    python -m benchmarks.bench_extraction --baseline bench_extraction.json
+
+Avec --baseline, le script compare au résultat d'un commit précédent et se
+termine en erreur si un rappel baisse ou si un débit chute au-delà de --tolerance.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark-hors-ligne')  # requis par le constructeur, jamais utilisé
+
+from scrapy.http import HtmlResponse, Request
+
+from app.config import Config
+from app.scrapers.page_text import MAX_CHUNKS, split_text_into_chunks
+from app.scrapers.scrapy_spider_improved import WebsiteSpider
+from app.services.ai_analysis_service import AIAnalysisService
+from app.utils.token_counter import TIKTOKEN_AVAILABLE, count_tokens, truncate_to_tokens
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+FIELDS = ['emails', 'phones', 'facebook', 'instagram', 'postal_code']
+
+def load_corpus():
+    """Pages du corpus et valeurs attendues"""
+    with open(os.path.join(CORPUS_DIR, 'expected.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    pages = []
+    for name, fields in expected.items():
+        with open(os.path.join(CORPUS_DIR, name), 'r', encoding='utf-8') as f:
+            pages.append({'name': name, 'html': f.read(), 'expected': fields})
+    return pages
+
+# ----- Comparaison des valeurs -----
+
+def phone_key(phone: str) -> str:
+    digits = re.sub(r'\D', '', phone or '')
+    for prefix in ('0033', '33'):
+        if digits.startswith(prefix) and len(digits) == len(prefix) + 9:
+            return '0' + digits[len(prefix):]
+    return digits
+
+def url_key(url: str) -> str:
+    return re.sub(r'^(https?://)?(www\.)?', '', (url or '').lower()).rstrip('/')
+
+def expected_values(expected):
+    """[(champ, valeur attendue)] d'une page"""
+    values = [('emails', email) for email in expected['emails']]
+    values += [('phones', phone) for phone in expected['phones']]
+    values += [(field, expected[field]) for field in ('facebook', 'instagram', 'postal_code') if expected.get(field)]
+    return values
+
+def extracted_recall(found, expected):
+    """
+    Rappel d'un extracteur
+
+    found: {'emails': [...], 'phones': [...], 'social': [urls], 'address': texte}
+    """
+    emails = {email.lower() for email in found['emails']}
+    phones = {phone_key(phone) for phone in found['phones']}
+    social = {url_key(url) for url in found['social']}
+    hits = {field: 0 for field in FIELDS}
+    totals = {field: 0 for field in FIELDS}
+    for field, value in expected_values(expected):
+        totals[field] += 1
+        if field == 'emails':
+            hit = value.lower() in emails
+        elif field == 'phones':
+            hit = phone_key(value) in phones
+        elif field == 'postal_code':
+            hit = value in (found['address'] or '')
+        else:
+            hit = url_key(value) in social
+        hits[field] += int(hit)
+    return hits, totals
+
+def preserved_recall(text, expected):
+    """Rappel d'une étape de réduction : valeurs attendues encore présentes dans le texte"""
+    text_lower = text.lower()
+    hits = {field: 0 for field in FIELDS}
+    totals = {field: 0 for field in FIELDS}
+    for field, value in expected_values(expected):
+        totals[field] += 1
+        hits[field] += int(value.lower().rstrip('/') in text_lower)
+    return hits, totals
+
+# ----- Étapes mesurées -----
+
+def spider_stage(spider):
+    def run(page):
+        url = page['expected']['url']
+        response = HtmlResponse(url=url, body=page['html'].encode('utf-8'), encoding='utf-8', request=Request(url, meta={'url': url}))
+        return spider._parse_website(response)
+
+    def found(result):
+        return {
+            'emails': result.get('emails', []),
+            'phones': result.get('phones', []),
+            'social': [url for urls in result.get('social_media', {}).values() for url in urls],
+            'address': result.get('address', '')
+        }
+    return run, lambda result, page: extracted_recall(found(result), page['expected'])
+
+def fallback_stage(service):
+    def run(page):
+        return service._get_fallback_result_with_html_analysis(page['html'], page['expected']['url'])
+
+    def found(result):
+        contact = result.get('contact', {})
+        return {
+            'emails': contact.get('emails', []),
+            'phones': contact.get('telephones', []),
+            'social': [url for url in result.get('reseaux_sociaux', {}).values() if isinstance(url, str)],
+            'address': contact.get('adresse', '')
+        }
+    return run, lambda result, page: extracted_recall(found(result), page['expected'])
+
+def page_text_stage(service):
+    def run(page):
+        text = service.prepare_page_text(page['html'], page['expected']['url'])
+        return truncate_to_tokens(text, Config.LLM_STANDARD_MAX_TOKENS)
+    return run, lambda result, page: preserved_recall(result, page['expected'])
+
+def chunks_stage(service):
+    def run(page):
+        text = service.prepare_page_text(page['html'], page['expected']['url'])
+        return split_text_into_chunks(text, Config.LLM_CHUNK_TOKENS, MAX_CHUNKS)
+    return run, lambda result, page: preserved_recall('\n'.join(result), page['expected'])
+
+def token_usage(service, pages):
+    """Tokens par page : HTML brut et texte converti transmis à l'IA"""
+    return {page['name']: {'html': count_tokens(page['html']),
+                           'text': count_tokens(service.prepare_page_text(page['html'], page['expected']['url']))}
+            for page in pages}
+
+def measure(run, score, pages, repeat):
+    """Temps (meilleur sur `repeat`), pic mémoire et rappel d'une étape sur tout le corpus"""
+    per_page = {}
+    hits = {field: 0 for field in FIELDS}
+    totals = {field: 0 for field in FIELDS}
+    total_seconds = 0.0
+    for page in pages:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run(page)
+            best = min(best, time.perf_counter() - start)
+        page_hits, page_totals = score(result, page)
+        for field in FIELDS:
+            hits[field] += page_hits[field]
+            totals[field] += page_totals[field]
+        found, expected = sum(page_hits.values()), sum(page_totals.values())
+        per_page[page['name']] = {'seconds': round(best, 5), 'recall': round(found / expected, 3) if expected else None}
+        total_seconds += best
+
+    # Pic mémoire mesuré à part (tracemalloc ralentit l'exécution)
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        run(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    total_bytes = sum(len(page['html'].encode('utf-8')) for page in pages)
+    found, expected = sum(hits.values()), sum(totals.values())
+    return {
+        'seconds': round(total_seconds, 5),
+        'mb_per_s': round(total_bytes / 1024 / 1024 / total_seconds, 2) if total_seconds else None,
+        'pages_per_s': round(len(pages) / total_seconds, 1) if total_seconds else None,
+        'peak_kb': round(peak / 1024),
+        'recall': round(found / expected, 3) if expected else None,
+        'recall_by_field': {field: round(hits[field] / totals[field], 3) for field in FIELDS if totals[field]},
+        'per_page': per_page
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'inconnu'
+
+def compare(results, baseline, tolerance):
+    """Régressions par rapport à un résultat précédent"""
+    regressions = []
+    for stage, current in results['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous:
+            continue
+        if current['recall'] is not None and previous['recall'] is not None and current['recall'] < previous['recall']:
+            regressions.append(f"{stage}: rappel {previous['recall']} -> {current['recall']}")
+        if previous['mb_per_s'] and current['mb_per_s'] < previous['mb_per_s'] * (1 - tolerance):
+            regressions.append(f"{stage}: débit {previous['mb_per_s']} -> {current['mb_per_s']} Mo/s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions par page')
+    parser.add_argument('--output', help='Fichier JSON où enregistrer les résultats')
+    parser.add_argument('--baseline', help='Résultats JSON d\'un commit précédent à comparer')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Baisse de débit tolérée (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)  # les étapes journalisent chaque page
+    pages = load_corpus()
+    service = AIAnalysisService()
+    stages = {
+        'spider': spider_stage(WebsiteSpider()),
+        'page_text': page_text_stage(service),
+        'text_chunks': chunks_stage(service),
+        'fallback': fallback_stage(service),
+    }
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'corpus': {page['name']: len(page['html']) for page in pages},
+        'stages': {name: measure(run, score, pages, args.repeat) for name, (run, score) in stages.items()},
+        'tokens': token_usage(service, pages)
+    }
+
+    total_kb = sum(results['corpus'].values()) / 1024
+    print(f"📚 Corpus: {len(pages)} pages, {total_kb:.0f} Ko (plus grande: {max(results['corpus'].values()) / 1024:.0f} Ko) - commit {results['commit']}")
+    print(f"{'Étape':<16}{'Mo/s':>9}{'pages/s':>10}{'pic Ko':>9}{'rappel':>9}  par champ")
+    for name, stage in results['stages'].items():
+        by_field = ', '.join(f"{field} {value:.0%}" for field, value in stage['recall_by_field'].items())
+        print(f"{name:<16}{stage['mb_per_s']:>9}{stage['pages_per_s']:>10}{stage['peak_kb']:>9}{stage['recall']:>9.0%}  {by_field}")
+
+    html_tokens = sum(usage['html'] for usage in results['tokens'].values())
+    text_tokens = sum(usage['text'] for usage in results['tokens'].values())
+    print(f"🔢 Tokens ({'tiktoken' if TIKTOKEN_AVAILABLE else 'caractères / 4'}): HTML brut {html_tokens}, "
+          f"texte converti {text_tokens} (-{1 - text_tokens / html_tokens:.0%})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 Résultats enregistrés dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"⚠️ Régressions par rapport au commit {baseline.get('commit')}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"✅ Aucune régression par rapport au commit {baseline.get('commit')}")
+
+if __name__ == '__main__':
+    main()
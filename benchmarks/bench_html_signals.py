@@ -0,0 +1,126 @@
+"""
+Benchmark : extraction en une passe (html_signals) vs helpers historiques du spider
+
+Génère une page volumineuse (liens, meta, scripts, JSON-LD, médias, paragraphes),
+vérifie que les deux extractions donnent les mêmes signaux puis compare les temps.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_html_signals --sections 400 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapy.http import HtmlResponse
+
+from app.scrapers.html_signals import extract_html_signals
+from benchmarks.legacy_extractors import LegacyExtractors
+
+PAGE_URL = 'https://www.exemple-restaurant.fr/'
+
+def build_page(sections: int) -> str:
+    """Page de test de grande taille"""
+    head = [
+        '<title>Restaurant Exemple - Cuisine maison</title>',
+        '<meta name="description" content="Restaurant traditionnel, réservation au 01 23 45 67 89">',
+        '<meta property="og:description" content="Cuisine maison">',
+        '<meta property="og:see_also" content="https://www.facebook.com/exemple.resto">',
+        '<meta name="author" content="contact@exemple-restaurant.fr">',
+        '<script src="/js/facebook-sdk.js"></script>',
+    ]
+    body = ['<header><h1>Restaurant Exemple</h1><nav>']
+    for i in range(10):
+        body.append(f'<a href="/menu-{i}">Menu {i}</a><a href="/contact">Contact</a>')
+    body.append('</nav></header>')
+
+    for i in range(sections):
+        body.append(f'<section id="s{i}"><h2>Section {i}</h2>')
+        body.append(f'<p>Nos services et tarifs pour la semaine {i}. Horaires : du mardi au samedi 12h-14h.</p>')
+        body.append(f'<p>Écrivez à equipe{i % 7}@exemple-restaurant.fr ou appelez le 06 12 34 {i % 90 + 10:02d} 78.</p>')
+        body.append(f'<img src="/img/plat-{i}.jpg" alt="Plat {i}"><img src="/img/salle-{i}.jpg">')
+        body.append(f'<a href="/carte/plat-{i}" title="Plat {i}">Voir le plat</a>')
+        body.append(f'<a href="https://www.instagram.com/exemple.resto/p/{i % 20}">Photo</a>')
+        if i % 10 == 0:
+            body.append(f'<iframe src="https://www.youtube.com/embed/video{i}"></iframe>')
+            body.append(f'<a href="tel:01234567{i % 90 + 10:02d}">Appeler</a>')
+            body.append(f'<a href="mailto:reservation{i}@exemple-restaurant.fr?subject=Resa">Réserver</a>')
+        if i % 25 == 0:
+            jsonld = {
+                '@context': 'https://schema.org',
+                '@type': 'Restaurant',
+                'name': 'Restaurant Exemple',
+                'telephone': '01 23 45 67 89',
+                'email': f'jsonld{i}@exemple-restaurant.fr',
+                'address': {'streetAddress': f'{i} rue de la Paix', 'postalCode': '75002', 'addressLocality': 'Paris'},
+                'openingHours': 'Tu-Sa 12:00-14:00',
+                'sameAs': ['https://www.facebook.com/exemple.resto', 'https://www.linkedin.com/company/exemple'],
+            }
+            body.append(f'<script type="application/ld+json">{json.dumps(jsonld)}</script>')
+            body.append('<script>var share = {fb: "https://www.facebook.com/sharer.php", tw: "/twitter/intent"};'
+                        + ' var pad = "' + 'x' * 2000 + '";</script>')
+        body.append('</section>')
+
+    body.append('<footer><address>12 rue de la Paix, 75002 Paris</address>'
+                '<form action="/contact"><input name="email"></form>'
+                '<a href="https://www.tiktok.com/@exemple">TikTok</a></footer>')
+    return f"<html><head>{''.join(head)}</head><body>{''.join(body)}</body></html>"
+
+def normalize(signals: dict) -> dict:
+    """Rendre les résultats comparables (les anciens helpers dédupliquent via set)"""
+    normalized = dict(signals)
+    for key in ('emails', 'phones', 'links'):
+        normalized[key] = sorted(set(signals[key]))
+    normalized['social_media'] = {platform: sorted(set(urls)) for platform, urls in signals['social_media'].items()}
+    return normalized
+
+def timed(func, repeat: int) -> float:
+    """Meilleur temps sur `repeat` exécutions"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sections', type=int, default=400, help='Nombre de sections de la page générée')
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de répétitions par mesure')
+    args = parser.parse_args()
+
+    html = build_page(args.sections)
+    response = HtmlResponse(url=PAGE_URL, body=html.encode('utf-8'), encoding='utf-8')
+    response.selector  # arbre construit une fois, comme dans le spider
+    legacy = LegacyExtractors()
+
+    def run_legacy():
+        return legacy.extract(response)
+
+    def run_single_pass():
+        return extract_html_signals(response.text, response.url, root=response.selector.root, urljoin=response.urljoin)
+
+    legacy_result = normalize(run_legacy())
+    single_pass_result = normalize(run_single_pass())
+    mismatches = [key for key in legacy_result if legacy_result[key] != single_pass_result.get(key)]
+
+    legacy_time = timed(run_legacy, args.repeat)
+    single_pass_time = timed(run_single_pass, args.repeat)
+
+    print(f"📄 Page: {len(html) / 1024:.0f} Ko, {args.sections} sections")
+    print(f"🐢 Helpers historiques : {legacy_time * 1000:8.1f} ms")
+    print(f"🚀 Extraction une passe: {single_pass_time * 1000:8.1f} ms")
+    print(f"⚡ Accélération        : x{legacy_time / single_pass_time:.1f}")
+    if mismatches:
+        print(f"⚠️ Signaux différents : {', '.join(mismatches)}")
+        for key in mismatches:
+            print(f"   - {key}: historique={legacy_result[key]!r:.200} / une passe={single_pass_result.get(key)!r:.200}")
+        sys.exit(1)
+    print("✅ Signaux identiques")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+"""
+Extracteurs historiques de WebsiteSpider (une passe de sélecteurs par signal)
+
+Conservés uniquement comme référence pour bench_html_signals.py : chaque helper
+reparcourt l'arbre (a[href], meta, script) et reparse les blocs JSON-LD.
+Les logs sont envoyés vers un logger désactivé pour ne mesurer que l'extraction.
+"""
+
+import json
+import logging
+import re
+
+logger = logging.getLogger('benchmarks.legacy_extractors')
+logger.disabled = True
+
+class LegacyExtractors:
+    """Helpers d'extraction tels qu'appelés par l'ancien WebsiteSpider.parse"""
+
+    def extract(self, response) -> dict:
+        """Résultat complet, mêmes clés que extract_html_signals"""
+        address, opening_hours = self._extract_address_hours(response)
+        return {
+            'title': self._extract_title(response),
+            'description': self._extract_description(response),
+            'emails': self._extract_emails_all(response),
+            'phones': self._extract_phones_all(response),
+            'social_media': self._extract_social_media_all(response),
+            'links': self._extract_important_links(response),
+            'address': address,
+            'opening_hours': opening_hours,
+            'structured_data': self._extract_structured_data(response),
+            'has_video': self._has_video(response),
+            'has_images': self._has_images(response),
+            'images_count': self._count_images(response),
+            'videos_count': self._count_videos(response),
+            'text_summary': self._extract_text_summary(response),
+            'products_services': self._has_products_services(response),
+            'contact_form': self._has_contact_form(response)
+        }
+
+    def _extract_title(self, response) -> str:
+        """Extraire le titre de la page"""
+        # Meta title
+        title = response.css('title::text').get()
+        if title:
+            title = title.strip()
+            logger.info(f"📝 Titre trouvé: {title[:50]}...")
+            return title
+
+        # Fallback: H1
+        h1 = response.css('h1::text').get()
+        if h1:
+            h1 = h1.strip()
+            logger.info(f"📝 Titre H1 trouvé: {h1[:50]}...")
+            return h1
+
+        logger.warning("⚠️ Aucun titre trouvé")
+        return ""
+
+    def _extract_description(self, response) -> str:
+        """Extraire la description de la page"""
+        # Meta description
+        desc = response.css('meta[name="description"]::attr(content)').get()
+        if desc:
+            desc = desc.strip()
+            logger.info(f"📄 Description meta trouvée: {desc[:50]}...")
+            return desc
+
+        # Open Graph description
+        og_desc = response.css('meta[property="og:description"]::attr(content)').get()
+        if og_desc:
+            og_desc = og_desc.strip()
+            logger.info(f"📄 Description OG trouvée: {og_desc[:50]}...")
+            return og_desc
+
+        logger.warning("⚠️ Aucune description trouvée")
+        return ""
+
+    def _extract_social_media_all(self, response) -> dict:
+        """Extraction exhaustive des liens réseaux sociaux (a, meta, scripts, JSON-LD)"""
+        social_media = {}
+
+        logger.info(f"🔍 [SOCIAL] Début extraction réseaux sociaux pour {response.url}")
+
+        # 1. Liens <a> - AMÉLIORÉ
+        for a in response.css('a[href]'):
+            href = a.attrib.get('href', '')
+            text = a.css('::text').get() or ''
+            title = a.attrib.get('title', '')
+            classes = ' '.join(a.attrib.get('class', []))
+
+            # Chercher dans href, texte, title et classes
+            search_text = f"{href} {text} {title} {classes}".lower()
+
+            for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+                if platform in search_text:
+                    full_url = response.urljoin(href)
+                    social_media.setdefault(platform, []).append(full_url)
+                    logger.info(f"📱 [SOCIAL] {platform} trouvé dans lien: {full_url}")
+
+        # 2. Meta tags - AMÉLIORÉ
+        for meta in response.css('meta'):
+            content = meta.attrib.get('content', '')
+            property_attr = meta.attrib.get('property', '')
+            name_attr = meta.attrib.get('name', '')
+
+            # Chercher dans content, property et name
+            search_text = f"{content} {property_attr} {name_attr}".lower()
+
+            for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+                if platform in search_text:
+                    social_media.setdefault(platform, []).append(content)
+                    logger.info(f"📱 [SOCIAL] {platform} trouvé dans meta: {content}")
+
+        # 3. Scripts - AMÉLIORÉ
+        for script in response.css('script'):
+            script_text = script.get()
+            if script_text:
+                # Chercher les URLs complètes
+                for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+                    # Pattern pour URLs complètes
+                    urls = re.findall(rf'https?://[^\s"\'>]*{platform}[^\s"\'>]*', script_text, re.IGNORECASE)
+                    for url in urls:
+                        social_media.setdefault(platform, []).append(url)
+                        logger.info(f"📱 [SOCIAL] {platform} trouvé dans script: {url}")
+
+                    # Pattern pour chemins relatifs
+                    paths = re.findall(rf'/{platform}[^\s"\'>]*', script_text, re.IGNORECASE)
+                    for path in paths:
+                        full_url = response.urljoin(path)
+                        social_media.setdefault(platform, []).append(full_url)
+                        logger.info(f"📱 [SOCIAL] {platform} trouvé dans script (path): {full_url}")
+
+        # 4. JSON-LD - AMÉLIORÉ
+        for script in response.css('script[type="application/ld+json"]::text').getall():
+            try:
+                data = json.loads(script)
+                self._extract_social_from_json(data, social_media, response)
+            except Exception as e:
+                logger.debug(f"⚠️ [SOCIAL] Erreur parsing JSON-LD: {str(e)}")
+                continue
+
+        # 5. Chercher dans les icônes et classes CSS
+        for element in response.css('*[class*="facebook"], *[class*="instagram"], *[class*="twitter"], *[class*="linkedin"], *[class*="youtube"], *[class*="social"]'):
+            classes = ' '.join(element.attrib.get('class', []))
+            parent = element.xpath('..')
+
+            # Chercher le lien parent
+            if parent and parent.css('a[href]'):
+                href = parent.css('a::attr(href)').get()
+                if href:
+                    for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+                        if platform in classes.lower():
+                            full_url = response.urljoin(href)
+                            social_media.setdefault(platform, []).append(full_url)
+                            logger.info(f"📱 [SOCIAL] {platform} trouvé via icône: {full_url}")
+
+        # 6. Chercher dans le texte brut
+        text_content = response.text
+        for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+            # URLs complètes
+            urls = re.findall(rf'https?://[^\s"\'>]*{platform}[^\s"\'>]*', text_content, re.IGNORECASE)
+            for url in urls:
+                social_media.setdefault(platform, []).append(url)
+                logger.info(f"📱 [SOCIAL] {platform} trouvé dans texte: {url}")
+
+        # Dédupliquer les URLs
+        for platform in social_media:
+            social_media[platform] = list(set(social_media[platform]))
+
+        logger.info(f"✅ [SOCIAL] Extraction terminée: {len(social_media)} plateformes trouvées")
+        for platform, urls in social_media.items():
+            logger.info(f"   📱 {platform}: {len(urls)} URLs")
+            for url in urls:
+                logger.info(f"      - {url}")
+
+        return social_media
+
+    def _extract_social_from_json(self, data, social_media, response):
+        """Extrait les réseaux sociaux depuis les données JSON"""
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if isinstance(value, str):
+                    for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+                        if platform in value.lower():
+                            social_media.setdefault(platform, []).append(value)
+                            logger.info(f"📱 [SOCIAL] {platform} trouvé dans JSON: {value}")
+                elif isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, str):
+                            for platform in ['facebook', 'instagram', 'twitter', 'linkedin', 'youtube', 'tiktok']:
+                                if platform in item.lower():
+                                    social_media.setdefault(platform, []).append(item)
+                                    logger.info(f"📱 [SOCIAL] {platform} trouvé dans JSON array: {item}")
+                elif isinstance(value, dict):
+                    self._extract_social_from_json(value, social_media, response)
+        elif isinstance(data, list):
+            for item in data:
+                self._extract_social_from_json(item, social_media, response)
+
+    def _extract_emails_all(self, response) -> list:
+        """Extraction exhaustive des emails (texte, href, meta, scripts, JSON-LD)"""
+        emails = set()
+        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+
+        logger.info(f"🔍 [EMAIL] Début extraction emails pour {response.url}")
+
+        # Texte brut
+        text_emails = re.findall(email_pattern, response.text)
+        emails.update(text_emails)
+        logger.info(f"📧 [EMAIL] {len(text_emails)} emails trouvés dans le texte")
+
+        # Href mailto
+        mailto_emails = []
+        for mailto in response.css('a[href^="mailto:"]::attr(href)').getall():
+            email = mailto.replace('mailto:', '').split('?')[0]
+            if re.match(email_pattern, email):
+                emails.add(email)
+                mailto_emails.append(email)
+        logger.info(f"📧 [EMAIL] {len(mailto_emails)} emails trouvés dans les liens mailto")
+
+        # Meta
+        meta_emails = []
+        for meta in response.css('meta'):
+            content = meta.attrib.get('content', '')
+            found_emails = re.findall(email_pattern, content)
+            emails.update(found_emails)
+            meta_emails.extend(found_emails)
+        logger.info(f"📧 [EMAIL] {len(meta_emails)} emails trouvés dans les meta tags")
+
+        # Scripts
+        script_emails = []
+        for script in response.css('script'):
+            script_text = script.get()
+            if script_text:
+                found_emails = re.findall(email_pattern, script_text)
+                emails.update(found_emails)
+                script_emails.extend(found_emails)
+        logger.info(f"📧 [EMAIL] {len(script_emails)} emails trouvés dans les scripts")
+
+        # JSON-LD
+        jsonld_emails = []
+        for script in response.css('script[type="application/ld+json"]::text').getall():
+            try:
+                data = json.loads(script)
+                if isinstance(data, dict):
+                    for v in data.values():
+                        if isinstance(v, str):
+                            found_emails = re.findall(email_pattern, v)
+                            emails.update(found_emails)
+                            jsonld_emails.extend(found_emails)
+                        elif isinstance(v, list):
+                            for item in v:
+                                if isinstance(item, str):
+                                    found_emails = re.findall(email_pattern, item)
+                                    emails.update(found_emails)
+                                    jsonld_emails.extend(found_emails)
+            except Exception:
+                continue
+        logger.info(f"📧 [EMAIL] {len(jsonld_emails)} emails trouvés dans JSON-LD")
+
+        final_emails = list(emails)
+        logger.info(f"✅ [EMAIL] Total emails uniques extraits: {len(final_emails)}")
+        for email in final_emails:
+            logger.debug(f"📧 [EMAIL] Email trouvé: {email}")
+
+        return final_emails
+
+    def _extract_phones_all(self, response) -> list:
+        """Extraction exhaustive des téléphones (texte, href, meta, scripts, JSON-LD)"""
+        phones = set()
+        phone_pattern = r'(?:\+33|0033|33|0)[1-9](?:[ .-]?\d{2}){4}'
+        # Texte brut
+        phones.update(re.findall(phone_pattern, response.text))
+        # Href tel
+        for tel in response.css('a[href^="tel:"]::attr(href)').getall():
+            phone = tel.replace('tel:', '').strip()
+            if re.match(phone_pattern, phone):
+                phones.add(phone)
+        # Meta
+        for meta in response.css('meta'):
+            content = meta.attrib.get('content', '')
+            phones.update(re.findall(phone_pattern, content))
+        # Scripts
+        for script in response.css('script'):
+            script_text = script.get()
+            if script_text:
+                phones.update(re.findall(phone_pattern, script_text))
+        # JSON-LD
+        for script in response.css('script[type="application/ld+json"]::text').getall():
+            try:
+                data = json.loads(script)
+                if isinstance(data, dict):
+                    for v in data.values():
+                        if isinstance(v, str):
+                            phones.update(re.findall(phone_pattern, v))
+                        elif isinstance(v, list):
+                            for item in v:
+                                if isinstance(item, str):
+                                    phones.update(re.findall(phone_pattern, item))
+            except Exception:
+                continue
+        return list(phones)
+
+    def _extract_important_links(self, response) -> list:
+        """Extraction des liens de contact, réservation, menu, etc."""
+        keywords = ['contact', 'reservation', 'menu', 'carte', 'book', 'reserver', 'access', 'localisation', 'find-us']
+        links = set()
+        for a in response.css('a[href]'):
+            href = a.attrib.get('href', '')
+            text = a.css('::text').get() or ''
+            if any(kw in href.lower() or kw in text.lower() for kw in keywords):
+                links.add(response.urljoin(href))
+        return list(links)
+
+    def _extract_address_hours(self, response):
+        """Extraction de l'adresse et des horaires (balises, microdonnées, JSON-LD)"""
+        address = ''
+        opening_hours = ''
+        # Balises address
+        addr = response.css('address::text').get()
+        if addr:
+            address = addr.strip()
+        # Microdonnées/JSON-LD
+        for script in response.css('script[type="application/ld+json"]::text').getall():
+            try:
+                data = json.loads(script)
+                if isinstance(data, dict):
+                    if 'address' in data:
+                        if isinstance(data['address'], dict):
+                            address = ', '.join([str(v) for v in data['address'].values() if v])
+                        elif isinstance(data['address'], str):
+                            address = data['address']
+                    if 'openingHours' in data:
+                        opening_hours = data['openingHours']
+            except Exception:
+                continue
+        # Recherche dans le texte pour les horaires
+        if not opening_hours:
+            for kw in ['horaires', 'ouverture', 'opening']:
+                found = re.findall(rf'{kw}[^\n\r:]*[:\-]([^\n\r<]+)', response.text, re.IGNORECASE)
+                if found:
+                    opening_hours = found[0].strip()
+                    break
+        return address, opening_hours
+
+    def _extract_structured_data(self, response):
+        """Extraction brute des scripts JSON-LD"""
+        data = []
+        for script in response.css('script[type="application/ld+json"]::text').getall():
+            try:
+                json_data = json.loads(script)
+                data.append(json_data)
+            except Exception:
+                continue
+        return data
+
+    def _has_video(self, response) -> bool:
+        """Détecter la présence de vidéos"""
+        # Chercher les balises video
+        video_tags = response.css('video').getall()
+        if video_tags:
+            logger.info(f"🎥 Vidéos trouvées: {len(video_tags)} balises video")
+            return True
+
+        # Chercher les iframes YouTube/Vimeo
+        iframe_srcs = response.css('iframe::attr(src)').getall()
+        video_platforms = ['youtube', 'vimeo', 'dailymotion', 'vimeo']
+
+        for src in iframe_srcs:
+            if any(platform in src.lower() for platform in video_platforms):
+                logger.info(f"🎥 Vidéo iframe trouvée: {src}")
+                return True
+
+        # Chercher les liens vers des vidéos
+        video_links = response.css('a[href*="youtube"], a[href*="vimeo"], a[href*="dailymotion"]').getall()
+        if video_links:
+            logger.info(f"🎥 Liens vidéo trouvés: {len(video_links)}")
+            return True
+
+        return False
+
+    def _count_videos(self, response) -> int:
+        """Compter le nombre de vidéos"""
+        count = 0
+
+        # Balises video
+        count += len(response.css('video').getall())
+
+        # Iframes vidéo
+        iframe_srcs = response.css('iframe::attr(src)').getall()
+        video_platforms = ['youtube', 'vimeo', 'dailymotion']
+        for src in iframe_srcs:
+            if any(platform in src.lower() for platform in video_platforms):
+                count += 1
+
+        # Liens vidéo
+        video_links = response.css('a[href*="youtube"], a[href*="vimeo"], a[href*="dailymotion"]').getall()
+        count += len(video_links)
+
+        return count
+
+    def _has_images(self, response) -> bool:
+        """Détecter la présence d'images"""
+        images = response.css('img').getall()
+        if images:
+            logger.info(f"🖼️ Images trouvées: {len(images)}")
+            return True
+        return False
+
+    def _count_images(self, response) -> int:
+        """Compter le nombre d'images"""
+        return len(response.css('img').getall())
+
+    def _extract_text_summary(self, response) -> str:
+        """Extraire un résumé du texte de la page"""
+        # Extraire le texte des paragraphes
+        paragraphs = response.css('p::text').getall()
+        text = ' '.join([p.strip() for p in paragraphs if p.strip()])
+
+        # Limiter à 500 caractères
+        if len(text) > 500:
+            text = text[:500] + "..."
+
+        return text
+
+    def _has_products_services(self, response) -> bool:
+        """Détecter la présence de produits/services"""
+        # Mots-clés liés aux produits/services
+        keywords = ['produit', 'service', 'tarif', 'prix', 'commander', 'acheter', 'réservation', 'booking']
+        page_text = response.text.lower()
+
+        for keyword in keywords:
+            if keyword in page_text:
+                logger.info(f"🛍️ Produits/services détectés (mot-clé: {keyword})")
+                return True
+
+        return False
+
+    def _has_contact_form(self, response) -> bool:
+        """Détecter la présence d'un formulaire de contact"""
+        # Chercher les formulaires
+        forms = response.css('form').getall()
+        if forms:
+            logger.info(f"📝 Formulaires trouvés: {len(forms)}")
+            return True
+
+        # Chercher les liens de contact
+        contact_links = response.css('a[href*="contact"], a[href*="nous-contacter"]').getall()
+        if contact_links:
+            logger.info(f"📝 Liens de contact trouvés: {len(contact_links)}")
+            return True
+
+        return False
@@ -0,0 +1,26 @@
+"""ajout du champ d'enrichissement en attente (étapes reportées par le budget de temps)
+
+Revision ID: add_pending_enrichment_field
+Revises: add_refresh_tracking_fields
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pending_enrichment_field'
+down_revision = 'add_refresh_tracking_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('enrichissement_en_attente', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.drop_column('enrichissement_en_attente')
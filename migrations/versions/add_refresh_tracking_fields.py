@@ -0,0 +1,35 @@
+"""ajout des champs de fraîcheur pour le rafraîchissement en arrière-plan
+
+Revision ID: add_refresh_tracking_fields
+Revises: 66566d244541, add_contact_tracking_fields
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_refresh_tracking_fields'
+down_revision = ('66566d244541', 'add_contact_tracking_fields')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Identifiant Google Places et dates de rafraîchissement par étape
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('place_id', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('google_maps_refreshed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('site_web_refreshed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('social_refreshed_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_leads_place_id', ['place_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.drop_index('ix_leads_place_id')
+        batch_op.drop_column('social_refreshed_at')
+        batch_op.drop_column('site_web_refreshed_at')
+        batch_op.drop_column('google_maps_refreshed_at')
+        batch_op.drop_column('place_id')
@@ -0,0 +1,26 @@
+"""ajout du statut de récupération du site web (contenu non HTML, page tronquée)
+
+Revision ID: add_site_web_status_field
+Revises: add_pending_enrichment_field
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_site_web_status_field'
+down_revision = 'add_pending_enrichment_field'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('site_web_statut', sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.drop_column('site_web_statut')
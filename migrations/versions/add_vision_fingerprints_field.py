@@ -0,0 +1,26 @@
+"""ajout des empreintes des captures analysées (analyse Vision réutilisée si la capture est inchangée)
+
+Revision ID: add_vision_fingerprints_field
+Revises: add_website_analysis_table
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_vision_fingerprints_field'
+down_revision = 'add_website_analysis_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('vision_fingerprints', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.drop_column('vision_fingerprints')
@@ -0,0 +1,45 @@
+"""ajout de la table des analyses de sites partagées entre leads (chaînes, Linktree...)
+
+Revision ID: add_website_analysis_table
+Revises: add_site_web_status_field
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_website_analysis_table'
+down_revision = 'add_site_web_status_field'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'website_analyses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cle', sa.String(length=500), nullable=False),
+        sa.Column('url', sa.String(length=500), nullable=False),
+        sa.Column('ai_analysis', sa.JSON(), nullable=True),
+        sa.Column('site_signals', sa.JSON(), nullable=True),
+        sa.Column('analysis_mode', sa.String(length=50), nullable=True),
+        sa.Column('html_size', sa.Integer(), nullable=True),
+        sa.Column('site_web_statut', sa.String(length=50), nullable=True),
+        sa.Column('complete', sa.Boolean(), nullable=True),
+        sa.Column('source_lead_id', sa.Integer(), nullable=True),
+        sa.Column('reutilisations', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('website_analyses', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_website_analyses_cle'), ['cle'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('website_analyses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_website_analyses_cle'))
+
+    op.drop_table('website_analyses')
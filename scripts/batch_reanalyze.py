@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Réanalyse de nuit des leads périmés par l'API Batch d'OpenAI (moitié prix, 24 h au plus)
+Usage:
+  python scripts/batch_reanalyze.py submit [--stage site_web|social] [--limit 200]
+  python scripts/batch_reanalyze.py collect [--wait]
+  python scripts/batch_reanalyze.py status
+
+- submit : sélectionne les leads les plus périmés (RefreshScheduler), prépare les
+  requêtes (site récupéré à nouveau, captures existantes pour 'social') et crée les lots
+- collect : reporte sur les leads les réponses des lots terminés ; --wait attend la fin des lots
+- OPENAI_API_BASE=http://127.0.0.1:8765/v1 vise le serveur local scripts/openai_batch_stub.py
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.batch_analysis_service import BatchAnalysisService
+from app.services.refresh_scheduler import RefreshScheduler
+from app.services.service_registry import get_website_scraper
+
+def submit(service: BatchAnalysisService, app, stage: str, limit: int):
+    candidates = RefreshScheduler(app).select_candidates(limit=limit)
+    leads = [lead for _, lead, stages in candidates if stage in stages]
+    print(f"[1/2] Préparation de {len(leads)} lead(s) ({stage})...")
+
+    outcomes = {}
+    website_scraper = get_website_scraper() if stage == 'site_web' else None
+    for lead in leads:
+        if stage == 'site_web':
+            outcome = service.prepare_lead_website(lead, website_scraper)
+        else:
+            outcome = 'queued' if service.prepare_lead_screenshots(lead) else 'skipped'
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    print(f"  -> {outcomes} ; requêtes à envoyer: {service.pending_count()}, réponses en cache: {service.stats['cached']}")
+
+    print("[2/2] Envoi des lots...")
+    for manifest in service.submit(description=f"reanalyse {stage}"):
+        print(f"  -> lot {manifest['batch_id']}: {len(manifest['requests'])} requête(s) {manifest['model']}")
+    # Réponses obtenues sans lot (cache, extraction déterministe)
+    if service.resolved:
+        print(f"  -> {service.collect_and_apply()} (réponses disponibles immédiatement)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Réanalyse des leads par l'API Batch d'OpenAI")
+    parser.add_argument('command', choices=['submit', 'collect', 'status'])
+    parser.add_argument('--stage', choices=['site_web', 'social'], default='site_web')
+    parser.add_argument('--limit', type=int, default=200)
+    parser.add_argument('--wait', action='store_true', help="attendre la fin des lots en cours")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        service = BatchAnalysisService()
+        if args.command == 'submit':
+            submit(service, app, args.stage, args.limit)
+        elif args.command == 'collect':
+            if args.wait:
+                service.wait()
+            print(json.dumps(service.collect_and_apply(), ensure_ascii=False))
+        else:
+            for manifest in service.manifests(include_applied=True):
+                if not manifest.get('applied'):
+                    manifest = service.refresh(manifest)
+                print(f"{manifest['batch_id']}: {manifest['status']} ({len(manifest['requests'])} requête(s) "
+                      f"{manifest['model']}, reporté: {'oui' if manifest.get('applied') else 'non'})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant les points d'accès fichiers et lots de l'API OpenAI
+Usage:
+  python scripts/openai_batch_stub.py [--port 8765] [--delay 5]
+  OPENAI_API_BASE=http://127.0.0.1:8765/v1 python scripts/batch_reanalyze.py submit
+
+- POST /v1/files (multipart, purpose=batch), GET /v1/files/<id>/content
+- POST /v1/batches, GET /v1/batches/<id>
+- Les lots passent à 'completed' après --delay secondes ; chaque requête reçoit
+  une réponse JSON fixe (analyse de site ou de capture selon le message système)
+- Aucune donnée n'est conservée après l'arrêt du serveur
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WEBSITE_ANSWER = {
+    'contact': {'emails': ['contact@exemple.fr'], 'telephones': ['01 23 45 67 89'], 'adresse': '1 rue de l\'Exemple, 75001 Paris'},
+    'entreprise': {'description': 'Réponse du serveur de test', 'services': ['Service de test'], 'specialites': []},
+    'pratique': {'horaires': 'Lun-Ven 9h-18h', 'tarifs': '', 'zone_intervention': ''},
+    'reseaux_sociaux': {'facebook': '', 'instagram': '', 'linkedin': '', 'twitter': '', 'youtube': '', 'tiktok': ''},
+    'qualite': {'moderne': True, 'responsive': True, 'contenu_riche': False}
+}
+
+SCREENSHOT_ANSWER = {
+    'followers': '1,2K', 'likes': '980', 'posts': '120', 'following': '150',
+    'description': 'Réponse du serveur de test', 'nom_page': 'Page de test', 'type_page': 'entreprise',
+    'verified': False, 'url_site': '', 'localisation': '', 'activite_recente': 'inconnue',
+    'engagement_rate': 'inconnu', 'qualite_contenu': 'moyenne', 'recommandations': []
+}
+
+class Store:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.files = {}
+        self.batches = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def new_id(self, prefix: str) -> str:
+        with self.lock:
+            return f"{prefix}-stub-{next(self.ids)}"
+
+    def answer(self, line: dict) -> dict:
+        body = line.get('body') or {}
+        system = next((m.get('content') for m in body.get('messages', []) if m.get('role') == 'system'), '') or ''
+        answer = SCREENSHOT_ANSWER if 'Vision' in system or body.get('model') == 'gpt-4o' else WEBSITE_ANSWER
+        return {
+            'id': self.new_id('batch_req'),
+            'custom_id': line.get('custom_id'),
+            'response': {
+                'status_code': 200,
+                'request_id': self.new_id('req'),
+                'body': {
+                    'model': body.get('model'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': json.dumps(answer, ensure_ascii=False)},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': 100, 'completion_tokens': 50, 'total_tokens': 150}
+                }
+            },
+            'error': None
+        }
+
+    def complete(self, batch: dict):
+        """Produire le fichier de sortie d'un lot dont le délai est écoulé"""
+        if batch['status'] != 'in_progress' or time.time() - batch['created_at'] < self.delay:
+            return
+        lines = [json.loads(raw) for raw in self.files[batch['input_file_id']]['content'].splitlines() if raw.strip()]
+        output_id = self.new_id('file')
+        self.files[output_id] = {'content': '\n'.join(json.dumps(self.answer(line), ensure_ascii=False) for line in lines),
+                                 'filename': f"{batch['id']}_output.jsonl"}
+        batch.update(status='completed', output_file_id=output_id, completed_at=int(time.time()),
+                     request_counts={'total': len(lines), 'completed': len(lines), 'failed': 0})
+
+class Handler(BaseHTTPRequestHandler):
+    store: Store = None
+
+    def _send(self, status: int, payload, raw: bool = False):
+        data = payload.encode('utf-8') if raw else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/jsonl' if raw else 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        if self.path == '/v1/files':
+            message = BytesParser(policy=default_policy).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8') + self._body())
+            fields = {part.get_param('name', header='content-disposition'): part for part in message.iter_parts()}
+            upload = fields.get('file')
+            if upload is None:
+                return self._send(400, {'error': {'message': 'fichier manquant'}})
+            file_id = self.store.new_id('file')
+            self.store.files[file_id] = {'content': upload.get_payload(decode=True).decode('utf-8'),
+                                         'filename': upload.get_filename()}
+            return self._send(200, {'id': file_id, 'object': 'file', 'purpose': 'batch', 'filename': upload.get_filename()})
+
+        if self.path == '/v1/batches':
+            request = json.loads(self._body() or b'{}')
+            if request.get('input_file_id') not in self.store.files:
+                return self._send(400, {'error': {'message': 'input_file_id inconnu'}})
+            batch = {'id': self.store.new_id('batch'), 'object': 'batch', 'endpoint': request.get('endpoint'),
+                     'input_file_id': request['input_file_id'], 'completion_window': request.get('completion_window'),
+                     'status': 'in_progress', 'output_file_id': None, 'error_file_id': None,
+                     'created_at': int(time.time()), 'metadata': request.get('metadata') or {}}
+            self.store.batches[batch['id']] = batch
+            return self._send(200, batch)
+
+        self._send(404, {'error': {'message': f"{self.path} inconnu"}})
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) == 3 and parts[:2] == ['v1', 'batches'] and parts[2] in self.store.batches:
+            batch = self.store.batches[parts[2]]
+            self.store.complete(batch)
+            return self._send(200, batch)
+        if len(parts) == 4 and parts[:2] == ['v1', 'files'] and parts[3] == 'content' and parts[2] in self.store.files:
+            return self._send(200, self.store.files[parts[2]]['content'], raw=True)
+        self._send(404, {'error': {'message': f"{self.path} inconnu"}})
+
+    def log_message(self, format, *args):
+        print(f"[STUB] {self.command} {self.path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local des points d'accès batch d'OpenAI")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0, help="secondes avant qu'un lot soit terminé")
+    args = parser.parse_args()
+
+    Handler.store = Store(args.delay)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), Handler)
+    print(f"Serveur batch de test sur http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()